@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import inspect, text
+from app.database import engine
+from app.models import VersaoConfiguracaoMeep
+
+def add_config_meep_versions():
+    """Criar tabela de versões de configuração MEEP e a coluna hash em configuracoes_meep"""
+    VersaoConfiguracaoMeep.__table__.create(bind=engine, checkfirst=True)
+    print("✅ Tabela configuracoes_meep_versoes criada com sucesso!")
+    
+    existentes = {coluna["name"] for coluna in inspect(engine).get_columns("configuracoes_meep")}
+    if "hash" in existentes:
+        print("✅ Campo hash já existe na tabela configuracoes_meep")
+        return
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE configuracoes_meep ADD COLUMN hash VARCHAR(64)"))
+    print("✅ Campo hash adicionado à tabela configuracoes_meep")
+
+if __name__ == "__main__":
+    add_config_meep_versions()
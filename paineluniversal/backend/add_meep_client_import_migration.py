@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import func, text
+from sqlalchemy.exc import IntegrityError
+from app.database import engine, SessionLocal
+from app.models import Importacao, MeepClient
+
+INDICE_ANTIGO = "ix_meep_clients_empresa_cpf_normalizado"
+INDICE_UNICO = "ux_meep_clients_empresa_cpf_normalizado"
+
+def add_meep_client_import_support():
+    """Criar a tabela de importações e tornar (empresa_id, cpf_normalizado) única para o upsert"""
+    Importacao.__table__.create(bind=engine, checkfirst=True)
+    print("✅ Tabela importacoes criada")
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP INDEX IF EXISTS {INDICE_ANTIGO}"))
+
+    indice = next(indice for indice in MeepClient.__table__.indexes if indice.name == INDICE_UNICO)
+    try:
+        indice.create(bind=engine, checkfirst=True)
+    except IntegrityError:
+        db = SessionLocal()
+        try:
+            duplicados = db.query(MeepClient.empresa_id, MeepClient.cpf_normalizado, func.count()).filter(
+                MeepClient.cpf_normalizado.isnot(None)
+            ).group_by(MeepClient.empresa_id, MeepClient.cpf_normalizado).having(func.count() > 1).all()
+        finally:
+            db.close()
+        print(f"❌ {len(duplicados)} CPFs duplicados impedem o índice único; corrija-os e rode novamente:")
+        for empresa_id, cpf, quantidade in duplicados:
+            print(f"   empresa {empresa_id}: CPF {cpf} ({quantidade} clientes)")
+        sys.exit(1)
+    print(f"✅ Índice único {INDICE_UNICO} criado")
+
+if __name__ == "__main__":
+    add_meep_client_import_support()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import inspect, text
+from app.database import engine, SessionLocal
+from app.models import MeepClient
+from app.services.meep_client_service import normalizar_cpf, normalizar_nome
+
+COLUNAS = {
+    "nome_busca": "VARCHAR(255)",
+    "cpf_normalizado": "VARCHAR(11)",
+}
+LOTE = 5000
+
+def add_meep_client_search_fields():
+    """Adicionar colunas normalizadas de busca de clientes MEEP, preencher e indexar"""
+    existentes = {coluna["name"] for coluna in inspect(engine).get_columns("meep_clients")}
+    with engine.begin() as conn:
+        for nome, tipo in COLUNAS.items():
+            if nome in existentes:
+                print(f"✅ Campo {nome} já existe na tabela meep_clients")
+                continue
+            conn.execute(text(f"ALTER TABLE meep_clients ADD COLUMN {nome} {tipo}"))
+            print(f"✅ Campo {nome} adicionado à tabela meep_clients")
+    
+    db = SessionLocal()
+    try:
+        total = 0
+        while True:
+            clientes = db.query(MeepClient.id, MeepClient.nome, MeepClient.cpf).filter(
+                MeepClient.nome_busca.is_(None)
+            ).limit(LOTE).all()
+            if not clientes:
+                break
+            db.bulk_update_mappings(MeepClient, [
+                {"id": id, "nome_busca": normalizar_nome(nome) or "", "cpf_normalizado": normalizar_cpf(cpf)}
+                for id, nome, cpf in clientes
+            ])
+            db.commit()
+            total += len(clientes)
+        print(f"✅ {total} clientes normalizados")
+    finally:
+        db.close()
+    
+    for indice in MeepClient.__table__.indexes:
+        indice.create(bind=engine, checkfirst=True)
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_meep_clients_nome_busca_trgm "
+                "ON meep_clients USING gin (nome_busca gin_trgm_ops)"
+            ))
+        print("✅ Índice trigram ix_meep_clients_nome_busca_trgm criado")
+    print("✅ Índices de busca de clientes criados")
+
+if __name__ == "__main__":
+    add_meep_client_search_fields()
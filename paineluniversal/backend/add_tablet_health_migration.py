@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import inspect, text
+from app.database import engine
+
+COLUNAS = {
+    "verificado_em": "TIMESTAMP WITH TIME ZONE",
+    "latencia_ms": "FLOAT",
+}
+
+def add_tablet_health_fields():
+    """Adicionar colunas do monitor de saúde dos tablets"""
+    existentes = {coluna["name"] for coluna in inspect(engine).get_columns("tablets")}
+    with engine.begin() as conn:
+        for nome, tipo in COLUNAS.items():
+            if nome in existentes:
+                print(f"✅ Campo {nome} já existe na tabela tablets")
+                continue
+            if engine.dialect.name == "sqlite" and tipo.startswith("TIMESTAMP"):
+                tipo = "DATETIME"
+            conn.execute(text(f"ALTER TABLE tablets ADD COLUMN {nome} {tipo}"))
+            print(f"✅ Campo {nome} adicionado à tabela tablets")
+
+if __name__ == "__main__":
+    add_tablet_health_fields()
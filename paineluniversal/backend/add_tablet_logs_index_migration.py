@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import engine
+from app.models import TabletLog
+
+def add_tablet_logs_index():
+    """Criar índice (tablet_id, timestamp) usado na leitura paginada dos logs de tablets"""
+    for indice in TabletLog.__table__.indexes:
+        if indice.name == "ix_tablet_logs_tablet_timestamp":
+            indice.create(bind=engine, checkfirst=True)
+            print(f"✅ Índice {indice.name} criado na tabela tablet_logs")
+
+if __name__ == "__main__":
+    add_tablet_logs_index()
@@ -0,0 +1,46 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from app.database import settings
+from app.models import Base
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("configurar_logs", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def url_banco() -> str:
+    """`sqlalchemy.url` definido pelo chamador (ex.: testes) ou DATABASE_URL"""
+    return config.get_main_option("sqlalchemy.url") or settings.database_url
+
+
+def opcoes_contexto(url: str) -> dict:
+    # SQLite não tem ALTER COLUMN; o modo batch recria a tabela
+    return {"target_metadata": target_metadata, "render_as_batch": url.startswith("sqlite"),
+            "compare_type": True}
+
+
+def run_migrations_offline() -> None:
+    url = url_banco()
+    context.configure(url=url, literal_binds=True, dialect_opts={"paramstyle": "named"}, **opcoes_contexto(url))
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    url = url_banco()
+    conectavel = create_engine(url, poolclass=pool.NullPool)
+    with conectavel.connect() as connection:
+        context.configure(connection=connection, **opcoes_contexto(url))
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
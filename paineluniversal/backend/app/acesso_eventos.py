@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from .auth import obter_usuario_atual, UsuarioPrincipal
+from .database import get_db, settings
+from .models import Evento, StatusEvento
+
+
+@dataclass(frozen=True)
+class InfoEvento:
+    """Campos do evento usados na checagem de acesso; cacheados por processo"""
+    id: int
+    empresa_id: int
+    status: StatusEvento
+    data_evento: datetime
+
+
+class CacheEventos:
+    """Cache LRU com TTL de evento_id -> InfoEvento"""
+
+    def __init__(self, ttl_segundos: int, tamanho_maximo: int):
+        self.ttl_segundos = ttl_segundos
+        self.tamanho_maximo = tamanho_maximo
+        self._entradas: "OrderedDict[int, Tuple[float, InfoEvento]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, evento_id: int) -> Optional[InfoEvento]:
+        with self._lock:
+            entrada = self._entradas.get(evento_id)
+            if entrada is None:
+                return None
+            expira_em, info = entrada
+            if expira_em <= time.monotonic():
+                del self._entradas[evento_id]
+                return None
+            self._entradas.move_to_end(evento_id)
+            return info
+
+    def armazenar(self, info: InfoEvento):
+        if self.ttl_segundos <= 0 or self.tamanho_maximo <= 0:
+            return
+        with self._lock:
+            self._entradas[info.id] = (time.monotonic() + self.ttl_segundos, info)
+            self._entradas.move_to_end(info.id)
+            while len(self._entradas) > self.tamanho_maximo:
+                self._entradas.popitem(last=False)
+
+    def invalidar(self, evento_id: int):
+        """Remover o evento do cache (atualização ou cancelamento)"""
+        with self._lock:
+            self._entradas.pop(evento_id, None)
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+
+    def __len__(self):
+        return len(self._entradas)
+
+
+cache_eventos = CacheEventos(settings.evento_cache_ttl_segundos, settings.evento_cache_max)
+
+
+def obter_info_evento(db: Session, evento_id: int) -> Optional[InfoEvento]:
+    info = cache_eventos.obter(evento_id)
+    if info is not None:
+        return info
+
+    linha = db.query(
+        Evento.id, Evento.empresa_id, Evento.status, Evento.data_evento
+    ).filter(Evento.id == evento_id).first()
+    if linha is None:
+        return None
+
+    info = InfoEvento(id=linha.id, empresa_id=linha.empresa_id, status=linha.status, data_evento=linha.data_evento)
+    cache_eventos.armazenar(info)
+    return info
+
+
+def verificar_acesso_evento(db: Session, evento_id: int, usuario_atual) -> InfoEvento:
+    """Garantir que o evento existe e pertence à empresa do usuário (admins acessam todos)"""
+    info = obter_info_evento(db, evento_id)
+    if info is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Evento não encontrado"
+        )
+
+    if (usuario_atual.tipo.value != "admin" and
+        usuario_atual.empresa_id != info.empresa_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Acesso negado"
+        )
+
+    return info
+
+
+def require_evento_access(
+    evento_id: int,
+    db: Session = Depends(get_db),
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
+) -> InfoEvento:
+    """Dependency para rotas com `evento_id` no path ou na query"""
+    return verificar_acesso_evento(db, evento_id, usuario_atual)
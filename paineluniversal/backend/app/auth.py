@@ -1,15 +1,22 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Optional, Dict, Set, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from .database import get_db, settings
-from .models import Usuario
+from .models import Usuario, TipoUsuario
 from .schemas import TokenData
+from .metrics import registro, Histograma, Contador, registrar_fila
+import asyncio
 import secrets
 import string
+import threading
+import time
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
@@ -20,6 +27,69 @@ def verificar_senha(senha_plana: str, senha_hash: str) -> bool:
 def gerar_hash_senha(senha: str) -> str:
     return pwd_context.hash(senha)
 
+BUCKETS_SENHA = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+senhas_duracao = registro.registrar(Histograma(
+    "password_hash_duration_seconds",
+    "Duração das operações bcrypt (hash e verificação) no executor de senhas",
+    labels=("operacao",),
+    buckets=BUCKETS_SENHA
+))
+
+senhas_rejeitadas = registro.registrar(Contador(
+    "password_hash_rejected_total",
+    "Operações de senha recusadas com o executor saturado",
+    labels=("operacao",)
+))
+
+class ExecutorSenhas:
+    """Executa o bcrypt fora do event loop em um pool dedicado, com limite de
+    operações em andamento; acima do limite a requisição falha na hora com 503."""
+
+    def __init__(self, max_workers: int, max_fila: int):
+        self.max_workers = max_workers
+        self.limite = max_workers + max_fila
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="senhas")
+        self._em_andamento = 0
+        self._lock = threading.Lock()
+
+    def _medir(self, operacao: str, funcao: Callable, args: tuple):
+        inicio = time.perf_counter()
+        try:
+            return funcao(*args)
+        finally:
+            senhas_duracao.observe(time.perf_counter() - inicio, operacao=operacao)
+
+    async def executar(self, operacao: str, funcao: Callable, *args):
+        with self._lock:
+            if self._em_andamento >= self.limite:
+                senhas_rejeitadas.inc(operacao=operacao)
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Servidor ocupado processando autenticações, tente novamente",
+                    headers={"Retry-After": "1"}
+                )
+            self._em_andamento += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._medir, operacao, funcao, args)
+        finally:
+            with self._lock:
+                self._em_andamento -= 1
+
+    def aguardando(self) -> int:
+        """Operações enfileiradas além das que estão ocupando os workers"""
+        return max(0, self._em_andamento - self.max_workers)
+
+executor_senhas = ExecutorSenhas(settings.senha_hash_workers, settings.senha_hash_fila_max)
+registrar_fila("senhas", executor_senhas.aguardando)
+
+async def verificar_senha_async(senha_plana: str, senha_hash: str) -> bool:
+    return await executor_senhas.executar("verificar", verificar_senha, senha_plana, senha_hash)
+
+async def gerar_hash_senha_async(senha: str) -> str:
+    return await executor_senhas.executar("hash", gerar_hash_senha, senha)
+
 def gerar_codigo_verificacao() -> str:
     """Gera código de 6 dígitos para autenticação multi-fator"""
     return ''.join(secrets.choice(string.digits) for _ in range(6))
@@ -30,7 +100,7 @@ def criar_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": int(time.time())})
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
@@ -45,12 +115,96 @@ def verificar_token(credentials: HTTPAuthorizationCredentials = Depends(security
         cpf = payload.get("sub")
         if cpf is None or not isinstance(cpf, str):
             raise credentials_exception
-        token_data = TokenData(cpf=cpf)
+        iat = payload.get("iat")
+        token_data = TokenData(cpf=cpf, iat=iat if isinstance(iat, int) else None)
     except JWTError:
         raise credentials_exception
     return token_data
 
-def obter_usuario_atual(token_data: TokenData = Depends(verificar_token), db: Session = Depends(get_db)):
+@dataclass(frozen=True)
+class UsuarioPrincipal:
+    """Dados do usuário autenticado usados pelos handlers; imutável e desacoplado da sessão"""
+    id: int
+    cpf: str
+    nome: str
+    tipo: TipoUsuario
+    empresa_id: Optional[int]
+    ativo: bool
+
+    @classmethod
+    def from_usuario(cls, usuario: Usuario) -> "UsuarioPrincipal":
+        return cls(
+            id=usuario.id,
+            cpf=usuario.cpf,
+            nome=usuario.nome,
+            tipo=usuario.tipo,
+            empresa_id=usuario.empresa_id,
+            ativo=usuario.ativo
+        )
+
+class CachePrincipais:
+    """Cache LRU com TTL dos principais autenticados, chaveado por CPF + iat do token"""
+
+    def __init__(self, ttl_segundos: int, tamanho_maximo: int):
+        self.ttl_segundos = ttl_segundos
+        self.tamanho_maximo = tamanho_maximo
+        self._entradas: "OrderedDict[Tuple[str, Optional[int]], Tuple[float, UsuarioPrincipal]]" = OrderedDict()
+        self._chaves_por_cpf: Dict[str, Set[Tuple[str, Optional[int]]]] = {}
+        self._lock = threading.Lock()
+
+    def obter(self, cpf: str, iat: Optional[int]) -> Optional[UsuarioPrincipal]:
+        chave = (cpf, iat)
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                return None
+            expira_em, principal = entrada
+            if expira_em <= time.monotonic():
+                self._remover(chave)
+                return None
+            self._entradas.move_to_end(chave)
+            return principal
+
+    def armazenar(self, cpf: str, iat: Optional[int], principal: UsuarioPrincipal):
+        if self.ttl_segundos <= 0 or self.tamanho_maximo <= 0:
+            return
+        chave = (cpf, iat)
+        with self._lock:
+            self._entradas[chave] = (time.monotonic() + self.ttl_segundos, principal)
+            self._entradas.move_to_end(chave)
+            self._chaves_por_cpf.setdefault(cpf, set()).add(chave)
+            while len(self._entradas) > self.tamanho_maximo:
+                self._remover(next(iter(self._entradas)))
+
+    def invalidar(self, cpf: str):
+        """Remover todas as entradas de um CPF (atualização ou desativação do usuário)"""
+        with self._lock:
+            for chave in list(self._chaves_por_cpf.get(cpf, ())):
+                self._remover(chave)
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._chaves_por_cpf.clear()
+
+    def _remover(self, chave):
+        self._entradas.pop(chave, None)
+        chaves = self._chaves_por_cpf.get(chave[0])
+        if chaves is not None:
+            chaves.discard(chave)
+            if not chaves:
+                del self._chaves_por_cpf[chave[0]]
+
+    def __len__(self):
+        return len(self._entradas)
+
+cache_principais = CachePrincipais(settings.principal_cache_ttl_segundos, settings.principal_cache_max)
+
+def obter_usuario_atual(token_data: TokenData = Depends(verificar_token), db: Session = Depends(get_db)) -> UsuarioPrincipal:
+    principal = cache_principais.obter(token_data.cpf, token_data.iat)
+    if principal is not None:
+        return principal
+    
     usuario = db.query(Usuario).filter(Usuario.cpf == token_data.cpf).first()
     if usuario is None:
         raise HTTPException(
@@ -62,9 +216,12 @@ def obter_usuario_atual(token_data: TokenData = Depends(verificar_token), db: Se
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Usuário inativo"
         )
-    return usuario
+    
+    principal = UsuarioPrincipal.from_usuario(usuario)
+    cache_principais.armazenar(token_data.cpf, token_data.iat, principal)
+    return principal
 
-def verificar_permissao_admin(usuario_atual: Usuario = Depends(obter_usuario_atual)):
+def verificar_permissao_admin(usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)) -> UsuarioPrincipal:
     if usuario_atual.tipo.value != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -72,7 +229,7 @@ def verificar_permissao_admin(usuario_atual: Usuario = Depends(obter_usuario_atu
         )
     return usuario_atual
 
-def verificar_permissao_promoter(usuario_atual: Usuario = Depends(obter_usuario_atual)):
+def verificar_permissao_promoter(usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)) -> UsuarioPrincipal:
     if usuario_atual.tipo.value not in ["admin", "promoter"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -80,11 +237,11 @@ def verificar_permissao_promoter(usuario_atual: Usuario = Depends(obter_usuario_
         )
     return usuario_atual
 
-def autenticar_usuario(cpf: str, senha: str, db: Session):
+async def autenticar_usuario(cpf: str, senha: str, db: Session):
     usuario = db.query(Usuario).filter(Usuario.cpf == cpf).first()
     if not usuario:
         return False
-    if not verificar_senha(senha, usuario.senha_hash):
+    if not await verificar_senha_async(senha, usuario.senha_hash):
         return False
     return usuario
 
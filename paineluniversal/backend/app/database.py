@@ -2,6 +2,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from pydantic_settings import BaseSettings
+from typing import Optional
 import os
 
 class Settings(BaseSettings):
@@ -10,6 +11,92 @@ class Settings(BaseSettings):
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     
+    metrics_token: str = ""
+    
+    sql_profiling: bool = False
+    sql_profiling_header_ttl_segundos: int = 300
+    slow_query_threshold_ms: int = 500
+    slow_query_log_file: str = "logs/slow_queries.log"
+    slow_query_log_max_bytes: int = 10 * 1024 * 1024
+    slow_query_log_backups: int = 5
+    
+    loop_monitor_intervalo_ms: int = 100
+    loop_lag_limite_ms: int = 200
+    loop_lag_debug: bool = False
+    
+    principal_cache_ttl_segundos: int = 30
+    principal_cache_max: int = 10000
+    
+    senha_hash_workers: int = 2
+    senha_hash_fila_max: int = 32
+    
+    codigo_verificacao_backend: str = "memoria"
+    codigo_verificacao_ttl_segundos: int = 300
+    codigo_verificacao_max_tentativas: int = 5
+    codigo_verificacao_max: int = 10000
+    codigo_verificacao_limpeza_minutos: int = 10
+    
+    evento_cache_ttl_segundos: int = 60
+    evento_cache_max: int = 5000
+    
+    scheduler_habilitado: bool = True
+    scheduler_lock_file: str = "logs/scheduler.lock"
+    scheduler_lock_chave: int = 7270001
+    scheduler_lider_intervalo_segundos: int = 30
+    scheduler_jitter_segundos: int = 60
+    alertas_intervalo_minutos: int = 30
+    alertas_timeout_segundos: int = 600
+    
+    whatsapp_remetente_padrao: str = "padrao"
+    whatsapp_taxa_por_segundo: float = 20
+    whatsapp_rajada: int = 20
+    whatsapp_envios_concorrentes: int = 8
+    whatsapp_max_tentativas: int = 5
+    whatsapp_backoff_segundos: float = 1.0
+    whatsapp_fila_max: int = 20000
+    whatsapp_drenar_segundos: int = 5
+    whatsapp_convites_max: int = 1000
+    
+    n8n_webhook_url: str = ""
+    outbox_intervalo_segundos: int = 2
+    outbox_tamanho_lote: int = 100
+    outbox_max_tentativas: int = 8
+    outbox_backoff_segundos: float = 5.0
+    outbox_timeout_entrega_segundos: int = 60
+    outbox_retencao_dias: int = 7
+    
+    http_limite_conexoes: int = 100
+    http_limite_por_host: int = 10
+    http_keepalive_segundos: float = 30
+    http_timeout_segundos: float = 10
+    http_timeout_conexao_segundos: float = 3
+    http_tentativas: int = 2
+    http_backoff_segundos: float = 0.2
+    
+    tablets_ciclo_segundos: int = 5
+    tablets_intervalo_segundos: int = 30
+    tablets_intervalo_falha_segundos: int = 5
+    tablets_intervalo_max_segundos: int = 300
+    tablets_timeout_segundos: float = 3
+    tablets_verificacoes_concorrentes: int = 20
+    tablets_sync_timeout_segundos: float = 10
+    tablets_sync_concorrentes: int = 10
+    
+    tablet_logs_lote_max: int = 1000
+    tablet_logs_pagina_max: int = 500
+    tablet_logs_retencao_dias: int = 30
+    tablet_logs_limpeza_minutos: int = 60
+    tablet_logs_lote_limpeza: int = 5000
+    
+    meep_clientes_pagina_max: int = 200
+    meep_restricoes_ttl_segundos: int = 30
+    
+    importacao_tamanho_lote: int = 2000
+    importacao_max_erros: int = 500
+    importacao_diretorio: Optional[str] = None
+    
+    prontidao_timeout_segundos: float = 2
+    
     class Config:
         env_file = ".env"
 
@@ -24,8 +111,12 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 def get_db():
+    """Sessão por requisição. A conexão sai do pool aqui, no threadpool onde as
+    dependências síncronas rodam: com o pool esgotado a espera (até `pool_timeout`)
+    não pode acontecer dentro das rotas async, no event loop."""
     db = SessionLocal()
     try:
+        db.connection()
         yield db
     finally:
         db.close()
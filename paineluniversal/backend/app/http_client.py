@@ -0,0 +1,139 @@
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+from .database import settings
+from .metrics import registro, Contador, Histograma
+
+logger = logging.getLogger(__name__)
+
+METODOS_IDEMPOTENTES = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+STATUS_REPETIVEIS = {502, 503, 504}
+
+requisicoes_http = registro.registrar(Contador(
+    "http_client_requests_total",
+    "Requisições HTTP de saída por integração e resultado",
+    labels=("integracao", "resultado")
+))
+
+duracao_http = registro.registrar(Histograma(
+    "http_client_request_duration_seconds",
+    "Duração das requisições HTTP de saída (cada tentativa)",
+    labels=("integracao",)
+))
+
+
+@dataclass
+class RespostaHTTP:
+    status: int
+    corpo: bytes
+    headers: Dict[str, str]
+
+    def json(self) -> Any:
+        return json.loads(self.corpo) if self.corpo else None
+
+
+class ClienteHTTP:
+    """Sessão aiohttp única para todas as integrações de saída, com pool de conexões
+    keep-alive limitado por host, timeouts padrão e retentativa em falhas transitórias.
+
+    Criada no lifespan; fora dele (scripts, testes) a sessão é aberta sob demanda no
+    event loop corrente.
+    """
+
+    def __init__(self, limite_conexoes: int, limite_por_host: int, keepalive_segundos: float,
+                 timeout_segundos: float, timeout_conexao_segundos: float,
+                 tentativas: int, backoff_segundos: float):
+        self.limite_conexoes = limite_conexoes
+        self.limite_por_host = limite_por_host
+        self.keepalive_segundos = keepalive_segundos
+        self.timeout_segundos = timeout_segundos
+        self.timeout_conexao_segundos = timeout_conexao_segundos
+        self.tentativas = tentativas
+        self.backoff_segundos = backoff_segundos
+        self._sessao: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def iniciar(self):
+        self._obter_sessao()
+
+    async def parar(self):
+        if self._sessao is not None and self._loop is asyncio.get_running_loop():
+            await self._sessao.close()
+        self._sessao = None
+        self._loop = None
+
+    def _obter_sessao(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._sessao is None or self._sessao.closed or self._loop is not loop:
+            conector = aiohttp.TCPConnector(
+                limit=self.limite_conexoes,
+                limit_per_host=self.limite_por_host,
+                keepalive_timeout=self.keepalive_segundos,
+                ttl_dns_cache=300
+            )
+            self._sessao = aiohttp.ClientSession(
+                connector=conector,
+                timeout=aiohttp.ClientTimeout(
+                    total=self.timeout_segundos, sock_connect=self.timeout_conexao_segundos
+                )
+            )
+            self._loop = loop
+        return self._sessao
+
+    async def requisitar(self, metodo: str, url: str, integracao: str, timeout: float = None,
+                         tentativas: int = None, **kwargs) -> RespostaHTTP:
+        """Executa a requisição e lê o corpo. Repete em erro de conexão, timeout ou
+        502/503/504 apenas para métodos idempotentes, salvo `tentativas` explícito.
+        Timeouts são levantados como `aiohttp.ServerTimeoutError` (um `ClientError`)."""
+        metodo = metodo.upper()
+        if tentativas is None:
+            tentativas = self.tentativas if metodo in METODOS_IDEMPOTENTES else 1
+        if timeout is not None:
+            kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout, sock_connect=self.timeout_conexao_segundos)
+
+        for tentativa in range(1, tentativas + 1):
+            ultima = tentativa == tentativas
+            inicio = time.perf_counter()
+            try:
+                async with self._obter_sessao().request(metodo, url, **kwargs) as response:
+                    resposta = RespostaHTTP(response.status, await response.read(), dict(response.headers))
+            except asyncio.TimeoutError:
+                requisicoes_http.inc(integracao=integracao, resultado="timeout")
+                if ultima:
+                    raise aiohttp.ServerTimeoutError(f"Timeout em {metodo} {url}")
+            except aiohttp.ClientError:
+                requisicoes_http.inc(integracao=integracao, resultado="erro_conexao")
+                if ultima:
+                    raise
+            else:
+                if resposta.status in STATUS_REPETIVEIS and not ultima:
+                    requisicoes_http.inc(integracao=integracao, resultado="retentativa")
+                else:
+                    requisicoes_http.inc(integracao=integracao, resultado=f"{resposta.status // 100}xx")
+                    return resposta
+            finally:
+                duracao_http.observe(time.perf_counter() - inicio, integracao=integracao)
+            await asyncio.sleep(self.backoff_segundos * 2 ** (tentativa - 1))
+
+    async def get(self, url: str, integracao: str, **kwargs) -> RespostaHTTP:
+        return await self.requisitar("GET", url, integracao, **kwargs)
+
+    async def post(self, url: str, integracao: str, **kwargs) -> RespostaHTTP:
+        return await self.requisitar("POST", url, integracao, **kwargs)
+
+
+cliente_http = ClienteHTTP(
+    limite_conexoes=settings.http_limite_conexoes,
+    limite_por_host=settings.http_limite_por_host,
+    keepalive_segundos=settings.http_keepalive_segundos,
+    timeout_segundos=settings.http_timeout_segundos,
+    timeout_conexao_segundos=settings.http_timeout_conexao_segundos,
+    tentativas=settings.http_tentativas,
+    backoff_segundos=settings.http_backoff_segundos
+)
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional
+
+from .database import settings
+from .metrics import registro, Histograma, Contador, Medidor
+
+logger = logging.getLogger(__name__)
+
+BUCKETS_LAG = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+lag_event_loop = registro.registrar(Histograma(
+    "event_loop_lag_seconds",
+    "Atraso do event loop em relação ao intervalo de amostragem",
+    buckets=BUCKETS_LAG
+))
+
+lag_event_loop_atual = registro.registrar(Medidor(
+    "event_loop_lag_last_seconds",
+    "Último atraso medido do event loop"
+))
+
+bloqueios_event_loop = registro.registrar(Contador(
+    "event_loop_blocked_total",
+    "Bloqueios do event loop acima do limite detectados pelo watchdog (modo debug)"
+))
+
+
+class MonitorEventLoop:
+    """Mede continuamente o atraso do event loop e, em modo debug, captura a pilha
+    do código que o manteve bloqueado por mais que o limite configurado."""
+
+    def __init__(self, intervalo_ms: int = None, limite_ms: int = None,
+                 debug: bool = None, max_capturas: int = 50):
+        self.intervalo = (intervalo_ms or settings.loop_monitor_intervalo_ms) / 1000
+        self.limite = (limite_ms or settings.loop_lag_limite_ms) / 1000
+        self.debug = settings.loop_lag_debug if debug is None else debug
+        self.capturas: Deque[Dict] = deque(maxlen=max_capturas)
+        self._tarefa: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._parar_watchdog = threading.Event()
+        self._thread_loop_id: Optional[int] = None
+        self._batimento = time.monotonic()
+
+    async def _amostrar(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            inicio = loop.time()
+            self._batimento = time.monotonic()
+            await asyncio.sleep(self.intervalo)
+            lag = max(0.0, loop.time() - inicio - self.intervalo)
+            lag_event_loop.observe(lag)
+            lag_event_loop_atual.set(lag)
+
+    def _vigiar(self):
+        """Thread watchdog: se o batimento do loop atrasar além do limite, registra a pilha"""
+        capturado_no_batimento = None
+        while not self._parar_watchdog.wait(self.limite / 4):
+            batimento = self._batimento
+            bloqueado_por = time.monotonic() - batimento - self.intervalo
+            if bloqueado_por < self.limite or capturado_no_batimento == batimento:
+                continue
+            frame = sys._current_frames().get(self._thread_loop_id)
+            if frame is None:
+                continue
+            capturado_no_batimento = batimento
+            pilha = traceback.format_stack(frame)
+            bloqueios_event_loop.inc()
+            captura = {
+                "capturado_em": datetime.now().isoformat(),
+                "bloqueado_ms": round(bloqueado_por * 1000, 1),
+                "pilha": [linha.rstrip() for linha in pilha]
+            }
+            self.capturas.append(captura)
+            logger.warning(
+                "Event loop bloqueado há %.0fms:\n%s", bloqueado_por * 1000, "".join(pilha[-8:])
+            )
+
+    def iniciar(self):
+        """Iniciar o monitor no event loop em execução"""
+        if self._tarefa is not None:
+            return
+        self._thread_loop_id = threading.get_ident()
+        self._batimento = time.monotonic()
+        self._tarefa = asyncio.get_running_loop().create_task(self._amostrar())
+        if self.debug:
+            self._parar_watchdog.clear()
+            self._watchdog = threading.Thread(target=self._vigiar, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+        logger.info("Monitor do event loop iniciado (debug=%s)", self.debug)
+
+    async def parar(self):
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            try:
+                await self._tarefa
+            except asyncio.CancelledError:
+                pass
+            self._tarefa = None
+        if self._watchdog is not None:
+            self._parar_watchdog.set()
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    def listar_capturas(self) -> List[Dict]:
+        return list(reversed(self.capturas))
+
+
+monitor_event_loop = MonitorEventLoop()
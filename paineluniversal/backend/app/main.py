@@ -1,25 +1,50 @@
 from fastapi import FastAPI, Depends, HTTPException, status, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
-import psycopg
+from contextlib import asynccontextmanager
+import secrets
 
-from .database import engine, get_db
-from .models import Base
-from .routers import auth, eventos, usuarios, empresas, listas, transacoes, checkins, dashboard, relatorios, whatsapp, cupons, n8n, pdv, financeiro, gamificacao, tablets, meep_clients
-from .middleware import LoggingMiddleware
+from .database import engine, get_db, settings
+from .routers import auth, eventos, usuarios, empresas, listas, transacoes, checkins, dashboard, relatorios, whatsapp, cupons, n8n, pdv, financeiro, gamificacao, tablets, meep_clients, debug
+from .middleware import LoggingMiddleware, SQLProfilingMiddleware
 from .auth import verificar_permissao_admin
-from .scheduler import start_scheduler
+from .scheduler import scheduler
 from .websocket import manager
+from .metrics import registro, instrumentar_engine
+from .profiling import instrumentar_profiling
+from .loop_monitor import monitor_event_loop
+from .prontidao import prontidao_banco
+from .http_client import cliente_http
+from .paginacao import HEADER_PROXIMO_CURSOR
+from .services.meep_client_service import HEADER_ALERTA_CLIENTE
+from .services.whatsapp_service import despachante_whatsapp
 
-Base.metadata.create_all(bind=engine)
+instrumentar_engine(engine)
+instrumentar_profiling(engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    monitor_event_loop.iniciar()
+    await prontidao_banco.verificar_na_subida()
+    await cliente_http.iniciar()
+    await despachante_whatsapp.iniciar()
+    if settings.scheduler_habilitado:
+        await scheduler.iniciar()
+    yield
+    await scheduler.parar()
+    await despachante_whatsapp.parar(settings.whatsapp_drenar_segundos)
+    await cliente_http.parar()
+    await monitor_event_loop.parar()
 
 app = FastAPI(
     title="Sistema de Gestão de Eventos",
     description="API completa para gestão de eventos com foco em segurança e automação via CPF",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Disable CORS. Do not remove this for full-stack development.
@@ -29,11 +54,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
+    expose_headers=[HEADER_PROXIMO_CURSOR, HEADER_ALERTA_CLIENTE],
 )
 
 app.add_middleware(LoggingMiddleware)
-
-start_scheduler()
+app.add_middleware(SQLProfilingMiddleware)
 
 app.include_router(auth.router, prefix="/api/auth", tags=["Autenticação"])
 app.include_router(empresas.router, prefix="/api/empresas", tags=["Empresas"])
@@ -52,6 +77,7 @@ app.include_router(financeiro.router, prefix="/api")
 app.include_router(gamificacao.router, prefix="/api")
 app.include_router(tablets.router, prefix="/api", tags=["Tablets"])
 app.include_router(meep_clients.router, prefix="/api", tags=["MEEP Clients"])
+app.include_router(debug.router, prefix="/api/debug", tags=["Debug"])
 
 @app.websocket("/api/pdv/ws/{evento_id}")
 async def websocket_endpoint(websocket: WebSocket, evento_id: int):
@@ -74,9 +100,32 @@ async def checkin_websocket_endpoint(websocket: WebSocket, evento_id: int):
         manager.disconnect(websocket, evento_id)
 
 @app.get("/healthz")
+@app.get("/healthz/live")
 async def healthz():
+    """Liveness: o processo responde; não toca o banco"""
     return {"status": "ok", "mensagem": "Sistema de Gestão de Eventos funcionando"}
 
+@app.get("/healthz/ready")
+async def healthz_ready():
+    """Readiness: conexão do pool ao banco e esquema na revisão esperada; 503 caso contrário"""
+    pronto, estado = await prontidao_banco.verificar()
+    return JSONResponse(estado, status_code=status.HTTP_200_OK if pronto else status.HTTP_503_SERVICE_UNAVAILABLE)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Métricas Prometheus; exige `Authorization: Bearer <METRICS_TOKEN>` e fica
+    desligada (404) enquanto o token não for configurado"""
+    if not settings.metrics_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    esperado = f"Bearer {settings.metrics_token}"
+    if not secrets.compare_digest(request.headers.get("authorization", "").encode(), esperado.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token de métricas inválido",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    return PlainTextResponse(registro.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/")
 async def root():
     return {
@@ -0,0 +1,291 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from sqlalchemy import event
+
+BUCKETS_REQUISICAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_CONSULTA = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+BUCKETS_JOB = (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _formatar_labels(nomes: Tuple[str, ...], valores: Tuple, extra: str = "") -> str:
+    pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _formatar_numero(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    if float(valor).is_integer():
+        return str(int(valor))
+    return repr(float(valor))
+
+
+class Metrica(ABC):
+    """Base das métricas em memória; cada série é identificada pela tupla de labels"""
+
+    tipo = "untyped"
+
+    def __init__(self, nome: str, descricao: str, labels: Iterable[str] = ()):
+        self.nome = nome
+        self.descricao = descricao
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _chave(self, labels: Dict) -> Tuple:
+        return tuple(labels.get(nome, "") for nome in self.labels)
+
+    @abstractmethod
+    def amostras(self) -> List[str]:
+        ...
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.nome} {self.descricao}",
+            f"# TYPE {self.nome} {self.tipo}",
+            *self.amostras()
+        ]
+
+
+class Contador(Metrica):
+    tipo = "counter"
+
+    def __init__(self, nome: str, descricao: str, labels: Iterable[str] = ()):
+        super().__init__(nome, descricao, labels)
+        self._valores: Dict[Tuple, float] = {}
+
+    def inc(self, valor: float = 1, **labels):
+        chave = self._chave(labels)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+
+    def valor(self, **labels) -> float:
+        return self._valores.get(self._chave(labels), 0)
+
+    def amostras(self) -> List[str]:
+        with self._lock:
+            itens = list(self._valores.items())
+        return [
+            f"{self.nome}{_formatar_labels(self.labels, chave)} {_formatar_numero(valor)}"
+            for chave, valor in itens
+        ]
+
+
+class Medidor(Metrica):
+    """Gauge; quando recebe ``coletar``, os valores são lidos no momento da coleta"""
+
+    tipo = "gauge"
+
+    def __init__(self, nome: str, descricao: str, labels: Iterable[str] = (),
+                 coletar: Callable[[], Iterable[Tuple[Dict, float]]] = None):
+        super().__init__(nome, descricao, labels)
+        self._valores: Dict[Tuple, float] = {}
+        self._coletar = coletar
+
+    def set(self, valor: float, **labels):
+        with self._lock:
+            self._valores[self._chave(labels)] = valor
+
+    def inc(self, valor: float = 1, **labels):
+        chave = self._chave(labels)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+
+    def dec(self, valor: float = 1, **labels):
+        self.inc(-valor, **labels)
+
+    def valor(self, **labels) -> float:
+        return self._valores.get(self._chave(labels), 0)
+
+    def amostras(self) -> List[str]:
+        if self._coletar is not None:
+            try:
+                itens = [(self._chave(labels), valor) for labels, valor in self._coletar()]
+            except Exception:
+                itens = []
+        else:
+            with self._lock:
+                itens = list(self._valores.items())
+        return [
+            f"{self.nome}{_formatar_labels(self.labels, chave)} {_formatar_numero(valor)}"
+            for chave, valor in itens
+        ]
+
+
+class Histograma(Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nome: str, descricao: str, labels: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = BUCKETS_REQUISICAO):
+        super().__init__(nome, descricao, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple, List] = {}
+
+    def observe(self, valor: float, **labels):
+        chave = self._chave(labels)
+        indice = bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(chave)
+            if serie is None:
+                serie = self._series[chave] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            serie[0][indice] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def contagem(self, **labels) -> int:
+        serie = self._series.get(self._chave(labels))
+        return serie[2] if serie else 0
+
+    def amostras(self) -> List[str]:
+        with self._lock:
+            itens = [(chave, (list(serie[0]), serie[1], serie[2])) for chave, serie in self._series.items()]
+        linhas = []
+        for chave, (contagens, soma, total) in itens:
+            acumulado = 0
+            for limite, quantidade in zip(self.buckets + (float("inf"),), contagens):
+                acumulado += quantidade
+                le = f'le="{_formatar_numero(limite)}"'
+                linhas.append(f"{self.nome}_bucket{_formatar_labels(self.labels, chave, le)} {acumulado}")
+            linhas.append(f"{self.nome}_sum{_formatar_labels(self.labels, chave)} {repr(soma)}")
+            linhas.append(f"{self.nome}_count{_formatar_labels(self.labels, chave)} {total}")
+        return linhas
+
+
+class RegistroMetricas:
+    def __init__(self):
+        self._metricas: Dict[str, Metrica] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, metrica: Metrica) -> Metrica:
+        with self._lock:
+            return self._metricas.setdefault(metrica.nome, metrica)
+
+    def render(self) -> str:
+        with self._lock:
+            metricas = list(self._metricas.values())
+        linhas = []
+        for metrica in metricas:
+            linhas.extend(metrica.render())
+        return "\n".join(linhas) + "\n"
+
+
+registro = RegistroMetricas()
+
+requisicoes_duracao = registro.registrar(Histograma(
+    "http_request_duration_seconds",
+    "Latência das requisições HTTP por rota e status",
+    labels=("method", "route", "status")
+))
+
+consultas_total = registro.registrar(Contador(
+    "db_queries_total",
+    "Comandos SQL executados"
+))
+
+consultas_duracao = registro.registrar(Histograma(
+    "db_query_duration_seconds",
+    "Duração dos comandos SQL",
+    buckets=BUCKETS_CONSULTA
+))
+
+jobs_duracao = registro.registrar(Histograma(
+    "scheduler_job_duration_seconds",
+    "Duração das execuções de jobs do scheduler",
+    labels=("job", "resultado"),
+    buckets=BUCKETS_JOB
+))
+
+_filas: Dict[str, Callable[[], int]] = {}
+
+
+def registrar_fila(nome: str, profundidade: Callable[[], int]):
+    """Expor a profundidade de uma fila de tarefas em segundo plano (ex.: outbox)"""
+    _filas[nome] = profundidade
+
+
+def _coletar_filas():
+    return [({"fila": nome}, profundidade()) for nome, profundidade in list(_filas.items())]
+
+
+registro.registrar(Medidor(
+    "background_queue_depth",
+    "Itens aguardando nas filas de tarefas em segundo plano",
+    labels=("fila",),
+    coletar=_coletar_filas
+))
+
+
+def _coletar_websockets():
+    from .websocket import manager
+    return [
+        ({"evento_id": evento_id}, len(conexoes))
+        for evento_id, conexoes in list(manager.active_connections.items())
+    ]
+
+
+registro.registrar(Medidor(
+    "websocket_connections",
+    "Conexões WebSocket ativas por evento",
+    labels=("evento_id",),
+    coletar=_coletar_websockets
+))
+
+
+def instrumentar_engine(engine):
+    """Contar consultas e medir sua duração via eventos do SQLAlchemy, e expor o pool"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _depois(conn, cursor, statement, parameters, context, executemany):
+        inicios = conn.info.get("metrics_query_start")
+        if inicios:
+            consultas_duracao.observe(time.perf_counter() - inicios.pop())
+        consultas_total.inc()
+
+    def _coletar_pool():
+        pool = engine.pool
+        estatisticas = []
+        for estado, metodo in (("tamanho", "size"), ("em_uso", "checkedout"),
+                               ("livres", "checkedin"), ("overflow", "overflow")):
+            if hasattr(pool, metodo):
+                estatisticas.append(({"estado": estado}, getattr(pool, metodo)()))
+        return estatisticas
+
+    registro.registrar(Medidor(
+        "db_pool_connections",
+        "Conexões do pool do SQLAlchemy por estado",
+        labels=("estado",),
+        coletar=_coletar_pool
+    ))
+
+
+def medir_job(nome: str):
+    """Decorator que registra a duração de um job do scheduler"""
+
+    def decorator(funcao):
+        @wraps(funcao)
+        def executar(*args, **kwargs):
+            inicio = time.perf_counter()
+            resultado = "erro"
+            try:
+                retorno = funcao(*args, **kwargs)
+                resultado = "sucesso"
+                return retorno
+            finally:
+                jobs_duracao.observe(time.perf_counter() - inicio, job=nome, resultado=resultado)
+        return executar
+
+    return decorator
@@ -1,8 +1,13 @@
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 from sqlalchemy.orm import Session
-from .database import SessionLocal
+from .database import SessionLocal, settings
 from .models import LogAuditoria
+from .metrics import requisicoes_duracao
+from .profiling import (
+    HEADER_PROFILING, HEADER_RESUMO, HEADER_PERFIL_ID,
+    header_profiling_valido, iniciar_perfil, encerrar_perfil
+)
 import json
 import time
 
@@ -19,6 +24,14 @@ class LoggingMiddleware(BaseHTTPMiddleware):
         
         process_time = time.time() - start_time
         
+        rota = request.scope.get("route")
+        requisicoes_duracao.observe(
+            process_time,
+            method=method,
+            route=getattr(rota, "path", "desconhecida"),
+            status=response.status_code
+        )
+        
         if url.startswith("/api/"):
             db = SessionLocal()
             try:
@@ -50,3 +63,24 @@ class LoggingMiddleware(BaseHTTPMiddleware):
         response.headers["X-Process-Time"] = str(process_time)
         
         return response
+
+class SQLProfilingMiddleware(BaseHTTPMiddleware):
+    """Perfil de SQL por requisição, ativado pela configuração ou pelo header assinado"""
+    
+    async def dispatch(self, request: Request, call_next):
+        if not (settings.sql_profiling or header_profiling_valido(request.headers.get(HEADER_PROFILING))):
+            return await call_next(request)
+        
+        perfil = iniciar_perfil(request.method, request.url.path)
+        start_time = time.perf_counter()
+        try:
+            response = await call_next(request)
+        except Exception:
+            encerrar_perfil(perfil, 500, (time.perf_counter() - start_time) * 1000)
+            raise
+        encerrar_perfil(perfil, response.status_code, (time.perf_counter() - start_time) * 1000)
+        
+        response.headers[HEADER_RESUMO] = perfil.resumo()
+        response.headers[HEADER_PERFIL_ID] = perfil.id
+        
+        return response
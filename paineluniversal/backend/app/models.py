@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Numeric, Enum, Date
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Numeric, Enum, Date, UniqueConstraint, Index, Float
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
+from datetime import datetime
 import enum
 
 class StatusEvento(enum.Enum):
@@ -135,7 +136,11 @@ class Transacao(Base):
     email_comprador = Column(String(255))
     telefone_comprador = Column(String(20))
     valor = Column(Numeric(10, 2), nullable=False)
-    status = Column(Enum(StatusTransacao), default=StatusTransacao.PENDENTE)
+    # Persistir o valor ("aprovada"), que é o que os routers gravam e filtram
+    status = Column(
+        Enum(StatusTransacao, values_callable=lambda enum: [membro.value for membro in enum]),
+        default=StatusTransacao.PENDENTE
+    )
     metodo_pagamento = Column(String(50))
     codigo_transacao = Column(String(100), unique=True)
     qr_code_ticket = Column(String(100), unique=True)
@@ -560,11 +565,13 @@ class Tablet(Base):
     porta = Column(Integer, default=8080)
     tipo = Column(Enum(TipoTablet), default=TipoTablet.POS)
     status = Column(Enum(StatusTablet), default=StatusTablet.DESCONECTADO)
-    empresa_id = Column(String, ForeignKey("empresas.id"), nullable=False)
+    empresa_id = Column(Integer, ForeignKey("empresas.id"), nullable=False)
     
     criado_em = Column(DateTime(timezone=True), server_default=func.now())
     atualizado_em = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     ultima_conexao = Column(DateTime(timezone=True))
+    verificado_em = Column(DateTime(timezone=True))
+    latencia_ms = Column(Float)
     
     empresa = relationship("Empresa")
     logs = relationship("TabletLog", back_populates="tablet")
@@ -572,6 +579,7 @@ class Tablet(Base):
 
 class TabletLog(Base):
     __tablename__ = "tablet_logs"
+    __table_args__ = (Index("ix_tablet_logs_tablet_timestamp", "tablet_id", "timestamp"),)
     
     id = Column(String, primary_key=True, index=True)
     tablet_id = Column(String, ForeignKey("tablets.id"), nullable=False)
@@ -588,11 +596,24 @@ class ConfiguracaoMeep(Base):
     tablet_id = Column(String, ForeignKey("tablets.id"), nullable=False)
     configuracao = Column(Text, nullable=False)
     versao = Column(String, default="2.0.0")
+    hash = Column(String(64))
     criado_em = Column(DateTime(timezone=True), server_default=func.now())
     atualizado_em = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     tablet = relationship("Tablet", back_populates="configuracao_meep")
 
+class VersaoConfiguracaoMeep(Base):
+    """Conteúdo imutável de cada versão de configuração, endereçado pelo hash"""
+    __tablename__ = "configuracoes_meep_versoes"
+    __table_args__ = (UniqueConstraint("empresa_id", "hash", name="uq_config_meep_empresa_hash"),)
+    
+    id = Column(String, primary_key=True, index=True)
+    empresa_id = Column(Integer, ForeignKey("empresas.id"), nullable=False)
+    hash = Column(String(64), nullable=False)
+    conteudo = Column(Text, nullable=False)
+    tamanho = Column(Integer, nullable=False)
+    criado_em = Column(DateTime(timezone=True), server_default=func.now())
+
 class StatusMeepClient(enum.Enum):
     ATIVO = "ativo"
     BLOQUEADO = "bloqueado"
@@ -617,10 +638,17 @@ class ClientCategory(Base):
 
 class MeepClient(Base):
     __tablename__ = "meep_clients"
+    __table_args__ = (
+        Index("ix_meep_clients_empresa_nome_busca", "empresa_id", "nome_busca", "id"),
+        Index("ux_meep_clients_empresa_cpf_normalizado", "empresa_id", "cpf_normalizado", unique=True,
+              postgresql_ops={"cpf_normalizado": "text_pattern_ops"}),
+    )
     
     id = Column(String, primary_key=True, index=True)
     nome = Column(String(255), nullable=False)
+    nome_busca = Column(String(255))
     cpf = Column(String(14), index=True)
+    cpf_normalizado = Column(String(11))
     identificador = Column(String(100), index=True)
     telefone = Column(String(20))
     email = Column(String(255))
@@ -653,3 +681,72 @@ class ClientBlockHistory(Base):
     criado_em = Column(DateTime(timezone=True), server_default=func.now())
     
     cliente = relationship("MeepClient", back_populates="historico_bloqueios")
+
+class CodigoVerificacao(Base):
+    __tablename__ = "codigos_verificacao"
+    
+    cpf = Column(String(14), primary_key=True)
+    codigo_hash = Column(String(64), nullable=False)
+    tentativas = Column(Integer, default=0, nullable=False)
+    expira_em = Column(DateTime, nullable=False, index=True)
+    criado_em = Column(DateTime(timezone=True), server_default=func.now())
+
+class EstadoAlerta(Base):
+    __tablename__ = "alertas_estado"
+    __table_args__ = (UniqueConstraint("regra", "entidade_id", "limiar", name="uq_alerta_regra_entidade_limiar"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    regra = Column(String(50), nullable=False)
+    entidade_id = Column(Integer, nullable=False)
+    limiar = Column(String(50), nullable=False)
+    ultimo_envio = Column(DateTime, nullable=False)
+
+class MarcaAlerta(Base):
+    __tablename__ = "alertas_marcas"
+    
+    regra = Column(String(50), primary_key=True)
+    avaliado_ate = Column(DateTime(timezone=True), nullable=False)
+
+class StatusOutbox(enum.Enum):
+    PENDENTE = "pendente"
+    ENTREGUE = "entregue"
+    MORTO = "morto"
+
+class EventoOutbox(Base):
+    __tablename__ = "outbox"
+    __table_args__ = (Index("ix_outbox_status_proxima_tentativa", "status", "proxima_tentativa"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    tipo = Column(String(30), nullable=False)
+    payload = Column(Text, nullable=False)
+    status = Column(Enum(StatusOutbox), nullable=False, default=StatusOutbox.PENDENTE)
+    tentativas = Column(Integer, nullable=False, default=0)
+    proxima_tentativa = Column(DateTime, nullable=False, default=datetime.utcnow)
+    ultimo_erro = Column(Text)
+    criado_em = Column(DateTime, nullable=False, default=datetime.utcnow)
+    processado_em = Column(DateTime)
+
+class StatusImportacao(enum.Enum):
+    PROCESSANDO = "processando"
+    CONCLUIDA = "concluida"
+    FALHOU = "falhou"
+
+class Importacao(Base):
+    """Importação de arquivo em segundo plano, com progresso por lote e erros por linha"""
+    __tablename__ = "importacoes"
+    
+    id = Column(String, primary_key=True, index=True)
+    tipo = Column(String(30), nullable=False)
+    empresa_id = Column(Integer, ForeignKey("empresas.id"), nullable=False)
+    usuario_id = Column(Integer, ForeignKey("usuarios.id"))
+    referencia_id = Column(Integer)
+    nome_arquivo = Column(String(255))
+    status = Column(Enum(StatusImportacao), nullable=False, default=StatusImportacao.PROCESSANDO)
+    linhas_processadas = Column(Integer, nullable=False, default=0)
+    criados = Column(Integer, nullable=False, default=0)
+    atualizados = Column(Integer, nullable=False, default=0)
+    total_erros = Column(Integer, nullable=False, default=0)
+    erros = Column(Text)
+    mensagem = Column(Text)
+    criado_em = Column(DateTime, nullable=False, default=datetime.utcnow)
+    concluido_em = Column(DateTime)
@@ -0,0 +1,25 @@
+import base64
+import json
+from typing import Any, List
+
+from fastapi import HTTPException, status
+
+HEADER_PROXIMO_CURSOR = "X-Proximo-Cursor"
+
+
+def codificar_cursor(*valores: Any) -> str:
+    """Cursor opaco da paginação por chave (keyset) com os valores da última linha"""
+    return base64.urlsafe_b64encode(json.dumps(valores).encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str, campos: int) -> List[Any]:
+    try:
+        valores = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        valores = None
+    if not isinstance(valores, list) or len(valores) != campos:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor inválido"
+        )
+    return valores
@@ -0,0 +1,197 @@
+import hashlib
+import hmac
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass, field, asdict
+from logging.handlers import RotatingFileHandler
+from typing import List, Optional
+
+from sqlalchemy import event
+
+from .database import settings
+
+HEADER_PROFILING = "X-SQL-Profile"
+HEADER_RESUMO = "X-SQL-Profile-Summary"
+HEADER_PERFIL_ID = "X-SQL-Profile-Id"
+
+_DIRETORIO_APP = os.path.dirname(os.path.abspath(__file__))
+_ARQUIVOS_IGNORADOS = {
+    os.path.join(_DIRETORIO_APP, "profiling.py"),
+    os.path.join(_DIRETORIO_APP, "metrics.py"),
+    os.path.join(_DIRETORIO_APP, "database.py"),
+}
+
+slow_query_logger = logging.getLogger("app.sql.slow")
+_handler_configurado = False
+_handler_lock = threading.Lock()
+
+
+@dataclass
+class ConsultaPerfilada:
+    sql: str
+    duracao_ms: float
+    linhas: Optional[int]
+    origem: Optional[str]
+
+
+@dataclass
+class PerfilRequisicao:
+    id: str
+    metodo: str
+    caminho: str
+    consultas: List[ConsultaPerfilada] = field(default_factory=list)
+    status_code: Optional[int] = None
+    duracao_ms: Optional[float] = None
+
+    @property
+    def tempo_sql_ms(self) -> float:
+        return sum(consulta.duracao_ms for consulta in self.consultas)
+
+    def resumo(self) -> str:
+        mais_lenta = max(self.consultas, key=lambda c: c.duracao_ms, default=None)
+        partes = [f"queries={len(self.consultas)}", f"sql_ms={self.tempo_sql_ms:.1f}"]
+        if mais_lenta is not None:
+            partes.append(f"slowest_ms={mais_lenta.duracao_ms:.1f}")
+            if mais_lenta.origem:
+                partes.append(f"slowest_at={mais_lenta.origem}")
+        return "; ".join(partes)
+
+    def to_dict(self) -> dict:
+        dados = asdict(self)
+        dados["total_consultas"] = len(self.consultas)
+        dados["tempo_sql_ms"] = round(self.tempo_sql_ms, 3)
+        return dados
+
+
+_perfil_atual: ContextVar[Optional[PerfilRequisicao]] = ContextVar("perfil_sql", default=None)
+
+
+class HistoricoPerfis:
+    """Últimos perfis de requisição, consultados pelo endpoint de debug"""
+
+    def __init__(self, limite: int = 100):
+        self.limite = limite
+        self._perfis: "OrderedDict[str, PerfilRequisicao]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def adicionar(self, perfil: PerfilRequisicao):
+        with self._lock:
+            self._perfis[perfil.id] = perfil
+            while len(self._perfis) > self.limite:
+                self._perfis.popitem(last=False)
+
+    def obter(self, perfil_id: str) -> Optional[PerfilRequisicao]:
+        with self._lock:
+            return self._perfis.get(perfil_id)
+
+    def listar(self) -> List[PerfilRequisicao]:
+        with self._lock:
+            return list(reversed(self._perfis.values()))
+
+
+historico_perfis = HistoricoPerfis()
+
+
+def assinar_header_profiling(timestamp: Optional[int] = None) -> str:
+    """Gerar o valor do header X-SQL-Profile ("<timestamp>.<assinatura>")"""
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    assinatura = hmac.new(
+        settings.secret_key.encode(), f"sql-profile:{timestamp}".encode(), hashlib.sha256
+    ).hexdigest()
+    return f"{timestamp}.{assinatura}"
+
+
+def header_profiling_valido(valor: Optional[str]) -> bool:
+    """Validar assinatura e validade do header de profiling"""
+    if not valor or "." not in valor:
+        return False
+    timestamp, _ = valor.split(".", 1)
+    if not timestamp.isdigit():
+        return False
+    if abs(time.time() - int(timestamp)) > settings.sql_profiling_header_ttl_segundos:
+        return False
+    return hmac.compare_digest(valor, assinar_header_profiling(int(timestamp)))
+
+
+def iniciar_perfil(metodo: str, caminho: str) -> PerfilRequisicao:
+    perfil = PerfilRequisicao(id=uuid.uuid4().hex[:12], metodo=metodo, caminho=caminho)
+    _perfil_atual.set(perfil)
+    return perfil
+
+
+def encerrar_perfil(perfil: PerfilRequisicao, status_code: int, duracao_ms: float):
+    perfil.status_code = status_code
+    perfil.duracao_ms = round(duracao_ms, 3)
+    _perfil_atual.set(None)
+    historico_perfis.adicionar(perfil)
+
+
+def origem_chamada() -> Optional[str]:
+    """Primeiro frame do código da aplicação na pilha atual (router/serviço e linha)"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        arquivo = frame.f_code.co_filename
+        if arquivo.startswith(_DIRETORIO_APP) and arquivo not in _ARQUIVOS_IGNORADOS:
+            relativo = os.path.relpath(arquivo, os.path.dirname(_DIRETORIO_APP))
+            return f"{relativo}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+def _configurar_slow_query_log():
+    global _handler_configurado
+    with _handler_lock:
+        if _handler_configurado:
+            return
+        diretorio = os.path.dirname(settings.slow_query_log_file)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        handler = RotatingFileHandler(
+            settings.slow_query_log_file,
+            maxBytes=settings.slow_query_log_max_bytes,
+            backupCount=settings.slow_query_log_backups,
+            encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        slow_query_logger.addHandler(handler)
+        slow_query_logger.setLevel(logging.WARNING)
+        slow_query_logger.propagate = False
+        _handler_configurado = True
+
+
+def instrumentar_profiling(engine):
+    """Registrar os listeners de profiling por requisição e de slow-query log"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("profiling_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _depois(conn, cursor, statement, parameters, context, executemany):
+        inicios = conn.info.get("profiling_query_start")
+        if not inicios:
+            return
+        duracao_ms = (time.perf_counter() - inicios.pop()) * 1000
+        perfil = _perfil_atual.get()
+        lenta = 0 < settings.slow_query_threshold_ms <= duracao_ms
+        if perfil is None and not lenta:
+            return
+
+        origem = origem_chamada()
+        linhas = cursor.rowcount if cursor.rowcount is not None and cursor.rowcount >= 0 else None
+        if perfil is not None:
+            perfil.consultas.append(ConsultaPerfilada(
+                sql=statement, duracao_ms=round(duracao_ms, 3), linhas=linhas, origem=origem
+            ))
+        if lenta:
+            _configurar_slow_query_log()
+            slow_query_logger.warning(
+                "%.1fms origem=%s linhas=%s sql=%s",
+                duracao_ms, origem, linhas, " ".join(statement.split())
+            )
@@ -0,0 +1,87 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import text
+
+from . import database
+from .database import settings
+from .metrics import registro, Medidor
+
+logger = logging.getLogger(__name__)
+
+DIRETORIO_BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+banco_pronto = registro.registrar(Medidor(
+    "database_ready",
+    "1 se a última checagem de prontidão alcançou o banco com o esquema na revisão esperada"
+))
+
+
+def revisao_esperada() -> Optional[str]:
+    """Head das migrações do Alembic (alembic/versions)"""
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+    config = Config(os.path.join(DIRETORIO_BACKEND, "alembic.ini"))
+    return ScriptDirectory.from_config(config).get_current_head()
+
+
+class ProntidaoBanco:
+    """Checagem de prontidão: pega uma conexão do pool, executa `SELECT 1` e compara a
+    revisão gravada pelo Alembic com a esperada pelo código. Checagens simultâneas
+    compartilham a mesma ida ao banco, e um banco travado não acumula threads."""
+
+    def __init__(self, timeout_segundos: float = None):
+        self.timeout = timeout_segundos or settings.prontidao_timeout_segundos
+        self._revisao_esperada: Optional[str] = None
+        self._tarefa: Optional[asyncio.Future] = None
+
+    def _checar(self) -> Dict:
+        from alembic.runtime.migration import MigrationContext
+
+        if self._revisao_esperada is None:
+            self._revisao_esperada = revisao_esperada()
+        inicio = time.perf_counter()
+        with database.engine.connect() as conexao:
+            conexao.execute(text("SELECT 1"))
+            latencia_ms = round((time.perf_counter() - inicio) * 1000, 1)
+            revisao = MigrationContext.configure(conexao).get_current_revision()
+        return {
+            "banco": "ok",
+            "latencia_ms": latencia_ms,
+            "revisao": revisao,
+            "revisao_esperada": self._revisao_esperada
+        }
+
+    async def verificar(self) -> Tuple[bool, Dict]:
+        if self._tarefa is None or self._tarefa.done():
+            self._tarefa = asyncio.ensure_future(asyncio.to_thread(self._checar))
+            self._tarefa.add_done_callback(lambda tarefa: tarefa.cancelled() or tarefa.exception())
+        try:
+            estado = await asyncio.wait_for(asyncio.shield(self._tarefa), self.timeout)
+        except asyncio.TimeoutError:
+            estado = {"banco": "indisponivel", "erro": f"sem resposta em {self.timeout:g}s"}
+        except Exception as e:
+            estado = {"banco": "indisponivel", "erro": str(e).splitlines()[0]}
+
+        pronto = estado["banco"] == "ok" and estado["revisao"] == estado["revisao_esperada"]
+        if estado["banco"] == "ok" and not pronto:
+            estado["erro"] = "migrações pendentes; rode `alembic upgrade head`"
+        estado["pool"] = database.engine.pool.status()
+        estado["status"] = "pronto" if pronto else "indisponivel"
+        banco_pronto.set(1 if pronto else 0)
+        return pronto, estado
+
+    async def verificar_na_subida(self):
+        """Checagem rápida no lifespan; só registra o problema, quem decide tirar a
+        instância do balanceador é a rota de prontidão."""
+        pronto, estado = await self.verificar()
+        if pronto:
+            logger.info("Banco pronto na revisão %s (%s ms)", estado["revisao"], estado["latencia_ms"])
+        else:
+            logger.error("Banco não está pronto na subida: %s", estado["erro"])
+
+
+prontidao_banco = ProntidaoBanco()
@@ -5,13 +5,12 @@ from datetime import timedelta
 from ..database import get_db, settings
 from ..models import Usuario
 from ..schemas import Token, LoginRequest, Usuario as UsuarioSchema
-from ..auth import autenticar_usuario, criar_access_token, gerar_codigo_verificacao, obter_usuario_atual
+from ..auth import autenticar_usuario, criar_access_token, gerar_codigo_verificacao, obter_usuario_atual, UsuarioPrincipal
+from ..services.codigo_verificacao_service import codigos_verificacao, ResultadoCodigo
 
 router = APIRouter()
 security = HTTPBearer()
 
-codigos_verificacao = {}
-
 @router.post("/login", response_model=Token)
 async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
     """
@@ -20,7 +19,7 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
     2. Segunda etapa: código de verificação (simulado)
     """
     
-    usuario = autenticar_usuario(login_data.cpf, login_data.senha, db)
+    usuario = await autenticar_usuario(login_data.cpf, login_data.senha, db)
     if not usuario:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -35,22 +34,25 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
     
     if not login_data.codigo_verificacao:
         codigo = gerar_codigo_verificacao()
-        codigos_verificacao[login_data.cpf] = codigo
+        codigos_verificacao.salvar(db, login_data.cpf, codigo)
         
         raise HTTPException(
             status_code=status.HTTP_202_ACCEPTED,
             detail=f"Código de verificação enviado. Use: {codigo}"
         )
     
-    codigo_armazenado = codigos_verificacao.get(login_data.cpf)
-    if not codigo_armazenado or codigo_armazenado != login_data.codigo_verificacao:
+    resultado = codigos_verificacao.verificar(db, login_data.cpf, login_data.codigo_verificacao)
+    if resultado == ResultadoCodigo.TENTATIVAS_ESGOTADAS:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Tentativas esgotadas. Solicite um novo código de verificação"
+        )
+    if resultado != ResultadoCodigo.VALIDO:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Código de verificação inválido"
         )
     
-    del codigos_verificacao[login_data.cpf]
-    
     usuario.ultimo_login = db.query(Usuario).filter(Usuario.id == usuario.id).first().criado_em
     db.commit()
     
@@ -66,12 +68,15 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
     }
 
 @router.get("/me", response_model=UsuarioSchema)
-async def obter_perfil(usuario_atual: Usuario = Depends(obter_usuario_atual)):
+async def obter_perfil(
+    db: Session = Depends(get_db),
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
+):
     """Obter dados do usuário logado"""
-    return usuario_atual
+    return db.query(Usuario).filter(Usuario.id == usuario_atual.id).first()
 
 @router.post("/logout")
-async def logout(usuario_atual: Usuario = Depends(obter_usuario_atual)):
+async def logout(usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)):
     """Logout do usuário (invalidar token)"""
     return {"mensagem": "Logout realizado com sucesso"}
 
@@ -86,7 +91,7 @@ async def solicitar_codigo_verificacao(cpf: str, db: Session = Depends(get_db)):
         )
     
     codigo = gerar_codigo_verificacao()
-    codigos_verificacao[cpf] = codigo
+    codigos_verificacao.salvar(db, cpf, codigo)
     
     return {
         "mensagem": "Código de verificação enviado",
@@ -1,21 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Response
 from sqlalchemy.orm import Session
+from sqlalchemy import func
 from typing import List, Optional
 from datetime import datetime, timedelta
 from ..database import get_db
-from ..models import Checkin, Transacao, Evento, Usuario, Comanda
+from ..models import Checkin, Transacao, Evento, Comanda
 from ..schemas import Checkin as CheckinSchema, CheckinCreate
-from ..auth import obter_usuario_atual, validar_cpf_basico
+from ..auth import obter_usuario_atual, validar_cpf_basico, UsuarioPrincipal
+from ..acesso_eventos import InfoEvento, require_evento_access, verificar_acesso_evento, obter_info_evento
 from ..websocket import manager
 from ..services.whatsapp_service import whatsapp_service
+from ..services.meep_client_service import exigir_atendimento
 
 router = APIRouter()
 
 @router.post("/", response_model=CheckinSchema)
 async def realizar_checkin(
     checkin: CheckinCreate,
+    response: Response,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Realizar check-in no evento"""
     
@@ -25,19 +29,8 @@ async def realizar_checkin(
             detail="CPF inválido"
         )
     
-    evento = db.query(Evento).filter(Evento.id == checkin.evento_id).first()
-    if not evento:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Evento não encontrado"
-        )
-    
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Acesso negado"
-        )
+    evento = verificar_acesso_evento(db, checkin.evento_id, usuario_atual)
+    exigir_atendimento(db, evento.empresa_id, cpf=checkin.cpf, response=response)
     
     checkin_existente = db.query(Checkin).filter(
         Checkin.cpf == checkin.cpf,
@@ -85,24 +78,11 @@ async def realizar_checkin(
 async def listar_checkins_evento(
     evento_id: int,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual),
+    evento: InfoEvento = Depends(require_evento_access)
 ):
     """Listar check-ins de um evento"""
     
-    evento = db.query(Evento).filter(Evento.id == evento_id).first()
-    if not evento:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Evento não encontrado"
-        )
-    
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Acesso negado"
-        )
-    
     checkins = db.query(Checkin).filter(Checkin.evento_id == evento_id).all()
     return checkins
 
@@ -111,7 +91,8 @@ async def verificar_checkin_cpf(
     cpf: str,
     evento_id: int,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual),
+    evento: InfoEvento = Depends(require_evento_access)
 ):
     """Verificar se CPF já fez check-in no evento"""
     
@@ -121,20 +102,6 @@ async def verificar_checkin_cpf(
             detail="CPF inválido"
         )
     
-    evento = db.query(Evento).filter(Evento.id == evento_id).first()
-    if not evento:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Evento não encontrado"
-        )
-    
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Acesso negado"
-        )
-    
     checkin = db.query(Checkin).filter(
         Checkin.cpf == cpf,
         Checkin.evento_id == evento_id
@@ -159,8 +126,9 @@ async def verificar_checkin_cpf(
 async def checkin_por_qr(
     qr_code: str,
     validacao_cpf: str,
+    response: Response,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Check-in por QR Code único"""
     
@@ -177,10 +145,13 @@ async def checkin_por_qr(
         cpf_formatado = comanda.cpf_cliente
         nome_cliente = comanda.nome_cliente
         evento_id = comanda.evento_id
+        empresa_id = comanda.empresa_id
     else:
         cpf_formatado = transacao.cpf_comprador
         nome_cliente = transacao.nome_comprador
         evento_id = transacao.evento_id
+        evento = obter_info_evento(db, evento_id)
+        empresa_id = evento.empresa_id if evento else None
     
     if not cpf_formatado:
         raise HTTPException(status_code=400, detail="CPF não encontrado no QR Code")
@@ -189,6 +160,9 @@ async def checkin_por_qr(
     if validacao_cpf != cpf_limpo[:3]:
         raise HTTPException(status_code=400, detail="Validação de CPF incorreta")
     
+    if empresa_id is not None:
+        exigir_atendimento(db, empresa_id, cpf=cpf_formatado, response=response)
+    
     checkin_existente = db.query(Checkin).filter(
         Checkin.cpf == cpf_formatado,
         Checkin.evento_id == evento_id
@@ -208,6 +182,13 @@ async def checkin_por_qr(
     )
     
     db.add(db_checkin)
+    if transacao and transacao.telefone_comprador:
+        whatsapp_service.notificar_n8n(db, "checkin_realizado", {
+            "cpf": cpf_formatado,
+            "nome": nome_cliente,
+            "evento_id": evento_id,
+            "telefone": transacao.telefone_comprador
+        })
     db.commit()
     db.refresh(db_checkin)
     
@@ -225,21 +206,13 @@ async def checkin_por_qr(
         "timestamp": datetime.now().isoformat()
     })
     
-    if transacao and transacao.telefone_comprador:
-        await whatsapp_service.notify_n8n("checkin_realizado", {
-            "cpf": cpf_formatado,
-            "nome": nome_cliente,
-            "evento_id": evento_id,
-            "telefone": transacao.telefone_comprador
-        })
-    
     return db_checkin
 
 @router.get("/dashboard/{evento_id}")
 async def dashboard_checkin_tempo_real(
     evento_id: int,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Dashboard de check-in em tempo real"""
     
@@ -262,7 +235,7 @@ async def dashboard_checkin_tempo_real(
     
     checkins_por_metodo = db.query(
         Checkin.metodo_checkin,
-        db.func.count(Checkin.id).label('total')
+        func.count(Checkin.id).label('total')
     ).filter(Checkin.evento_id == evento_id).group_by(Checkin.metodo_checkin).all()
     
     vendas_sem_checkin = db.query(Transacao).outerjoin(
@@ -5,7 +5,7 @@ from datetime import datetime
 from ..database import get_db
 from ..models import Lista, Evento
 from ..schemas import CupomCreate, CupomResponse
-from ..auth import verificar_permissao_promoter
+from ..auth import verificar_permissao_promoter, UsuarioPrincipal
 
 router = APIRouter(prefix="/cupons", tags=["Cupons"])
 
@@ -13,7 +13,7 @@ router = APIRouter(prefix="/cupons", tags=["Cupons"])
 async def criar_cupom(
     cupom_data: CupomCreate,
     db: Session = Depends(get_db),
-    usuario_atual = Depends(verificar_permissao_promoter)
+    usuario_atual: UsuarioPrincipal = Depends(verificar_permissao_promoter)
 ):
     """
     Criar cupom de desconto para lista específica.
@@ -115,7 +115,7 @@ async def usar_cupom(
 async def listar_cupons_evento(
     evento_id: int,
     db: Session = Depends(get_db),
-    usuario_atual = Depends(verificar_permissao_promoter)
+    usuario_atual: UsuarioPrincipal = Depends(verificar_permissao_promoter)
 ):
     """
     Listar todos os cupons de um evento específico.
@@ -1,20 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy import func, desc, case, and_, select
 from typing import List, Optional
 from datetime import datetime, date, timedelta
 from decimal import Decimal
 from ..database import get_db
 from ..models import Evento, Transacao, Checkin, Usuario, Lista, PromoterEvento
 from ..schemas import DashboardResumo, RankingPromoter, DashboardAvancado, FiltrosDashboard, RankingPromoterAvancado, DadosGrafico
-from ..auth import obter_usuario_atual
+from ..auth import obter_usuario_atual, UsuarioPrincipal
+from ..acesso_eventos import InfoEvento, require_evento_access
 
 router = APIRouter()
 
 @router.get("/resumo", response_model=DashboardResumo)
 async def obter_resumo_dashboard(
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Obter resumo do dashboard"""
     
@@ -56,7 +57,7 @@ async def obter_ranking_promoters(
     evento_id: Optional[int] = None,
     limit: int = 10,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Obter ranking de promoters por vendas"""
     
@@ -104,7 +105,7 @@ async def obter_ranking_promoters(
 async def obter_vendas_tempo_real(
     evento_id: Optional[int] = None,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Obter dados de vendas em tempo real"""
     
@@ -156,25 +157,11 @@ async def obter_vendas_tempo_real(
 async def obter_aniversariantes(
     evento_id: int,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual),
+    evento: InfoEvento = Depends(require_evento_access)
 ):
     """Obter lista de aniversariantes do evento"""
     
-    evento = db.query(Evento).filter(Evento.id == evento_id).first()
-    if not evento:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Evento não encontrado"
-        )
-    
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Acesso negado"
-        )
-    
-    
     return {
         "evento_id": evento_id,
         "data_evento": evento.data_evento,
@@ -187,18 +174,11 @@ async def obter_aniversariantes(
 async def obter_dados_tempo_real(
     evento_id: int,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual),
+    evento: InfoEvento = Depends(require_evento_access)
 ):
     """Obter dados em tempo real para dashboard"""
     
-    evento = db.query(Evento).filter(Evento.id == evento_id).first()
-    if not evento:
-        raise HTTPException(status_code=404, detail="Evento não encontrado")
-    
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(status_code=403, detail="Acesso negado")
-    
     uma_hora_atras = datetime.now() - timedelta(hours=1)
     vendas_ultima_hora = db.query(func.count(Transacao.id)).filter(
         Transacao.evento_id == evento_id,
@@ -231,129 +211,109 @@ async def obter_dashboard_avancado(
     data_fim: Optional[date] = None,
     metodo_pagamento: Optional[str] = None,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Dashboard avançado com métricas completas"""
     
-    eventos_query = db.query(Evento)
-    transacoes_query = db.query(Transacao)
-    checkins_query = db.query(Checkin)
+    filtros_eventos = []
+    filtros_transacoes = []
+    filtros_checkins = []
     
     if usuario_atual.tipo.value != "admin":
-        eventos_query = eventos_query.filter(Evento.empresa_id == usuario_atual.empresa_id)
-        transacoes_query = transacoes_query.join(Evento).filter(Evento.empresa_id == usuario_atual.empresa_id)
-        checkins_query = checkins_query.join(Evento).filter(Evento.empresa_id == usuario_atual.empresa_id)
+        filtros_eventos.append(Evento.empresa_id == usuario_atual.empresa_id)
+        filtros_transacoes.append(Transacao.evento_id.in_(
+            select(Evento.id).where(Evento.empresa_id == usuario_atual.empresa_id)
+        ))
+        filtros_checkins.append(Checkin.evento_id.in_(
+            select(Evento.id).where(Evento.empresa_id == usuario_atual.empresa_id)
+        ))
     
     if evento_id:
-        transacoes_query = transacoes_query.filter(Transacao.evento_id == evento_id)
-        checkins_query = checkins_query.filter(Checkin.evento_id == evento_id)
-        eventos_query = eventos_query.filter(Evento.id == evento_id)
+        filtros_transacoes.append(Transacao.evento_id == evento_id)
+        filtros_checkins.append(Checkin.evento_id == evento_id)
+        filtros_eventos.append(Evento.id == evento_id)
     
     if data_inicio:
-        transacoes_query = transacoes_query.filter(Transacao.criado_em >= data_inicio)
-        checkins_query = checkins_query.filter(Checkin.checkin_em >= data_inicio)
+        filtros_transacoes.append(Transacao.criado_em >= data_inicio)
+        filtros_checkins.append(Checkin.checkin_em >= data_inicio)
     
     if data_fim:
-        transacoes_query = transacoes_query.filter(Transacao.criado_em <= data_fim)
-        checkins_query = checkins_query.filter(Checkin.checkin_em <= data_fim)
+        filtros_transacoes.append(Transacao.criado_em <= data_fim)
+        filtros_checkins.append(Checkin.checkin_em <= data_fim)
     
     if metodo_pagamento:
-        transacoes_query = transacoes_query.filter(Transacao.metodo_pagamento == metodo_pagamento)
-    
-    total_vendas = transacoes_query.filter(Transacao.status == "aprovada").count()
-    total_checkins = checkins_query.count()
-    receita_total = transacoes_query.filter(Transacao.status == "aprovada").with_entities(
-        func.sum(Transacao.valor)
-    ).scalar() or Decimal('0.00')
+        filtros_transacoes.append(Transacao.metodo_pagamento == metodo_pagamento)
     
     hoje = date.today()
     inicio_semana = hoje - timedelta(days=hoje.weekday())
     inicio_mes = hoje.replace(day=1)
     
-    vendas_hoje = transacoes_query.filter(
-        func.date(Transacao.criado_em) == hoje,
-        Transacao.status == "aprovada"
-    ).count()
-    
-    vendas_semana = transacoes_query.filter(
-        Transacao.criado_em >= inicio_semana,
-        Transacao.status == "aprovada"
-    ).count()
+    aprovada = Transacao.status == "aprovada"
+    transacao_hoje = and_(aprovada, func.date(Transacao.criado_em) == hoje)
+    transacao_semana = and_(aprovada, Transacao.criado_em >= inicio_semana)
+    transacao_mes = and_(aprovada, Transacao.criado_em >= inicio_mes)
     
-    vendas_mes = transacoes_query.filter(
-        Transacao.criado_em >= inicio_mes,
-        Transacao.status == "aprovada"
-    ).count()
-    
-    receita_hoje = transacoes_query.filter(
-        func.date(Transacao.criado_em) == hoje,
-        Transacao.status == "aprovada"
-    ).with_entities(func.sum(Transacao.valor)).scalar() or Decimal('0.00')
-    
-    receita_semana = transacoes_query.filter(
-        Transacao.criado_em >= inicio_semana,
-        Transacao.status == "aprovada"
-    ).with_entities(func.sum(Transacao.valor)).scalar() or Decimal('0.00')
-    
-    receita_mes = transacoes_query.filter(
-        Transacao.criado_em >= inicio_mes,
-        Transacao.status == "aprovada"
-    ).with_entities(func.sum(Transacao.valor)).scalar() or Decimal('0.00')
-    
-    checkins_hoje = checkins_query.filter(
-        func.date(Checkin.checkin_em) == hoje
-    ).count()
-    
-    checkins_semana = checkins_query.filter(
-        Checkin.checkin_em >= inicio_semana
-    ).count()
-    
-    taxa_conversao = (total_checkins / total_vendas * 100) if total_vendas > 0 else 0
-    taxa_presenca = taxa_conversao
-    
-    vendas_sem_checkin = db.query(Transacao).outerjoin(
+    vendas_sem_checkin = select(func.count(Transacao.id)).outerjoin(
         Checkin, Transacao.cpf_comprador == Checkin.cpf
-    ).filter(
+    ).where(
         Transacao.status == "aprovada",
         Checkin.id.is_(None)
     )
     
     if evento_id:
-        vendas_sem_checkin = vendas_sem_checkin.filter(Transacao.evento_id == evento_id)
-    
-    fila_espera = vendas_sem_checkin.count()
+        vendas_sem_checkin = vendas_sem_checkin.where(Transacao.evento_id == evento_id)
+    
+    # Todas as métricas de transações em uma única varredura, com agregação condicional
+    metricas = db.query(
+        func.count(case((aprovada, 1))).label("total_vendas"),
+        func.sum(case((aprovada, Transacao.valor))).label("receita_total"),
+        func.count(case((transacao_hoje, 1))).label("vendas_hoje"),
+        func.count(case((transacao_semana, 1))).label("vendas_semana"),
+        func.count(case((transacao_mes, 1))).label("vendas_mes"),
+        func.sum(case((transacao_hoje, Transacao.valor))).label("receita_hoje"),
+        func.sum(case((transacao_semana, Transacao.valor))).label("receita_semana"),
+        func.sum(case((transacao_mes, Transacao.valor))).label("receita_mes"),
+        func.count(case((and_(aprovada, Transacao.valor == 0), 1))).label("cortesias"),
+        func.count(case((Transacao.status == "pendente", 1))).label("inadimplentes"),
+        select(func.count(Evento.id)).where(*filtros_eventos).scalar_subquery().label("total_eventos"),
+        vendas_sem_checkin.scalar_subquery().label("fila_espera")
+    ).select_from(Transacao).filter(*filtros_transacoes).one()
+    
+    metricas_checkins = db.query(
+        func.count(Checkin.id).label("total_checkins"),
+        func.count(case((func.date(Checkin.checkin_em) == hoje, 1))).label("checkins_hoje"),
+        func.count(case((Checkin.checkin_em >= inicio_semana, 1))).label("checkins_semana")
+    ).filter(*filtros_checkins).one()
+    
+    total_vendas = metricas.total_vendas or 0
+    total_checkins = metricas_checkins.total_checkins or 0
+    receita_total = metricas.receita_total or Decimal('0.00')
     
-    cortesias = transacoes_query.filter(
-        Transacao.status == "aprovada",
-        Transacao.valor == 0
-    ).count()
-    
-    inadimplentes = transacoes_query.filter(
-        Transacao.status == "pendente"
-    ).count()
+    taxa_conversao = (total_checkins / total_vendas * 100) if total_vendas > 0 else 0
+    taxa_presenca = taxa_conversao
     
     aniversariantes_mes = 0
     
     consumo_medio = receita_total / total_vendas if total_vendas > 0 else Decimal('0.00')
     
     return DashboardAvancado(
-        total_eventos=eventos_query.count(),
+        total_eventos=metricas.total_eventos or 0,
         total_vendas=total_vendas,
         total_checkins=total_checkins,
         receita_total=receita_total,
         taxa_conversao=round(taxa_conversao, 2),
-        vendas_hoje=vendas_hoje,
-        vendas_semana=vendas_semana,
-        vendas_mes=vendas_mes,
-        receita_hoje=receita_hoje,
-        receita_semana=receita_semana,
-        receita_mes=receita_mes,
-        checkins_hoje=checkins_hoje,
-        checkins_semana=checkins_semana,
+        vendas_hoje=metricas.vendas_hoje or 0,
+        vendas_semana=metricas.vendas_semana or 0,
+        vendas_mes=metricas.vendas_mes or 0,
+        receita_hoje=metricas.receita_hoje or Decimal('0.00'),
+        receita_semana=metricas.receita_semana or Decimal('0.00'),
+        receita_mes=metricas.receita_mes or Decimal('0.00'),
+        checkins_hoje=metricas_checkins.checkins_hoje or 0,
+        checkins_semana=metricas_checkins.checkins_semana or 0,
         taxa_presenca=round(taxa_presenca, 2),
-        fila_espera=fila_espera,
-        cortesias=cortesias,
-        inadimplentes=inadimplentes,
+        fila_espera=metricas.fila_espera or 0,
+        cortesias=metricas.cortesias or 0,
+        inadimplentes=metricas.inadimplentes or 0,
         aniversariantes_mes=aniversariantes_mes,
         consumo_medio=consumo_medio
     )
@@ -363,7 +323,7 @@ async def obter_grafico_vendas_tempo(
     periodo: str = "7d",
     evento_id: Optional[int] = None,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Gráfico de vendas ao longo do tempo"""
     
@@ -436,7 +396,7 @@ async def obter_grafico_vendas_tempo(
 async def obter_grafico_vendas_lista(
     evento_id: Optional[int] = None,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Gráfico de vendas por lista"""
     
@@ -474,7 +434,7 @@ async def obter_ranking_promoters_avancado(
     evento_id: Optional[int] = None,
     limit: int = 10,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Ranking avançado de promoters com métricas de conversão"""
     
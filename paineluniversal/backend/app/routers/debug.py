@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, HTTPException
+from ..auth import verificar_permissao_admin, UsuarioPrincipal
+from ..profiling import historico_perfis
+from ..loop_monitor import monitor_event_loop, lag_event_loop_atual
+
+router = APIRouter()
+
+@router.get("/sql")
+async def listar_perfis_sql(usuario_atual: UsuarioPrincipal = Depends(verificar_permissao_admin)):
+    """Resumo dos últimos perfis de SQL por requisição"""
+    return [
+        {
+            "id": perfil.id,
+            "metodo": perfil.metodo,
+            "caminho": perfil.caminho,
+            "status_code": perfil.status_code,
+            "duracao_ms": perfil.duracao_ms,
+            "total_consultas": len(perfil.consultas),
+            "resumo": perfil.resumo()
+        }
+        for perfil in historico_perfis.listar()
+    ]
+
+@router.get("/sql/{perfil_id}")
+async def obter_perfil_sql(
+    perfil_id: str,
+    usuario_atual: UsuarioPrincipal = Depends(verificar_permissao_admin)
+):
+    """Todas as consultas de uma requisição perfilada, com duração, linhas e origem"""
+    perfil = historico_perfis.obter(perfil_id)
+    if not perfil:
+        raise HTTPException(status_code=404, detail="Perfil não encontrado")
+    return perfil.to_dict()
+
+@router.get("/loop")
+async def obter_capturas_event_loop(usuario_atual: UsuarioPrincipal = Depends(verificar_permissao_admin)):
+    """Último atraso do event loop e pilhas capturadas em bloqueios (modo debug)"""
+    return {
+        "intervalo_ms": monitor_event_loop.intervalo * 1000,
+        "limite_ms": monitor_event_loop.limite * 1000,
+        "debug": monitor_event_loop.debug,
+        "ultimo_lag_ms": round(lag_event_loop_atual.valor() * 1000, 3),
+        "capturas": monitor_event_loop.listar_capturas()
+    }
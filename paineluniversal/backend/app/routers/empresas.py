@@ -2,9 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 from ..database import get_db
-from ..models import Empresa, Usuario
+from ..models import Empresa
 from ..schemas import Empresa as EmpresaSchema, EmpresaCreate
-from ..auth import obter_usuario_atual, verificar_permissao_admin
+from ..auth import obter_usuario_atual, verificar_permissao_admin, UsuarioPrincipal
 
 router = APIRouter()
 
@@ -12,7 +12,7 @@ router = APIRouter()
 async def criar_empresa(
     empresa: EmpresaCreate,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(verificar_permissao_admin)
+    usuario_atual: UsuarioPrincipal = Depends(verificar_permissao_admin)
 ):
     """Criar nova empresa (apenas admins)"""
     
@@ -35,7 +35,7 @@ async def listar_empresas(
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(verificar_permissao_admin)
+    usuario_atual: UsuarioPrincipal = Depends(verificar_permissao_admin)
 ):
     """Listar todas as empresas (apenas admins)"""
     empresas = db.query(Empresa).offset(skip).limit(limit).all()
@@ -45,7 +45,7 @@ async def listar_empresas(
 async def obter_empresa(
     empresa_id: int,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Obter dados de uma empresa"""
     
@@ -69,7 +69,7 @@ async def atualizar_empresa(
     empresa_id: int,
     empresa_update: EmpresaCreate,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(verificar_permissao_admin)
+    usuario_atual: UsuarioPrincipal = Depends(verificar_permissao_admin)
 ):
     """Atualizar dados da empresa (apenas admins)"""
     
@@ -100,7 +100,7 @@ async def atualizar_empresa(
 async def desativar_empresa(
     empresa_id: int,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(verificar_permissao_admin)
+    usuario_atual: UsuarioPrincipal = Depends(verificar_permissao_admin)
 ):
     """Desativar empresa (soft delete)"""
     
@@ -7,11 +7,8 @@ from datetime import datetime
 from decimal import Decimal
 import csv
 import io
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import inch
 from ..database import get_db
-from ..models import Evento, Usuario, PromoterEvento, Transacao, Checkin, Lista, TipoUsuario
+from ..models import Evento, Usuario, PromoterEvento, Transacao, Checkin, Lista, TipoUsuario, StatusEvento
 from ..schemas import (
     Evento as EventoSchema, 
     EventoCreate, 
@@ -20,7 +17,8 @@ from ..schemas import (
     PromoterEventoCreate,
     PromoterEventoResponse
 )
-from ..auth import obter_usuario_atual, verificar_permissao_admin
+from ..auth import obter_usuario_atual, verificar_permissao_admin, UsuarioPrincipal
+from ..acesso_eventos import InfoEvento, require_evento_access, cache_eventos
 
 router = APIRouter()
 
@@ -28,7 +26,7 @@ router = APIRouter()
 async def criar_evento(
     evento: EventoCreate,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Criar novo evento"""
     
@@ -67,7 +65,7 @@ async def listar_eventos(
     empresa_id: Optional[int] = None,
     status: Optional[str] = None,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Listar eventos"""
     
@@ -93,7 +91,7 @@ async def buscar_eventos(
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Busca avançada de eventos com filtros"""
     
@@ -121,7 +119,7 @@ async def buscar_eventos(
 async def obter_evento(
     evento_id: int,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Obter dados de um evento"""
     
@@ -146,7 +144,7 @@ async def atualizar_evento(
     evento_id: int,
     evento_update: EventoCreate,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Atualizar dados do evento"""
     
@@ -175,6 +173,7 @@ async def atualizar_evento(
     
     db.commit()
     db.refresh(evento)
+    cache_eventos.invalidar(evento_id)
     
     return evento
 
@@ -182,7 +181,7 @@ async def atualizar_evento(
 async def cancelar_evento(
     evento_id: int,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(verificar_permissao_admin)
+    usuario_atual: UsuarioPrincipal = Depends(verificar_permissao_admin)
 ):
     """Cancelar evento (apenas admins)"""
     
@@ -193,8 +192,9 @@ async def cancelar_evento(
             detail="Evento não encontrado"
         )
     
-    evento.status = "cancelado"
+    evento.status = StatusEvento.CANCELADO
     db.commit()
+    cache_eventos.invalidar(evento_id)
     
     return {"mensagem": "Evento cancelado com sucesso"}
 
@@ -202,7 +202,7 @@ async def cancelar_evento(
 async def obter_evento_detalhado(
     evento_id: int,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Obter evento com dados financeiros e promoters"""
     
@@ -287,24 +287,11 @@ async def vincular_promoter(
     evento_id: int,
     promoter_data: PromoterEventoCreate,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual),
+    evento: InfoEvento = Depends(require_evento_access)
 ):
     """Vincular promoter ao evento"""
     
-    evento = db.query(Evento).filter(Evento.id == evento_id).first()
-    if not evento:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Evento não encontrado"
-        )
-    
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Acesso negado"
-        )
-    
     promoter = db.query(Usuario).filter(
         Usuario.id == promoter_data.promoter_id,
         Usuario.tipo == TipoUsuario.PROMOTER
@@ -354,24 +341,11 @@ async def desvincular_promoter(
     evento_id: int,
     promoter_id: int,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual),
+    evento: InfoEvento = Depends(require_evento_access)
 ):
     """Desvincular promoter do evento"""
     
-    evento = db.query(Evento).filter(Evento.id == evento_id).first()
-    if not evento:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Evento não encontrado"
-        )
-    
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Acesso negado"
-        )
-    
     promoter_evento = db.query(PromoterEvento).filter(
         PromoterEvento.evento_id == evento_id,
         PromoterEvento.promoter_id == promoter_id,
@@ -393,24 +367,11 @@ async def desvincular_promoter(
 async def obter_status_financeiro(
     evento_id: int,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual),
+    evento: InfoEvento = Depends(require_evento_access)
 ):
     """Obter status financeiro detalhado do evento"""
     
-    evento = db.query(Evento).filter(Evento.id == evento_id).first()
-    if not evento:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Evento não encontrado"
-        )
-    
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Acesso negado"
-        )
-    
     vendas_por_lista = db.query(
         Lista.nome,
         Lista.tipo,
@@ -468,24 +429,11 @@ async def obter_status_financeiro(
 async def exportar_evento_csv(
     evento_id: int,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual),
+    evento: InfoEvento = Depends(require_evento_access)
 ):
     """Exportar dados do evento em CSV"""
     
-    evento = db.query(Evento).filter(Evento.id == evento_id).first()
-    if not evento:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Evento não encontrado"
-        )
-    
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Acesso negado"
-        )
-    
     transacoes = db.query(Transacao).join(Lista).filter(
         Lista.evento_id == evento_id
     ).all()
@@ -527,7 +475,7 @@ async def exportar_evento_csv(
 async def exportar_evento_pdf(
     evento_id: int,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Exportar dados do evento em PDF"""
     
@@ -545,6 +493,9 @@ async def exportar_evento_pdf(
             detail="Acesso negado"
         )
     
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import A4
+    
     buffer = io.BytesIO()
     p = canvas.Canvas(buffer, pagesize=A4)
     width, height = A4
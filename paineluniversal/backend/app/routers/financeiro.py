@@ -8,10 +8,6 @@ import uuid
 import os
 import io
 import csv
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
 
 from ..database import get_db
 from ..models import (
@@ -25,7 +21,8 @@ from ..schemas import (
     CaixaEventoCreate, CaixaEvento as CaixaEventoSchema,
     DashboardFinanceiro
 )
-from ..auth import obter_usuario_atual, verificar_permissao_admin, verificar_permissao_promoter
+from ..auth import obter_usuario_atual, verificar_permissao_admin, verificar_permissao_promoter, UsuarioPrincipal
+from ..acesso_eventos import InfoEvento, require_evento_access, verificar_acesso_evento
 
 router = APIRouter(prefix="/financeiro", tags=["Financeiro"])
 
@@ -33,17 +30,11 @@ router = APIRouter(prefix="/financeiro", tags=["Financeiro"])
 async def criar_movimentacao(
     movimentacao: MovimentacaoFinanceiraCreate,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(verificar_permissao_promoter)
+    usuario_atual: UsuarioPrincipal = Depends(verificar_permissao_promoter)
 ):
     """Criar nova movimentação financeira"""
     
-    evento = db.query(Evento).filter(Evento.id == movimentacao.evento_id).first()
-    if not evento:
-        raise HTTPException(status_code=404, detail="Evento não encontrado")
-    
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(status_code=403, detail="Acesso negado")
+    verificar_acesso_evento(db, movimentacao.evento_id, usuario_atual)
     
     db_movimentacao = MovimentacaoFinanceira(
         **movimentacao.dict(),
@@ -77,18 +68,11 @@ async def listar_movimentacoes(
     data_fim: Optional[str] = "",
     status: Optional[str] = "",
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual),
+    evento: InfoEvento = Depends(require_evento_access)
 ):
     """Listar movimentações financeiras do evento"""
     
-    evento = db.query(Evento).filter(Evento.id == evento_id).first()
-    if not evento:
-        raise HTTPException(status_code=404, detail="Evento não encontrado")
-    
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(status_code=403, detail="Acesso negado")
-    
     query = db.query(MovimentacaoFinanceira).filter(
         MovimentacaoFinanceira.evento_id == evento_id
     )
@@ -121,7 +105,7 @@ async def atualizar_movimentacao(
     movimentacao_id: int,
     movimentacao_update: MovimentacaoFinanceiraUpdate,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(verificar_permissao_promoter)
+    usuario_atual: UsuarioPrincipal = Depends(verificar_permissao_promoter)
 ):
     """Atualizar movimentação financeira"""
     
@@ -132,10 +116,7 @@ async def atualizar_movimentacao(
     if not movimentacao:
         raise HTTPException(status_code=404, detail="Movimentação não encontrada")
     
-    evento = db.query(Evento).filter(Evento.id == movimentacao.evento_id).first()
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(status_code=403, detail="Acesso negado")
+    verificar_acesso_evento(db, movimentacao.evento_id, usuario_atual)
     
     dados_anteriores = {
         "categoria": movimentacao.categoria,
@@ -170,7 +151,7 @@ async def upload_comprovante(
     movimentacao_id: int,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(verificar_permissao_promoter)
+    usuario_atual: UsuarioPrincipal = Depends(verificar_permissao_promoter)
 ):
     """Upload de comprovante para movimentação"""
     
@@ -181,10 +162,7 @@ async def upload_comprovante(
     if not movimentacao:
         raise HTTPException(status_code=404, detail="Movimentação não encontrada")
     
-    evento = db.query(Evento).filter(Evento.id == movimentacao.evento_id).first()
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(status_code=403, detail="Acesso negado")
+    verificar_acesso_evento(db, movimentacao.evento_id, usuario_atual)
     
     allowed_types = ["image/jpeg", "image/png", "application/pdf"]
     if file.content_type not in allowed_types:
@@ -213,18 +191,11 @@ async def upload_comprovante(
 async def obter_dashboard_financeiro(
     evento_id: int,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual),
+    evento: InfoEvento = Depends(require_evento_access)
 ):
     """Dashboard financeiro do evento"""
     
-    evento = db.query(Evento).filter(Evento.id == evento_id).first()
-    if not evento:
-        raise HTTPException(status_code=404, detail="Evento não encontrado")
-    
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(status_code=403, detail="Acesso negado")
-    
     total_entradas = db.query(func.sum(MovimentacaoFinanceira.valor)).filter(
         MovimentacaoFinanceira.evento_id == evento_id,
         MovimentacaoFinanceira.tipo == "entrada",
@@ -317,7 +288,7 @@ async def exportar_relatorio_financeiro(
     data_inicio: Optional[str] = "",
     data_fim: Optional[str] = "",
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Exportar relatório financeiro em PDF, Excel ou CSV"""
     
@@ -352,6 +323,9 @@ async def exportar_relatorio_financeiro(
     movimentacoes = query.order_by(MovimentacaoFinanceira.criado_em.desc()).all()
     
     if formato == "excel":
+        from openpyxl import Workbook
+        from openpyxl.styles import Font, PatternFill
+        
         wb = Workbook()
         ws = wb.active
         ws.title = "Relatório Financeiro"
@@ -406,6 +380,9 @@ async def exportar_relatorio_financeiro(
         )
     
     elif formato == "pdf":
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.pagesizes import A4
+        
         buffer = io.BytesIO()
         p = canvas.Canvas(buffer, pagesize=A4)
         width, height = A4
@@ -456,17 +433,11 @@ async def exportar_relatorio_financeiro(
 async def abrir_caixa_evento(
     caixa: CaixaEventoCreate,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(verificar_permissao_promoter)
+    usuario_atual: UsuarioPrincipal = Depends(verificar_permissao_promoter)
 ):
     """Abrir caixa do evento"""
     
-    evento = db.query(Evento).filter(Evento.id == caixa.evento_id).first()
-    if not evento:
-        raise HTTPException(status_code=404, detail="Evento não encontrado")
-    
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(status_code=403, detail="Acesso negado")
+    verificar_acesso_evento(db, caixa.evento_id, usuario_atual)
     
     caixa_existente = db.query(CaixaEvento).filter(
         CaixaEvento.evento_id == caixa.evento_id,
@@ -504,7 +475,7 @@ async def fechar_caixa_evento(
     caixa_id: int,
     observacoes_fechamento: Optional[str] = None,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(verificar_permissao_promoter)
+    usuario_atual: UsuarioPrincipal = Depends(verificar_permissao_promoter)
 ):
     """Fechar caixa do evento"""
     
@@ -512,10 +483,7 @@ async def fechar_caixa_evento(
     if not caixa:
         raise HTTPException(status_code=404, detail="Caixa não encontrado")
     
-    evento = db.query(Evento).filter(Evento.id == caixa.evento_id).first()
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(status_code=403, detail="Acesso negado")
+    verificar_acesso_evento(db, caixa.evento_id, usuario_atual)
     
     if caixa.status == "fechado":
         raise HTTPException(status_code=400, detail="Caixa já está fechado")
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import func, desc, and_, or_
 from typing import List, Optional
@@ -8,9 +8,6 @@ import uuid
 import os
 import io
 import csv
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment
-from openpyxl.chart import BarChart, Reference
 
 from ..database import get_db
 from ..models import (
@@ -23,7 +20,7 @@ from ..schemas import (
     MetricaPromoterResponse, RankingGamificado, DashboardGamificacao,
     FiltrosRanking, PromoterConquistaResponse
 )
-from ..auth import obter_usuario_atual, verificar_permissao_admin, verificar_permissao_promoter
+from ..auth import obter_usuario_atual, verificar_permissao_admin, verificar_permissao_promoter, UsuarioPrincipal
 from ..services.whatsapp_service import whatsapp_service
 
 router = APIRouter(prefix="/gamificacao", tags=["Gamificação"])
@@ -37,7 +34,7 @@ async def obter_ranking_gamificado(
     tipo_ranking: Optional[str] = "geral",
     limit: int = 20,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Obter ranking gamificado de promoters"""
     
@@ -127,7 +124,7 @@ async def obter_ranking_gamificado(
 async def obter_dashboard_gamificacao(
     evento_id: Optional[int] = None,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Dashboard completo de gamificação"""
     
@@ -205,7 +202,7 @@ async def obter_dashboard_gamificacao(
 async def criar_conquista(
     conquista: ConquistaCreate,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(verificar_permissao_admin)
+    usuario_atual: UsuarioPrincipal = Depends(verificar_permissao_admin)
 ):
     """Criar nova conquista (apenas admin)"""
     
@@ -230,9 +227,8 @@ async def criar_conquista(
 @router.post("/verificar-conquistas/{promoter_id}")
 async def verificar_conquistas_promoter(
     promoter_id: int,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(verificar_permissao_admin)
+    usuario_atual: UsuarioPrincipal = Depends(verificar_permissao_admin)
 ):
     """Verificar e atribuir conquistas para um promoter"""
     
@@ -289,15 +285,11 @@ async def verificar_conquistas_promoter(
             novas_conquistas.append(conquista)
     
     if novas_conquistas:
-        db.commit()
-        
         if promoter.telefone:
-            background_tasks.add_task(
-                enviar_notificacao_conquista,
-                promoter.telefone,
-                promoter.nome,
-                novas_conquistas
+            whatsapp_service.enviar_mensagem_outbox(
+                db, promoter.telefone, mensagem_conquista(promoter.nome, novas_conquistas)
             )
+        db.commit()
     
     return {
         "message": f"{len(novas_conquistas)} novas conquistas atribuídas",
@@ -314,7 +306,7 @@ async def exportar_ranking(
     tipo_ranking: Optional[str] = "geral",
     limit: int = 20,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Exportar ranking em Excel, PDF ou CSV"""
     
@@ -333,6 +325,10 @@ async def exportar_ranking(
     )
     
     if formato == "excel":
+        from openpyxl import Workbook
+        from openpyxl.styles import Font, PatternFill, Alignment
+        from openpyxl.chart import BarChart, Reference
+        
         wb = Workbook()
         ws = wb.active
         ws.title = "Ranking Promoters"
@@ -435,8 +431,8 @@ def calcular_pontuacao_gamificada(vendas: int, receita: float, taxa_presenca: fl
     
     return pontos_vendas + pontos_receita + pontos_presenca + pontos_conquistas
 
-async def enviar_notificacao_conquista(telefone: str, nome: str, conquistas: List[Conquista]):
-    """Enviar notificação de conquista via WhatsApp"""
+def mensagem_conquista(nome: str, conquistas: List[Conquista]) -> str:
+    """Mensagem de WhatsApp anunciando novas conquistas"""
     conquistas_texto = "\n".join([f"{c.icone} {c.nome}" for c in conquistas])
     
     message = f"""
@@ -448,4 +444,4 @@ Você conquistou novos badges:
 Continue assim e alcance novos níveis! 🚀
     """.strip()
     
-    await whatsapp_service._send_whatsapp_message(telefone, message)
+    return message
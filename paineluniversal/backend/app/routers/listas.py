@@ -8,9 +8,16 @@ from ..schemas import (
     Lista as ListaSchema, ListaCreate, ListaDetalhada, 
     DashboardListas, ConvidadoCreate, ConvidadoImport
 )
-from ..auth import obter_usuario_atual
-import uuid
-import re
+from ..auth import obter_usuario_atual, UsuarioPrincipal
+from ..acesso_eventos import InfoEvento, require_evento_access, verificar_acesso_evento
+from ..services.importacao import (
+    ProgressoImportacao, detectar_delimitador, iniciar_importacao, obter_importacao, importacao_para_dict
+)
+from ..services.convidados_service import (
+    processar_lote_convidados, TIPO_IMPORTACAO as TIPO_IMPORTACAO_CONVIDADOS
+)
+from functools import partial
+import asyncio
 import csv
 import io
 from decimal import Decimal
@@ -21,23 +28,11 @@ router = APIRouter()
 async def criar_lista(
     lista: ListaCreate,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Criar nova lista para evento"""
     
-    evento = db.query(Evento).filter(Evento.id == lista.evento_id).first()
-    if not evento:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Evento não encontrado"
-        )
-    
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Acesso negado"
-        )
+    verificar_acesso_evento(db, lista.evento_id, usuario_atual)
     
     db_lista = Lista(**lista.dict())
     db.add(db_lista)
@@ -50,24 +45,11 @@ async def criar_lista(
 async def listar_listas_evento(
     evento_id: int,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual),
+    evento: InfoEvento = Depends(require_evento_access)
 ):
     """Listar listas de um evento"""
     
-    evento = db.query(Evento).filter(Evento.id == evento_id).first()
-    if not evento:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Evento não encontrado"
-        )
-    
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Acesso negado"
-        )
-    
     listas = db.query(Lista).filter(Lista.evento_id == evento_id).all()
     return listas
 
@@ -75,7 +57,7 @@ async def listar_listas_evento(
 async def listar_listas_promoter(
     promoter_id: int,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Listar listas de um promoter"""
     
@@ -94,7 +76,7 @@ async def atualizar_lista(
     lista_id: int,
     lista_update: ListaCreate,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Atualizar dados da lista"""
     
@@ -105,13 +87,7 @@ async def atualizar_lista(
             detail="Lista não encontrada"
         )
     
-    evento = db.query(Evento).filter(Evento.id == lista.evento_id).first()
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Acesso negado"
-        )
+    verificar_acesso_evento(db, lista.evento_id, usuario_atual)
     
     for field, value in lista_update.dict(exclude={'evento_id'}).items():
         setattr(lista, field, value)
@@ -125,7 +101,7 @@ async def atualizar_lista(
 async def desativar_lista(
     lista_id: int,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Desativar lista"""
     
@@ -136,13 +112,7 @@ async def desativar_lista(
             detail="Lista não encontrada"
         )
     
-    evento = db.query(Evento).filter(Evento.id == lista.evento_id).first()
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Acesso negado"
-        )
+    verificar_acesso_evento(db, lista.evento_id, usuario_atual)
     
     lista.ativa = False
     db.commit()
@@ -153,7 +123,7 @@ async def desativar_lista(
 async def obter_lista_detalhada(
     lista_id: int,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Obter lista com métricas detalhadas"""
     
@@ -161,10 +131,7 @@ async def obter_lista_detalhada(
     if not lista:
         raise HTTPException(status_code=404, detail="Lista não encontrada")
     
-    evento = db.query(Evento).filter(Evento.id == lista.evento_id).first()
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(status_code=403, detail="Acesso negado")
+    verificar_acesso_evento(db, lista.evento_id, usuario_atual)
     
     total_convidados = db.query(Transacao).filter(
         Transacao.lista_id == lista_id,
@@ -202,30 +169,31 @@ async def importar_convidados(
     lista_id: int,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Importar convidados via CSV/Excel"""
     
-    import pandas as pd
-    
     lista = db.query(Lista).filter(Lista.id == lista_id).first()
     if not lista:
         raise HTTPException(status_code=404, detail="Lista não encontrada")
     
-    evento = db.query(Evento).filter(Evento.id == lista.evento_id).first()
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(status_code=403, detail="Acesso negado")
+    evento = verificar_acesso_evento(db, lista.evento_id, usuario_atual)
     
-    try:
-        content = await file.read()
+    if not file.filename.endswith(('.csv', '.xlsx', '.xls')):
+        raise HTTPException(status_code=400, detail="Formato não suportado. Use CSV ou Excel.")
+    content = await file.read()
+    
+    def importar():
+        import pandas as pd
         
         if file.filename.endswith('.csv'):
-            df = pd.read_csv(io.StringIO(content.decode('utf-8')))
-        elif file.filename.endswith(('.xlsx', '.xls')):
-            df = pd.read_excel(io.BytesIO(content))
+            amostra = content[:64 * 1024].decode('utf-8-sig', errors='ignore')
+            df = pd.read_csv(io.BytesIO(content), dtype=str, keep_default_na=False,
+                             encoding='utf-8-sig', sep=detectar_delimitador(amostra))
         else:
-            raise HTTPException(status_code=400, detail="Formato não suportado. Use CSV ou Excel.")
+            df = pd.read_excel(io.BytesIO(content), dtype=str, keep_default_na=False)
+        df.columns = [str(coluna).strip().lower() for coluna in df.columns]
+        df.index = df.index + 2
         
         required_columns = ['cpf', 'nome']
         missing_columns = [col for col in required_columns if col not in df.columns]
@@ -235,66 +203,73 @@ async def importar_convidados(
                 detail=f"Colunas obrigatórias ausentes: {', '.join(missing_columns)}"
             )
         
-        convidados_criados = 0
-        erros = []
-        
-        for index, row in df.iterrows():
-            try:
-                cpf = re.sub(r'\D', '', str(row['cpf']))
-                if len(cpf) != 11:
-                    erros.append(f"Linha {index + 2}: CPF inválido")
-                    continue
-                
-                cpf_formatado = f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}"
-                
-                transacao_existente = db.query(Transacao).filter(
-                    Transacao.cpf_comprador == cpf_formatado,
-                    Transacao.evento_id == evento.id
-                ).first()
-                
-                if transacao_existente:
-                    erros.append(f"Linha {index + 2}: CPF {cpf_formatado} já cadastrado no evento")
-                    continue
-                
-                transacao_data = {
-                    'cpf_comprador': cpf_formatado,
-                    'nome_comprador': str(row['nome']),
-                    'email_comprador': str(row.get('email', '')),
-                    'telefone_comprador': str(row.get('telefone', '')),
-                    'valor': lista.preco,
-                    'status': 'aprovada',
-                    'lista_id': lista_id,
-                    'evento_id': evento.id,
-                    'usuario_id': usuario_atual.id,
-                    'codigo_transacao': str(uuid.uuid4()),
-                    'qr_code_ticket': f"TICKET-{str(uuid.uuid4())[:8].upper()}-{evento.id}"
-                }
-                
-                db_transacao = Transacao(**transacao_data)
-                db.add(db_transacao)
-                convidados_criados += 1
-                
-            except Exception as e:
-                erros.append(f"Linha {index + 2}: {str(e)}")
-        
-        lista.vendas_realizadas += convidados_criados
+        progresso = ProgressoImportacao(TIPO_IMPORTACAO_CONVIDADOS, max_erros=len(df))
+        processar_lote_convidados(lista.id, evento.id, lista.preco, usuario_atual.id, set(), db, df, progresso)
         db.commit()
         
         return {
-            "convidados_criados": convidados_criados,
+            "convidados_criados": progresso.criados,
             "total_linhas": len(df),
-            "erros": erros
+            "erros": [f"Linha {erro['linha']}: {erro['erro']}" for erro in progresso.erros]
         }
-        
+    
+    try:
+        return await asyncio.to_thread(importar)
+    except HTTPException:
+        raise
     except Exception as e:
+        db.rollback()
         raise HTTPException(status_code=500, detail=f"Erro ao processar arquivo: {str(e)}")
 
+@router.post("/{lista_id}/convidados/importacoes", status_code=status.HTTP_202_ACCEPTED)
+async def importar_convidados_em_lotes(
+    lista_id: int,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
+):
+    """Importar listas grandes em segundo plano: o upload vai para disco em blocos e o
+    arquivo é processado e commitado em lotes, com progresso na rota de status"""
+    
+    lista = db.query(Lista).filter(Lista.id == lista_id).first()
+    if not lista:
+        raise HTTPException(status_code=404, detail="Lista não encontrada")
+    
+    evento = verificar_acesso_evento(db, lista.evento_id, usuario_atual)
+    
+    importacao = await iniciar_importacao(
+        db, file, TIPO_IMPORTACAO_CONVIDADOS, evento.empresa_id, usuario_atual.id,
+        colunas_obrigatorias=("cpf", "nome"),
+        processar_lote=partial(processar_lote_convidados, lista.id, evento.id, lista.preco, usuario_atual.id, None),
+        referencia_id=lista.id
+    )
+    return importacao_para_dict(importacao)
+
+@router.get("/{lista_id}/convidados/importacoes/{importacao_id}")
+async def obter_importacao_convidados(
+    lista_id: int,
+    importacao_id: str,
+    db: Session = Depends(get_db),
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
+):
+    """Status e progresso de uma importação em lotes"""
+    
+    lista = db.query(Lista).filter(Lista.id == lista_id).first()
+    if not lista:
+        raise HTTPException(status_code=404, detail="Lista não encontrada")
+    
+    evento = verificar_acesso_evento(db, lista.evento_id, usuario_atual)
+    
+    return importacao_para_dict(
+        obter_importacao(db, importacao_id, TIPO_IMPORTACAO_CONVIDADOS, evento.empresa_id, referencia_id=lista.id)
+    )
+
 @router.get("/{lista_id}/convidados/export/{formato}")
 async def exportar_convidados(
     lista_id: int,
     formato: str,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Exportar convidados da lista em CSV/Excel"""
     
@@ -305,10 +280,7 @@ async def exportar_convidados(
     if not lista:
         raise HTTPException(status_code=404, detail="Lista não encontrada")
     
-    evento = db.query(Evento).filter(Evento.id == lista.evento_id).first()
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(status_code=403, detail="Acesso negado")
+    verificar_acesso_evento(db, lista.evento_id, usuario_atual)
     
     convidados = db.query(Transacao).outerjoin(Checkin).filter(
         Transacao.lista_id == lista_id,
@@ -377,18 +349,11 @@ async def exportar_convidados(
 async def obter_dashboard_listas(
     evento_id: int,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual),
+    evento: InfoEvento = Depends(require_evento_access)
 ):
     """Dashboard de listas para um evento"""
     
-    evento = db.query(Evento).filter(Evento.id == evento_id).first()
-    if not evento:
-        raise HTTPException(status_code=404, detail="Evento não encontrado")
-    
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(status_code=403, detail="Acesso negado")
-    
     listas = db.query(Lista).filter(Lista.evento_id == evento_id).all()
     total_listas = len(listas)
     
@@ -403,17 +368,22 @@ async def obter_dashboard_listas(
     
     taxa_presenca_geral = (total_presentes / total_convidados * 100) if total_convidados > 0 else 0
     
-    listas_mais_ativas = []
-    for lista in listas[:5]:
-        convidados = db.query(Transacao).filter(
-            Transacao.lista_id == lista.id,
-            Transacao.status == "aprovada"
-        ).count()
-        listas_mais_ativas.append({
+    convidados_por_lista = dict(db.query(
+        Transacao.lista_id,
+        func.count(Transacao.id)
+    ).filter(
+        Transacao.lista_id.in_([lista.id for lista in listas[:5]]),
+        Transacao.status == "aprovada"
+    ).group_by(Transacao.lista_id).all()) if listas else {}
+    
+    listas_mais_ativas = [
+        {
             "nome": lista.nome,
             "tipo": lista.tipo.value,
-            "convidados": convidados
-        })
+            "convidados": convidados_por_lista.get(lista.id, 0)
+        }
+        for lista in listas[:5]
+    ]
     
     return DashboardListas(
         total_listas=total_listas,
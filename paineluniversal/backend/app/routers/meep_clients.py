@@ -1,23 +1,56 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, UploadFile, File, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, tuple_
 from typing import List, Optional
 from datetime import datetime
+from functools import partial
 import uuid
 
-from ..database import get_db
-from ..models import MeepClient, ClientCategory, ClientBlockHistory, Usuario
+from ..database import get_db, settings
+from ..models import MeepClient, ClientCategory, ClientBlockHistory, StatusMeepClient, SexoMeepClient
+from ..paginacao import HEADER_PROXIMO_CURSOR, codificar_cursor, decodificar_cursor
+from ..services.meep_client_service import (
+    normalizar_cpf, normalizar_nome, aplicar_campos_busca, processar_lote_clientes, TIPO_IMPORTACAO,
+    restricoes_clientes, SituacaoCliente
+)
+from ..services.importacao import iniciar_importacao, obter_importacao, importacao_para_dict
 from ..schemas import (
     MeepClientCreate, MeepClientUpdate, MeepClientResponse,
     ClientCategoryCreate, ClientCategoryResponse,
     ClientBlockHistoryResponse
 )
-from ..auth import obter_usuario_atual
+from ..auth import obter_usuario_atual, UsuarioPrincipal
 
 router = APIRouter()
 
+CPF_DUPLICADO = "Cliente com este CPF já existe"
+
+def _verificar_cpf_disponivel(db: Session, empresa_id: int, cpf_normalizado: Optional[str],
+                              cliente_id: Optional[str] = None):
+    if not cpf_normalizado:
+        return
+    query = db.query(MeepClient.id).filter(
+        MeepClient.cpf_normalizado == cpf_normalizado,
+        MeepClient.empresa_id == empresa_id
+    )
+    if cliente_id is not None:
+        query = query.filter(MeepClient.id != cliente_id)
+    if query.first():
+        raise HTTPException(status_code=400, detail=CPF_DUPLICADO)
+
+def _commit_cliente(db: Session):
+    """Commit protegido pelo índice único (empresa_id, cpf_normalizado): duas requisições
+    simultâneas com o mesmo CPF passam pela checagem, mas só uma grava"""
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=CPF_DUPLICADO)
+
 @router.get("/meep-clients", response_model=List[MeepClientResponse])
 async def listar_clientes(
+    response: Response,
     nome: Optional[str] = Query(None),
     cpf: Optional[str] = Query(None),
     identificador: Optional[str] = Query(None),
@@ -25,62 +58,107 @@ async def listar_clientes(
     nome_na_lista: Optional[bool] = Query(None),
     somente_bloqueados: Optional[bool] = Query(None),
     somente_com_alertas: Optional[bool] = Query(None),
+    limit: int = Query(50),
+    cursor: Optional[str] = Query(None),
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
+    """Busca de clientes pelas colunas normalizadas (nome sem acentos, CPF só com
+    dígitos), em ordem alfabética e paginada por chave: a próxima página é pedida
+    com o cursor devolvido no header `X-Proximo-Cursor`. Nome e identificador casam
+    em qualquer posição, sem diferenciar maiúsculas; o CPF casa por prefixo."""
     query = db.query(MeepClient).filter(MeepClient.empresa_id == usuario_atual.empresa_id)
     
     if nome:
-        query = query.filter(MeepClient.nome.ilike(f"%{nome}%"))
+        query = query.filter(MeepClient.nome_busca.contains(normalizar_nome(nome) or "", autoescape=True))
     if cpf:
-        query = query.filter(MeepClient.cpf.ilike(f"%{cpf}%"))
+        query = query.filter(MeepClient.cpf_normalizado.startswith(normalizar_cpf(cpf) or cpf, autoescape=True))
     if identificador:
-        query = query.filter(MeepClient.identificador.ilike(f"%{identificador}%"))
+        query = query.filter(MeepClient.identificador.icontains(identificador.strip(), autoescape=True))
     if categoria:
         query = query.filter(MeepClient.categoria_id == categoria)
     if nome_na_lista is not None:
         query = query.filter(MeepClient.nome_na_lista == nome_na_lista)
     if somente_bloqueados:
-        query = query.filter(MeepClient.status == "bloqueado")
+        query = query.filter(MeepClient.status == StatusMeepClient.BLOQUEADO)
     if somente_com_alertas:
         query = query.filter(MeepClient.has_alert == True)
+    if cursor:
+        nome_busca, cliente_id = decodificar_cursor(cursor, 2)
+        query = query.filter(tuple_(MeepClient.nome_busca, MeepClient.id) > (nome_busca, cliente_id))
     
-    clientes = query.order_by(MeepClient.nome).all()
+    limit = max(1, min(limit, settings.meep_clientes_pagina_max))
+    clientes = query.order_by(MeepClient.nome_busca, MeepClient.id).limit(limit + 1).all()
+    if len(clientes) > limit:
+        clientes = clientes[:limit]
+        response.headers[HEADER_PROXIMO_CURSOR] = codificar_cursor(clientes[-1].nome_busca, clientes[-1].id)
     return clientes
 
 @router.post("/meep-clients", response_model=MeepClientResponse)
 async def criar_cliente(
     cliente_data: MeepClientCreate,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
-    if cliente_data.cpf:
-        existing_client = db.query(MeepClient).filter(
-            and_(
-                MeepClient.cpf == cliente_data.cpf,
-                MeepClient.empresa_id == usuario_atual.empresa_id
-            )
-        ).first()
-        if existing_client:
-            raise HTTPException(status_code=400, detail="Cliente com este CPF já existe")
+    _verificar_cpf_disponivel(db, usuario_atual.empresa_id, normalizar_cpf(cliente_data.cpf))
     
+    dados = cliente_data.model_dump()
+    if dados.get("sexo") is not None:
+        dados["sexo"] = SexoMeepClient(dados["sexo"])
     cliente = MeepClient(
         id=str(uuid.uuid4()),
-        **cliente_data.model_dump(),
+        **dados,
         empresa_id=usuario_atual.empresa_id
     )
+    aplicar_campos_busca(cliente)
     
     db.add(cliente)
-    db.commit()
+    _commit_cliente(db)
     db.refresh(cliente)
     
     return cliente
 
+@router.post("/meep-clients/import", status_code=status.HTTP_202_ACCEPTED)
+async def importar_clientes(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
+):
+    """Importa clientes de CSV/XLSX em segundo plano; o CPF identifica quem já existe"""
+    importacao = await iniciar_importacao(
+        db, file, TIPO_IMPORTACAO, usuario_atual.empresa_id, usuario_atual.id,
+        colunas_obrigatorias=("nome", "cpf"),
+        processar_lote=partial(processar_lote_clientes, usuario_atual.empresa_id, set())
+    )
+    return importacao_para_dict(importacao)
+
+@router.get("/meep-clients/import/{importacao_id}")
+async def obter_importacao_clientes(
+    importacao_id: str,
+    db: Session = Depends(get_db),
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
+):
+    return importacao_para_dict(obter_importacao(db, importacao_id, TIPO_IMPORTACAO, usuario_atual.empresa_id))
+
+@router.get("/meep-clients/pode-atender")
+async def verificar_atendimento(
+    cpf: Optional[str] = None,
+    identificador: Optional[str] = None,
+    db: Session = Depends(get_db),
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
+):
+    """Checagem rápida (sem consulta ao banco) para portaria e bar"""
+    situacao = restricoes_clientes.situacao(db, usuario_atual.empresa_id, cpf, identificador)
+    return {
+        "pode_atender": situacao != SituacaoCliente.BLOQUEADO,
+        "situacao": situacao.value
+    }
+
 @router.get("/meep-clients/{cliente_id}", response_model=MeepClientResponse)
 async def obter_cliente(
     cliente_id: str,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     cliente = db.query(MeepClient).filter(
         and_(
@@ -99,7 +177,7 @@ async def atualizar_cliente(
     cliente_id: str,
     cliente_data: MeepClientUpdate,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     cliente = db.query(MeepClient).filter(
         and_(
@@ -111,11 +189,20 @@ async def atualizar_cliente(
     if not cliente:
         raise HTTPException(status_code=404, detail="Cliente não encontrado")
     
-    for field, value in cliente_data.model_dump(exclude_unset=True).items():
+    dados = cliente_data.model_dump(exclude_unset=True)
+    if dados.get("status") is not None:
+        dados["status"] = StatusMeepClient(dados["status"])
+    if dados.get("sexo") is not None:
+        dados["sexo"] = SexoMeepClient(dados["sexo"])
+    if "cpf" in dados:
+        _verificar_cpf_disponivel(db, usuario_atual.empresa_id, normalizar_cpf(dados["cpf"]), cliente.id)
+    for field, value in dados.items():
         setattr(cliente, field, value)
+    aplicar_campos_busca(cliente)
     
-    db.commit()
+    _commit_cliente(db)
     db.refresh(cliente)
+    restricoes_clientes.atualizar(cliente)
     
     return cliente
 
@@ -123,7 +210,7 @@ async def atualizar_cliente(
 async def deletar_cliente(
     cliente_id: str,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     cliente = db.query(MeepClient).filter(
         and_(
@@ -137,6 +224,7 @@ async def deletar_cliente(
     
     db.delete(cliente)
     db.commit()
+    restricoes_clientes.remover(usuario_atual.empresa_id, cliente_id)
     
     return {"message": "Cliente deletado com sucesso"}
 
@@ -145,7 +233,7 @@ async def alternar_bloqueio_cliente(
     cliente_id: str,
     reason: str = "",
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     cliente = db.query(MeepClient).filter(
         and_(
@@ -157,8 +245,8 @@ async def alternar_bloqueio_cliente(
     if not cliente:
         raise HTTPException(status_code=404, detail="Cliente não encontrado")
     
-    if cliente.status == "bloqueado":
-        cliente.status = "ativo"
+    if cliente.status == StatusMeepClient.BLOQUEADO:
+        cliente.status = StatusMeepClient.ATIVO
         
         history_entry = ClientBlockHistory(
             id=str(uuid.uuid4()),
@@ -168,7 +256,7 @@ async def alternar_bloqueio_cliente(
             razao_desbloqueio=reason or "Desbloqueio manual"
         )
     else:
-        cliente.status = "bloqueado"
+        cliente.status = StatusMeepClient.BLOQUEADO
         
         history_entry = ClientBlockHistory(
             id=str(uuid.uuid4()),
@@ -181,14 +269,15 @@ async def alternar_bloqueio_cliente(
     db.add(history_entry)
     db.commit()
     db.refresh(cliente)
+    restricoes_clientes.atualizar(cliente)
     
-    return {"message": f"Cliente {'desbloqueado' if cliente.status == 'ativo' else 'bloqueado'} com sucesso"}
+    return {"message": f"Cliente {'desbloqueado' if cliente.status == StatusMeepClient.ATIVO else 'bloqueado'} com sucesso"}
 
 @router.get("/meep-clients/{cliente_id}/block-history", response_model=List[ClientBlockHistoryResponse])
 async def obter_historico_bloqueios(
     cliente_id: str,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     cliente = db.query(MeepClient).filter(
         and_(
@@ -209,7 +298,7 @@ async def obter_historico_bloqueios(
 @router.get("/client-categories", response_model=List[ClientCategoryResponse])
 async def listar_categorias(
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     categorias = db.query(ClientCategory).filter(
         ClientCategory.empresa_id == usuario_atual.empresa_id
@@ -221,7 +310,7 @@ async def listar_categorias(
 async def criar_categoria(
     categoria_data: ClientCategoryCreate,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     categoria = ClientCategory(
         id=str(uuid.uuid4()),
@@ -239,7 +328,7 @@ async def criar_categoria(
 async def deletar_categoria(
     categoria_id: str,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     categoria = db.query(ClientCategory).filter(
         and_(
@@ -3,10 +3,10 @@ from sqlalchemy.orm import Session
 from typing import Dict, Any
 from datetime import datetime
 import json
-import aiohttp
 from ..database import get_db
-from ..models import Evento, Transacao, Usuario, LogAuditoria
-from ..auth import verificar_permissao_admin
+from ..models import Evento, Transacao, LogAuditoria
+from ..auth import verificar_permissao_admin, UsuarioPrincipal
+from ..http_client import cliente_http
 
 router = APIRouter(prefix="/n8n", tags=["N8N Automações"])
 
@@ -83,7 +83,7 @@ async def trigger_evento_criado(
     evento_id: int,
     n8n_webhook_url: str,
     db: Session = Depends(get_db),
-    usuario_atual = Depends(verificar_permissao_admin)
+    usuario_atual: UsuarioPrincipal = Depends(verificar_permissao_admin)
 ):
     """
     Disparar automação N8N quando evento é criado.
@@ -105,12 +105,11 @@ async def trigger_evento_criado(
     }
     
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(n8n_webhook_url, json=payload) as response:
-                if response.status == 200:
-                    return {"status": "success", "message": "Automação N8N disparada"}
-                else:
-                    return {"status": "error", "message": f"Erro HTTP {response.status}"}
+        response = await cliente_http.post(n8n_webhook_url, integracao="n8n", json=payload)
+        if response.status == 200:
+            return {"status": "success", "message": "Automação N8N disparada"}
+        else:
+            return {"status": "error", "message": f"Erro HTTP {response.status}"}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
@@ -119,7 +118,7 @@ async def trigger_venda_realizada(
     transacao_id: int,
     n8n_webhook_url: str,
     db: Session = Depends(get_db),
-    usuario_atual = Depends(verificar_permissao_admin)
+    usuario_atual: UsuarioPrincipal = Depends(verificar_permissao_admin)
 ):
     """
     Disparar automação N8N quando venda é realizada.
@@ -142,12 +141,11 @@ async def trigger_venda_realizada(
     }
     
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(n8n_webhook_url, json=payload) as response:
-                if response.status == 200:
-                    return {"status": "success", "message": "Automação N8N disparada"}
-                else:
-                    return {"status": "error", "message": f"Erro HTTP {response.status}"}
+        response = await cliente_http.post(n8n_webhook_url, integracao="n8n", json=payload)
+        if response.status == 200:
+            return {"status": "success", "message": "Automação N8N disparada"}
+        else:
+            return {"status": "error", "message": f"Erro HTTP {response.status}"}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, WebSocket, WebSocketDisconnect
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, and_
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, WebSocket, WebSocketDisconnect, Response
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import func, desc, and_, insert
 from typing import List, Optional
 from datetime import datetime, date, timedelta
 from decimal import Decimal
@@ -17,8 +17,10 @@ from ..schemas import (
     VendaPDVCreate, VendaPDV as VendaPDVSchema, RecargaComandaCreate, RecargaComanda as RecargaComandaSchema,
     CaixaPDVCreate, CaixaPDV as CaixaPDVSchema, RelatorioVendasPDV, DashboardPDV
 )
-from ..auth import obter_usuario_atual, verificar_permissao_admin
+from ..auth import obter_usuario_atual, verificar_permissao_admin, UsuarioPrincipal
+from ..acesso_eventos import InfoEvento, require_evento_access, verificar_acesso_evento
 from ..websocket import notify_stock_update, notify_new_sale, notify_cash_register_update
+from ..services.meep_client_service import exigir_atendimento
 
 router = APIRouter(prefix="/pdv", tags=["PDV"])
 
@@ -26,7 +28,7 @@ router = APIRouter(prefix="/pdv", tags=["PDV"])
 async def criar_produto(
     produto: ProdutoCreate,
     db: Session = Depends(get_db),
-    usuario_atual = Depends(verificar_permissao_admin)
+    usuario_atual: UsuarioPrincipal = Depends(verificar_permissao_admin)
 ):
     """Criar novo produto"""
     
@@ -60,18 +62,11 @@ async def listar_produtos(
     status: Optional[str] = None,
     busca: Optional[str] = None,
     db: Session = Depends(get_db),
-    usuario_atual = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual),
+    evento: InfoEvento = Depends(require_evento_access)
 ):
     """Listar produtos do evento"""
     
-    evento = db.query(Evento).filter(Evento.id == evento_id).first()
-    if not evento:
-        raise HTTPException(status_code=404, detail="Evento não encontrado")
-    
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(status_code=403, detail="Acesso negado")
-    
     query = db.query(Produto).filter(Produto.evento_id == evento_id)
     
     if categoria:
@@ -93,7 +88,7 @@ async def listar_produtos(
 async def obter_produto(
     produto_id: int,
     db: Session = Depends(get_db),
-    usuario_atual = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Obter produto por ID"""
     
@@ -112,7 +107,7 @@ async def atualizar_produto(
     produto_id: int,
     produto_update: ProdutoCreate,
     db: Session = Depends(get_db),
-    usuario_atual = Depends(verificar_permissao_admin)
+    usuario_atual: UsuarioPrincipal = Depends(verificar_permissao_admin)
 ):
     """Atualizar produto"""
     
@@ -136,17 +131,11 @@ async def atualizar_produto(
 async def criar_comanda(
     comanda: ComandaCreate,
     db: Session = Depends(get_db),
-    usuario_atual = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Criar nova comanda"""
     
-    evento = db.query(Evento).filter(Evento.id == comanda.evento_id).first()
-    if not evento:
-        raise HTTPException(status_code=404, detail="Evento não encontrado")
-    
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(status_code=403, detail="Acesso negado")
+    verificar_acesso_evento(db, comanda.evento_id, usuario_atual)
     
     qr_code = str(uuid.uuid4())[:8].upper()
     
@@ -169,18 +158,11 @@ async def listar_comandas(
     status: Optional[str] = None,
     cpf: Optional[str] = None,
     db: Session = Depends(get_db),
-    usuario_atual = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual),
+    evento: InfoEvento = Depends(require_evento_access)
 ):
     """Listar comandas do evento"""
     
-    evento = db.query(Evento).filter(Evento.id == evento_id).first()
-    if not evento:
-        raise HTTPException(status_code=404, detail="Evento não encontrado")
-    
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(status_code=403, detail="Acesso negado")
-    
     query = db.query(Comanda).filter(Comanda.evento_id == evento_id)
     
     if status:
@@ -196,7 +178,7 @@ async def recarregar_comanda(
     comanda_id: int,
     recarga: RecargaComandaCreate,
     db: Session = Depends(get_db),
-    usuario_atual = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Recarregar saldo da comanda"""
     
@@ -231,21 +213,27 @@ async def recarregar_comanda(
 async def processar_venda(
     venda: VendaPDVCreate,
     background_tasks: BackgroundTasks,
+    response: Response,
     db: Session = Depends(get_db),
-    usuario_atual = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Processar venda no PDV"""
     
-    evento = db.query(Evento).filter(Evento.id == venda.evento_id).first()
-    if not evento:
-        raise HTTPException(status_code=404, detail="Evento não encontrado")
+    evento = verificar_acesso_evento(db, venda.evento_id, usuario_atual)
+    if venda.cpf_cliente:
+        exigir_atendimento(db, evento.empresa_id, cpf=venda.cpf_cliente, response=response)
+    comanda = db.query(Comanda).filter(Comanda.id == venda.comanda_id).first() if venda.comanda_id else None
+    if comanda and comanda.cpf_cliente:
+        exigir_atendimento(db, comanda.empresa_id, cpf=comanda.cpf_cliente, response=response)
     
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(status_code=403, detail="Acesso negado")
+    produto_ids = {item.produto_id for item in venda.itens}
+    produtos = {
+        produto.id: produto
+        for produto in db.query(Produto).filter(Produto.id.in_(produto_ids)).all()
+    } if produto_ids else {}
     
     for item in venda.itens:
-        produto = db.query(Produto).filter(Produto.id == item.produto_id).first()
+        produto = produtos.get(item.produto_id)
         if not produto:
             raise HTTPException(status_code=404, detail=f"Produto {item.produto_id} não encontrado")
         
@@ -270,7 +258,7 @@ async def processar_venda(
             detail=f"Valor dos pagamentos ({valor_pagamentos}) não confere com valor final ({valor_final})"
         )
     
-    numero_venda = f"PDV{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    numero_venda = f"PDV{datetime.now().strftime('%y%m%d%H%M%S')}{uuid.uuid4().hex[:5].upper()}"
     
     db_venda = VendaPDV(
         numero_venda=numero_venda,
@@ -292,57 +280,73 @@ async def processar_venda(
     db.add(db_venda)
     db.flush()  # Para obter o ID da venda
     
+    # Itens, movimentos e pagamentos em inserts em lote (executemany), sem um INSERT por linha
+    itens_venda = []
+    movimentos = []
     for item in venda.itens:
-        preco_total = item.quantidade * item.preco_unitario
+        itens_venda.append({
+            "venda_id": db_venda.id,
+            "produto_id": item.produto_id,
+            "quantidade": item.quantidade,
+            "preco_unitario": item.preco_unitario,
+            "preco_total": item.quantidade * item.preco_unitario,
+            "observacoes": item.observacoes
+        })
         
-        db_item = ItemVendaPDV(
-            venda_id=db_venda.id,
-            produto_id=item.produto_id,
-            quantidade=item.quantidade,
-            preco_unitario=item.preco_unitario,
-            preco_total=preco_total,
-            observacoes=item.observacoes
-        )
-        db.add(db_item)
-        
-        produto = db.query(Produto).filter(Produto.id == item.produto_id).first()
+        produto = produtos[item.produto_id]
         if produto.controla_estoque:
             estoque_anterior = produto.estoque_atual
             produto.estoque_atual -= item.quantidade
             
-            movimento = MovimentoEstoque(
-                produto_id=item.produto_id,
-                tipo_movimento="saida",
-                quantidade=item.quantidade,
-                estoque_anterior=estoque_anterior,
-                estoque_atual=produto.estoque_atual,
-                motivo="Venda PDV",
-                venda_id=db_venda.id,
-                usuario_id=usuario_atual.id
-            )
-            db.add(movimento)
-    
-    for pagamento in venda.pagamentos:
-        db_pagamento = PagamentoPDV(
-            venda_id=db_venda.id,
-            tipo_pagamento=pagamento.tipo_pagamento,
-            valor=pagamento.valor,
-            promoter_id=pagamento.promoter_id,
-            comissao_percentual=pagamento.comissao_percentual or Decimal('0.00'),
-            valor_comissao=(pagamento.valor * (pagamento.comissao_percentual or Decimal('0.00')) / 100),
-            codigo_transacao=str(uuid.uuid4())
-        )
-        db.add(db_pagamento)
+            movimentos.append({
+                "produto_id": item.produto_id,
+                "tipo_movimento": "saida",
+                "quantidade": item.quantidade,
+                "estoque_anterior": estoque_anterior,
+                "estoque_atual": produto.estoque_atual,
+                "motivo": "Venda PDV",
+                "venda_id": db_venda.id,
+                "usuario_id": usuario_atual.id
+            })
+    
+    pagamentos = [
+        {
+            "venda_id": db_venda.id,
+            "tipo_pagamento": pagamento.tipo_pagamento,
+            "valor": pagamento.valor,
+            "promoter_id": pagamento.promoter_id,
+            "comissao_percentual": pagamento.comissao_percentual or Decimal('0.00'),
+            "valor_comissao": (pagamento.valor * (pagamento.comissao_percentual or Decimal('0.00')) / 100),
+            "codigo_transacao": str(uuid.uuid4())
+        }
+        for pagamento in venda.pagamentos
+    ]
+    
+    if itens_venda:
+        db.execute(insert(ItemVendaPDV), itens_venda)
+    if movimentos:
+        db.execute(insert(MovimentoEstoque), movimentos)
+    if pagamentos:
+        db.execute(insert(PagamentoPDV), pagamentos)
     
     if venda.comanda_id:
-        comanda = db.query(Comanda).filter(Comanda.id == venda.comanda_id).first()
         if comanda and comanda.saldo_atual >= valor_final:
             comanda.saldo_atual -= valor_final
         else:
             raise HTTPException(status_code=400, detail="Saldo insuficiente na comanda")
     
+    estoques = [
+        (produto.id, produto.estoque_atual, produto.nome)
+        for produto in (produtos[produto_id] for produto_id in dict.fromkeys(item.produto_id for item in venda.itens))
+    ]
+    venda_id = db_venda.id
+    
     db.commit()
-    db.refresh(db_venda)
+    
+    db_venda = db.query(VendaPDV).options(
+        selectinload(VendaPDV.itens),
+        selectinload(VendaPDV.pagamentos)
+    ).filter(VendaPDV.id == venda_id).one()
     
     await notify_new_sale(venda.evento_id, {
         "numero_venda": db_venda.numero_venda,
@@ -351,15 +355,13 @@ async def processar_venda(
         "itens_count": len(venda.itens)
     })
     
-    for item in venda.itens:
-        produto = db.query(Produto).filter(Produto.id == item.produto_id).first()
-        if produto:
-            await notify_stock_update(
-                produto.id, 
-                venda.evento_id, 
-                produto.estoque_atual,
-                produto.nome
-            )
+    for produto_id, estoque_atual, nome in estoques:
+        await notify_stock_update(
+            produto_id, 
+            venda.evento_id, 
+            estoque_atual,
+            nome
+        )
     
     background_tasks.add_task(imprimir_comprovante, db_venda.id)
     
@@ -373,18 +375,11 @@ async def listar_vendas(
     status: Optional[str] = None,
     cpf_cliente: Optional[str] = None,
     db: Session = Depends(get_db),
-    usuario_atual = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual),
+    evento: InfoEvento = Depends(require_evento_access)
 ):
     """Listar vendas do PDV"""
     
-    evento = db.query(Evento).filter(Evento.id == evento_id).first()
-    if not evento:
-        raise HTTPException(status_code=404, detail="Evento não encontrado")
-    
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(status_code=403, detail="Acesso negado")
-    
     query = db.query(VendaPDV).filter(VendaPDV.evento_id == evento_id)
     
     if data_inicio:
@@ -399,23 +394,20 @@ async def listar_vendas(
     if cpf_cliente:
         query = query.filter(VendaPDV.cpf_cliente == cpf_cliente)
     
-    return query.order_by(desc(VendaPDV.criado_em)).all()
+    return query.options(
+        selectinload(VendaPDV.itens),
+        selectinload(VendaPDV.pagamentos)
+    ).order_by(desc(VendaPDV.criado_em)).all()
 
 @router.post("/caixa/abrir", response_model=CaixaPDVSchema)
 async def abrir_caixa(
     caixa: CaixaPDVCreate,
     db: Session = Depends(get_db),
-    usuario_atual = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Abrir caixa PDV"""
     
-    evento = db.query(Evento).filter(Evento.id == caixa.evento_id).first()
-    if not evento:
-        raise HTTPException(status_code=404, detail="Evento não encontrado")
-    
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(status_code=403, detail="Acesso negado")
+    verificar_acesso_evento(db, caixa.evento_id, usuario_atual)
     
     caixa_aberto = db.query(CaixaPDV).filter(
         and_(
@@ -448,7 +440,7 @@ async def fechar_caixa(
     valor_fechamento: Decimal,
     observacoes: Optional[str] = None,
     db: Session = Depends(get_db),
-    usuario_atual = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Fechar caixa PDV"""
     
@@ -486,18 +478,11 @@ async def fechar_caixa(
 async def obter_dashboard_pdv(
     evento_id: int,
     db: Session = Depends(get_db),
-    usuario_atual = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual),
+    evento: InfoEvento = Depends(require_evento_access)
 ):
     """Obter dashboard do PDV"""
     
-    evento = db.query(Evento).filter(Evento.id == evento_id).first()
-    if not evento:
-        raise HTTPException(status_code=404, detail="Evento não encontrado")
-    
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(status_code=403, detail="Acesso negado")
-    
     hoje = date.today()
     
     vendas_hoje = db.query(func.count(VendaPDV.id)).filter(
@@ -553,7 +538,7 @@ async def obter_dashboard_pdv(
 async def relatorio_x(
     caixa_id: int,
     db: Session = Depends(get_db),
-    usuario_atual = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Relatório X - Vendas do caixa sem fechamento"""
     
@@ -607,7 +592,7 @@ async def relatorio_x(
 async def relatorio_z(
     caixa_id: int,
     db: Session = Depends(get_db),
-    usuario_atual = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Relatório Z - Fechamento definitivo do caixa"""
     
@@ -5,7 +5,8 @@ from datetime import datetime, date
 from ..database import get_db
 from ..models import Evento, Transacao, Checkin, Usuario, Lista
 from ..schemas import RelatorioVendas
-from ..auth import obter_usuario_atual, verificar_permissao_admin
+from ..auth import obter_usuario_atual, verificar_permissao_admin, UsuarioPrincipal
+from ..acesso_eventos import InfoEvento, require_evento_access
 import csv
 import io
 import json
@@ -17,7 +18,7 @@ router = APIRouter()
 async def gerar_relatorio_vendas(
     evento_id: int,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Gerar relatório de vendas de um evento"""
     
@@ -84,24 +85,11 @@ async def gerar_relatorio_vendas(
 async def exportar_vendas_csv(
     evento_id: int,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual),
+    evento: InfoEvento = Depends(require_evento_access)
 ):
     """Exportar relatório de vendas em CSV"""
     
-    evento = db.query(Evento).filter(Evento.id == evento_id).first()
-    if not evento:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Evento não encontrado"
-        )
-    
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Acesso negado"
-        )
-    
     transacoes = db.query(Transacao).filter(
         Transacao.evento_id == evento_id,
         Transacao.status == "aprovada"
@@ -147,24 +135,11 @@ async def exportar_vendas_csv(
 async def exportar_checkins_csv(
     evento_id: int,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual),
+    evento: InfoEvento = Depends(require_evento_access)
 ):
     """Exportar relatório de check-ins em CSV"""
     
-    evento = db.query(Evento).filter(Evento.id == evento_id).first()
-    if not evento:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Evento não encontrado"
-        )
-    
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Acesso negado"
-        )
-    
     checkins = db.query(Checkin).filter(Checkin.evento_id == evento_id).all()
     
     output = io.StringIO()
@@ -206,7 +181,7 @@ async def exportar_logs_auditoria(
     evento_id: Optional[int] = None,
     formato: str = "json",
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(verificar_permissao_admin)
+    usuario_atual: UsuarioPrincipal = Depends(verificar_permissao_admin)
 ):
     """Exportar logs de auditoria (apenas admins)"""
     
@@ -280,7 +255,8 @@ async def exportar_logs_auditoria(
 async def exportar_vendas_excel(
     evento_id: int,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual),
+    evento: InfoEvento = Depends(require_evento_access)
 ):
     """Exportar relatório de vendas em Excel"""
     
@@ -288,14 +264,6 @@ async def exportar_vendas_excel(
     from openpyxl.styles import Font, PatternFill, Alignment
     from openpyxl.utils import get_column_letter
     
-    evento = db.query(Evento).filter(Evento.id == evento_id).first()
-    if not evento:
-        raise HTTPException(status_code=404, detail="Evento não encontrado")
-    
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(status_code=403, detail="Acesso negado")
-    
     wb = Workbook()
     ws = wb.active
     ws.title = "Relatório de Vendas"
@@ -344,7 +312,7 @@ async def exportar_dashboard(
     formato: str,
     evento_id: Optional[int] = None,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Exportar dados do dashboard em diferentes formatos"""
     
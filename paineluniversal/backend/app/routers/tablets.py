@@ -1,18 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 from datetime import datetime
-import aiohttp
-import asyncio
 import uuid
 
-from ..database import get_db
-from ..auth import obter_usuario_atual
-from ..models import Usuario, Tablet, TabletLog, ConfiguracaoMeep
+from ..database import get_db, settings
+from ..auth import obter_usuario_atual, UsuarioPrincipal
+from ..paginacao import HEADER_PROXIMO_CURSOR, codificar_cursor, decodificar_cursor
+from ..models import Tablet, TabletLog, ConfiguracaoMeep, VersaoConfiguracaoMeep, StatusTablet
+from ..services.tablet_monitor import monitor_tablets, AlvoTablet
+from ..services.tablet_logs import adicionar_log, inserir_logs
+from ..services.meep_sync import (
+    sincronizador_configuracao, registrar_versao, carregar_versoes, ResultadoSincronizacao
+)
 from ..schemas import (
     TabletCreate, TabletResponse, TabletUpdate,
-    TabletLogResponse, ConfiguracaoMeepResponse,
-    TipoTablet, StatusTablet
+    TabletLogResponse, TabletLogLote, ConfiguracaoMeepResponse, SincronizacaoConfigRequest,
+    TipoTablet
 )
 
 router = APIRouter(prefix="/api/tablets", tags=["tablets"])
@@ -22,7 +27,7 @@ router = APIRouter(prefix="/api/tablets", tags=["tablets"])
 async def criar_tablet(
     tablet_data: TabletCreate,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Criar um novo tablet"""
     
@@ -48,24 +53,16 @@ async def criar_tablet(
     )
     
     db.add(novo_tablet)
+    adicionar_log(db, novo_tablet.id, "criacao", f"Tablet {novo_tablet.nome} criado por {usuario_atual.nome}")
     db.commit()
     db.refresh(novo_tablet)
     
-    log = TabletLog(
-        id=str(uuid.uuid4()),
-        tablet_id=novo_tablet.id,
-        evento="criacao",
-        detalhes=f"Tablet {novo_tablet.nome} criado por {usuario_atual.nome}"
-    )
-    db.add(log)
-    db.commit()
-    
     return novo_tablet
 
 @router.get("/", response_model=List[TabletResponse])
 async def listar_tablets(
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Listar todos os tablets da empresa"""
     tablets = db.query(Tablet).filter(
@@ -78,7 +75,7 @@ async def listar_tablets(
 async def obter_tablet(
     tablet_id: str,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Obter detalhes de um tablet específico"""
     tablet = db.query(Tablet).filter(
@@ -99,7 +96,7 @@ async def atualizar_tablet(
     tablet_id: str,
     tablet_data: TabletUpdate,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Atualizar dados de um tablet"""
     tablet = db.query(Tablet).filter(
@@ -117,25 +114,17 @@ async def atualizar_tablet(
         setattr(tablet, field, value)
     
     tablet.atualizado_em = datetime.utcnow()
+    adicionar_log(db, tablet.id, "atualizacao", f"Tablet {tablet.nome} atualizado por {usuario_atual.nome}")
     db.commit()
     db.refresh(tablet)
     
-    log = TabletLog(
-        id=str(uuid.uuid4()),
-        tablet_id=tablet.id,
-        evento="atualizacao",
-        detalhes=f"Tablet {tablet.nome} atualizado por {usuario_atual.nome}"
-    )
-    db.add(log)
-    db.commit()
-    
     return tablet
 
 @router.delete("/{tablet_id}")
 async def deletar_tablet(
     tablet_id: str,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Deletar um tablet"""
     tablet = db.query(Tablet).filter(
@@ -149,13 +138,7 @@ async def deletar_tablet(
             detail="Tablet não encontrado"
         )
     
-    log = TabletLog(
-        id=str(uuid.uuid4()),
-        tablet_id=tablet.id,
-        evento="exclusao",
-        detalhes=f"Tablet {tablet.nome} excluído por {usuario_atual.nome}"
-    )
-    db.add(log)
+    adicionar_log(db, tablet.id, "exclusao", f"Tablet {tablet.nome} excluído por {usuario_atual.nome}")
     
     db.delete(tablet)
     db.commit()
@@ -167,7 +150,7 @@ async def deletar_tablet(
 async def integrar_tablet(
     integration_data: dict,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Integrar tablet com sistema MEEP"""
     
@@ -191,66 +174,106 @@ async def integrar_tablet(
             detail="Tablet não encontrado"
         )
     
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"http://{tablet.ip}:{tablet.porta}/health",
-                timeout=aiohttp.ClientTimeout(total=5)
-            ) as response:
-                if response.status == 200:
-                    tablet.status = "conectado"
-                    tablet.ultima_conexao = datetime.utcnow()
-                    
-                    log = TabletLog(
-                        id=str(uuid.uuid4()),
-                        tablet_id=tablet.id,
-                        evento="integracao",
-                        detalhes=f"Tablet {tablet.nome} integrado com sucesso"
-                    )
-                    db.add(log)
-                    db.commit()
-                    db.refresh(tablet)
-                    
-                    return {
-                        "success": True,
-                        "message": "Tablet integrado com sucesso",
-                        "tablet": tablet
-                    }
-                else:
-                    tablet.status = "desconectado"
-                    db.commit()
-                    
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Tablet não responde"
-                    )
-            
-    except aiohttp.ClientError as e:
-        tablet.status = "desconectado"
+    estado = await monitor_tablets.verificar(AlvoTablet(tablet.id, tablet.ip, tablet.porta))
+    monitor_tablets.aplicar(tablet, estado)
+    
+    if estado.online:
+        adicionar_log(db, tablet.id, "integracao", f"Tablet {tablet.nome} integrado com sucesso")
         db.commit()
+        db.refresh(tablet)
         
-        log = TabletLog(
-            id=str(uuid.uuid4()),
-            tablet_id=tablet.id,
-            evento="erro",
-            detalhes=f"Erro na integração do tablet {tablet.nome}: {str(e)}"
-        )
-        db.add(log)
-        db.commit()
+        return {
+            "success": True,
+            "message": "Tablet integrado com sucesso",
+            "tablet": tablet
+        }
+    
+    adicionar_log(db, tablet.id, "erro", f"Erro na integração do tablet {tablet.nome}: {estado.erro}")
+    db.commit()
+    
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Tablet não responde: {estado.erro}"
+    )
+
+def _registrar_sincronizacao(db: Session, tablets: List[Tablet], versao: VersaoConfiguracaoMeep,
+                             resultados: List[ResultadoSincronizacao]):
+    """Guarda a versão aplicada em cada tablet sincronizado e registra os logs (sem commit)"""
+    por_id = {tablet.id: tablet for tablet in tablets}
+    agora = datetime.utcnow()
+    for resultado in resultados:
+        tablet = por_id[resultado.tablet_id]
+        if not resultado.sucesso:
+            adicionar_log(db, tablet.id, "erro", f"Erro na sincronização do tablet {tablet.nome}: {resultado.erro}")
+            continue
+        
+        tablet.ultima_conexao = agora
+        if tablet.configuracao_meep is None:
+            tablet.configuracao_meep = ConfiguracaoMeep(id=str(uuid.uuid4()), tablet_id=tablet.id,
+                                                        configuracao=versao.conteudo, hash=versao.hash)
+        elif tablet.configuracao_meep.hash != versao.hash:
+            tablet.configuracao_meep.configuracao = versao.conteudo
+            tablet.configuracao_meep.hash = versao.hash
         
+        if resultado.resultado != "inalterado":
+            adicionar_log(db, tablet.id, "sincronizacao",
+                          f"Configuração {versao.hash[:12]} sincronizada com tablet {tablet.nome} "
+                          f"({resultado.resultado}, {resultado.bytes} bytes)")
+
+@router.post("/sync-config")
+async def sincronizar_configuracao_frota(
+    dados: SincronizacaoConfigRequest,
+    db: Session = Depends(get_db),
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
+):
+    """Sincronizar uma configuração com vários tablets em paralelo (todos da empresa se
+    `tablet_ids` não for informado), enviando só o diff para quem já tem uma versão conhecida"""
+    
+    query = db.query(Tablet).options(joinedload(Tablet.configuracao_meep)).filter(
+        Tablet.empresa_id == usuario_atual.empresa_id
+    )
+    if dados.tablet_ids is not None:
+        query = query.filter(Tablet.id.in_(dados.tablet_ids))
+    tablets = query.all()
+    
+    faltando = set(dados.tablet_ids or []) - {tablet.id for tablet in tablets}
+    if faltando or not tablets:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Erro ao conectar com tablet: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Tablets não encontrados: {', '.join(sorted(faltando))}" if faltando else "Nenhum tablet encontrado"
         )
+    
+    versoes_base = carregar_versoes(
+        db, usuario_atual.empresa_id,
+        (tablet.configuracao_meep.hash for tablet in tablets if tablet.configuracao_meep)
+    )
+    alvos = [AlvoTablet(tablet.id, tablet.ip, tablet.porta) for tablet in tablets]
+    # a versão é gravada e a transação encerrada antes do envio; o resultado vai em outra
+    versao = registrar_versao(db, usuario_atual.empresa_id, dados.configuracao)
+    resultados = await sincronizador_configuracao.sincronizar_frota(
+        alvos, versao.hash, dados.configuracao, versoes_base
+    )
+    
+    _registrar_sincronizacao(db, tablets, versao, resultados)
+    db.commit()
+    
+    return {
+        "hash": versao.hash,
+        "tamanho": versao.tamanho,
+        "total": len(resultados),
+        "sincronizados": sum(1 for resultado in resultados if resultado.sucesso),
+        "bytes_enviados": sum(resultado.bytes for resultado in resultados),
+        "resultados": [resultado.to_dict() for resultado in resultados]
+    }
 
 @router.post("/{tablet_id}/sync-config")
 async def sincronizar_configuracao(
     tablet_id: str,
     config_data: dict,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
-    """Sincronizar configuração com tablet"""
+    """Sincronizar configuração com tablet (nada é enviado se ele já tiver esta versão)"""
     
     tablet = db.query(Tablet).filter(
         Tablet.id == tablet_id,
@@ -263,57 +286,39 @@ async def sincronizar_configuracao(
             detail="Tablet não encontrado"
         )
     
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"http://{tablet.ip}:{tablet.porta}/api/sync-config",
-                json=config_data,
-                timeout=aiohttp.ClientTimeout(total=10)
-            ) as response:
-                if response.status == 200:
-                    tablet.ultima_conexao = datetime.utcnow()
-                    
-                    log = TabletLog(
-                        id=str(uuid.uuid4()),
-                        tablet_id=tablet.id,
-                        evento="sincronizacao",
-                        detalhes=f"Configuração sincronizada com tablet {tablet.nome}"
-                    )
-                    db.add(log)
-                    db.commit()
-                    
-                    return {
-                        "success": True,
-                        "message": "Configuração sincronizada com sucesso"
-                    }
-                else:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Erro na sincronização"
-                    )
-            
-    except aiohttp.ClientError as e:
-        log = TabletLog(
-            id=str(uuid.uuid4()),
-            tablet_id=tablet.id,
-            evento="erro",
-            detalhes=f"Erro na sincronização do tablet {tablet.nome}: {str(e)}"
-        )
-        db.add(log)
-        db.commit()
-        
+    versoes_base = carregar_versoes(
+        db, usuario_atual.empresa_id,
+        [tablet.configuracao_meep.hash] if tablet.configuracao_meep else []
+    )
+    alvo = AlvoTablet(tablet.id, tablet.ip, tablet.porta)
+    versao = registrar_versao(db, usuario_atual.empresa_id, config_data)
+    resultado = await sincronizador_configuracao.sincronizar(alvo, versao.hash, config_data, versoes_base)
+    
+    _registrar_sincronizacao(db, [tablet], versao, [resultado])
+    db.commit()
+    
+    if not resultado.sucesso:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Erro ao sincronizar com tablet: {str(e)}"
+            detail=f"Erro ao sincronizar com tablet: {resultado.erro}"
         )
+    
+    return {
+        "success": True,
+        "message": "Configuração sincronizada com sucesso",
+        "hash": versao.hash,
+        **resultado.to_dict()
+    }
 
 @router.get("/{tablet_id}/status")
 async def verificar_status_tablet(
     tablet_id: str,
+    atualizar: bool = False,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
-    """Verificar status de conexão do tablet"""
+    """Status de conexão do tablet, mantido pelo monitor da frota em segundo plano;
+    `atualizar=true` força uma verificação imediata"""
     
     tablet = db.query(Tablet).filter(
         Tablet.id == tablet_id,
@@ -326,33 +331,21 @@ async def verificar_status_tablet(
             detail="Tablet não encontrado"
         )
     
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"http://{tablet.ip}:{tablet.porta}/health",
-                timeout=aiohttp.ClientTimeout(total=5)
-            ) as response:
-                if response.status == 200:
-                    tablet.status = "conectado"
-                    tablet.ultima_conexao = datetime.utcnow()
-                    status_online = True
-                else:
-                    tablet.status = "desconectado"
-                    status_online = False
-            
-    except aiohttp.ClientError:
-        tablet.status = "desconectado"
-        status_online = False
-    
-    db.commit()
+    estado = monitor_tablets.obter(tablet.id)
+    if atualizar:
+        estado = await monitor_tablets.verificar(AlvoTablet(tablet.id, tablet.ip, tablet.porta))
+        monitor_tablets.aplicar(tablet, estado)
+        db.commit()
     
     return {
         "tablet_id": tablet.id,
         "nome": tablet.nome,
         "ip": tablet.ip,
         "porta": tablet.porta,
-        "status": tablet.status,
-        "online": status_online,
+        "status": estado.status.value if estado else tablet.status.value,
+        "online": estado.online if estado else tablet.status == StatusTablet.CONECTADO,
+        "latencia_ms": estado.latencia_ms if estado else tablet.latencia_ms,
+        "verificado_em": estado.verificado_em if estado else tablet.verificado_em,
         "ultima_conexao": tablet.ultima_conexao
     }
 
@@ -360,11 +353,14 @@ async def verificar_status_tablet(
 @router.get("/{tablet_id}/logs", response_model=List[TabletLogResponse])
 async def obter_logs_tablet(
     tablet_id: str,
+    response: Response,
     limit: int = 50,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
-    """Obter logs de um tablet"""
+    """Obter logs de um tablet, do mais recente ao mais antigo. Paginação por chave:
+    a próxima página é pedida com o cursor devolvido no header `X-Proximo-Cursor`"""
     
     tablet = db.query(Tablet).filter(
         Tablet.id == tablet_id,
@@ -377,16 +373,61 @@ async def obter_logs_tablet(
             detail="Tablet não encontrado"
         )
     
-    logs = db.query(TabletLog).filter(
-        TabletLog.tablet_id == tablet_id
-    ).order_by(TabletLog.timestamp.desc()).limit(limit).all()
+    limit = max(1, min(limit, settings.tablet_logs_pagina_max))
+    query = db.query(TabletLog).filter(TabletLog.tablet_id == tablet_id)
+    if cursor:
+        timestamp, log_id = decodificar_cursor(cursor, 2)
+        try:
+            timestamp = datetime.fromisoformat(timestamp)
+        except (TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor inválido"
+            )
+        query = query.filter(tuple_(TabletLog.timestamp, TabletLog.id) < (timestamp, log_id))
+    
+    logs = query.order_by(TabletLog.timestamp.desc(), TabletLog.id.desc()).limit(limit + 1).all()
+    if len(logs) > limit:
+        logs = logs[:limit]
+        response.headers[HEADER_PROXIMO_CURSOR] = codificar_cursor(logs[-1].timestamp.isoformat(), logs[-1].id)
     
     return logs
 
+@router.post("/{tablet_id}/logs", status_code=status.HTTP_201_CREATED)
+async def receber_logs_tablet(
+    tablet_id: str,
+    lote: TabletLogLote,
+    db: Session = Depends(get_db),
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
+):
+    """Receber um lote de linhas de log enviado pelo tablet, gravado num único INSERT"""
+    
+    if len(lote.logs) > settings.tablet_logs_lote_max:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Máximo de {settings.tablet_logs_lote_max} linhas por lote"
+        )
+    
+    tablet = db.query(Tablet.id).filter(
+        Tablet.id == tablet_id,
+        Tablet.empresa_id == usuario_atual.empresa_id
+    ).first()
+    
+    if not tablet:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tablet não encontrado"
+        )
+    
+    recebidos = inserir_logs(db, tablet_id, [linha.model_dump() for linha in lote.logs])
+    db.commit()
+    
+    return {"recebidos": recebidos}
+
 @router.get("/configuracoes-meep", response_model=List[ConfiguracaoMeepResponse])
 async def listar_configuracoes_meep(
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Listar configurações MEEP da empresa"""
     
@@ -2,9 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from ..database import get_db
-from ..models import Transacao, Lista, Evento, Usuario
+from ..models import Transacao, Lista, Evento
 from ..schemas import Transacao as TransacaoSchema, TransacaoCreate
-from ..auth import obter_usuario_atual, validar_cpf_basico
+from ..auth import obter_usuario_atual, validar_cpf_basico, UsuarioPrincipal
+from ..acesso_eventos import verificar_acesso_evento
 import uuid
 
 router = APIRouter()
@@ -13,7 +14,7 @@ router = APIRouter()
 async def criar_transacao(
     transacao: TransacaoCreate,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Criar nova transação (venda de ingresso)"""
     
@@ -30,19 +31,7 @@ async def criar_transacao(
             detail="Lista não encontrada ou inativa"
         )
     
-    evento = db.query(Evento).filter(Evento.id == transacao.evento_id).first()
-    if not evento:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Evento não encontrado"
-        )
-    
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Acesso negado"
-        )
+    evento = verificar_acesso_evento(db, transacao.evento_id, usuario_atual)
     
     if lista.limite_vendas and lista.vendas_realizadas >= lista.limite_vendas:
         raise HTTPException(
@@ -74,7 +63,7 @@ async def listar_transacoes(
     cpf_comprador: Optional[str] = None,
     status: Optional[str] = None,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Listar transações"""
     
@@ -99,7 +88,7 @@ async def listar_transacoes(
 async def obter_transacao(
     transacao_id: int,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Obter dados de uma transação"""
     
@@ -110,13 +99,7 @@ async def obter_transacao(
             detail="Transação não encontrada"
         )
     
-    evento = db.query(Evento).filter(Evento.id == transacao.evento_id).first()
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Acesso negado"
-        )
+    verificar_acesso_evento(db, transacao.evento_id, usuario_atual)
     
     return transacao
 
@@ -125,7 +108,7 @@ async def atualizar_status_transacao(
     transacao_id: int,
     novo_status: str,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Atualizar status da transação"""
     
@@ -136,13 +119,7 @@ async def atualizar_status_transacao(
             detail="Transação não encontrada"
         )
     
-    evento = db.query(Evento).filter(Evento.id == transacao.evento_id).first()
-    if (usuario_atual.tipo.value != "admin" and 
-        usuario_atual.empresa_id != evento.empresa_id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Acesso negado"
-        )
+    verificar_acesso_evento(db, transacao.evento_id, usuario_atual)
     
     status_validos = ["pendente", "aprovada", "cancelada"]
     if novo_status not in status_validos:
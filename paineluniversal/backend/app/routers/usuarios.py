@@ -4,7 +4,7 @@ from typing import List, Optional
 from ..database import get_db
 from ..models import Usuario, Empresa
 from ..schemas import Usuario as UsuarioSchema, UsuarioCreate
-from ..auth import obter_usuario_atual, verificar_permissao_admin, gerar_hash_senha, validar_cpf_basico
+from ..auth import obter_usuario_atual, verificar_permissao_admin, gerar_hash_senha_async, validar_cpf_basico, cache_principais, UsuarioPrincipal
 
 router = APIRouter()
 
@@ -12,7 +12,7 @@ router = APIRouter()
 async def criar_usuario(
     usuario: UsuarioCreate,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(verificar_permissao_admin)
+    usuario_atual: UsuarioPrincipal = Depends(verificar_permissao_admin)
 ):
     """Criar novo usuário (apenas admins)"""
     
@@ -43,7 +43,7 @@ async def criar_usuario(
             detail="Empresa não encontrada"
         )
     
-    senha_hash = gerar_hash_senha(usuario.senha)
+    senha_hash = await gerar_hash_senha_async(usuario.senha)
     usuario_data = usuario.dict()
     del usuario_data['senha']
     usuario_data['senha_hash'] = senha_hash
@@ -61,7 +61,7 @@ async def listar_usuarios(
     limit: int = 100,
     empresa_id: Optional[int] = None,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Listar usuários"""
     
@@ -79,7 +79,7 @@ async def listar_usuarios(
 async def obter_usuario(
     usuario_id: int,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    usuario_atual: UsuarioPrincipal = Depends(obter_usuario_atual)
 ):
     """Obter dados de um usuário"""
     
@@ -105,7 +105,7 @@ async def atualizar_usuario(
     usuario_id: int,
     usuario_update: UsuarioCreate,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(verificar_permissao_admin)
+    usuario_atual: UsuarioPrincipal = Depends(verificar_permissao_admin)
 ):
     """Atualizar dados do usuário (apenas admins)"""
     
@@ -138,22 +138,27 @@ async def atualizar_usuario(
                 detail="Email já cadastrado"
             )
     
+    cpf_anterior = usuario.cpf
+    
     for field, value in usuario_update.dict(exclude={'senha'}).items():
         setattr(usuario, field, value)
     
     if usuario_update.senha:
-        usuario.senha_hash = gerar_hash_senha(usuario_update.senha)
+        usuario.senha_hash = await gerar_hash_senha_async(usuario_update.senha)
     
     db.commit()
     db.refresh(usuario)
     
+    cache_principais.invalidar(cpf_anterior)
+    cache_principais.invalidar(usuario.cpf)
+    
     return usuario
 
 @router.delete("/{usuario_id}")
 async def desativar_usuario(
     usuario_id: int,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(verificar_permissao_admin)
+    usuario_atual: UsuarioPrincipal = Depends(verificar_permissao_admin)
 ):
     """Desativar usuário (soft delete)"""
     
@@ -167,4 +172,6 @@ async def desativar_usuario(
     usuario.ativo = False
     db.commit()
     
+    cache_principais.invalidar(usuario.cpf)
+    
     return {"mensagem": "Usuário desativado com sucesso"}
@@ -1,11 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any
 from pydantic import BaseModel
-from ..database import get_db
-from ..auth import obter_usuario_atual, verificar_permissao_promoter
-from ..models import Usuario, Evento, Lista
-from ..services.whatsapp_service import whatsapp_service
+from ..database import get_db, settings
+from ..auth import obter_usuario_atual, verificar_permissao_promoter, UsuarioPrincipal
+from ..models import Evento, Lista
+from ..services.whatsapp_service import whatsapp_service, despachante_whatsapp
 import logging
 
 logger = logging.getLogger(__name__)
@@ -33,7 +33,7 @@ class WebhookMessage(BaseModel):
 @router.post("/init", summary="Inicializar sessão WhatsApp")
 async def inicializar_whatsapp(
     request: WhatsAppInitRequest,
-    usuario_atual: Usuario = Depends(verificar_permissao_promoter)
+    usuario_atual: UsuarioPrincipal = Depends(verificar_permissao_promoter)
 ):
     """
     Inicializa sessão do WhatsApp e retorna QR Code para escaneamento.
@@ -56,7 +56,7 @@ async def inicializar_whatsapp(
 
 @router.get("/status", summary="Status da sessão WhatsApp")
 async def status_whatsapp(
-    usuario_atual: Usuario = Depends(verificar_permissao_promoter)
+    usuario_atual: UsuarioPrincipal = Depends(verificar_permissao_promoter)
 ):
     """
     Retorna o status atual da sessão WhatsApp.
@@ -76,9 +76,8 @@ async def status_whatsapp(
 @router.post("/send-invite", summary="Enviar convite individual")
 async def enviar_convite(
     request: SendInviteRequest,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(verificar_permissao_promoter)
+    usuario_atual: UsuarioPrincipal = Depends(verificar_permissao_promoter)
 ):
     """
     Envia convite individual via WhatsApp.
@@ -107,16 +106,11 @@ async def enviar_convite(
         if not lista:
             raise HTTPException(status_code=404, detail="Lista não encontrada")
         
-        background_tasks.add_task(
-            whatsapp_service.send_invite,
-            request.phone,
-            request.evento_id,
-            request.lista_id,
-            db
-        )
+        mensagem = whatsapp_service.send_invite(request.phone, evento, lista)
         
         return {
             "message": "Convite sendo enviado",
+            "mensagem_id": mensagem.id,
             "phone": request.phone,
             "evento": evento.nome,
             "lista": lista.nome
@@ -131,9 +125,8 @@ async def enviar_convite(
 @router.post("/send-bulk", summary="Enviar convites em massa")
 async def enviar_convites_massa(
     request: BulkInviteRequest,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(verificar_permissao_promoter)
+    usuario_atual: UsuarioPrincipal = Depends(verificar_permissao_promoter)
 ):
     """
     Envia convites em massa via WhatsApp.
@@ -162,20 +155,18 @@ async def enviar_convites_massa(
         if not lista:
             raise HTTPException(status_code=404, detail="Lista não encontrada")
         
-        if len(request.phones) > 100:
-            raise HTTPException(status_code=400, detail="Máximo de 100 números por vez")
+        if len(request.phones) > settings.whatsapp_convites_max:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Máximo de {settings.whatsapp_convites_max} números por vez"
+            )
         
-        background_tasks.add_task(
-            whatsapp_service.send_bulk_invites,
-            request.evento_id,
-            request.lista_id,
-            request.phones,
-            db
-        )
+        mensagens = whatsapp_service.send_bulk_invites(evento, lista, request.phones)
         
         return {
             "message": "Convites sendo enviados em massa",
             "total_phones": len(request.phones),
+            "mensagem_ids": [mensagem.id for mensagem in mensagens],
             "evento": evento.nome,
             "lista": lista.nome
         }
@@ -186,6 +177,23 @@ async def enviar_convites_massa(
         logger.error(f"Erro ao enviar convites em massa: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/mensagens/{mensagem_id}", summary="Status de uma mensagem enviada")
+async def status_mensagem(
+    mensagem_id: str,
+    usuario_atual: UsuarioPrincipal = Depends(verificar_permissao_promoter)
+):
+    """
+    Retorna o status de envio (pendente, enviando, enviada, falhou) de uma mensagem
+    enfileirada, com o número de tentativas e o último erro.
+    
+    **Permissões necessárias:** Promoter ou Admin
+    """
+    mensagem = despachante_whatsapp.status(mensagem_id)
+    if not mensagem:
+        raise HTTPException(status_code=404, detail="Mensagem não encontrada")
+    
+    return mensagem.to_dict()
+
 @router.post("/webhook", summary="Webhook para mensagens recebidas")
 async def webhook_mensagens(
     message: WebhookMessage,
@@ -217,7 +225,7 @@ async def webhook_mensagens(
 async def listar_convites_evento(
     evento_id: int,
     db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(verificar_permissao_promoter)
+    usuario_atual: UsuarioPrincipal = Depends(verificar_permissao_promoter)
 ):
     """
     Lista todos os convites enviados para um evento específico.
@@ -1,31 +1,269 @@
 import asyncio
-import schedule
+import os
+import random
 import time
-from threading import Thread
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import text
+
+from .database import engine, settings
 from .services.alert_service import alert_service
+from .services.codigo_verificacao_service import codigos_verificacao
+from .services.outbox_service import outbox_relay
+from .services.tablet_monitor import monitor_tablets
+from .services.tablet_logs import retencao_logs_tablets
+from .metrics import registro, jobs_duracao, Contador, Medidor
 import logging
 
 logger = logging.getLogger(__name__)
 
-def run_alert_checks():
-    """Executar verificações de alerta"""
-    try:
-        asyncio.run(alert_service.run_alert_checks())
-        logger.info("Verificações de alerta executadas com sucesso")
-    except Exception as e:
-        logger.error(f"Erro nas verificações de alerta: {e}")
-
-def start_scheduler():
-    """Iniciar scheduler de alertas"""
-    schedule.every(30).minutes.do(run_alert_checks)
-    
-    schedule.every(6).hours.do(run_alert_checks)
-    
-    def run_scheduler():
+jobs_ignorados = registro.registrar(Contador(
+    "scheduler_job_skipped_total",
+    "Execuções de jobs ignoradas por já haver execuções demais em andamento",
+    labels=("job",)
+))
+
+scheduler_lider = registro.registrar(Medidor(
+    "scheduler_leader",
+    "1 se este processo detém a trava de líder do scheduler"
+))
+
+
+class TravaLider(ABC):
+    """Trava entre processos que elege um único worker para rodar os jobs"""
+
+    @abstractmethod
+    def adquirir(self) -> bool:
+        ...
+
+    @abstractmethod
+    def liberar(self):
+        ...
+
+
+class TravaArquivo(TravaLider):
+    """flock não bloqueante em um arquivo local; serve para workers na mesma máquina"""
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self._fd: Optional[int] = None
+
+    def adquirir(self) -> bool:
+        if self._fd is not None:
+            return True
+        try:
+            import fcntl
+        except ImportError:
+            return True
+        diretorio = os.path.dirname(self.caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        fd = os.open(self.caminho, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    def liberar(self):
+        if self._fd is None:
+            return
+        import fcntl
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+        self._fd = None
+
+
+class TravaPostgres(TravaLider):
+    """Advisory lock de sessão no PostgreSQL, mantido em uma conexão dedicada;
+    vale para workers em máquinas diferentes"""
+
+    def __init__(self, engine, chave: int):
+        self.engine = engine
+        self.chave = chave
+        self._conexao = None
+
+    def adquirir(self) -> bool:
+        if self._conexao is not None:
+            return True
+        conexao = self.engine.connect()
+        try:
+            obtida = conexao.execute(text("SELECT pg_try_advisory_lock(:chave)"), {"chave": self.chave}).scalar()
+            conexao.commit()
+        except Exception:
+            conexao.close()
+            raise
+        if not obtida:
+            conexao.close()
+            return False
+        self._conexao = conexao
+        return True
+
+    def liberar(self):
+        if self._conexao is None:
+            return
+        try:
+            self._conexao.execute(text("SELECT pg_advisory_unlock(:chave)"), {"chave": self.chave})
+            self._conexao.commit()
+        finally:
+            self._conexao.close()
+            self._conexao = None
+
+
+def criar_trava() -> TravaLider:
+    if engine.dialect.name == "postgresql":
+        return TravaPostgres(engine, settings.scheduler_lock_chave)
+    return TravaArquivo(settings.scheduler_lock_file)
+
+
+@dataclass
+class Job:
+    """`funcao` é uma corrotina; com `em_thread`, uma função síncrona que o scheduler
+    roda no executor padrão. Uma thread não pode ser interrompida: no timeout ela segue
+    rodando e continua ocupando sua vaga em `max_concorrentes` até terminar."""
+    nome: str
+    funcao: Callable[[], Any]
+    intervalo_segundos: float
+    jitter_segundos: float = 0
+    timeout_segundos: Optional[float] = None
+    max_concorrentes: int = 1
+    em_thread: bool = False
+
+
+class Scheduler:
+    """Scheduler asyncio que roda no event loop da aplicação (iniciado no lifespan).
+
+    Só o processo que obtém a trava de líder agenda jobs; os demais tentam de novo a
+    cada `intervalo_lider_segundos`, assumindo se o líder cair.
+    """
+
+    def __init__(self, trava: TravaLider, intervalo_lider_segundos: float = 30):
+        self.trava = trava
+        self.intervalo_lider_segundos = intervalo_lider_segundos
+        self.jobs: Dict[str, Job] = {}
+        self.lider = False
+        self._tarefa: Optional[asyncio.Task] = None
+        self._tarefas_jobs: List[asyncio.Task] = []
+        self._execucoes: set = set()
+        self._em_andamento: Dict[str, int] = {}
+
+    def adicionar(self, job: Job):
+        self.jobs[job.nome] = job
+
+    @property
+    def ativo(self) -> bool:
+        return self._tarefa is not None
+
+    async def iniciar(self):
+        if self._tarefa is None:
+            self._tarefa = asyncio.get_running_loop().create_task(self._disputar_lideranca())
+            logger.info("Scheduler iniciado")
+
+    async def parar(self):
+        tarefas = [t for t in (self._tarefa, *self._tarefas_jobs, *self._execucoes) if t is not None]
+        for tarefa in tarefas:
+            tarefa.cancel()
+        await asyncio.gather(*tarefas, return_exceptions=True)
+        self._tarefa = None
+        self._tarefas_jobs = []
+        self._execucoes = set()
+        if self.lider:
+            await asyncio.to_thread(self.trava.liberar)
+            self.lider = False
+            scheduler_lider.set(0)
+
+    async def _disputar_lideranca(self):
+        while not self.lider:
+            try:
+                self.lider = await asyncio.to_thread(self.trava.adquirir)
+            except Exception as e:
+                logger.error(f"Erro ao obter trava do scheduler: {e}")
+            if not self.lider:
+                await asyncio.sleep(self.intervalo_lider_segundos)
+
+        scheduler_lider.set(1)
+        logger.info("Este processo é o líder do scheduler (pid %s)", os.getpid())
+        loop = asyncio.get_running_loop()
+        self._tarefas_jobs = [loop.create_task(self._agendar(job)) for job in self.jobs.values()]
+
+    async def _agendar(self, job: Job):
         while True:
-            schedule.run_pending()
-            time.sleep(60)
-    
-    scheduler_thread = Thread(target=run_scheduler, daemon=True)
-    scheduler_thread.start()
-    logger.info("Scheduler de alertas iniciado")
+            await asyncio.sleep(job.intervalo_segundos + random.uniform(0, job.jitter_segundos))
+            if self._em_andamento.get(job.nome, 0) >= job.max_concorrentes:
+                jobs_ignorados.inc(job=job.nome)
+                logger.warning("Job %s ignorado: execução anterior ainda em andamento", job.nome)
+                continue
+            execucao = asyncio.get_running_loop().create_task(self._executar(job))
+            self._execucoes.add(execucao)
+            execucao.add_done_callback(self._execucoes.discard)
+
+    async def _executar(self, job: Job):
+        self._em_andamento[job.nome] = self._em_andamento.get(job.nome, 0) + 1
+        inicio = time.perf_counter()
+        resultado = "erro"
+        thread = None
+        try:
+            if job.em_thread:
+                thread = asyncio.get_running_loop().run_in_executor(None, job.funcao)
+                await asyncio.wait_for(asyncio.shield(thread), timeout=job.timeout_segundos)
+            else:
+                await asyncio.wait_for(job.funcao(), timeout=job.timeout_segundos)
+            resultado = "sucesso"
+        except asyncio.TimeoutError:
+            resultado = "timeout"
+            logger.error("Job %s excedeu o timeout de %ss", job.nome, job.timeout_segundos)
+        except Exception as e:
+            logger.error(f"Erro no job {job.nome}: {e}")
+        finally:
+            jobs_duracao.observe(time.perf_counter() - inicio, job=job.nome, resultado=resultado)
+            if thread is not None and not thread.done():
+                thread.add_done_callback(lambda concluida: self._liberar_vaga(job, concluida))
+            else:
+                self._em_andamento[job.nome] -= 1
+
+    def _liberar_vaga(self, job: Job, thread: asyncio.Future):
+        """Fim de uma thread que passou do timeout: só agora o job pode rodar de novo"""
+        self._em_andamento[job.nome] -= 1
+        if not thread.cancelled() and thread.exception() is not None:
+            logger.error(f"Erro no job {job.nome} após o timeout: {thread.exception()}")
+
+
+scheduler = Scheduler(criar_trava(), settings.scheduler_lider_intervalo_segundos)
+scheduler.adicionar(Job(
+    nome="alertas",
+    funcao=alert_service.executar_verificacoes,
+    intervalo_segundos=settings.alertas_intervalo_minutos * 60,
+    jitter_segundos=settings.scheduler_jitter_segundos,
+    timeout_segundos=settings.alertas_timeout_segundos,
+    em_thread=True
+))
+scheduler.adicionar(Job(
+    nome="outbox",
+    funcao=outbox_relay.processar,
+    intervalo_segundos=settings.outbox_intervalo_segundos
+))
+scheduler.adicionar(Job(
+    nome="tablets",
+    funcao=monitor_tablets.ciclo,
+    intervalo_segundos=settings.tablets_ciclo_segundos,
+    timeout_segundos=settings.tablets_timeout_segundos * 3
+))
+scheduler.adicionar(Job(
+    nome="tablet_logs",
+    funcao=retencao_logs_tablets.limpar,
+    intervalo_segundos=settings.tablet_logs_limpeza_minutos * 60,
+    jitter_segundos=settings.scheduler_jitter_segundos
+))
+if settings.codigo_verificacao_backend == "banco":
+    scheduler.adicionar(Job(
+        nome="codigos_verificacao",
+        funcao=codigos_verificacao.limpar_expirados,
+        intervalo_segundos=settings.codigo_verificacao_limpeza_minutos * 60,
+        jitter_segundos=settings.scheduler_jitter_segundos
+    ))
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr, validator, ConfigDict
 from datetime import datetime, date
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from decimal import Decimal
 from enum import Enum
 from .models import StatusEvento, TipoLista, StatusTransacao, TipoUsuario, TipoProduto, StatusProduto, TipoComanda, StatusComanda, StatusVendaPDV, TipoPagamentoPDV
@@ -307,6 +307,7 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     cpf: Optional[str] = None
+    iat: Optional[int] = None
 
 class LoginRequest(BaseModel):
     cpf: str
@@ -768,10 +769,12 @@ class TabletResponse(BaseModel):
     porta: int
     tipo: TipoTablet
     status: StatusTablet
-    empresa_id: str
+    empresa_id: int
     criado_em: datetime
     atualizado_em: datetime
     ultima_conexao: Optional[datetime] = None
+    verificado_em: Optional[datetime] = None
+    latencia_ms: Optional[float] = None
 
 class TabletLogResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -782,6 +785,14 @@ class TabletLogResponse(BaseModel):
     detalhes: Optional[str] = None
     timestamp: datetime
 
+class TabletLogEntrada(BaseModel):
+    evento: str
+    detalhes: Optional[str] = None
+    timestamp: Optional[datetime] = None
+
+class TabletLogLote(BaseModel):
+    logs: List[TabletLogEntrada]
+
 class ConfiguracaoMeepResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     
@@ -789,9 +800,14 @@ class ConfiguracaoMeepResponse(BaseModel):
     tablet_id: str
     configuracao: str
     versao: str
+    hash: Optional[str] = None
     criado_em: datetime
     atualizado_em: datetime
 
+class SincronizacaoConfigRequest(BaseModel):
+    configuracao: Dict[str, Any]
+    tablet_ids: Optional[List[str]] = None
+
 class StatusMeepClient(str, Enum):
     ATIVO = "ativo"
     BLOQUEADO = "bloqueado"
@@ -857,7 +873,7 @@ class MeepClientResponse(BaseModel):
     has_alert: bool
     empresa_id: int
     criado_em: datetime
-    atualizado_em: datetime
+    atualizado_em: Optional[datetime] = None
 
 class ClientBlockHistoryResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -1,15 +1,51 @@
-import asyncio
+import hashlib
+import time
+from collections import defaultdict
+from dataclasses import dataclass
 from datetime import datetime, date, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, Dict, Any
+from sqlalchemy import func, and_, or_, select
+from typing import List, Dict, Any, Optional, Tuple
 from ..database import SessionLocal
-from ..models import Evento, Lista, Transacao, Usuario, TipoLista
+from ..models import (
+    Evento, Lista, Transacao, Usuario, TipoLista, TipoUsuario,
+    Conquista, PromoterConquista, TipoConquista, EstadoAlerta, MarcaAlerta
+)
+from ..metrics import registro, Histograma, Contador
 from ..services.whatsapp_service import whatsapp_service
 import logging
 
 logger = logging.getLogger(__name__)
 
+BUCKETS_REGRA = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0)
+
+# Recuo aplicado à marca d'água: cobre transações que commitaram depois do início da
+# avaliação anterior e a resolução de segundos do relógio do banco; a deduplicação
+# impede que a reavaliação dessas entidades gere reenvios
+MARGEM_MARCA = timedelta(minutes=1)
+
+regras_duracao = registro.registrar(Histograma(
+    "alert_rule_duration_seconds",
+    "Duração da avaliação de cada regra de alerta",
+    labels=("regra", "resultado"),
+    buckets=BUCKETS_REGRA
+))
+
+alertas_gerados = registro.registrar(Contador(
+    "alerts_generated_total",
+    "Alertas produzidos pelas regras",
+    labels=("regra",)
+))
+
+@dataclass(frozen=True)
+class Alerta:
+    """Alerta produzido por uma regra: entidade, limiar atingido e destinatários"""
+    regra: str
+    entidade_id: int
+    limiar: str
+    destinatarios: Tuple[str, ...]
+    mensagem: str
+
 class AlertService:
     def __init__(self):
         self.alert_rules = {
@@ -19,210 +55,354 @@ class AlertService:
             "evento_proximo": self.check_evento_proximo,
             "conquistas_pendentes": self.check_conquistas_pendentes
         }
-    
-    async def run_alert_checks(self):
-        """Executar todas as verificações de alerta"""
+        # Intervalo mínimo para reenviar o mesmo (regra, entidade, limiar); None envia uma única vez
+        self.reenvio = {
+            "limite_lista": None,
+            "aniversarios_vip": None,
+            "vendas_baixas": timedelta(hours=24),
+            "evento_proximo": None,
+            "conquistas_pendentes": None
+        }
+
+    def avaliar_regra(self, db: Session, rule_name: str, desde: Optional[datetime] = None) -> Optional[List[Alerta]]:
+        """Avaliar uma regra medindo sua duração; retorna None se a regra falhar"""
+        inicio = time.perf_counter()
+        resultado = "erro"
+        try:
+            if desde is not None:
+                desde = desde - MARGEM_MARCA
+            alertas = self.alert_rules[rule_name](db, desde)
+            alertas_gerados.inc(len(alertas), regra=rule_name)
+            resultado = "sucesso"
+            return alertas
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Erro na regra {rule_name}: {e}")
+            return None
+        finally:
+            regras_duracao.observe(time.perf_counter() - inicio, regra=rule_name, resultado=resultado)
+
+    def executar_verificacoes(self):
+        """Avalia as regras e grava, na mesma transação, as mensagens no outbox, o estado
+        de deduplicação e as marcas d'água; o envio fica a cargo do relay do outbox"""
         db = SessionLocal()
         try:
-            for rule_name, rule_func in self.alert_rules.items():
-                try:
-                    await rule_func(db)
-                except Exception as e:
-                    logger.error(f"Erro na regra {rule_name}: {e}")
+            marcas = self.carregar_marcas(db)
+            inicio_avaliacao = db.scalar(select(func.now()))
+            alertas = []
+            regras_avaliadas = set()
+            for rule_name in self.alert_rules:
+                alertas_regra = self.avaliar_regra(db, rule_name, marcas.get(rule_name))
+                if alertas_regra is not None:
+                    alertas.extend(alertas_regra)
+                    regras_avaliadas.add(rule_name)
+
+            agora = datetime.utcnow()
+            alertas = self.filtrar_ja_enviados(db, alertas, agora)
+            for alerta in alertas:
+                self.enviar_alerta(db, alerta)
+            self.registrar_envios(db, alertas, agora)
+            self.salvar_marcas(db, {rule_name: inicio_avaliacao for rule_name in regras_avaliadas})
+            db.commit()
         finally:
             db.close()
-    
-    async def check_limite_lista(self, db: Session):
-        """Verificar listas próximas do limite"""
-        listas_criticas = db.query(Lista).filter(
+
+    def enviar_alerta(self, db: Session, alerta: Alerta):
+        for telefone in alerta.destinatarios:
+            whatsapp_service.enviar_mensagem_outbox(db, telefone, alerta.mensagem)
+
+    def carregar_marcas(self, db: Session) -> Dict[str, datetime]:
+        """Marca d'água de cada regra: início da última avaliação concluída e enviada"""
+        return {marca.regra: marca.avaliado_ate for marca in db.query(MarcaAlerta).all()}
+
+    def salvar_marcas(self, db: Session, marcas: Dict[str, datetime]):
+        existentes = {marca.regra: marca for marca in db.query(MarcaAlerta).filter(
+            MarcaAlerta.regra.in_(list(marcas))
+        ).all()} if marcas else {}
+        for regra, avaliado_ate in marcas.items():
+            if regra in existentes:
+                existentes[regra].avaliado_ate = avaliado_ate
+            else:
+                db.add(MarcaAlerta(regra=regra, avaliado_ate=avaliado_ate))
+
+    def _estados(self, db: Session, alertas: List[Alerta]) -> Dict[Tuple[str, int, str], EstadoAlerta]:
+        if not alertas:
+            return {}
+        estados = db.query(EstadoAlerta).filter(
+            EstadoAlerta.regra.in_({alerta.regra for alerta in alertas}),
+            EstadoAlerta.entidade_id.in_({alerta.entidade_id for alerta in alertas})
+        ).all()
+        return {(estado.regra, estado.entidade_id, estado.limiar): estado for estado in estados}
+
+    def filtrar_ja_enviados(self, db: Session, alertas: List[Alerta], agora: datetime) -> List[Alerta]:
+        """Descartar alertas já enviados, respeitando o intervalo de reenvio de cada regra"""
+        estados = self._estados(db, alertas)
+        pendentes = []
+        for alerta in alertas:
+            estado = estados.get((alerta.regra, alerta.entidade_id, alerta.limiar))
+            reenvio = self.reenvio.get(alerta.regra)
+            if estado is None or (reenvio is not None and estado.ultimo_envio + reenvio <= agora):
+                pendentes.append(alerta)
+        return pendentes
+
+    def registrar_envios(self, db: Session, alertas: List[Alerta], agora: datetime):
+        estados = self._estados(db, alertas)
+        for alerta in alertas:
+            chave = (alerta.regra, alerta.entidade_id, alerta.limiar)
+            if chave in estados:
+                estados[chave].ultimo_envio = agora
+            else:
+                estados[chave] = EstadoAlerta(
+                    regra=alerta.regra, entidade_id=alerta.entidade_id,
+                    limiar=alerta.limiar, ultimo_envio=agora
+                )
+                db.add(estados[chave])
+
+    def _telefones_admins(self, db: Session, empresa_ids) -> Dict[int, Tuple[str, ...]]:
+        """Telefones dos admins agrupados por empresa, em uma única consulta"""
+        if not empresa_ids:
+            return {}
+        telefones = defaultdict(list)
+        for empresa_id, telefone in db.query(Usuario.empresa_id, Usuario.telefone).filter(
+            Usuario.empresa_id.in_(empresa_ids),
+            Usuario.tipo == TipoUsuario.ADMIN,
+            Usuario.telefone.isnot(None)
+        ).all():
+            telefones[empresa_id].append(telefone)
+        return {empresa_id: tuple(lista) for empresa_id, lista in telefones.items()}
+
+    def check_limite_lista(self, db: Session, desde: Optional[datetime] = None) -> List[Alerta]:
+        """Verificar listas próximas do limite (apenas listas com vendas ou criadas desde a marca)"""
+        query = db.query(
+            Lista.id, Lista.nome, Lista.vendas_realizadas, Lista.limite_vendas,
+            Evento.nome.label("evento_nome"), Usuario.telefone
+        ).join(
+            Evento, Evento.id == Lista.evento_id
+        ).join(
+            Usuario, Usuario.id == Lista.promoter_id
+        ).filter(
             Lista.ativa == True,
             Lista.limite_vendas.isnot(None),
-            Lista.vendas_realizadas >= Lista.limite_vendas * 0.9
-        ).all()
-        
+            Lista.vendas_realizadas >= Lista.limite_vendas * 0.9,
+            Usuario.telefone.isnot(None)
+        )
+        if desde is not None:
+            query = query.filter(or_(
+                Lista.criado_em >= desde,
+                Lista.id.in_(select(Transacao.lista_id).where(Transacao.criado_em >= desde))
+            ))
+        listas_criticas = query.all()
+
+        alertas = []
         for lista in listas_criticas:
             percentual = (lista.vendas_realizadas / lista.limite_vendas) * 100
-            
-            if lista.promoter_id:
-                promoter = db.query(Usuario).filter(Usuario.id == lista.promoter_id).first()
-                if promoter and promoter.telefone:
-                    message = f"""
+            limiar = "100" if lista.vendas_realizadas >= lista.limite_vendas else "90"
+            message = f"""
 🚨 *ALERTA - LIMITE DE LISTA*
 
 Lista: {lista.nome}
 Vendas: {lista.vendas_realizadas}/{lista.limite_vendas} ({percentual:.1f}%)
-Evento: {lista.evento.nome}
+Evento: {lista.evento_nome}
 
 Ação necessária: Verificar estratégia de vendas
-                    """.strip()
-                    
-                    await whatsapp_service._send_whatsapp_message(
-                        promoter.telefone, message
-                    )
-    
-    async def check_aniversarios_vip(self, db: Session):
+            """.strip()
+            alertas.append(Alerta("limite_lista", lista.id, limiar, (lista.telefone,), message))
+        return alertas
+
+    def check_aniversarios_vip(self, db: Session, desde: Optional[datetime] = None) -> List[Alerta]:
         """Verificar aniversariantes VIP nos próximos eventos"""
         hoje = date.today()
         proximos_7_dias = hoje + timedelta(days=7)
-        
-        eventos_proximos = db.query(Evento).filter(
-            func.date(Evento.data_evento).between(hoje, proximos_7_dias)
+
+        transacoes_vip = db.query(
+            Evento.id, Evento.nome, Evento.data_evento, Evento.empresa_id,
+            Transacao.cpf_comprador, Transacao.nome_comprador
+        ).join(
+            Transacao, Transacao.evento_id == Evento.id
+        ).join(
+            Lista, Lista.id == Transacao.lista_id
+        ).filter(
+            func.date(Evento.data_evento).between(hoje, proximos_7_dias),
+            Lista.tipo == TipoLista.VIP,
+            Transacao.status == "aprovada"
         ).all()
-        
-        for evento in eventos_proximos:
-            transacoes_vip = db.query(Transacao).join(Lista).filter(
-                Transacao.evento_id == evento.id,
-                Lista.tipo == TipoLista.VIP,
-                Transacao.status == "aprovada"
-            ).all()
-            
-            aniversariantes = []
-            for transacao in transacoes_vip:
-                if self._is_birthday_week(transacao.cpf_comprador):
-                    aniversariantes.append(transacao.nome_comprador)
-            
-            if aniversariantes:
-                admin_users = db.query(Usuario).filter(
-                    Usuario.empresa_id == evento.empresa_id,
-                    Usuario.tipo == "admin"
-                ).all()
-                
-                for admin in admin_users:
-                    if admin.telefone:
-                        message = f"""
+
+        eventos = {}
+        aniversariantes = defaultdict(list)
+        cpfs = defaultdict(set)
+        for linha in transacoes_vip:
+            if self._is_birthday_week(linha.cpf_comprador):
+                eventos[linha.id] = linha
+                aniversariantes[linha.id].append(linha.nome_comprador)
+                cpfs[linha.id].add(linha.cpf_comprador)
+
+        admins = self._telefones_admins(db, {evento.empresa_id for evento in eventos.values()})
+
+        alertas = []
+        for evento_id, evento in eventos.items():
+            destinatarios = admins.get(evento.empresa_id)
+            if not destinatarios:
+                continue
+            message = f"""
 🎂 *ANIVERSARIANTES VIP*
 
 Evento: {evento.nome}
 Data: {evento.data_evento.strftime('%d/%m/%Y')}
 
 Aniversariantes da semana:
-{chr(10).join(f"• {nome}" for nome in aniversariantes)}
+{chr(10).join(f"• {nome}" for nome in aniversariantes[evento_id])}
 
 Considere preparar algo especial! 🎉
-                        """.strip()
-                        
-                        await whatsapp_service._send_whatsapp_message(
-                            admin.telefone, message
-                        )
-    
-    async def check_vendas_baixas(self, db: Session):
+            """.strip()
+            # Data do evento e conjunto de aniversariantes: convidado novo ou evento remarcado geram novo alerta
+            convidados = hashlib.sha1(",".join(sorted(cpfs[evento_id])).encode()).hexdigest()[:12]
+            limiar = f"{evento.data_evento:%Y-%m-%d}:{convidados}"
+            alertas.append(Alerta("aniversarios_vip", evento_id, limiar, destinatarios, message))
+        return alertas
+
+    def _eventos_com_vendas(self, db: Session, *condicoes):
+        """Eventos filtrados com o total de vendas aprovadas, em uma consulta agrupada"""
+        return db.query(
+            Evento.id, Evento.nome, Evento.data_evento, Evento.local, Evento.empresa_id,
+            func.count(Transacao.id).label("total_vendas")
+        ).outerjoin(
+            Transacao, and_(Transacao.evento_id == Evento.id, Transacao.status == "aprovada")
+        ).filter(*condicoes).group_by(
+            Evento.id, Evento.nome, Evento.data_evento, Evento.local, Evento.empresa_id
+        )
+
+    def check_vendas_baixas(self, db: Session, desde: Optional[datetime] = None) -> List[Alerta]:
         """Verificar eventos com vendas baixas"""
         hoje = date.today()
-        proximos_30_dias = hoje + timedelta(days=30)
-        
-        eventos_proximos = db.query(Evento).filter(
-            func.date(Evento.data_evento).between(hoje, proximos_30_dias)
-        ).all()
-        
-        for evento in eventos_proximos:
-            total_vendas = db.query(func.count(Transacao.id)).filter(
-                Transacao.evento_id == evento.id,
-                Transacao.status == "aprovada"
-            ).scalar() or 0
-            
+        proximos_7_dias = hoje + timedelta(days=7)
+
+        eventos = self._eventos_com_vendas(
+            db, func.date(Evento.data_evento).between(hoje, proximos_7_dias)
+        ).having(func.count(Transacao.id) < 10).all()
+        if not eventos:
+            return []
+
+        promoters = defaultdict(list)
+        for evento_id, telefone in db.query(Lista.evento_id, Usuario.telefone).join(
+            Usuario, Usuario.id == Lista.promoter_id
+        ).filter(
+            Lista.evento_id.in_([evento.id for evento in eventos]),
+            Usuario.telefone.isnot(None)
+        ).distinct().all():
+            promoters[evento_id].append(telefone)
+
+        alertas = []
+        for evento in eventos:
+            if not promoters[evento.id]:
+                continue
             dias_restantes = (evento.data_evento.date() - hoje).days
-            
-            if dias_restantes <= 7 and total_vendas < 10:
-                promoters = db.query(Usuario).join(
-                    Lista, Lista.promoter_id == Usuario.id
-                ).filter(Lista.evento_id == evento.id).distinct().all()
-                
-                for promoter in promoters:
-                    if promoter.telefone:
-                        message = f"""
+            message = f"""
 📉 *ALERTA - VENDAS BAIXAS*
 
 Evento: {evento.nome}
 Data: {evento.data_evento.strftime('%d/%m/%Y')}
-Vendas atuais: {total_vendas}
+Vendas atuais: {evento.total_vendas}
 Dias restantes: {dias_restantes}
 
 Ação sugerida: Intensificar divulgação
-                        """.strip()
-                        
-                        await whatsapp_service._send_whatsapp_message(
-                            promoter.telefone, message
-                        )
-    
-    async def check_evento_proximo(self, db: Session):
+            """.strip()
+            alertas.append(Alerta("vendas_baixas", evento.id, "7d", tuple(promoters[evento.id]), message))
+        return alertas
+
+    def check_evento_proximo(self, db: Session, desde: Optional[datetime] = None) -> List[Alerta]:
         """Verificar eventos nas próximas 24h"""
         amanha = date.today() + timedelta(days=1)
-        
-        eventos_amanha = db.query(Evento).filter(
-            func.date(Evento.data_evento) == amanha
-        ).all()
-        
+
+        eventos_amanha = self._eventos_com_vendas(db, func.date(Evento.data_evento) == amanha).all()
+        admins = self._telefones_admins(db, {evento.empresa_id for evento in eventos_amanha})
+
+        alertas = []
         for evento in eventos_amanha:
-            total_vendas = db.query(func.count(Transacao.id)).filter(
-                Transacao.evento_id == evento.id,
-                Transacao.status == "aprovada"
-            ).scalar() or 0
-            
-            admin_users = db.query(Usuario).filter(
-                Usuario.empresa_id == evento.empresa_id,
-                Usuario.tipo == "admin"
-            ).all()
-            
-            for admin in admin_users:
-                if admin.telefone:
-                    message = f"""
+            destinatarios = admins.get(evento.empresa_id)
+            if not destinatarios:
+                continue
+            message = f"""
 ⏰ *EVENTO AMANHÃ*
 
 {evento.nome}
 📅 {evento.data_evento.strftime('%d/%m/%Y às %H:%M')}
 📍 {evento.local}
-🎫 {total_vendas} vendas confirmadas
+🎫 {evento.total_vendas} vendas confirmadas
 
 Lembrete: Preparar equipe e materiais
-                    """.strip()
-                    
-                    await whatsapp_service._send_whatsapp_message(
-                        admin.telefone, message
-                    )
-    
+            """.strip()
+            # Evento remarcado para outro dia recebe um novo lembrete
+            limiar = f"24h:{evento.data_evento:%Y-%m-%d %H:%M}"
+            alertas.append(Alerta("evento_proximo", evento.id, limiar, destinatarios, message))
+        return alertas
+
     def _is_birthday_week(self, cpf: str) -> bool:
         """Mock para verificação de aniversário (requer API de CPF real)"""
         return cpf.endswith(('01', '15', '30'))
-    
-    async def check_conquistas_pendentes(self, db: Session):
-        """Verificar promoters que podem ter novas conquistas"""
-        from ..models import Conquista, PromoterConquista, TipoConquista
-        
-        promoters_ativos = db.query(Usuario).filter(
-            Usuario.tipo == "promoter",
-            Usuario.ativo == True
-        ).all()
-        
-        for promoter in promoters_ativos:
-            total_vendas = db.query(func.count(Transacao.id)).join(Lista).filter(
-                Lista.promoter_id == promoter.id,
-                Transacao.status == "aprovada"
-            ).scalar() or 0
-            
-            conquistas_vendas = db.query(Conquista).filter(
+
+    def check_conquistas_pendentes(self, db: Session, desde: Optional[datetime] = None) -> List[Alerta]:
+        """Verificar promoters que podem ter novas conquistas (apenas quem vendeu desde a marca,
+        ou todos se uma conquista foi criada depois dela)"""
+        filtro_promoters = []
+        if desde is not None:
+            conquista_nova = db.query(Conquista.id).filter(Conquista.criado_em > desde).first()
+            if conquista_nova is None:
+                filtro_promoters.append(Usuario.id.in_(
+                    select(Lista.promoter_id).join(Transacao, Transacao.lista_id == Lista.id).where(
+                        func.coalesce(Transacao.atualizado_em, Transacao.criado_em) >= desde
+                    )
+                ))
+
+        vendas_por_promoter = db.query(
+            Usuario.id.label("promoter_id"),
+            Usuario.nome.label("nome"),
+            Usuario.telefone.label("telefone"),
+            func.count(Transacao.id).label("total_vendas")
+        ).outerjoin(
+            Lista, Lista.promoter_id == Usuario.id
+        ).outerjoin(
+            Transacao, and_(Transacao.lista_id == Lista.id, Transacao.status == "aprovada")
+        ).filter(
+            Usuario.tipo == TipoUsuario.PROMOTER,
+            Usuario.ativo == True,
+            Usuario.telefone.isnot(None),
+            *filtro_promoters
+        ).group_by(Usuario.id, Usuario.nome, Usuario.telefone).subquery()
+
+        pendentes = db.query(
+            vendas_por_promoter.c.promoter_id,
+            vendas_por_promoter.c.nome,
+            vendas_por_promoter.c.telefone,
+            Conquista.id.label("conquista_id"),
+            Conquista.nome.label("conquista_nome"),
+            Conquista.icone
+        ).join(
+            Conquista, and_(
                 Conquista.tipo == TipoConquista.VENDAS,
-                Conquista.criterio_valor <= total_vendas,
-                Conquista.ativa == True
-            ).all()
-            
-            for conquista in conquistas_vendas:
-                ja_possui = db.query(PromoterConquista).filter(
-                    PromoterConquista.promoter_id == promoter.id,
-                    PromoterConquista.conquista_id == conquista.id
-                ).first()
-                
-                if not ja_possui and promoter.telefone:
-                    message = f"""
+                Conquista.ativa == True,
+                Conquista.criterio_valor <= vendas_por_promoter.c.total_vendas
+            )
+        ).outerjoin(
+            PromoterConquista, and_(
+                PromoterConquista.promoter_id == vendas_por_promoter.c.promoter_id,
+                PromoterConquista.conquista_id == Conquista.id
+            )
+        ).filter(PromoterConquista.id.is_(None)).all()
+
+        alertas = []
+        for pendente in pendentes:
+            message = f"""
 🎉 *NOVA CONQUISTA DISPONÍVEL!*
 
-{promoter.nome}, você pode ter desbloqueado:
-{conquista.icone} {conquista.nome}
+{pendente.nome}, você pode ter desbloqueado:
+{pendente.icone} {pendente.conquista_nome}
 
 Acesse o sistema para verificar! 🚀
-                    """.strip()
-                    
-                    await whatsapp_service._send_whatsapp_message(
-                        promoter.telefone, message
-                    )
+            """.strip()
+            alertas.append(Alerta(
+                "conquistas_pendentes", pendente.promoter_id, str(pendente.conquista_id),
+                (pendente.telefone,), message
+            ))
+        return alertas
 
 alert_service = AlertService()
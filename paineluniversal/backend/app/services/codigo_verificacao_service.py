@@ -0,0 +1,182 @@
+import asyncio
+import enum
+import hashlib
+import hmac
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal, settings
+from ..models import CodigoVerificacao
+
+
+class ResultadoCodigo(enum.Enum):
+    VALIDO = "valido"
+    INVALIDO = "invalido"
+    TENTATIVAS_ESGOTADAS = "tentativas_esgotadas"
+
+
+def _hash_codigo(cpf: str, codigo: str) -> str:
+    return hmac.new(settings.secret_key.encode(), f"{cpf}:{codigo}".encode(), hashlib.sha256).hexdigest()
+
+
+class ArmazenamentoCodigos(ABC):
+    """Interface dos armazenamentos de códigos de verificação do login em duas etapas.
+
+    Cada CPF tem no máximo um código ativo; um novo código substitui o anterior.
+    O código vale por `ttl_segundos` e é descartado após `max_tentativas` erros.
+    """
+
+    def __init__(self, ttl_segundos: int, max_tentativas: int):
+        self.ttl_segundos = ttl_segundos
+        self.max_tentativas = max_tentativas
+
+    @abstractmethod
+    def salvar(self, db: Session, cpf: str, codigo: str):
+        ...
+
+    @abstractmethod
+    def verificar(self, db: Session, cpf: str, codigo: str) -> ResultadoCodigo:
+        ...
+
+    async def limpar_expirados(self) -> int:
+        return 0
+
+
+class ArmazenamentoCodigosMemoria(ArmazenamentoCodigos):
+    """Códigos no próprio processo: expiração preguiçosa e limite de tamanho.
+    Só funciona com um único worker, pois as duas etapas precisam cair no mesmo processo."""
+
+    def __init__(self, ttl_segundos: int, max_tentativas: int, tamanho_maximo: int):
+        super().__init__(ttl_segundos, max_tentativas)
+        self.tamanho_maximo = tamanho_maximo
+        self._codigos: "OrderedDict[str, Tuple[str, float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def salvar(self, db: Session, cpf: str, codigo: str):
+        agora = time.monotonic()
+        with self._lock:
+            self._codigos.pop(cpf, None)
+            self._codigos[cpf] = (_hash_codigo(cpf, codigo), agora + self.ttl_segundos, 0)
+            # TTL fixo: a ordem de inserção é também a ordem de expiração
+            while self._codigos:
+                _, (_, expira_em, _) = next(iter(self._codigos.items()))
+                if expira_em > agora and len(self._codigos) <= self.tamanho_maximo:
+                    break
+                self._codigos.popitem(last=False)
+
+    def verificar(self, db: Session, cpf: str, codigo: str) -> ResultadoCodigo:
+        with self._lock:
+            entrada = self._codigos.get(cpf)
+            if entrada is None:
+                return ResultadoCodigo.INVALIDO
+            codigo_hash, expira_em, tentativas = entrada
+            if expira_em <= time.monotonic():
+                del self._codigos[cpf]
+                return ResultadoCodigo.INVALIDO
+            if hmac.compare_digest(codigo_hash, _hash_codigo(cpf, codigo)):
+                del self._codigos[cpf]
+                return ResultadoCodigo.VALIDO
+            tentativas += 1
+            if tentativas >= self.max_tentativas:
+                del self._codigos[cpf]
+                return ResultadoCodigo.TENTATIVAS_ESGOTADAS
+            self._codigos[cpf] = (codigo_hash, expira_em, tentativas)
+            return ResultadoCodigo.INVALIDO
+
+    def __len__(self):
+        return len(self._codigos)
+
+
+class ArmazenamentoCodigosBanco(ArmazenamentoCodigos):
+    """Códigos na tabela codigos_verificacao, compartilhados entre todos os workers"""
+
+    def salvar(self, db: Session, cpf: str, codigo: str):
+        """Upsert pelo CPF: dois pedidos de código simultâneos não disputam a chave primária.
+        Os códigos expirados são removidos pelo scheduler (`limpar_expirados`)."""
+        valores = {
+            "codigo_hash": _hash_codigo(cpf, codigo),
+            "tentativas": 0,
+            "expira_em": datetime.utcnow() + timedelta(seconds=self.ttl_segundos)
+        }
+        dialeto = db.get_bind().dialect.name
+        if dialeto in ("postgresql", "sqlite"):
+            if dialeto == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+            stmt = insert(CodigoVerificacao.__table__).values(cpf=cpf, **valores)
+            db.execute(stmt.on_conflict_do_update(index_elements=["cpf"], set_=valores))
+            db.commit()
+            return
+
+        for _ in range(2):
+            if not db.query(CodigoVerificacao).filter(CodigoVerificacao.cpf == cpf).update(valores):
+                db.add(CodigoVerificacao(cpf=cpf, **valores))
+            try:
+                db.commit()
+                return
+            except IntegrityError:
+                db.rollback()
+        raise RuntimeError(f"Não foi possível salvar o código de verificação de {cpf}")
+
+    async def limpar_expirados(self) -> int:
+        return await asyncio.to_thread(self._limpar_expirados)
+
+    def _limpar_expirados(self) -> int:
+        db = SessionLocal()
+        try:
+            removidos = db.query(CodigoVerificacao).filter(
+                CodigoVerificacao.expira_em <= datetime.utcnow()
+            ).delete(synchronize_session=False)
+            db.commit()
+            return removidos
+        finally:
+            db.close()
+
+    def verificar(self, db: Session, cpf: str, codigo: str) -> ResultadoCodigo:
+        registro = db.query(CodigoVerificacao).filter(
+            CodigoVerificacao.cpf == cpf
+        ).with_for_update().first()
+        if registro is None:
+            db.rollback()
+            return ResultadoCodigo.INVALIDO
+
+        resultado = ResultadoCodigo.INVALIDO
+        if registro.expira_em <= datetime.utcnow():
+            db.delete(registro)
+        elif hmac.compare_digest(registro.codigo_hash, _hash_codigo(cpf, codigo)):
+            db.delete(registro)
+            resultado = ResultadoCodigo.VALIDO
+        else:
+            registro.tentativas += 1
+            if registro.tentativas >= self.max_tentativas:
+                db.delete(registro)
+                resultado = ResultadoCodigo.TENTATIVAS_ESGOTADAS
+        db.commit()
+        return resultado
+
+
+def criar_armazenamento_codigos(backend: Optional[str] = None) -> ArmazenamentoCodigos:
+    backend = backend or settings.codigo_verificacao_backend
+    if backend == "memoria":
+        return ArmazenamentoCodigosMemoria(
+            settings.codigo_verificacao_ttl_segundos,
+            settings.codigo_verificacao_max_tentativas,
+            settings.codigo_verificacao_max
+        )
+    if backend == "banco":
+        return ArmazenamentoCodigosBanco(
+            settings.codigo_verificacao_ttl_segundos,
+            settings.codigo_verificacao_max_tentativas
+        )
+    raise ValueError(f"Backend de códigos de verificação desconhecido: {backend}")
+
+
+codigos_verificacao = criar_armazenamento_codigos()
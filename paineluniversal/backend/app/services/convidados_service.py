@@ -0,0 +1,97 @@
+import uuid
+from decimal import Decimal
+from typing import Iterable, Optional, Set
+
+from sqlalchemy import func, insert, update
+from sqlalchemy.orm import Session
+
+from ..models import Lista, Transacao, StatusTransacao
+from .importacao import ProgressoImportacao, normalizar_cpfs
+
+TIPO_IMPORTACAO = "convidados"
+COLUNAS_CONVIDADOS = ("cpf", "nome", "email", "telefone")
+
+# Abaixo do limite de parâmetros por comando do PostgreSQL (65535) e do SQLite (32766)
+MAX_CPFS_POR_CONSULTA = 30000
+
+
+def cpfs_cadastrados(db: Session, evento_id: int, cpfs: Iterable[str]) -> Set[str]:
+    """CPFs (formatados) que já têm transação no evento, com uma consulta IN por bloco"""
+    cpfs = list(cpfs)
+    existentes = set()
+    for inicio in range(0, len(cpfs), MAX_CPFS_POR_CONSULTA):
+        existentes.update(cpf for (cpf,) in db.query(Transacao.cpf_comprador).filter(
+            Transacao.evento_id == evento_id,
+            Transacao.cpf_comprador.in_(cpfs[inicio:inicio + MAX_CPFS_POR_CONSULTA])
+        ))
+    return existentes
+
+
+def processar_lote_convidados(lista_id: int, evento_id: int, preco: Decimal, usuario_id: int,
+                              cpfs_vistos: Optional[Set[str]], db: Session, lote: "pd.DataFrame",
+                              progresso: ProgressoImportacao):
+    """Valida um lote do arquivo de convidados com operações de coluna, descarta CPFs
+    repetidos (no arquivo ou já no evento), insere as transações em lote e soma os
+    convidados criados em `vendas_realizadas` no próprio banco.
+
+    Sem `cpfs_vistos` a repetição só é checada dentro do lote; entre lotes commitados
+    um a um, o CPF repetido aparece como já cadastrado no evento e a memória não
+    cresce com o arquivo."""
+    import numpy as np
+    import pandas as pd
+
+    cpfs_vistos = set() if cpfs_vistos is None else cpfs_vistos
+
+    lote = lote.reindex(columns=COLUNAS_CONVIDADOS, fill_value="").astype(str).apply(lambda coluna: coluna.str.strip())
+    cpfs, cpf_valido = normalizar_cpfs(lote["cpf"])
+    formatados = cpfs.str.replace(r"(\d{3})(\d{3})(\d{3})(\d{2})", r"\1.\2.\3-\4", regex=True)
+
+    sem_nome = lote["nome"] == ""
+    candidatas = cpf_valido & ~sem_nome
+    repetido = candidatas & (formatados.where(candidatas).duplicated() | formatados.isin(cpfs_vistos))
+    cadastrado = candidatas & ~repetido & formatados.isin(
+        cpfs_cadastrados(db, evento_id, formatados[candidatas & ~repetido].unique())
+    )
+
+    condicoes = [~cpf_valido, sem_nome, repetido, cadastrado]
+    mensagens = [
+        pd.Series("CPF inválido", index=lote.index),
+        pd.Series("Nome obrigatório", index=lote.index),
+        "CPF " + formatados + " repetido no arquivo",
+        "CPF " + formatados + " já cadastrado no evento",
+    ]
+    erros = pd.Series(np.select(condicoes, mensagens, default=""), index=lote.index)
+    for linha, mensagem in erros[erros != ""].items():
+        progresso.erro(linha, mensagem)
+
+    validas = erros == ""
+    lote, formatados = lote[validas], formatados[validas]
+    cpfs_vistos.update(formatados)
+
+    codigos = [uuid.uuid4().hex for _ in range(len(lote))]
+
+    def opcional(coluna: str) -> "pd.Series":
+        return lote[coluna].astype(object).where(lote[coluna] != "", None)
+
+    transacoes = pd.DataFrame({
+        "cpf_comprador": formatados.astype(object),
+        "nome_comprador": lote["nome"].astype(object),
+        "email_comprador": opcional("email"),
+        "telefone_comprador": opcional("telefone"),
+        "codigo_transacao": codigos,
+        "qr_code_ticket": [f"TICKET-{codigo[:8].upper()}-{evento_id}" for codigo in codigos],
+    }, index=lote.index).to_dict("records")
+
+    if transacoes:
+        db.execute(insert(Transacao).values(
+            valor=preco,
+            status=StatusTransacao.APROVADA,
+            lista_id=lista_id,
+            evento_id=evento_id,
+            usuario_id=usuario_id
+        ), transacoes)
+        db.execute(
+            update(Lista).where(Lista.id == lista_id)
+            .values(vendas_realizadas=func.coalesce(Lista.vendas_realizadas, 0) + len(transacoes))
+        )
+    progresso.lote(len(erros), len(transacoes))
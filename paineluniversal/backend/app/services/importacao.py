@@ -0,0 +1,301 @@
+import asyncio
+import csv
+import itertools
+import json
+import logging
+import os
+import tempfile
+import uuid
+from datetime import date, datetime
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile, status
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal, settings
+from ..models import Importacao, StatusImportacao
+from ..metrics import registro, registrar_fila, Contador
+
+logger = logging.getLogger(__name__)
+
+EXTENSOES = (".csv", ".xlsx")
+TAMANHO_BLOCO = 1024 * 1024
+
+linhas_importadas = registro.registrar(Contador(
+    "import_rows_total",
+    "Linhas de arquivos importados por tipo e resultado",
+    labels=("tipo", "resultado")
+))
+
+_tarefas = set()
+registrar_fila("importacoes", lambda: len(_tarefas))
+
+
+def extensao(nome_arquivo: Optional[str]) -> str:
+    nome = (nome_arquivo or "").lower()
+    for ext in EXTENSOES:
+        if nome.endswith(ext):
+            return ext
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Formato não suportado. Use CSV ou XLSX."
+    )
+
+
+async def salvar_upload(arquivo: UploadFile) -> str:
+    """Copia o upload para um arquivo temporário em blocos, sem carregá-lo inteiro na memória"""
+    fd, caminho = tempfile.mkstemp(suffix=extensao(arquivo.filename), dir=settings.importacao_diretorio)
+    try:
+        with os.fdopen(fd, "wb") as destino:
+            while bloco := await arquivo.read(TAMANHO_BLOCO):
+                destino.write(bloco)
+    except BaseException:
+        os.remove(caminho)
+        raise
+    return caminho
+
+
+def _normalizar_colunas(colunas) -> List[str]:
+    return ["" if coluna is None else str(coluna).strip().lower() for coluna in colunas]
+
+
+def _texto(valor: Any) -> str:
+    """Valor de célula de planilha como texto (números inteiros sem o `.0`)"""
+    if valor is None:
+        return ""
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    if isinstance(valor, datetime):
+        return valor.date().isoformat()
+    if isinstance(valor, date):
+        return valor.isoformat()
+    return str(valor).strip()
+
+
+def detectar_delimitador(amostra: str) -> str:
+    """Separador do CSV (vírgula, ponto e vírgula ou tab) a partir do início do arquivo"""
+    try:
+        return csv.Sniffer().sniff(amostra, delimiters=",;\t").delimiter
+    except csv.Error:
+        return ","
+
+
+def _delimitador(caminho: str) -> str:
+    with open(caminho, encoding="utf-8-sig", newline="") as arquivo:
+        return detectar_delimitador(arquivo.read(64 * 1024))
+
+
+def ler_cabecalho(caminho: str) -> List[str]:
+    if caminho.endswith(".csv"):
+        with open(caminho, encoding="utf-8-sig", newline="") as arquivo:
+            return _normalizar_colunas(next(csv.reader(arquivo, delimiter=_delimitador(caminho)), []))
+
+    from openpyxl import load_workbook
+    planilha = load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        return _normalizar_colunas(next(planilha.active.iter_rows(max_row=1, values_only=True), ()))
+    finally:
+        planilha.close()
+
+
+def ler_em_lotes(caminho: str, tamanho_lote: int) -> Iterator["pd.DataFrame"]:
+    """Lê CSV (pandas em chunks) ou XLSX (openpyxl somente leitura) em DataFrames de até
+    `tamanho_lote` linhas: colunas em minúsculas, valores texto ('' quando vazio) e índice
+    igual ao número da linha no arquivo. A memória fica limitada a um lote."""
+    import pandas as pd
+
+    if caminho.endswith(".csv"):
+        leitor = pd.read_csv(caminho, sep=_delimitador(caminho), dtype=str, keep_default_na=False,
+                             encoding="utf-8-sig", chunksize=tamanho_lote, skipinitialspace=True)
+        for lote in leitor:
+            lote.columns = _normalizar_colunas(lote.columns)
+            lote.index = lote.index + 2
+            lote = lote[(lote != "").any(axis=1)]
+            if len(lote):
+                yield lote
+        return
+
+    from openpyxl import load_workbook
+    planilha = load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        linhas = planilha.active.iter_rows(values_only=True)
+        colunas = _normalizar_colunas(next(linhas, ()))
+        numero = 2
+        while bloco := list(itertools.islice(linhas, tamanho_lote)):
+            valores = [[_texto(valor) for valor in linha[:len(colunas)]] + [""] * (len(colunas) - len(linha))
+                       for linha in bloco]
+            lote = pd.DataFrame(valores, columns=colunas, index=range(numero, numero + len(bloco)))
+            numero += len(bloco)
+            lote = lote[(lote != "").any(axis=1)]
+            if len(lote):
+                yield lote
+    finally:
+        planilha.close()
+
+
+def normalizar_cpfs(serie: "pd.Series") -> Tuple["pd.Series", "pd.Series"]:
+    """CPFs só com dígitos e a máscara dos válidos (tamanho, dígitos repetidos e dígitos
+    verificadores), calculados sobre a coluna inteira com numpy. CPFs com 9 ou 10 dígitos
+    (zeros à esquerda perdidos na planilha) são completados antes da validação."""
+    import numpy as np
+    import pandas as pd
+
+    digitos = serie.fillna("").astype(str).str.replace(r"\D", "", regex=True)
+    digitos = digitos.where(~digitos.str.len().between(9, 10), digitos.str.zfill(11))
+    validos = (digitos.str.len() == 11).to_numpy(copy=True)
+
+    if validos.any():
+        matriz = (np.frombuffer("".join(digitos[validos]).encode(), dtype=np.uint8)
+                  .reshape(-1, 11).astype(np.int64) - 48)
+        digito1 = (matriz[:, :9] @ np.arange(10, 1, -1)) * 10 % 11 % 10
+        digito2 = (matriz[:, :10] @ np.arange(11, 1, -1)) * 10 % 11 % 10
+        repetidos = (matriz == matriz[:, :1]).all(axis=1)
+        validos[validos] = (matriz[:, 9] == digito1) & (matriz[:, 10] == digito2) & ~repetidos
+
+    return digitos, pd.Series(validos, index=serie.index)
+
+
+class ProgressoImportacao:
+    """Acumula contagens e erros por linha dos lotes de uma importação"""
+
+    def __init__(self, tipo: str, max_erros: int):
+        self.tipo = tipo
+        self.max_erros = max_erros
+        self.linhas = 0
+        self.criados = 0
+        self.atualizados = 0
+        self.total_erros = 0
+        self.erros: List[dict] = []
+
+    def erro(self, linha: int, mensagem: str):
+        self.total_erros += 1
+        linhas_importadas.inc(tipo=self.tipo, resultado="erro")
+        if len(self.erros) < self.max_erros:
+            self.erros.append({"linha": int(linha), "erro": mensagem})
+
+    def lote(self, linhas: int, criados: int, atualizados: int = 0):
+        self.linhas += linhas
+        self.criados += criados
+        self.atualizados += atualizados
+        linhas_importadas.inc(criados, tipo=self.tipo, resultado="criado")
+        linhas_importadas.inc(atualizados, tipo=self.tipo, resultado="atualizado")
+
+    def aplicar(self, importacao: Importacao):
+        importacao.linhas_processadas = self.linhas
+        importacao.criados = self.criados
+        importacao.atualizados = self.atualizados
+        importacao.total_erros = self.total_erros
+        importacao.erros = json.dumps(self.erros, ensure_ascii=False)
+
+
+def criar_importacao(db: Session, tipo: str, empresa_id: int, usuario_id: int, nome_arquivo: str,
+                     referencia_id: Optional[int] = None) -> Importacao:
+    importacao = Importacao(
+        id=str(uuid.uuid4()),
+        tipo=tipo,
+        empresa_id=empresa_id,
+        usuario_id=usuario_id,
+        referencia_id=referencia_id,
+        nome_arquivo=nome_arquivo,
+        status=StatusImportacao.PROCESSANDO
+    )
+    db.add(importacao)
+    db.commit()
+    return importacao
+
+
+def processar_arquivo(importacao_id: str, caminho: str,
+                      processar_lote: Callable[[Session, "pd.DataFrame", ProgressoImportacao], None]):
+    """Lê o arquivo em lotes e aplica `processar_lote` em cada um, gravando o progresso na
+    mesma transação do lote. Roda fora do event loop; remove o arquivo ao final."""
+    db = SessionLocal()
+    try:
+        importacao = db.get(Importacao, importacao_id)
+        progresso = ProgressoImportacao(importacao.tipo, settings.importacao_max_erros)
+        try:
+            for lote in ler_em_lotes(caminho, settings.importacao_tamanho_lote):
+                processar_lote(db, lote, progresso)
+                progresso.aplicar(importacao)
+                db.commit()
+            importacao.status = StatusImportacao.CONCLUIDA
+        except Exception as e:
+            db.rollback()
+            logger.exception("Falha na importação %s", importacao_id)
+            importacao.status = StatusImportacao.FALHOU
+            importacao.mensagem = str(e)
+        importacao.concluido_em = datetime.utcnow()
+        db.commit()
+    finally:
+        db.close()
+        os.remove(caminho)
+
+
+def executar_em_segundo_plano(funcao: Callable, *args):
+    """Roda a importação numa thread sem prender a requisição"""
+    tarefa = asyncio.get_running_loop().create_task(asyncio.to_thread(funcao, *args))
+    _tarefas.add(tarefa)
+    tarefa.add_done_callback(_tarefas.discard)
+
+
+async def iniciar_importacao(db: Session, arquivo: UploadFile, tipo: str, empresa_id: int, usuario_id: int,
+                             colunas_obrigatorias: Tuple[str, ...],
+                             processar_lote: Callable[[Session, "pd.DataFrame", ProgressoImportacao], None],
+                             referencia_id: Optional[int] = None) -> Importacao:
+    """Salva o upload, confere o cabeçalho e dispara o processamento em segundo plano"""
+    caminho = await salvar_upload(arquivo)
+    try:
+        try:
+            cabecalho = await asyncio.to_thread(ler_cabecalho, caminho)
+        except Exception:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Não foi possível ler o arquivo"
+            )
+        ausentes = [coluna for coluna in colunas_obrigatorias if coluna not in cabecalho]
+        if ausentes:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Colunas obrigatórias ausentes: {', '.join(ausentes)}"
+            )
+        importacao = criar_importacao(db, tipo, empresa_id, usuario_id, arquivo.filename, referencia_id)
+    except BaseException:
+        os.remove(caminho)
+        raise
+
+    executar_em_segundo_plano(processar_arquivo, importacao.id, caminho, processar_lote)
+    return importacao
+
+
+def obter_importacao(db: Session, importacao_id: str, tipo: str, empresa_id: int,
+                     referencia_id: Optional[int] = None) -> Importacao:
+    query = db.query(Importacao).filter(
+        Importacao.id == importacao_id,
+        Importacao.tipo == tipo,
+        Importacao.empresa_id == empresa_id
+    )
+    if referencia_id is not None:
+        query = query.filter(Importacao.referencia_id == referencia_id)
+    importacao = query.first()
+    if not importacao:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Importação não encontrada"
+        )
+    return importacao
+
+
+def importacao_para_dict(importacao: Importacao) -> dict:
+    return {
+        "id": importacao.id,
+        "tipo": importacao.tipo,
+        "status": importacao.status.value,
+        "nome_arquivo": importacao.nome_arquivo,
+        "linhas_processadas": importacao.linhas_processadas or 0,
+        "criados": importacao.criados or 0,
+        "atualizados": importacao.atualizados or 0,
+        "total_erros": importacao.total_erros or 0,
+        "erros": json.loads(importacao.erros) if importacao.erros else [],
+        "mensagem": importacao.mensagem,
+        "criado_em": importacao.criado_em,
+        "concluido_em": importacao.concluido_em
+    }
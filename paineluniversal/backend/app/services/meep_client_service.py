@@ -0,0 +1,300 @@
+import enum
+import re
+import threading
+import time
+import unicodedata
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import func, insert, literal_column, or_, update
+from sqlalchemy.orm import Session
+
+from ..database import settings
+from ..models import MeepClient, SexoMeepClient, StatusMeepClient
+from .importacao import ProgressoImportacao, normalizar_cpfs
+
+_NAO_DIGITOS = re.compile(r"\D")
+_ESPACOS = re.compile(r"\s+")
+
+
+def normalizar_cpf(cpf: Optional[str]) -> Optional[str]:
+    """CPF só com dígitos (None se não sobrar nenhum)"""
+    if not cpf:
+        return None
+    return _NAO_DIGITOS.sub("", cpf) or None
+
+
+def normalizar_nome(nome: Optional[str]) -> Optional[str]:
+    """Nome em minúsculas, sem acentos e com espaços simples, para busca"""
+    if not nome:
+        return None
+    decomposto = unicodedata.normalize("NFKD", nome)
+    sem_acentos = "".join(c for c in decomposto if not unicodedata.combining(c))
+    return _ESPACOS.sub(" ", sem_acentos).strip().lower() or None
+
+
+def aplicar_campos_busca(cliente: MeepClient):
+    """Recalcula as colunas normalizadas usadas pela busca a partir de nome e CPF"""
+    cliente.nome_busca = normalizar_nome(cliente.nome) or ""
+    cliente.cpf_normalizado = normalizar_cpf(cliente.cpf)
+
+
+HEADER_ALERTA_CLIENTE = "X-Cliente-Alerta"
+
+
+class SituacaoCliente(enum.Enum):
+    LIVRE = "livre"
+    ALERTA = "alerta"
+    BLOQUEADO = "bloqueado"
+
+
+def situacao_cliente(status_cliente: Optional[StatusMeepClient], has_alert: Optional[bool]) -> SituacaoCliente:
+    if status_cliente == StatusMeepClient.BLOQUEADO:
+        return SituacaoCliente.BLOQUEADO
+    if has_alert:
+        return SituacaoCliente.ALERTA
+    return SituacaoCliente.LIVRE
+
+
+@dataclass
+class _RestricoesEmpresa:
+    """Clientes bloqueados ou com alerta de uma empresa, indexados por CPF e identificador"""
+    expira_em: float
+    clientes: Dict[str, Tuple[Optional[str], Optional[str], SituacaoCliente]] = field(default_factory=dict)
+    cpfs: Dict[str, str] = field(default_factory=dict)
+    identificadores: Dict[str, str] = field(default_factory=dict)
+
+    def adicionar(self, cliente_id: str, cpf: Optional[str], identificador: Optional[str], situacao: SituacaoCliente):
+        self.clientes[cliente_id] = (cpf, identificador, situacao)
+        if cpf:
+            self.cpfs[cpf] = cliente_id
+        if identificador:
+            self.identificadores[identificador] = cliente_id
+
+    def remover(self, cliente_id: str):
+        cpf, identificador, _ = self.clientes.pop(cliente_id, (None, None, None))
+        if cpf and self.cpfs.get(cpf) == cliente_id:
+            del self.cpfs[cpf]
+        if identificador and self.identificadores.get(identificador) == cliente_id:
+            del self.identificadores[identificador]
+
+    def situacao(self, chaves: Dict[str, str], valor: Optional[str]) -> SituacaoCliente:
+        cliente_id = chaves.get(valor) if valor else None
+        return self.clientes[cliente_id][2] if cliente_id else SituacaoCliente.LIVRE
+
+
+class RestricoesClientes:
+    """Conjunto em memória, por empresa, dos clientes MEEP bloqueados ou com alerta.
+
+    A empresa é carregada com uma consulta na primeira checagem e recarregada após
+    `ttl_segundos` (mudanças feitas em outros workers); alterações feitas neste processo
+    entram na hora via `atualizar`/`remover`. A checagem em si é uma busca em dicionário."""
+
+    def __init__(self, ttl_segundos: int):
+        self.ttl_segundos = ttl_segundos
+        self._empresas: Dict[int, _RestricoesEmpresa] = {}
+        self._versoes: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def _carregar(self, db: Session, empresa_id: int) -> _RestricoesEmpresa:
+        with self._lock:
+            versao = self._versoes.get(empresa_id, 0)
+        linhas = db.query(
+            MeepClient.id, MeepClient.cpf_normalizado, MeepClient.identificador,
+            MeepClient.status, MeepClient.has_alert
+        ).filter(
+            MeepClient.empresa_id == empresa_id,
+            or_(MeepClient.status == StatusMeepClient.BLOQUEADO, MeepClient.has_alert.is_(True))
+        ).all()
+
+        restricoes = _RestricoesEmpresa(expira_em=time.monotonic() + self.ttl_segundos)
+        for cliente_id, cpf, identificador, status_cliente, has_alert in linhas:
+            restricoes.adicionar(cliente_id, cpf, identificador, situacao_cliente(status_cliente, has_alert))
+
+        with self._lock:
+            # Uma alteração durante a consulta pode não estar no resultado: usa sem guardar
+            if self._versoes.get(empresa_id, 0) == versao and self.ttl_segundos > 0:
+                self._empresas[empresa_id] = restricoes
+        return restricoes
+
+    def _empresa(self, db: Session, empresa_id: int) -> _RestricoesEmpresa:
+        with self._lock:
+            restricoes = self._empresas.get(empresa_id)
+        if restricoes is None or restricoes.expira_em <= time.monotonic():
+            restricoes = self._carregar(db, empresa_id)
+        return restricoes
+
+    def situacao(self, db: Session, empresa_id: int, cpf: Optional[str] = None,
+                 identificador: Optional[str] = None) -> SituacaoCliente:
+        """Pior situação entre o CPF (com ou sem pontuação) e o identificador informados"""
+        restricoes = self._empresa(db, empresa_id)
+        with self._lock:
+            situacoes = (
+                restricoes.situacao(restricoes.cpfs, normalizar_cpf(cpf)),
+                restricoes.situacao(restricoes.identificadores, identificador),
+            )
+        if SituacaoCliente.BLOQUEADO in situacoes:
+            return SituacaoCliente.BLOQUEADO
+        if SituacaoCliente.ALERTA in situacoes:
+            return SituacaoCliente.ALERTA
+        return SituacaoCliente.LIVRE
+
+    def pode_atender(self, db: Session, empresa_id: int, cpf: Optional[str] = None,
+                     identificador: Optional[str] = None) -> bool:
+        return self.situacao(db, empresa_id, cpf, identificador) != SituacaoCliente.BLOQUEADO
+
+    def atualizar(self, cliente: MeepClient):
+        """Reflete no conjunto o status, alerta, CPF e identificador atuais do cliente"""
+        with self._lock:
+            self._versoes[cliente.empresa_id] = self._versoes.get(cliente.empresa_id, 0) + 1
+            restricoes = self._empresas.get(cliente.empresa_id)
+            if restricoes is None:
+                return
+            restricoes.remover(cliente.id)
+            situacao = situacao_cliente(cliente.status, cliente.has_alert)
+            if situacao != SituacaoCliente.LIVRE:
+                restricoes.adicionar(cliente.id, cliente.cpf_normalizado, cliente.identificador, situacao)
+
+    def remover(self, empresa_id: int, cliente_id: str):
+        with self._lock:
+            self._versoes[empresa_id] = self._versoes.get(empresa_id, 0) + 1
+            restricoes = self._empresas.get(empresa_id)
+            if restricoes is not None:
+                restricoes.remover(cliente_id)
+
+    def invalidar(self, empresa_id: int):
+        """Descarta a empresa (alterações em lote); a próxima checagem recarrega"""
+        with self._lock:
+            self._versoes[empresa_id] = self._versoes.get(empresa_id, 0) + 1
+            self._empresas.pop(empresa_id, None)
+
+    def limpar(self):
+        with self._lock:
+            self._empresas.clear()
+
+
+restricoes_clientes = RestricoesClientes(settings.meep_restricoes_ttl_segundos)
+
+
+def exigir_atendimento(db: Session, empresa_id: int, cpf: Optional[str] = None,
+                       identificador: Optional[str] = None,
+                       response: Optional[Response] = None) -> SituacaoCliente:
+    """Recusa (403) clientes bloqueados; clientes com alerta seguem, marcados no header
+    `X-Cliente-Alerta` da resposta"""
+    situacao = restricoes_clientes.situacao(db, empresa_id, cpf, identificador)
+    if situacao == SituacaoCliente.BLOQUEADO:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Cliente bloqueado"
+        )
+    if situacao == SituacaoCliente.ALERTA and response is not None:
+        response.headers[HEADER_ALERTA_CLIENTE] = "true"
+    return situacao
+
+
+TIPO_IMPORTACAO = "meep_clients"
+COLUNAS_IMPORTACAO = ("nome", "cpf", "identificador", "telefone", "email", "data_nascimento", "sexo")
+CAMPOS_ATUALIZAVEIS = ("nome", "nome_busca", "identificador", "telefone", "email", "data_nascimento", "sexo")
+
+
+def upsert_clientes(db: Session, registros: List[dict]) -> Tuple[int, int]:
+    """Insere ou atualiza clientes pela chave (empresa_id, cpf_normalizado) e devolve
+    (criados, atualizados). No PostgreSQL é um único INSERT ... ON CONFLICT; nos demais
+    bancos, uma consulta IN pelos CPFs do lote seguida de INSERT e UPDATE em lote.
+    Campos vazios no arquivo não apagam o que já está cadastrado."""
+    if not registros:
+        return 0, 0
+    tabela = MeepClient.__table__
+
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+        stmt = pg_insert(tabela).values(registros)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[tabela.c.empresa_id, tabela.c.cpf_normalizado],
+            set_={
+                **{campo: func.coalesce(stmt.excluded[campo], tabela.c[campo]) for campo in CAMPOS_ATUALIZAVEIS},
+                "atualizado_em": func.now()
+            }
+        ).returning(literal_column("xmax = 0"))
+        criados = sum(1 for (inserido,) in db.execute(stmt) if inserido)
+        return criados, len(registros) - criados
+
+    empresa_id = registros[0]["empresa_id"]
+    existentes = dict(db.query(MeepClient.cpf_normalizado, MeepClient.id).filter(
+        MeepClient.empresa_id == empresa_id,
+        MeepClient.cpf_normalizado.in_([registro["cpf_normalizado"] for registro in registros])
+    ).all())
+    novos = [registro for registro in registros if registro["cpf_normalizado"] not in existentes]
+    agora = datetime.utcnow()
+    atualizacoes = [
+        {
+            "id": existentes[registro["cpf_normalizado"]],
+            "atualizado_em": agora,
+            **{campo: registro[campo] for campo in CAMPOS_ATUALIZAVEIS if registro[campo] is not None}
+        }
+        for registro in registros if registro["cpf_normalizado"] in existentes
+    ]
+    if novos:
+        db.execute(insert(tabela), novos)
+    if atualizacoes:
+        db.execute(update(MeepClient), atualizacoes)
+    return len(novos), len(atualizacoes)
+
+
+def processar_lote_clientes(empresa_id: int, cpfs_vistos: Set[str], db: Session,
+                            lote: "pd.DataFrame", progresso: ProgressoImportacao):
+    """Valida e normaliza um lote do arquivo de clientes com operações de coluna e faz o
+    upsert das linhas válidas; as demais viram erros por linha"""
+    import numpy as np
+    import pandas as pd
+
+    lote = lote.reindex(columns=COLUNAS_IMPORTACAO, fill_value="").apply(lambda coluna: coluna.str.strip())
+    cpfs, cpf_valido = normalizar_cpfs(lote["cpf"])
+    # ISO (datas de células XLSX e AAAA-MM-DD no CSV) antes; dayfirst trocaria dia e mês
+    datas = pd.to_datetime(lote["data_nascimento"], errors="coerce", format="%Y-%m-%d")
+    sem_iso = datas.isna() & (lote["data_nascimento"] != "")
+    if sem_iso.any():
+        datas[sem_iso] = pd.to_datetime(lote["data_nascimento"][sem_iso], errors="coerce",
+                                        dayfirst=True, format="mixed")
+    sem_nome = lote["nome"] == ""
+    data_invalida = (lote["data_nascimento"] != "") & datas.isna()
+    candidatas = ~sem_nome & cpf_valido & ~data_invalida
+    repetido = candidatas & (cpfs.where(candidatas).duplicated() | cpfs.isin(cpfs_vistos))
+
+    condicoes = [sem_nome, ~cpf_valido, data_invalida, repetido]
+    mensagens = ["Nome obrigatório", "CPF inválido", "Data de nascimento inválida", "CPF repetido no arquivo"]
+    erros = pd.Series(np.select(condicoes, mensagens, default=""), index=lote.index)
+    for linha, mensagem in erros[erros != ""].items():
+        progresso.erro(linha, mensagem)
+
+    validas = erros == ""
+    lote, cpfs, datas = lote[validas], cpfs[validas], datas[validas]
+    cpfs_vistos.update(cpfs)
+
+    sexos = {sexo.value: sexo for sexo in SexoMeepClient}
+
+    def opcional(coluna: str) -> "pd.Series":
+        return lote[coluna].astype(object).where(lote[coluna] != "", None)
+
+    registros = pd.DataFrame({
+        "empresa_id": empresa_id,
+        "nome": lote["nome"].astype(object),
+        "nome_busca": lote["nome"].map(normalizar_nome).fillna(""),
+        "cpf": cpfs.str.replace(r"(\d{3})(\d{3})(\d{3})(\d{2})", r"\1.\2.\3-\4", regex=True).astype(object),
+        "cpf_normalizado": cpfs.astype(object),
+        "identificador": opcional("identificador"),
+        "telefone": opcional("telefone"),
+        "email": opcional("email"),
+        "data_nascimento": datas.dt.date.astype(object).where(datas.notna(), None),
+        "sexo": lote["sexo"].str[:1].str.upper().map(sexos).astype(object).where(lambda s: s.notna(), None),
+    }).to_dict("records")
+    for registro in registros:
+        registro["id"] = str(uuid.uuid4())
+
+    criados, atualizados = upsert_clientes(db, registros)
+    if atualizados:
+        restricoes_clientes.invalidar(empresa_id)
+    progresso.lote(len(erros), criados, atualizados)
@@ -0,0 +1,223 @@
+import asyncio
+import hashlib
+import json
+import logging
+import uuid
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Iterable, List, Optional
+
+import aiohttp
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..database import settings
+from ..models import VersaoConfiguracaoMeep
+from ..http_client import cliente_http
+from ..metrics import registro, Contador
+from .tablet_monitor import AlvoTablet
+
+logger = logging.getLogger(__name__)
+
+CABECALHO_HASH = "X-Config-Hash"
+CABECALHO_BASE = "X-Config-Base"
+
+sincronizacoes_config = registro.registrar(Contador(
+    "tablet_config_sync_total",
+    "Sincronizações de configuração MEEP por resultado (inalterado, diff, completo, erro)",
+    labels=("resultado",)
+))
+
+bytes_config = registro.registrar(Contador(
+    "tablet_config_sync_bytes_total",
+    "Bytes de configuração MEEP enviados aos tablets",
+    labels=("modo",)
+))
+
+
+def serializar(configuracao: Any) -> str:
+    """Forma canônica da configuração (chaves ordenadas, sem espaços), base do hash"""
+    return json.dumps(configuracao, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def hash_configuracao(configuracao: Any) -> str:
+    return hashlib.sha256(serializar(configuracao).encode()).hexdigest()
+
+
+def gerar_patch(antigo: Any, novo: Any) -> Any:
+    """JSON Merge Patch (RFC 7386) que leva `antigo` a `novo`. Listas são substituídas
+    inteiras; valores `null` em `novo` não são representáveis (confira com `aplicar_patch`)."""
+    if not isinstance(antigo, dict) or not isinstance(novo, dict):
+        return novo
+    patch = {chave: None for chave in antigo.keys() - novo.keys()}
+    for chave, valor in novo.items():
+        if chave not in antigo:
+            patch[chave] = valor
+        elif antigo[chave] != valor:
+            patch[chave] = gerar_patch(antigo[chave], valor)
+    return patch
+
+
+def aplicar_patch(documento: Any, patch: Any) -> Any:
+    """Aplica um JSON Merge Patch, como o tablet faz ao receber um diff"""
+    if not isinstance(patch, dict):
+        return patch
+    resultado = dict(documento) if isinstance(documento, dict) else {}
+    for chave, valor in patch.items():
+        if valor is None:
+            resultado.pop(chave, None)
+        else:
+            resultado[chave] = aplicar_patch(resultado.get(chave), valor)
+    return resultado
+
+
+def _buscar_versao(db: Session, empresa_id: int, hash_: str) -> Optional[VersaoConfiguracaoMeep]:
+    return db.query(VersaoConfiguracaoMeep).filter(
+        VersaoConfiguracaoMeep.empresa_id == empresa_id,
+        VersaoConfiguracaoMeep.hash == hash_
+    ).first()
+
+
+def registrar_versao(db: Session, empresa_id: int, configuracao: Any) -> VersaoConfiguracaoMeep:
+    """Grava a versão da configuração se o hash ainda não existir na empresa, em uma
+    transação própria que termina aqui (commit). A versão volta desanexada da sessão:
+    o envio aos tablets pode levar segundos e não deve segurar transação nem trava."""
+    conteudo = serializar(configuracao)
+    hash_ = hashlib.sha256(conteudo.encode()).hexdigest()
+    versao = _buscar_versao(db, empresa_id, hash_)
+    if versao is None:
+        versao = VersaoConfiguracaoMeep(
+            id=str(uuid.uuid4()),
+            empresa_id=empresa_id,
+            hash=hash_,
+            conteudo=conteudo,
+            tamanho=len(conteudo.encode())
+        )
+        db.add(versao)
+        try:
+            db.flush()
+        except IntegrityError:
+            # outra requisição gravou o mesmo hash entre a consulta e o INSERT
+            db.rollback()
+            versao = _buscar_versao(db, empresa_id, hash_)
+    db.expunge(versao)
+    db.commit()
+    return versao
+
+
+def carregar_versoes(db: Session, empresa_id: int, hashes: Iterable[Optional[str]]) -> Dict[str, Any]:
+    """Conteúdo das versões informadas, em uma consulta, para servir de base dos diffs"""
+    hashes = {hash_ for hash_ in hashes if hash_}
+    if not hashes:
+        return {}
+    versoes = db.query(VersaoConfiguracaoMeep.hash, VersaoConfiguracaoMeep.conteudo).filter(
+        VersaoConfiguracaoMeep.empresa_id == empresa_id,
+        VersaoConfiguracaoMeep.hash.in_(hashes)
+    ).all()
+    return {hash_: json.loads(conteudo) for hash_, conteudo in versoes}
+
+
+@dataclass
+class ResultadoSincronizacao:
+    tablet_id: str
+    resultado: str
+    bytes: int = 0
+    erro: Optional[str] = None
+
+    @property
+    def sucesso(self) -> bool:
+        return self.resultado != "erro"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class SincronizadorConfiguracao:
+    """Envia uma versão de configuração aos tablets em paralelo (até `max_concorrentes`).
+
+    Cada tablet informa a versão que tem em `GET /api/config-version`: se for a mesma,
+    nada é enviado; se for uma versão conhecida (`versoes_base`), vai só o merge patch
+    em `POST /api/sync-config/patch`; senão, ou se o tablet recusar o patch (404, 409,
+    412), a configuração completa em `POST /api/sync-config`, como antes.
+    """
+
+    def __init__(self, timeout_segundos: float, max_concorrentes: int):
+        self.timeout_segundos = timeout_segundos
+        self.max_concorrentes = max_concorrentes
+
+    async def _versao_do_tablet(self, url: str) -> Optional[str]:
+        resposta = await cliente_http.get(f"{url}/api/config-version", integracao="tablet_config",
+                                          timeout=self.timeout_segundos)
+        if resposta.status != 200:
+            return None
+        try:
+            return (resposta.json() or {}).get("hash")
+        except (ValueError, AttributeError):
+            return None
+
+    async def _enviar(self, url: str, corpo: bytes, headers: Dict[str, str]) -> int:
+        resposta = await cliente_http.post(url, integracao="tablet_config", data=corpo,
+                                           headers=headers, timeout=self.timeout_segundos)
+        return resposta.status
+
+    async def sincronizar(self, alvo: AlvoTablet, hash_: str, configuracao: Any,
+                          versoes_base: Dict[str, Any]) -> ResultadoSincronizacao:
+        url = f"http://{alvo.ip}:{alvo.porta}"
+        enviados = 0
+        try:
+            reportada = await self._versao_do_tablet(url)
+            if reportada == hash_:
+                return self._resultado(alvo, "inalterado")
+
+            completo = serializar(configuracao).encode()
+            if reportada in versoes_base:
+                base = versoes_base[reportada]
+                patch = gerar_patch(base, configuracao)
+                corpo = serializar(patch).encode()
+                if aplicar_patch(base, patch) == configuracao and len(corpo) < len(completo):
+                    enviados += len(corpo)
+                    status = await self._enviar(f"{url}/api/sync-config/patch", corpo, {
+                        "Content-Type": "application/merge-patch+json",
+                        CABECALHO_BASE: reportada,
+                        CABECALHO_HASH: hash_
+                    })
+                    if status == 200:
+                        return self._resultado(alvo, "diff", enviados)
+                    if status not in (404, 409, 412):
+                        return self._resultado(alvo, "erro", enviados, f"HTTP {status}")
+
+            enviados += len(completo)
+            status = await self._enviar(f"{url}/api/sync-config", completo, {
+                "Content-Type": "application/json",
+                CABECALHO_HASH: hash_
+            })
+            if status == 200:
+                return self._resultado(alvo, "completo", enviados)
+            return self._resultado(alvo, "erro", enviados, f"HTTP {status}")
+        except aiohttp.ClientError as e:
+            return self._resultado(alvo, "erro", enviados, str(e) or e.__class__.__name__)
+
+    @staticmethod
+    def _resultado(alvo: AlvoTablet, resultado: str, enviados: int = 0,
+                   erro: Optional[str] = None) -> ResultadoSincronizacao:
+        sincronizacoes_config.inc(resultado=resultado)
+        if enviados:
+            bytes_config.inc(enviados, modo=resultado)
+        if erro:
+            logger.warning("Falha ao sincronizar configuração com tablet %s: %s", alvo.id, erro)
+        return ResultadoSincronizacao(alvo.id, resultado, enviados, erro)
+
+    async def sincronizar_frota(self, alvos: List[AlvoTablet], hash_: str, configuracao: Any,
+                                versoes_base: Dict[str, Any]) -> List[ResultadoSincronizacao]:
+        semaforo = asyncio.Semaphore(self.max_concorrentes)
+
+        async def sincronizar_limitado(alvo: AlvoTablet) -> ResultadoSincronizacao:
+            async with semaforo:
+                return await self.sincronizar(alvo, hash_, configuracao, versoes_base)
+
+        return list(await asyncio.gather(*(sincronizar_limitado(alvo) for alvo in alvos)))
+
+
+sincronizador_configuracao = SincronizadorConfiguracao(
+    timeout_segundos=settings.tablets_sync_timeout_segundos,
+    max_concorrentes=settings.tablets_sync_concorrentes
+)
@@ -0,0 +1,142 @@
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal, settings
+from ..models import EventoOutbox, StatusOutbox
+from ..metrics import registro, registrar_fila, Contador
+
+logger = logging.getLogger(__name__)
+
+TIPO_WHATSAPP = "whatsapp"
+TIPO_N8N = "n8n"
+
+entregas_outbox = registro.registrar(Contador(
+    "outbox_deliveries_total",
+    "Tentativas de entrega de eventos do outbox por tipo e resultado",
+    labels=("tipo", "resultado")
+))
+
+
+def adicionar_outbox(db: Session, tipo: str, payload: Dict[str, Any]) -> EventoOutbox:
+    """Registra um evento de saída na sessão atual; ele só é entregue depois do commit
+    da mesma transação que gravou a mudança de negócio"""
+    evento = EventoOutbox(tipo=tipo, payload=json.dumps(payload, default=str))
+    db.add(evento)
+    return evento
+
+
+class RelayOutbox:
+    """Drena o outbox em lotes, entregando cada evento pelo handler do seu tipo.
+
+    Falhas são reagendadas com backoff exponencial; após `max_tentativas` o evento vai
+    para `morto` (dead letter) e fica na tabela para inspeção. Roda como job do
+    scheduler, portanto só no processo líder.
+    """
+
+    def __init__(self, tamanho_lote: int, max_tentativas: int, backoff_segundos: float,
+                 timeout_entrega_segundos: float, retencao_dias: int):
+        self.tamanho_lote = tamanho_lote
+        self.max_tentativas = max_tentativas
+        self.backoff_segundos = backoff_segundos
+        self.timeout_entrega_segundos = timeout_entrega_segundos
+        self.retencao_dias = retencao_dias
+        self.handlers: Dict[str, Callable[[Dict[str, Any]], Awaitable]] = {}
+        self.pendentes = 0
+
+    def registrar(self, tipo: str, handler: Callable[[Dict[str, Any]], Awaitable]):
+        self.handlers[tipo] = handler
+
+    async def processar(self):
+        """Entrega lotes até não sobrar evento vencido e remove os entregues antigos"""
+        while True:
+            lote = await asyncio.to_thread(self._reservar_lote)
+            if lote:
+                resultados = await asyncio.gather(*(self._entregar(*item) for item in lote))
+                await asyncio.to_thread(self._concluir_lote, resultados)
+            if len(lote) < self.tamanho_lote:
+                break
+        await asyncio.to_thread(self._limpar_entregues)
+
+    def _reservar_lote(self) -> List[Tuple[int, str, Dict[str, Any]]]:
+        db = SessionLocal()
+        try:
+            eventos = db.query(EventoOutbox.id, EventoOutbox.tipo, EventoOutbox.payload).filter(
+                EventoOutbox.status == StatusOutbox.PENDENTE,
+                EventoOutbox.proxima_tentativa <= datetime.utcnow()
+            ).order_by(EventoOutbox.id).limit(self.tamanho_lote).all()
+            return [(id, tipo, json.loads(payload)) for id, tipo, payload in eventos]
+        finally:
+            db.close()
+
+    async def _entregar(self, id: int, tipo: str, payload: Dict[str, Any]) -> Tuple[int, Optional[str]]:
+        handler = self.handlers.get(tipo)
+        if handler is None:
+            return id, f"Sem handler para o tipo {tipo}"
+        try:
+            await asyncio.wait_for(handler(payload), timeout=self.timeout_entrega_segundos)
+        except asyncio.TimeoutError:
+            entregas_outbox.inc(tipo=tipo, resultado="timeout")
+            return id, "Timeout na entrega"
+        except Exception as e:
+            entregas_outbox.inc(tipo=tipo, resultado="erro")
+            return id, str(e) or e.__class__.__name__
+        entregas_outbox.inc(tipo=tipo, resultado="entregue")
+        return id, None
+
+    def _concluir_lote(self, resultados: List[Tuple[int, Optional[str]]]):
+        agora = datetime.utcnow()
+        erros = dict(resultados)
+        db = SessionLocal()
+        try:
+            for evento in db.query(EventoOutbox).filter(EventoOutbox.id.in_(list(erros))).all():
+                erro = erros[evento.id]
+                evento.tentativas += 1
+                if erro is None:
+                    evento.status = StatusOutbox.ENTREGUE
+                    evento.processado_em = agora
+                    evento.ultimo_erro = None
+                    continue
+                evento.ultimo_erro = erro
+                if evento.tentativas >= self.max_tentativas:
+                    evento.status = StatusOutbox.MORTO
+                    evento.processado_em = agora
+                    entregas_outbox.inc(tipo=evento.tipo, resultado="morto")
+                    logger.error(f"Evento {evento.id} do outbox ({evento.tipo}) descartado após "
+                                 f"{evento.tentativas} tentativas: {erro}")
+                else:
+                    evento.proxima_tentativa = agora + timedelta(
+                        seconds=self.backoff_segundos * 2 ** (evento.tentativas - 1)
+                    )
+            db.commit()
+        finally:
+            db.close()
+
+    def _limpar_entregues(self):
+        db = SessionLocal()
+        try:
+            db.query(EventoOutbox).filter(
+                EventoOutbox.status == StatusOutbox.ENTREGUE,
+                EventoOutbox.processado_em < datetime.utcnow() - timedelta(days=self.retencao_dias)
+            ).delete(synchronize_session=False)
+            db.commit()
+            self.pendentes = db.query(func.count(EventoOutbox.id)).filter(
+                EventoOutbox.status == StatusOutbox.PENDENTE
+            ).scalar()
+        finally:
+            db.close()
+
+
+outbox_relay = RelayOutbox(
+    tamanho_lote=settings.outbox_tamanho_lote,
+    max_tentativas=settings.outbox_max_tentativas,
+    backoff_segundos=settings.outbox_backoff_segundos,
+    timeout_entrega_segundos=settings.outbox_timeout_entrega_segundos,
+    retencao_dias=settings.outbox_retencao_dias
+)
+registrar_fila("outbox", lambda: outbox_relay.pendentes)
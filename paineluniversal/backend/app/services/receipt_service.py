@@ -1,6 +1,3 @@
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import mm
 import io
 from datetime import datetime
 from decimal import Decimal
@@ -13,33 +10,36 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 class ReceiptService:
     def __init__(self):
-        self.width = 80 * mm  # Largura papel térmico
-        self.height = 200 * mm  # Altura variável
+        self.largura_mm = 80  # Largura papel térmico
+        self.altura_mm = 200  # Altura variável
     
     def gerar_comprovante_pdf(self, venda: VendaPDV) -> bytes:
         """Gerar comprovante em PDF para impressão térmica"""
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.units import mm
         
+        width, height = self.largura_mm * mm, self.altura_mm * mm
         buffer = io.BytesIO()
-        p = canvas.Canvas(buffer, pagesize=(self.width, self.height))
+        p = canvas.Canvas(buffer, pagesize=(width, height))
         
-        y = self.height - 20 * mm
+        y = height - 20 * mm
         p.setFont("Helvetica-Bold", 12)
-        p.drawCentredText(self.width/2, y, "COMPROVANTE DE VENDA")
+        p.drawCentredText(width/2, y, "COMPROVANTE DE VENDA")
         
         y -= 10 * mm
         p.setFont("Helvetica", 8)
-        p.drawCentredText(self.width/2, y, f"Venda: {venda.numero_venda}")
+        p.drawCentredText(width/2, y, f"Venda: {venda.numero_venda}")
         
         y -= 5 * mm
-        p.drawCentredText(self.width/2, y, f"Data: {venda.criado_em.strftime('%d/%m/%Y %H:%M')}")
+        p.drawCentredText(width/2, y, f"Data: {venda.criado_em.strftime('%d/%m/%Y %H:%M')}")
         
         y -= 8 * mm
-        p.line(5 * mm, y, self.width - 5 * mm, y)
+        p.line(5 * mm, y, width - 5 * mm, y)
         
         y -= 8 * mm
         p.setFont("Helvetica-Bold", 8)
         p.drawString(5 * mm, y, "ITEM")
-        p.drawRightString(self.width - 5 * mm, y, "TOTAL")
+        p.drawRightString(width - 5 * mm, y, "TOTAL")
         
         y -= 5 * mm
         p.setFont("Helvetica", 7)
@@ -51,16 +51,16 @@ class ReceiptService:
             
             linha_item = f"{item.quantidade} x R$ {item.preco_unitario:.2f}"
             p.drawString(8 * mm, y, linha_item)
-            p.drawRightString(self.width - 5 * mm, y, f"R$ {item.preco_total:.2f}")
+            p.drawRightString(width - 5 * mm, y, f"R$ {item.preco_total:.2f}")
             y -= 5 * mm
         
         y -= 3 * mm
-        p.line(5 * mm, y, self.width - 5 * mm, y)
+        p.line(5 * mm, y, width - 5 * mm, y)
         
         y -= 8 * mm
         p.setFont("Helvetica-Bold", 10)
         p.drawString(5 * mm, y, "TOTAL:")
-        p.drawRightString(self.width - 5 * mm, y, f"R$ {venda.valor_final:.2f}")
+        p.drawRightString(width - 5 * mm, y, f"R$ {venda.valor_final:.2f}")
         
         y -= 8 * mm
         p.setFont("Helvetica", 8)
@@ -70,7 +70,7 @@ class ReceiptService:
         
         y -= 15 * mm
         p.setFont("Helvetica", 6)
-        p.drawCentredText(self.width/2, y, "Obrigado pela preferência!")
+        p.drawCentredText(width/2, y, "Obrigado pela preferência!")
         
         p.save()
         buffer.seek(0)
@@ -105,7 +105,7 @@ Obrigado pela preferência! 🎉
         """.strip()
         
         try:
-            await whatsapp_service._send_whatsapp_message(telefone, mensagem)
+            whatsapp_service.enviar_mensagem(telefone, mensagem)
         except Exception as e:
             print(f"Erro ao enviar comprovante WhatsApp: {e}")
 
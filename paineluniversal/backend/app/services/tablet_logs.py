@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal, settings
+from ..models import TabletLog
+from ..metrics import registro, Contador
+
+logger = logging.getLogger(__name__)
+
+logs_tablets = registro.registrar(Contador(
+    "tablet_logs_total",
+    "Linhas de log de tablets gravadas e removidas pela retenção",
+    labels=("operacao",)
+))
+
+
+def _utc(momento: Optional[datetime]) -> datetime:
+    if momento is None:
+        return datetime.utcnow()
+    if momento.tzinfo is not None:
+        return momento.astimezone(timezone.utc).replace(tzinfo=None)
+    return momento
+
+
+def adicionar_log(db: Session, tablet_id: str, evento: str, detalhes: Optional[str] = None):
+    """Adiciona uma linha de log à transação corrente (sem commit)"""
+    db.add(TabletLog(id=str(uuid.uuid4()), tablet_id=tablet_id, evento=evento,
+                     detalhes=detalhes, timestamp=datetime.utcnow()))
+    logs_tablets.inc(operacao="gravado")
+
+
+def inserir_logs(db: Session, tablet_id: str, linhas: List[Dict[str, Any]]) -> int:
+    """Grava várias linhas de log num único INSERT em lote (sem commit)"""
+    if not linhas:
+        return 0
+    db.execute(insert(TabletLog), [
+        {
+            "id": str(uuid.uuid4()),
+            "tablet_id": tablet_id,
+            "evento": linha["evento"],
+            "detalhes": linha.get("detalhes"),
+            "timestamp": _utc(linha.get("timestamp"))
+        }
+        for linha in linhas
+    ])
+    logs_tablets.inc(len(linhas), operacao="gravado")
+    return len(linhas)
+
+
+class RetencaoLogs:
+    """Remove logs de tablets mais antigos que `retencao_dias`, em lotes de
+    `tamanho_lote` linhas por transação para não segurar travas longas na tabela."""
+
+    def __init__(self, retencao_dias: int, tamanho_lote: int):
+        self.retencao_dias = retencao_dias
+        self.tamanho_lote = tamanho_lote
+
+    async def limpar(self) -> int:
+        return await asyncio.to_thread(self._limpar)
+
+    def _limpar(self) -> int:
+        corte = datetime.utcnow() - timedelta(days=self.retencao_dias)
+        removidos = 0
+        db = SessionLocal()
+        try:
+            while True:
+                ids = [id for id, in db.query(TabletLog.id).filter(
+                    TabletLog.timestamp < corte
+                ).limit(self.tamanho_lote).all()]
+                if not ids:
+                    break
+                db.query(TabletLog).filter(TabletLog.id.in_(ids)).delete(synchronize_session=False)
+                db.commit()
+                removidos += len(ids)
+                if len(ids) < self.tamanho_lote:
+                    break
+        finally:
+            db.close()
+        if removidos:
+            logs_tablets.inc(removidos, operacao="removido")
+            logger.info("Retenção de logs de tablets: %s linhas removidas", removidos)
+        return removidos
+
+
+retencao_logs_tablets = RetencaoLogs(
+    retencao_dias=settings.tablet_logs_retencao_dias,
+    tamanho_lote=settings.tablet_logs_lote_limpeza
+)
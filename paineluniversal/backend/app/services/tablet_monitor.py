@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from ..database import SessionLocal, settings
+from ..models import Tablet, StatusTablet
+from ..http_client import cliente_http
+from ..metrics import registro, Histograma, Medidor
+
+logger = logging.getLogger(__name__)
+
+latencia_tablets = registro.registrar(Histograma(
+    "tablet_health_latency_seconds",
+    "Latência do /health dos tablets nas verificações bem-sucedidas"
+))
+
+
+@dataclass
+class EstadoTablet:
+    tablet_id: str
+    online: bool
+    status: StatusTablet
+    latencia_ms: Optional[float]
+    verificado_em: datetime
+    falhas_consecutivas: int = 0
+    proxima_verificacao: float = 0.0
+    erro: Optional[str] = None
+
+
+@dataclass
+class AlvoTablet:
+    id: str
+    ip: str
+    porta: int
+
+
+class MonitorTablets:
+    """Verifica a saúde da frota de tablets em segundo plano, em paralelo e com limite de
+    concorrência. Tablets saudáveis são verificados a cada `intervalo_segundos`; após
+    falhas o intervalo cresce exponencialmente até `intervalo_max_segundos`, começando em
+    `intervalo_falha_segundos` para que uma queda pontual seja confirmada logo.
+
+    O estado fica em memória (processo líder) e é persistido em `tablets`, de onde os
+    demais workers o leem.
+    """
+
+    def __init__(self, intervalo_segundos: float, intervalo_falha_segundos: float,
+                 intervalo_max_segundos: float, timeout_segundos: float, max_concorrentes: int):
+        self.intervalo_segundos = intervalo_segundos
+        self.intervalo_falha_segundos = intervalo_falha_segundos
+        self.intervalo_max_segundos = intervalo_max_segundos
+        self.timeout_segundos = timeout_segundos
+        self.max_concorrentes = max_concorrentes
+        self.estados: Dict[str, EstadoTablet] = {}
+
+    def obter(self, tablet_id: str) -> Optional[EstadoTablet]:
+        return self.estados.get(tablet_id)
+
+    def _proximo_intervalo(self, falhas_consecutivas: int) -> float:
+        if not falhas_consecutivas:
+            return self.intervalo_segundos
+        return min(self.intervalo_falha_segundos * 2 ** (falhas_consecutivas - 1), self.intervalo_max_segundos)
+
+    async def verificar(self, alvo: AlvoTablet) -> EstadoTablet:
+        """Uma verificação do /health; atualiza o estado em memória e o devolve"""
+        inicio = time.perf_counter()
+        erro = None
+        try:
+            resposta = await cliente_http.get(
+                f"http://{alvo.ip}:{alvo.porta}/health", integracao="tablet_health",
+                timeout=self.timeout_segundos, tentativas=1
+            )
+            online = resposta.status == 200
+            if not online:
+                erro = f"HTTP {resposta.status}"
+        except aiohttp.ClientError as e:
+            online = False
+            erro = str(e) or e.__class__.__name__
+        latencia = time.perf_counter() - inicio
+
+        anterior = self.estados.get(alvo.id)
+        falhas = 0 if online else (anterior.falhas_consecutivas + 1 if anterior else 1)
+        if online:
+            latencia_tablets.observe(latencia)
+        estado = EstadoTablet(
+            tablet_id=alvo.id,
+            online=online,
+            status=StatusTablet.CONECTADO if online else StatusTablet.DESCONECTADO,
+            latencia_ms=round(latencia * 1000, 1) if online else None,
+            verificado_em=datetime.utcnow(),
+            falhas_consecutivas=falhas,
+            proxima_verificacao=time.monotonic() + self._proximo_intervalo(falhas),
+            erro=erro
+        )
+        self.estados[alvo.id] = estado
+        return estado
+
+    async def ciclo(self):
+        """Verifica os tablets vencidos e persiste os resultados"""
+        alvos = await asyncio.to_thread(self._carregar_alvos)
+        ids = {alvo.id for alvo in alvos}
+        for tablet_id in list(self.estados):
+            if tablet_id not in ids:
+                del self.estados[tablet_id]
+
+        agora = time.monotonic()
+        vencidos = [
+            alvo for alvo in alvos
+            if alvo.id not in self.estados or self.estados[alvo.id].proxima_verificacao <= agora
+        ]
+        if not vencidos:
+            return
+
+        semaforo = asyncio.Semaphore(self.max_concorrentes)
+
+        async def verificar_limitado(alvo: AlvoTablet) -> EstadoTablet:
+            async with semaforo:
+                return await self.verificar(alvo)
+
+        estados = await asyncio.gather(*(verificar_limitado(alvo) for alvo in vencidos))
+        await asyncio.to_thread(self.persistir, estados)
+
+    def _carregar_alvos(self) -> List[AlvoTablet]:
+        db = SessionLocal()
+        try:
+            return [
+                AlvoTablet(id, ip, porta)
+                for id, ip, porta in db.query(Tablet.id, Tablet.ip, Tablet.porta).all()
+            ]
+        finally:
+            db.close()
+
+    @staticmethod
+    def aplicar(tablet: Tablet, estado: EstadoTablet):
+        """Copia o resultado da verificação para a linha do tablet (sem commit)"""
+        tablet.status = estado.status
+        tablet.latencia_ms = estado.latencia_ms
+        tablet.verificado_em = estado.verificado_em
+        if estado.online:
+            tablet.ultima_conexao = estado.verificado_em
+
+    def persistir(self, estados: List[EstadoTablet]):
+        por_id = {estado.tablet_id: estado for estado in estados}
+        db = SessionLocal()
+        try:
+            for tablet in db.query(Tablet).filter(Tablet.id.in_(list(por_id))).all():
+                self.aplicar(tablet, por_id[tablet.id])
+            db.commit()
+        finally:
+            db.close()
+
+
+monitor_tablets = MonitorTablets(
+    intervalo_segundos=settings.tablets_intervalo_segundos,
+    intervalo_falha_segundos=settings.tablets_intervalo_falha_segundos,
+    intervalo_max_segundos=settings.tablets_intervalo_max_segundos,
+    timeout_segundos=settings.tablets_timeout_segundos,
+    max_concorrentes=settings.tablets_verificacoes_concorrentes
+)
+
+registro.registrar(Medidor(
+    "tablets_online",
+    "Tablets que responderam à última verificação de saúde",
+    coletar=lambda: [({}, sum(1 for estado in list(monitor_tablets.estados.values()) if estado.online))]
+))
@@ -0,0 +1,268 @@
+import asyncio
+import enum
+import logging
+import random
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+from fastapi import HTTPException, status
+
+from ..metrics import registro, Contador, Histograma
+
+logger = logging.getLogger(__name__)
+
+mensagens_whatsapp = registro.registrar(Contador(
+    "whatsapp_messages_total",
+    "Mensagens de WhatsApp processadas pelo despachante",
+    labels=("resultado",)
+))
+
+duracao_envio_whatsapp = registro.registrar(Histograma(
+    "whatsapp_send_duration_seconds",
+    "Duração de cada chamada de envio ao provedor de WhatsApp"
+))
+
+
+class StatusMensagem(enum.Enum):
+    PENDENTE = "pendente"
+    ENVIANDO = "enviando"
+    ENVIADA = "enviada"
+    FALHOU = "falhou"
+
+
+@dataclass
+class MensagemSaida:
+    telefone: str
+    texto: str
+    remetente: str
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: StatusMensagem = StatusMensagem.PENDENTE
+    tentativas: int = 0
+    erro: Optional[str] = None
+    criado_em: datetime = field(default_factory=datetime.now)
+    enviado_em: Optional[datetime] = None
+    concluida: asyncio.Event = field(default_factory=asyncio.Event, repr=False, compare=False)
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "telefone": self.telefone,
+            "remetente": self.remetente,
+            "status": self.status.value,
+            "tentativas": self.tentativas,
+            "erro": self.erro,
+            "criado_em": self.criado_em.isoformat(),
+            "enviado_em": self.enviado_em.isoformat() if self.enviado_em else None
+        }
+
+
+class BaldeTokens:
+    """Token bucket: permite rajadas de até `capacidade` envios e repõe `taxa` tokens por segundo"""
+
+    def __init__(self, taxa: float, capacidade: int):
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self.tokens = float(capacidade)
+        self._atualizado = time.monotonic()
+
+    def consumir(self) -> float:
+        """Consome um token se houver; senão retorna quantos segundos faltam para o próximo"""
+        agora = time.monotonic()
+        self.tokens = min(self.capacidade, self.tokens + (agora - self._atualizado) * self.taxa)
+        self._atualizado = agora
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.taxa
+
+    async def aguardar(self):
+        while True:
+            espera = self.consumir()
+            if not espera:
+                return
+            await asyncio.sleep(espera)
+
+
+class DespachanteWhatsApp:
+    """Fila de saída do WhatsApp: quem envia só enfileira e retorna; os workers respeitam o
+    limite de taxa de cada número remetente, com retentativas e backoff exponencial."""
+
+    def __init__(self, enviar: Callable[[str, str], Awaitable], remetente_padrao: str,
+                 taxa_por_segundo: float, rajada: int, max_concorrentes: int,
+                 max_tentativas: int, backoff_segundos: float, max_fila: int,
+                 max_status: int = 10000):
+        self.enviar = enviar
+        self.remetente_padrao = remetente_padrao
+        self.taxa_por_segundo = taxa_por_segundo
+        self.rajada = rajada
+        self.max_concorrentes = max_concorrentes
+        self.max_tentativas = max_tentativas
+        self.backoff_segundos = backoff_segundos
+        self.max_fila = max_fila
+        self.max_status = max_status
+        self._fila: Deque[MensagemSaida] = deque()
+        self._mensagens: "OrderedDict[str, MensagemSaida]" = OrderedDict()
+        self._baldes: Dict[str, BaldeTokens] = {}
+        self._em_envio = 0
+        self._retentativas: Set[asyncio.TimerHandle] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sinal: Optional[asyncio.Event] = None
+        self._workers: List[asyncio.Task] = []
+
+    def enfileirar(self, telefone: str, texto: str, remetente: str = None,
+                   mensagem_id: str = None) -> MensagemSaida:
+        """Enfileira uma mensagem; `mensagem_id` permite a quem reenvia consultar o status
+        da tentativa anterior em vez de duplicar o envio"""
+        mensagem = MensagemSaida(telefone=telefone, texto=texto, remetente=remetente or self.remetente_padrao)
+        if mensagem_id is not None:
+            mensagem.id = mensagem_id
+        return self._enfileirar([mensagem])[0]
+
+    def enfileirar_varios(self, telefones: List[str], texto: str, remetente: str = None) -> List[MensagemSaida]:
+        """Enfileira a mesma mensagem para vários telefones; tudo ou nada se a fila estiver cheia"""
+        return self._enfileirar([
+            MensagemSaida(telefone=telefone, texto=texto, remetente=remetente or self.remetente_padrao)
+            for telefone in telefones
+        ])
+
+    def _enfileirar(self, mensagens: List[MensagemSaida]) -> List[MensagemSaida]:
+        if len(self._fila) + len(mensagens) > self.max_fila:
+            mensagens_whatsapp.inc(len(mensagens), resultado="rejeitada")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Fila de envio do WhatsApp cheia, tente novamente",
+                headers={"Retry-After": "5"}
+            )
+        for mensagem in mensagens:
+            self._registrar(mensagem)
+            self._fila.append(mensagem)
+        self._acordar()
+        return mensagens
+
+    def status(self, mensagem_id: str) -> Optional[MensagemSaida]:
+        return self._mensagens.get(mensagem_id)
+
+    def profundidade(self) -> int:
+        return len(self._fila)
+
+    def pendentes(self) -> int:
+        return len(self._fila) + self._em_envio + len(self._retentativas)
+
+    @property
+    def ativo(self) -> bool:
+        return bool(self._workers)
+
+    async def iniciar(self):
+        if self._workers:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._sinal = asyncio.Event()
+        self._workers = [self._loop.create_task(self._trabalhar()) for _ in range(self.max_concorrentes)]
+        self._acordar()
+
+    async def aguardar_conclusao(self, mensagem: MensagemSaida) -> MensagemSaida:
+        """Espera a mensagem ser enviada ou esgotar as tentativas"""
+        await mensagem.concluida.wait()
+        return mensagem
+
+    async def aguardar_ociosa(self, timeout: float = None) -> bool:
+        """Espera a fila esvaziar (incluindo retentativas agendadas); False se estourar o timeout"""
+        limite = time.monotonic() + timeout if timeout is not None else None
+        while self.pendentes():
+            if limite is not None and time.monotonic() >= limite:
+                return False
+            await asyncio.sleep(0.01)
+        return True
+
+    async def parar(self, timeout: float = 0):
+        if not self._workers:
+            return
+        if timeout and not await self.aguardar_ociosa(timeout):
+            logger.warning("Despachante do WhatsApp parado com %s mensagens pendentes", self.pendentes())
+        for handle in self._retentativas:
+            handle.cancel()
+        self._retentativas.clear()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._loop = None
+        self._sinal = None
+
+    def _registrar(self, mensagem: MensagemSaida):
+        self._mensagens[mensagem.id] = mensagem
+        while len(self._mensagens) > self.max_status:
+            self._mensagens.popitem(last=False)
+
+    def _acordar(self):
+        if self._sinal is None:
+            return
+        try:
+            em_outro_loop = asyncio.get_running_loop() is not self._loop
+        except RuntimeError:
+            em_outro_loop = True
+        if em_outro_loop:
+            self._loop.call_soon_threadsafe(self._sinal.set)
+        else:
+            self._sinal.set()
+
+    def _balde(self, remetente: str) -> BaldeTokens:
+        balde = self._baldes.get(remetente)
+        if balde is None:
+            balde = self._baldes[remetente] = BaldeTokens(self.taxa_por_segundo, self.rajada)
+        return balde
+
+    async def _trabalhar(self):
+        while True:
+            if not self._fila:
+                self._sinal.clear()
+                await self._sinal.wait()
+                continue
+            mensagem = self._fila.popleft()
+            self._em_envio += 1
+            try:
+                await self._balde(mensagem.remetente).aguardar()
+                await self._enviar(mensagem)
+            finally:
+                self._em_envio -= 1
+
+    async def _enviar(self, mensagem: MensagemSaida):
+        mensagem.status = StatusMensagem.ENVIANDO
+        mensagem.tentativas += 1
+        inicio = time.perf_counter()
+        try:
+            await self.enviar(mensagem.telefone, mensagem.texto)
+        except Exception as e:
+            mensagem.erro = str(e)
+            if mensagem.tentativas >= self.max_tentativas:
+                mensagem.status = StatusMensagem.FALHOU
+                mensagem.concluida.set()
+                mensagens_whatsapp.inc(resultado="falhou")
+                logger.error(f"Mensagem {mensagem.id} para {mensagem.telefone} falhou após "
+                             f"{mensagem.tentativas} tentativas: {e}")
+            else:
+                mensagem.status = StatusMensagem.PENDENTE
+                mensagens_whatsapp.inc(resultado="retentativa")
+                atraso = self.backoff_segundos * 2 ** (mensagem.tentativas - 1) * random.uniform(0.5, 1)
+                self._agendar_retentativa(mensagem, atraso)
+        else:
+            mensagem.status = StatusMensagem.ENVIADA
+            mensagem.enviado_em = datetime.now()
+            mensagem.erro = None
+            mensagem.concluida.set()
+            mensagens_whatsapp.inc(resultado="enviada")
+        finally:
+            duracao_envio_whatsapp.observe(time.perf_counter() - inicio)
+
+    def _agendar_retentativa(self, mensagem: MensagemSaida, atraso: float):
+        def reenfileirar():
+            self._retentativas.discard(handle)
+            self._fila.append(mensagem)
+            self._acordar()
+
+        handle = self._loop.call_later(atraso, reenfileirar)
+        self._retentativas.add(handle)
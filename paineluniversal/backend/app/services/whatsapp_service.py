@@ -1,17 +1,19 @@
 import asyncio
 import json
 import logging
-import qrcode
 import io
 import base64
+import uuid
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 from sqlalchemy.orm import Session
-from ..database import get_db
+from ..database import get_db, settings
 from ..models import Evento, Usuario, Transacao, Checkin, Lista
 from ..auth import validar_cpf_basico
-import aiohttp
-import websockets
+from ..metrics import registrar_fila
+from ..http_client import cliente_http
+from .whatsapp_dispatcher import DespachanteWhatsApp, MensagemSaida, StatusMensagem
+from .outbox_service import outbox_relay, adicionar_outbox, TIPO_WHATSAPP, TIPO_N8N
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +23,7 @@ class WhatsAppService:
         self.qr_code = None
         self.is_connected = False
         self.webhook_url = None
-        self.n8n_webhook_url = None
+        self.n8n_webhook_url = settings.n8n_webhook_url or None
         
     async def initialize_session(self) -> Dict[str, Any]:
         """Inicializa sessão do WhatsApp e retorna QR Code"""
@@ -39,6 +41,8 @@ class WhatsAppService:
     
     def _generate_mock_qr(self) -> str:
         """Gera QR Code mock para demonstração"""
+        import qrcode
+        
         qr = qrcode.QRCode(version=1, box_size=10, border=5)
         qr.add_data("https://wa.me/qr/mock-session-" + str(datetime.now().timestamp()))
         qr.make(fit=True)
@@ -50,30 +54,9 @@ class WhatsAppService:
         
         return f"data:image/png;base64,{img_str}"
     
-    async def send_invite(self, phone: str, evento_id: int, lista_id: int, db: Session) -> Dict[str, Any]:
-        """Envia convite via WhatsApp"""
-        try:
-            evento = db.query(Evento).filter(Evento.id == evento_id).first()
-            lista = db.query(Lista).filter(Lista.id == lista_id).first()
-            
-            if not evento or not lista:
-                return {"status": "error", "message": "Evento ou lista não encontrados"}
-            
-            message = self._format_invite_message(evento, lista)
-            
-            result = await self._send_whatsapp_message(phone, message)
-            
-            return {
-                "status": "sent",
-                "phone": phone,
-                "evento": evento.nome,
-                "lista": lista.nome,
-                "message": "Convite enviado com sucesso"
-            }
-            
-        except Exception as e:
-            logger.error(f"Erro ao enviar convite: {e}")
-            return {"status": "error", "message": str(e)}
+    def send_invite(self, phone: str, evento: Evento, lista: Lista) -> MensagemSaida:
+        """Enfileira convite via WhatsApp"""
+        return self.enviar_mensagem(phone, self._format_invite_message(evento, lista))
     
     def _format_invite_message(self, evento: Evento, lista: Lista) -> str:
         """Formata mensagem de convite"""
@@ -100,8 +83,12 @@ Limite de idade: {evento.limite_idade}+ anos
         
         return message
     
+    def enviar_mensagem(self, phone: str, message: str, remetente: str = None) -> MensagemSaida:
+        """Enfileira mensagem no despachante; o envio acontece em segundo plano"""
+        return despachante_whatsapp.enfileirar(phone, message, remetente)
+    
     async def _send_whatsapp_message(self, phone: str, message: str) -> Dict[str, Any]:
-        """Envia mensagem via WhatsApp (mock)"""
+        """Envia mensagem via WhatsApp (mock); chamado apenas pelo despachante"""
         await asyncio.sleep(0.5)  # Simula delay de envio
         
         return {
@@ -154,6 +141,11 @@ Limite de idade: {evento.limite_idade}+ anos
                 transacao.status = "confirmado"
                 transacao.telefone_comprador = phone
             
+            self.notificar_n8n(db, "confirmacao_presenca", {
+                "cpf": cpf_formatado,
+                "phone": phone,
+                "eventos_confirmados": len(transacoes)
+            })
             db.commit()
             
             response_msg = f"""
@@ -168,13 +160,7 @@ Para fazer check-in no evento, responda:
 Exemplo: CHECKIN {cpf_formatado} {cpf[:3]}
             """.strip()
             
-            await self._send_whatsapp_message(phone, response_msg)
-            
-            await self.notify_n8n("confirmacao_presenca", {
-                "cpf": cpf_formatado,
-                "phone": phone,
-                "eventos_confirmados": len(transacoes)
-            })
+            self.enviar_mensagem(phone, response_msg)
             
             return {
                 "status": "confirmed",
@@ -239,6 +225,11 @@ Exemplo: CHECKIN {cpf_formatado} {cpf[:3]}
                 db.add(checkin)
                 checkins_realizados.append(transacao.evento.nome)
             
+            self.notificar_n8n(db, "checkin_realizado", {
+                "cpf": cpf_formatado,
+                "phone": phone,
+                "eventos": checkins_realizados
+            })
             db.commit()
             
             response_msg = f"""
@@ -252,13 +243,7 @@ Horário: {datetime.now().strftime('%H:%M')}
 Bem-vindo(a) ao evento! 🎉
             """.strip()
             
-            await self._send_whatsapp_message(phone, response_msg)
-            
-            await self.notify_n8n("checkin_realizado", {
-                "cpf": cpf_formatado,
-                "phone": phone,
-                "eventos": checkins_realizados
-            })
+            self.enviar_mensagem(phone, response_msg)
             
             return {
                 "status": "checkin_success",
@@ -290,60 +275,64 @@ CHECKIN 123.456.789-10 123
 Precisa de ajuda? Entre em contato com a organização.
         """.strip()
         
-        await self._send_whatsapp_message(phone, help_msg)
+        self.enviar_mensagem(phone, help_msg)
         return {"status": "help_sent"}
     
     async def _send_error_message(self, phone: str, error: str) -> Dict[str, Any]:
         """Envia mensagem de erro"""
         error_msg = f"❌ *ERRO*\n\n{error}\n\nDigite qualquer mensagem para ver os comandos disponíveis."
-        await self._send_whatsapp_message(phone, error_msg)
+        self.enviar_mensagem(phone, error_msg)
         return {"status": "error_sent", "message": error}
     
-    async def send_bulk_invites(self, evento_id: int, lista_id: int, phones: List[str], db: Session) -> Dict[str, Any]:
-        """Envia convites em massa"""
-        try:
-            results = []
-            for phone in phones:
-                result = await self.send_invite(phone, evento_id, lista_id, db)
-                results.append({"phone": phone, "result": result})
-                await asyncio.sleep(1)  # Delay entre envios
-            
-            success_count = sum(1 for r in results if r["result"]["status"] == "sent")
-            
-            return {
-                "status": "completed",
-                "total": len(phones),
-                "success": success_count,
-                "failed": len(phones) - success_count,
-                "results": results
-            }
-            
-        except Exception as e:
-            logger.error(f"Erro no envio em massa: {e}")
-            return {"status": "error", "message": str(e)}
+    def send_bulk_invites(self, evento: Evento, lista: Lista, phones: List[str]) -> List[MensagemSaida]:
+        """Enfileira convites em massa; o despachante envia no limite de taxa do provedor"""
+        return despachante_whatsapp.enfileirar_varios(phones, self._format_invite_message(evento, lista))
     
     async def set_n8n_webhook(self, webhook_url: str):
         """Configurar webhook N8N para automações"""
         self.n8n_webhook_url = webhook_url
         
-    async def notify_n8n(self, event_type: str, data: Dict[str, Any]):
-        """Notificar N8N sobre eventos do WhatsApp"""
+    def notificar_n8n(self, db: Session, event_type: str, data: Dict[str, Any]):
+        """Registrar no outbox uma notificação ao N8N; é entregue após o commit de `db`"""
         if not self.n8n_webhook_url:
             return
-            
-        payload = {
+        
+        adicionar_outbox(db, TIPO_N8N, {
             "source": "whatsapp",
             "event_type": event_type,
             "timestamp": datetime.now().isoformat(),
             "data": data
-        }
+        })
+    
+    def enviar_mensagem_outbox(self, db: Session, phone: str, message: str):
+        """Registrar no outbox uma mensagem a enviar após o commit de `db`; o id fica no
+        payload para que as retentativas do relay reencontrem a mesma mensagem"""
+        adicionar_outbox(db, TIPO_WHATSAPP, {"telefone": phone, "mensagem": message, "mensagem_id": uuid.uuid4().hex})
+    
+    async def entregar_n8n(self, payload: Dict[str, Any]):
+        """Handler do outbox: POST no webhook do N8N, falhando para o relay tentar de novo"""
+        if not self.n8n_webhook_url:
+            return
         
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(self.n8n_webhook_url, json=payload) as response:
-                    logger.info(f"N8N notificado: {event_type} - Status: {response.status}")
-        except Exception as e:
-            logger.error(f"Erro ao notificar N8N: {e}")
+        response = await cliente_http.post(self.n8n_webhook_url, integracao="n8n", json=payload)
+        if response.status >= 400:
+            raise RuntimeError(f"N8N respondeu {response.status}")
+        logger.info(f"N8N notificado: {payload['event_type']} - Status: {response.status}")
+    
+    async def entregar_mensagem(self, payload: Dict[str, Any]):
+        """Handler do outbox: envia pelo despachante e só conclui quando o envio termina.
+
+        O timeout do relay cancela apenas a espera; a mensagem segue na fila do despachante.
+        Na retentativa, uma mensagem com o mesmo id ainda pendente ou já enviada é só
+        aguardada; ela só é enfileirada de novo se não existir ou se tiver falhado."""
+        mensagem_id = payload.get("mensagem_id")
+        mensagem = despachante_whatsapp.status(mensagem_id) if mensagem_id else None
+        if mensagem is None or mensagem.status == StatusMensagem.FALHOU:
+            mensagem = despachante_whatsapp.enfileirar(payload["telefone"], payload["mensagem"],
+                                                       mensagem_id=mensagem_id)
+        await despachante_whatsapp.aguardar_conclusao(mensagem)
+        if mensagem.status == StatusMensagem.FALHOU:
+            raise RuntimeError(mensagem.erro)
 
     async def get_session_status(self) -> Dict[str, Any]:
         """Retorna status da sessão WhatsApp"""
@@ -354,3 +343,18 @@ Precisa de ajuda? Entre em contato com a organização.
         }
 
 whatsapp_service = WhatsAppService()
+
+despachante_whatsapp = DespachanteWhatsApp(
+    enviar=lambda telefone, texto: whatsapp_service._send_whatsapp_message(telefone, texto),
+    remetente_padrao=settings.whatsapp_remetente_padrao,
+    taxa_por_segundo=settings.whatsapp_taxa_por_segundo,
+    rajada=settings.whatsapp_rajada,
+    max_concorrentes=settings.whatsapp_envios_concorrentes,
+    max_tentativas=settings.whatsapp_max_tentativas,
+    backoff_segundos=settings.whatsapp_backoff_segundos,
+    max_fila=settings.whatsapp_fila_max
+)
+registrar_fila("whatsapp", despachante_whatsapp.profundidade)
+
+outbox_relay.registrar(TIPO_WHATSAPP, whatsapp_service.entregar_mensagem)
+outbox_relay.registrar(TIPO_N8N, whatsapp_service.entregar_n8n)
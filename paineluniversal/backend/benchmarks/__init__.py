@@ -0,0 +1,4 @@
+"""Benchmarks de carga sintética para os picos de portaria (check-in) e bar (PDV).
+
+Uso: ``python -m benchmarks --help`` a partir de ``paineluniversal/backend``.
+"""
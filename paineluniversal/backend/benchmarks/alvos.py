@@ -0,0 +1,104 @@
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+import httpx
+
+
+class AlvoInProcess:
+    """Executa as requisições direto no app ASGI, via TestClient (um único event loop)"""
+
+    modo = "in-process"
+
+    def __init__(self, app):
+        from fastapi.testclient import TestClient
+        self._client = TestClient(app)
+
+    def __enter__(self):
+        self._client.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._client.__exit__(exc_type, exc, tb)
+
+    def requisicao(self, metodo: str, url: str, **kwargs) -> int:
+        return self._client.request(metodo, url, **kwargs).status_code
+
+    @contextmanager
+    def websocket(self, caminho: str):
+        with self._client.websocket_connect(caminho) as ws:
+            yield ws
+
+
+class _WebSocketRemoto:
+    """Adapta a conexão síncrona do pacote websockets à interface do TestClient"""
+
+    def __init__(self, conexao):
+        self._conexao = conexao
+
+    def receive_text(self) -> str:
+        return self._conexao.recv()
+
+    def send_text(self, texto: str):
+        self._conexao.send(texto)
+
+
+class AlvoHttp:
+    """Executa as requisições contra um servidor HTTP (ex.: uvicorn local)"""
+
+    modo = "http"
+
+    def __init__(self, base_url: str, timeout: float = 30.0):
+        self.base_url = base_url.rstrip("/")
+        self._client = httpx.Client(base_url=self.base_url, timeout=timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._client.close()
+
+    def requisicao(self, metodo: str, url: str, **kwargs) -> int:
+        return self._client.request(metodo, url, **kwargs).status_code
+
+    @contextmanager
+    def websocket(self, caminho: str):
+        from websockets.sync.client import connect
+        url = self.base_url.replace("http://", "ws://").replace("https://", "wss://") + caminho
+        with connect(url) as conexao:
+            yield _WebSocketRemoto(conexao)
+
+
+@contextmanager
+def uvicorn_local(database_url: str, porta: int = 8765, timeout: float = 30.0):
+    """Sobe ``uvicorn app.main:app`` em um subprocesso e aguarda o /healthz"""
+    diretorio = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, DATABASE_URL=database_url)
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(porta), "--log-level", "warning"],
+        cwd=diretorio,
+        env=env
+    )
+    base_url = f"http://127.0.0.1:{porta}"
+    try:
+        limite = time.monotonic() + timeout
+        while True:
+            if processo.poll() is not None:
+                raise RuntimeError(f"uvicorn encerrou com código {processo.returncode}")
+            try:
+                if httpx.get(f"{base_url}/healthz", timeout=1.0).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > limite:
+                raise RuntimeError("uvicorn não respondeu ao /healthz a tempo")
+            time.sleep(0.2)
+        yield base_url
+    finally:
+        processo.terminate()
+        try:
+            processo.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            processo.kill()
@@ -0,0 +1,177 @@
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List
+
+from .estatisticas import ColetorResultados, resumo_latencias
+
+
+def _executar(alvo, coletor: ColetorResultados, concorrencia: int, chamadas: List[Dict]):
+    """Dispara as chamadas em um pool de threads e registra latência e status"""
+
+    def executar_chamada(chamada):
+        inicio = time.perf_counter()
+        try:
+            status = alvo.requisicao(chamada["metodo"], chamada["url"], **chamada["kwargs"])
+        except Exception as e:
+            status = type(e).__name__
+        latencia_ms = (time.perf_counter() - inicio) * 1000
+        coletor.registrar(latencia_ms, status, status in chamada["esperado"])
+
+    coletor.iniciar()
+    with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+        list(executor.map(executar_chamada, chamadas))
+    coletor.finalizar()
+
+
+def door_rush(alvo, dataset, headers: Dict, concorrencia: int = 32,
+              duplicados: float = 0.05, semente: int = 42) -> Dict:
+    """Pico de portaria: check-ins por QR Code intercalados entre todos os eventos.
+
+    Uma fração dos ingressos é lida duas vezes (leitura repetida na catraca);
+    para esses, 200 ou 400 são respostas esperadas.
+    """
+    aleatorio = random.Random(semente)
+    qr_codes = list(dataset.qr_codes)
+    repetidos = set(aleatorio.sample(qr_codes, int(len(qr_codes) * duplicados)))
+    leituras = qr_codes + list(repetidos)
+    aleatorio.shuffle(leituras)
+
+    chamadas = [
+        {
+            "metodo": "POST",
+            "url": "/api/checkins/qr",
+            "kwargs": {
+                "params": {"qr_code": qr_code, "validacao_cpf": dataset.validacoes[qr_code]},
+                "headers": headers
+            },
+            "esperado": {200, 400} if qr_code in repetidos else {200}
+        }
+        for qr_code in leituras
+    ]
+
+    coletor = ColetorResultados()
+    _executar(alvo, coletor, concorrencia, chamadas)
+    resultado = coletor.resumo()
+    resultado.update({"concorrencia": concorrencia, "leituras_repetidas": len(repetidos)})
+    return resultado
+
+
+class _OuvinteWebSocket:
+    """Ouvinte de WebSocket do PDV que mede o atraso de entrega das notificações"""
+
+    def __init__(self, alvo, caminho: str):
+        self.alvo = alvo
+        self.caminho = caminho
+        self.mensagens = 0
+        self.atrasos_ms: List[float] = []
+        self.erro = None
+        self.pronto = threading.Event()
+        self._ws = None
+        self._thread = threading.Thread(target=self._ouvir, daemon=True)
+
+    def iniciar(self):
+        self._thread.start()
+        self.pronto.wait(timeout=10)
+
+    def _ouvir(self):
+        try:
+            with self.alvo.websocket(self.caminho) as ws:
+                self._ws = ws
+                self.pronto.set()
+                while True:
+                    texto = ws.receive_text()
+                    if "pong" in texto:
+                        break
+                    recebido_em = datetime.now()
+                    self.mensagens += 1
+                    try:
+                        timestamp = json.loads(texto).get("timestamp")
+                    except ValueError:
+                        continue
+                    if timestamp:
+                        atraso = recebido_em - datetime.fromisoformat(timestamp)
+                        self.atrasos_ms.append(atraso.total_seconds() * 1000)
+        except Exception as e:
+            self.erro = f"{type(e).__name__}: {e}"
+        finally:
+            self.pronto.set()
+
+    def parar(self, timeout: float = 10.0):
+        """Pede um pong ao servidor, que marca o fim das mensagens do cenário"""
+        if self._ws is not None and self._thread.is_alive():
+            try:
+                self._ws.send_text("fim")
+            except Exception:
+                pass
+        self._thread.join(timeout)
+
+
+def bar_rush(alvo, dataset, headers: Dict, concorrencia: int = 32, vendas: int = 500,
+             itens_por_venda: int = 2, ouvintes_por_evento: int = 2, semente: int = 42) -> Dict:
+    """Pico de bar: vendas concorrentes no PDV disputando os mesmos produtos e
+    comandas, com ouvintes de WebSocket conectados em cada evento."""
+    aleatorio = random.Random(semente)
+
+    ouvintes = [
+        _OuvinteWebSocket(alvo, f"/api/pdv/ws/{evento_id}")
+        for evento_id in dataset.evento_ids
+        for _ in range(ouvintes_por_evento)
+    ]
+    for ouvinte in ouvintes:
+        ouvinte.iniciar()
+
+    chamadas = []
+    for i in range(vendas):
+        evento_id = dataset.evento_ids[i % len(dataset.evento_ids)]
+        produtos = dataset.produtos_evento[evento_id]
+        comanda_id = aleatorio.choice(dataset.comandas_evento[evento_id])
+        itens = [
+            {"produto_id": aleatorio.choice(produtos), "quantidade": 1, "preco_unitario": "10.00"}
+            for _ in range(itens_por_venda)
+        ]
+        chamadas.append({
+            "metodo": "POST",
+            "url": "/api/pdv/vendas",
+            "kwargs": {
+                "json": {
+                    "evento_id": evento_id,
+                    "comanda_id": comanda_id,
+                    "itens": itens,
+                    "pagamentos": [
+                        {"tipo_pagamento": "SALDO_COMANDA", "valor": f"{10 * itens_por_venda}.00"}
+                    ]
+                },
+                "headers": headers
+            },
+            "esperado": {200}
+        })
+
+    coletor = ColetorResultados()
+    _executar(alvo, coletor, concorrencia, chamadas)
+
+    for ouvinte in ouvintes:
+        ouvinte.parar()
+
+    atrasos = [atraso for ouvinte in ouvintes for atraso in ouvinte.atrasos_ms]
+    resultado = coletor.resumo()
+    resultado.update({
+        "concorrencia": concorrencia,
+        "itens_por_venda": itens_por_venda,
+        "websocket": {
+            "ouvintes": len(ouvintes),
+            "mensagens_recebidas": sum(ouvinte.mensagens for ouvinte in ouvintes),
+            "atraso_entrega_ms": resumo_latencias(atrasos),
+            "erros": [ouvinte.erro for ouvinte in ouvintes if ouvinte.erro]
+        }
+    })
+    return resultado
+
+
+CENARIOS = {
+    "door_rush": door_rush,
+    "bar_rush": bar_rush,
+}
@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+
+
+def percentil(valores: List[float], p: float) -> Optional[float]:
+    """Percentil por interpolação linear (p entre 0 e 100)"""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    posicao = (len(ordenados) - 1) * p / 100
+    inferior = int(posicao)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    fracao = posicao - inferior
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * fracao
+
+
+def resumo_latencias(latencias_ms: List[float]) -> Dict[str, Optional[float]]:
+    """p50/p95/p99, média e máximo em milissegundos"""
+    if not latencias_ms:
+        return {"p50": None, "p95": None, "p99": None, "media": None, "max": None}
+    return {
+        "p50": round(percentil(latencias_ms, 50), 2),
+        "p95": round(percentil(latencias_ms, 95), 2),
+        "p99": round(percentil(latencias_ms, 99), 2),
+        "media": round(sum(latencias_ms) / len(latencias_ms), 2),
+        "max": round(max(latencias_ms), 2)
+    }
+
+
+class ColetorResultados:
+    """Acumula latência e status de cada requisição de um cenário (thread-safe)"""
+
+    def __init__(self):
+        self.latencias_ms: List[float] = []
+        self.status: Counter = Counter()
+        self.erros = 0
+        self._lock = threading.Lock()
+        self._inicio = None
+        self._fim = None
+
+    def iniciar(self):
+        self._inicio = time.perf_counter()
+
+    def finalizar(self):
+        self._fim = time.perf_counter()
+
+    def registrar(self, latencia_ms: float, status, esperado: bool):
+        with self._lock:
+            self.latencias_ms.append(latencia_ms)
+            self.status[str(status)] += 1
+            if not esperado:
+                self.erros += 1
+
+    @property
+    def duracao_s(self) -> float:
+        if self._inicio is None:
+            return 0.0
+        return (self._fim or time.perf_counter()) - self._inicio
+
+    def resumo(self) -> Dict:
+        total = len(self.latencias_ms)
+        duracao = self.duracao_s
+        return {
+            "requisicoes": total,
+            "duracao_s": round(duracao, 3),
+            "throughput_rps": round(total / duracao, 2) if duracao > 0 else None,
+            "latencia_ms": resumo_latencias(self.latencias_ms),
+            "taxa_erro": round(self.erros / total, 4) if total else 0.0,
+            "erros": self.erros,
+            "status": dict(self.status)
+        }
+
+
+class ContadorConsultas:
+    """Conta comandos SQL emitidos por um engine durante um cenário"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.total = 0
+        self.tempo_total_ms = 0.0
+        self._lock = threading.Lock()
+
+    def _antes(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("benchmark_query_start", []).append(time.perf_counter())
+
+    def _depois(self, conn, cursor, statement, parameters, context, executemany):
+        inicio = conn.info["benchmark_query_start"].pop()
+        with self._lock:
+            self.total += 1
+            self.tempo_total_ms += (time.perf_counter() - inicio) * 1000
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._antes)
+        event.listen(self.engine, "after_cursor_execute", self._depois)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        event.remove(self.engine, "before_cursor_execute", self._antes)
+        event.remove(self.engine, "after_cursor_execute", self._depois)
+
+    def resumo(self, requisicoes: int) -> Dict:
+        return {
+            "total": self.total,
+            "por_requisicao": round(self.total / requisicoes, 2) if requisicoes else None,
+            "tempo_total_ms": round(self.tempo_total_ms, 2)
+        }
@@ -0,0 +1,83 @@
+import json
+import platform
+import subprocess
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .cenarios import CENARIOS
+from .estatisticas import ContadorConsultas
+
+
+def versao_codigo() -> Optional[str]:
+    """Commit atual do repositório, para comparar resultados entre releases"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def executar_cenarios(alvo, dataset, headers: Dict, nomes: List[str], engine=None,
+                      opcoes: Optional[Dict[str, Dict]] = None) -> Dict[str, Dict]:
+    """Executar os cenários em sequência; conta consultas SQL quando o engine é local"""
+    opcoes = opcoes or {}
+    resultados = {}
+    for nome in nomes:
+        cenario = CENARIOS[nome]
+        if engine is None:
+            resultado = cenario(alvo, dataset, headers, **opcoes.get(nome, {}))
+            resultado["consultas_sql"] = None
+        else:
+            with ContadorConsultas(engine) as contador:
+                resultado = cenario(alvo, dataset, headers, **opcoes.get(nome, {}))
+            resultado["consultas_sql"] = contador.resumo(resultado["requisicoes"])
+        resultados[nome] = resultado
+    return resultados
+
+
+def montar_relatorio(resultados: Dict[str, Dict], modo: str, engine, dataset) -> Dict:
+    """Relatório JSON com metadados do ambiente e do dataset"""
+    return {
+        "versao": versao_codigo(),
+        "gerado_em": datetime.now().isoformat(),
+        "modo": modo,
+        "banco": engine.dialect.name,
+        "python": platform.python_version(),
+        "dataset": {
+            "eventos": len(dataset.evento_ids),
+            "listas": len(dataset.lista_ids),
+            "ingressos_sem_checkin": len(dataset.qr_codes),
+            "produtos": len(dataset.produto_ids),
+            "comandas": len(dataset.comanda_ids)
+        },
+        "cenarios": resultados
+    }
+
+
+def comparar(atual: Dict, base: Dict) -> List[str]:
+    """Diferenças de p95, throughput e taxa de erro em relação a um relatório anterior"""
+    linhas = [f"comparação {base.get('versao')} -> {atual.get('versao')}"]
+    for nome, resultado in atual["cenarios"].items():
+        anterior = base.get("cenarios", {}).get(nome)
+        if not anterior:
+            continue
+        for rotulo, valor_atual, valor_base in (
+            ("p95_ms", resultado["latencia_ms"]["p95"], anterior["latencia_ms"]["p95"]),
+            ("throughput_rps", resultado["throughput_rps"], anterior["throughput_rps"]),
+            ("taxa_erro", resultado["taxa_erro"], anterior["taxa_erro"]),
+        ):
+            if valor_atual is None or valor_base is None:
+                continue
+            variacao = ((valor_atual - valor_base) / valor_base * 100) if valor_base else 0.0
+            linhas.append(f"  {nome:<10} {rotulo:<15} {valor_base:>10} -> {valor_atual:>10} ({variacao:+.1f}%)")
+    return linhas
+
+
+def salvar_relatorio(relatorio: Dict, caminho: Optional[str]):
+    texto = json.dumps(relatorio, indent=2, ensure_ascii=False)
+    if caminho:
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto)
+    else:
+        print(texto)
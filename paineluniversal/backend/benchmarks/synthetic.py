@@ -0,0 +1,279 @@
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List
+
+from app.models import (
+    Empresa, Usuario, Evento, Lista, Transacao, Checkin, Produto, Comanda,
+    VendaPDV, ItemVendaPDV, PagamentoPDV, TipoUsuario, StatusEvento, TipoLista,
+    TipoProduto, StatusProduto, TipoComanda, StatusComanda, StatusVendaPDV,
+    TipoPagamentoPDV
+)
+
+
+def gerar_cpf(sequencial: int) -> str:
+    """Gerar CPF válido e formatado a partir de um número sequencial"""
+    base = f"{sequencial % 10**9:09d}"
+    if base == base[0] * 9:
+        base = f"{(sequencial + 1) % 10**9:09d}"
+    digitos = [int(d) for d in base]
+    for peso_inicial in (10, 11):
+        soma = sum(d * (peso_inicial - i) for i, d in enumerate(digitos))
+        resto = soma % 11
+        digitos.append(0 if resto < 2 else 11 - resto)
+    cpf = "".join(str(d) for d in digitos)
+    return f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}"
+
+
+@dataclass
+class SyntheticDataset:
+    empresa_id: int
+    admin_cpf: str
+    promoter_cpfs: List[str]
+    evento_ids: List[int]
+    lista_ids: List[int]
+    produto_ids: List[int]
+    comanda_ids: List[int]
+    qr_codes: List[str] = field(default_factory=list)
+    validacoes: Dict[str, str] = field(default_factory=dict)
+    produtos_evento: Dict[int, List[int]] = field(default_factory=dict)
+    comandas_evento: Dict[int, List[int]] = field(default_factory=dict)
+
+
+def recriar_esquema(engine, database_url: str):
+    """Recriar o banco do benchmark pelas migrações do Alembic, como em produção, para
+    que a revisão gravada seja a esperada pela checagem de prontidão"""
+    from alembic import command
+    from alembic.config import Config
+    from sqlalchemy import text
+
+    from app.models import Base
+    from app.prontidao import DIRETORIO_BACKEND
+
+    Base.metadata.drop_all(bind=engine)
+    with engine.begin() as conexao:
+        conexao.execute(text("DROP TABLE IF EXISTS alembic_version"))
+    config = Config(os.path.join(DIRETORIO_BACKEND, "alembic.ini"))
+    config.set_main_option("sqlalchemy.url", database_url.replace("%", "%%"))
+    config.attributes["configurar_logs"] = False
+    command.upgrade(config, "head")
+
+
+def escala(nome: str, padrao: int) -> int:
+    """Tamanho do dataset, ajustável por variável de ambiente (ex.: SYNTHETIC_EVENTOS=50)"""
+    multiplicador = float(os.getenv("SYNTHETIC_SCALE", "1"))
+    return max(1, int(int(os.getenv(f"SYNTHETIC_{nome.upper()}", padrao)) * multiplicador))
+
+
+def seed_dataset(
+    db,
+    eventos: int = None,
+    listas_por_evento: int = None,
+    transacoes_por_lista: int = None,
+    percentual_checkin: float = 0.5,
+    produtos_por_evento: int = None,
+    vendas_por_evento: int = None,
+    comandas_por_evento: int = None,
+    promoters: int = None
+) -> SyntheticDataset:
+    """Popular o banco com um conjunto sintético escalável de eventos, listas,
+    transações, check-ins e vendas de PDV."""
+
+    eventos = eventos or escala("eventos", 3)
+    listas_por_evento = listas_por_evento or escala("listas", 4)
+    transacoes_por_lista = transacoes_por_lista or escala("transacoes", 25)
+    produtos_por_evento = produtos_por_evento or escala("produtos", 5)
+    vendas_por_evento = vendas_por_evento or escala("vendas", 20)
+    comandas_por_evento = comandas_por_evento or escala("comandas", 10)
+    promoters = promoters or escala("promoters", 4)
+
+    empresa = Empresa(
+        nome="Empresa Sintética",
+        cnpj="11222333000181",
+        email="sintetica@empresa.com",
+        telefone="11999990000"
+    )
+    db.add(empresa)
+    db.flush()
+
+    admin = Usuario(
+        nome="Admin Sintético",
+        email="admin@sintetica.com",
+        cpf=gerar_cpf(1),
+        telefone="11999990001",
+        tipo=TipoUsuario.ADMIN,
+        empresa_id=empresa.id,
+        senha_hash="$2b$12$sintetico",
+        ativo=True
+    )
+    db.add(admin)
+
+    usuarios_promoters = []
+    for i in range(promoters):
+        promoter = Usuario(
+            nome=f"Promoter {i}",
+            email=f"promoter{i}@sintetica.com",
+            cpf=gerar_cpf(100 + i),
+            telefone=f"119888{i:05d}",
+            tipo=TipoUsuario.PROMOTER,
+            empresa_id=empresa.id,
+            senha_hash="$2b$12$sintetico",
+            ativo=True
+        )
+        usuarios_promoters.append(promoter)
+    db.add_all(usuarios_promoters)
+    db.flush()
+
+    dataset = SyntheticDataset(
+        empresa_id=empresa.id,
+        admin_cpf=admin.cpf,
+        promoter_cpfs=[p.cpf for p in usuarios_promoters],
+        evento_ids=[],
+        lista_ids=[],
+        produto_ids=[],
+        comanda_ids=[]
+    )
+
+    agora = datetime.now()
+    sequencial_cpf = 1000
+    for e in range(eventos):
+        evento = Evento(
+            nome=f"Evento Sintético {e}",
+            descricao="Gerado para testes de desempenho",
+            data_evento=agora + timedelta(days=e % 30 + 1),
+            local=f"Local {e}",
+            limite_idade=18,
+            capacidade_maxima=listas_por_evento * transacoes_por_lista * 2,
+            status=StatusEvento.ATIVO,
+            empresa_id=empresa.id,
+            criador_id=admin.id
+        )
+        db.add(evento)
+        db.flush()
+        dataset.evento_ids.append(evento.id)
+
+        for l in range(listas_por_evento):
+            promoter = usuarios_promoters[(e + l) % len(usuarios_promoters)]
+            lista = Lista(
+                nome=f"Lista {e}-{l}",
+                tipo=list(TipoLista)[l % len(TipoLista)],
+                preco=Decimal("50.00") if l % 2 else Decimal("0.00"),
+                limite_vendas=transacoes_por_lista + 5,
+                vendas_realizadas=transacoes_por_lista,
+                ativa=True,
+                evento_id=evento.id,
+                promoter_id=promoter.id
+            )
+            db.add(lista)
+            db.flush()
+            dataset.lista_ids.append(lista.id)
+
+            transacoes = []
+            for t in range(transacoes_por_lista):
+                sequencial_cpf += 1
+                qr_code = f"TICKET-{sequencial_cpf:08d}-{evento.id}"
+                transacoes.append(Transacao(
+                    cpf_comprador=gerar_cpf(sequencial_cpf),
+                    nome_comprador=f"Convidado {sequencial_cpf}",
+                    email_comprador=f"convidado{sequencial_cpf}@email.com",
+                    telefone_comprador=f"1197{sequencial_cpf:07d}",
+                    valor=lista.preco,
+                    status="aprovada",
+                    metodo_pagamento="pix",
+                    codigo_transacao=f"TX-{sequencial_cpf}",
+                    qr_code_ticket=qr_code,
+                    evento_id=evento.id,
+                    lista_id=lista.id,
+                    usuario_id=admin.id
+                ))
+            db.add_all(transacoes)
+            db.flush()
+
+            limite_checkin = int(len(transacoes) * percentual_checkin)
+            db.add_all([
+                Checkin(
+                    cpf=transacao.cpf_comprador,
+                    nome=transacao.nome_comprador,
+                    evento_id=evento.id,
+                    usuario_id=admin.id,
+                    transacao_id=transacao.id,
+                    metodo_checkin="qr_code",
+                    validacao_cpf=transacao.cpf_comprador[:3]
+                )
+                for transacao in transacoes[:limite_checkin]
+            ])
+            for transacao in transacoes[limite_checkin:]:
+                dataset.qr_codes.append(transacao.qr_code_ticket)
+                dataset.validacoes[transacao.qr_code_ticket] = transacao.cpf_comprador[:3]
+
+        produtos = [
+            Produto(
+                nome=f"Produto {e}-{p}",
+                tipo=TipoProduto.BEBIDA,
+                preco=Decimal("10.00") + p,
+                codigo_interno=f"SINT{e:04d}{p:04d}",
+                estoque_atual=100000,
+                estoque_minimo=10,
+                controla_estoque=True,
+                status=StatusProduto.ATIVO,
+                categoria="Bebidas",
+                evento_id=evento.id,
+                empresa_id=empresa.id
+            )
+            for p in range(produtos_por_evento)
+        ]
+        db.add_all(produtos)
+
+        comandas = [
+            Comanda(
+                numero_comanda=f"C{e:04d}{c:05d}",
+                cpf_cliente=gerar_cpf(900000 + e * 1000 + c),
+                nome_cliente=f"Cliente Comanda {c}",
+                tipo=TipoComanda.FISICA,
+                qr_code=f"COMANDA-{e:04d}{c:05d}",
+                saldo_atual=Decimal("100000.00"),
+                status=StatusComanda.ATIVA,
+                evento_id=evento.id,
+                empresa_id=empresa.id
+            )
+            for c in range(comandas_por_evento)
+        ]
+        db.add_all(comandas)
+        db.flush()
+        dataset.produto_ids.extend(p.id for p in produtos)
+        dataset.comanda_ids.extend(c.id for c in comandas)
+        dataset.produtos_evento[evento.id] = [p.id for p in produtos]
+        dataset.comandas_evento[evento.id] = [c.id for c in comandas]
+
+        for v in range(vendas_por_evento):
+            produto = produtos[v % len(produtos)]
+            venda = VendaPDV(
+                numero_venda=f"SINT{e:04d}{v:06d}",
+                valor_total=produto.preco,
+                valor_desconto=Decimal("0.00"),
+                valor_final=produto.preco,
+                tipo_pagamento=TipoPagamentoPDV.PIX,
+                status=StatusVendaPDV.APROVADA,
+                evento_id=evento.id,
+                empresa_id=empresa.id,
+                usuario_vendedor_id=admin.id
+            )
+            db.add(venda)
+            db.flush()
+            db.add(ItemVendaPDV(
+                venda_id=venda.id,
+                produto_id=produto.id,
+                quantidade=1,
+                preco_unitario=produto.preco,
+                preco_total=produto.preco
+            ))
+            db.add(PagamentoPDV(
+                venda_id=venda.id,
+                tipo_pagamento=TipoPagamentoPDV.PIX,
+                valor=produto.preco,
+                status=StatusVendaPDV.APROVADA.value
+            ))
+
+    db.commit()
+    return dataset
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import engine
+from app.models import EstadoAlerta, MarcaAlerta
+
+def create_alertas_tables():
+    """Criar tabelas de deduplicação e marcas d'água dos alertas"""
+    try:
+        EstadoAlerta.__table__.create(bind=engine, checkfirst=True)
+        MarcaAlerta.__table__.create(bind=engine, checkfirst=True)
+        print("✅ Tabelas de alertas criadas com sucesso!")
+        print("- alertas_estado")
+        print("- alertas_marcas")
+    except Exception as e:
+        print(f"❌ Erro ao criar tabelas: {e}")
+
+if __name__ == "__main__":
+    create_alertas_tables()
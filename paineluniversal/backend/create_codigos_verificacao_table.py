@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import engine
+from app.models import CodigoVerificacao
+
+def create_codigos_verificacao_table():
+    """Criar tabela de códigos de verificação compartilhada entre workers"""
+    try:
+        CodigoVerificacao.__table__.create(bind=engine, checkfirst=True)
+        print("✅ Tabela codigos_verificacao criada com sucesso!")
+    except Exception as e:
+        print(f"❌ Erro ao criar tabela: {e}")
+
+if __name__ == "__main__":
+    create_codigos_verificacao_table()
@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import engine
+from app.models import EventoOutbox
+
+def create_outbox_table():
+    """Criar tabela do outbox de notificações (WhatsApp e N8N)"""
+    try:
+        EventoOutbox.__table__.create(bind=engine, checkfirst=True)
+        print("✅ Tabela de outbox criada com sucesso!")
+        print("- outbox")
+    except Exception as e:
+        print(f"❌ Erro ao criar tabela: {e}")
+
+if __name__ == "__main__":
+    create_outbox_table()
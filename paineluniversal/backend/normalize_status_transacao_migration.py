@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, text
+from app.database import settings
+
+STATUS_TRANSACAO = ["pendente", "aprovada", "cancelada"]
+
+def normalize_status_transacao():
+    """Converter transacoes.status dos nomes do enum (APROVADA) para os valores (aprovada)"""
+    engine = create_engine(settings.database_url)
+    
+    with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            for valor in STATUS_TRANSACAO:
+                try:
+                    conn.execute(text(
+                        f"ALTER TYPE statustransacao RENAME VALUE '{valor.upper()}' TO '{valor}'"
+                    ))
+                    conn.commit()
+                    print(f"✅ Valor {valor.upper()} renomeado para {valor} no tipo statustransacao")
+                except Exception as e:
+                    conn.rollback()
+                    print(f"ℹ️ Valor {valor.upper()} não renomeado: {e}")
+        else:
+            resultado = conn.execute(text(
+                "UPDATE transacoes SET status = LOWER(status) WHERE status <> LOWER(status)"
+            ))
+            conn.commit()
+            print(f"✅ {resultado.rowcount} transações com status normalizado")
+        
+        print("✅ Status migration completed successfully!")
+
+if __name__ == "__main__":
+    normalize_status_transacao()
@@ -1,26 +1,101 @@
+import os
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+
+# O engine da própria aplicação (prontidão no lifespan, sessões dos jobs) também aponta
+# para o banco de testes, e o scheduler fica desligado: a suíte não cria ./eventos.db
+os.environ["DATABASE_URL"] = SQLALCHEMY_DATABASE_URL
+os.environ["SCHEDULER_HABILITADO"] = "false"
+
 from app.main import app
 from app.database import get_db, Base
+from app.auth import cache_principais, criar_access_token
+from app.acesso_eventos import cache_eventos
+from app.services.meep_client_service import restricoes_clientes
+from benchmarks.synthetic import seed_dataset
+from .query_counter import QueryCounter
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def override_get_db():
     try:
         db = TestingSessionLocal()
+        db.connection()
         yield db
     finally:
         db.close()
 
 app.dependency_overrides[get_db] = override_get_db
 
+_request_stats = []
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "query_budget: testes de orçamento de consultas SQL e latência por endpoint"
+    )
+
+def pytest_terminal_summary(terminalreporter):
+    if not _request_stats:
+        return
+    terminalreporter.section("orçamento de consultas por endpoint")
+    for stats in _request_stats:
+        terminalreporter.write_line(
+            f"{stats.endpoint:<55} {stats.status_code} "
+            f"{stats.queries:>4} consultas {stats.elapsed_ms:>9.1f} ms"
+        )
+
+@pytest.fixture(autouse=True)
+def limpar_caches():
+    """Os testes recriam usuários e eventos com os mesmos CPFs e ids; os caches não podem vazar entre eles"""
+    cache_principais.limpar()
+    cache_eventos.limpar()
+    restricoes_clientes.limpar()
+    yield
+
 @pytest.fixture(scope="session")
 def test_db():
     Base.metadata.create_all(bind=engine)
     yield
     Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture
+def modulos_sessao_local():
+    """Módulos que abrem `SessionLocal` por conta própria (jobs, importações em segundo
+    plano); o arquivo de teste sobrescreve esta fixture para apontá-los ao banco de testes"""
+    return ()
+
+@pytest.fixture
+def db(monkeypatch, modulos_sessao_local):
+    """Esquema recriado do zero e uma sessão no banco de testes"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    app.dependency_overrides[get_db] = override_get_db
+    for modulo in modulos_sessao_local:
+        monkeypatch.setattr(modulo, "SessionLocal", TestingSessionLocal)
+    sessao = TestingSessionLocal()
+    yield sessao
+    sessao.close()
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture
+def cenario(db):
+    """Empresa com um evento pequeno e o header de autenticação do admin: (dataset, headers)"""
+    dataset = seed_dataset(db, eventos=1, listas_por_evento=1, transacoes_por_lista=2,
+                           produtos_por_evento=1, comandas_por_evento=1)
+    headers = {"Authorization": f"Bearer {criar_access_token(data={'sub': dataset.admin_cpf})}"}
+    return dataset, headers
+
+@pytest.fixture
+def query_counter():
+    """Contador de consultas SQL e tempo por requisição no engine de testes"""
+    app.dependency_overrides[get_db] = override_get_db
+    with QueryCounter(engine) as counter:
+        yield counter
+    _request_stats.extend(counter.history)
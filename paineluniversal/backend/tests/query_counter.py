@@ -0,0 +1,84 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import List
+
+from sqlalchemy import event
+
+
+@dataclass
+class RequestStats:
+    """Consultas SQL e tempo de parede de uma requisição medida"""
+    endpoint: str
+    status_code: int
+    queries: int
+    elapsed_ms: float
+    statements: List[str] = field(default_factory=list)
+
+
+class QueryCounter:
+    """Conta comandos SQL emitidos por um engine através dos eventos do SQLAlchemy.
+
+    Os listeners ficam registrados enquanto o contador estiver ativo (``with``),
+    e cada chamada a ``measure`` isola os comandos de uma única requisição.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements: List[str] = []
+        self.durations: List[float] = []
+        self.history: List[RequestStats] = []
+        self._lock = threading.Lock()
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        inicio = conn.info["query_start_time"].pop()
+        with self._lock:
+            self.statements.append(statement)
+            self.durations.append(time.perf_counter() - inicio)
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(self.engine, "after_cursor_execute", self._after_cursor_execute)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        event.remove(self.engine, "before_cursor_execute", self._before_cursor_execute)
+        event.remove(self.engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def reset(self):
+        with self._lock:
+            self.statements = []
+            self.durations = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def measure(self, client, method: str, url: str, **kwargs):
+        """Executar uma requisição no TestClient e registrar consultas e latência"""
+        self.reset()
+        inicio = time.perf_counter()
+        response = client.request(method, url, **kwargs)
+        elapsed_ms = (time.perf_counter() - inicio) * 1000
+        with self._lock:
+            statements = list(self.statements)
+        stats = RequestStats(
+            endpoint=f"{method} {url.split('?')[0]}",
+            status_code=response.status_code,
+            queries=len(statements),
+            elapsed_ms=elapsed_ms,
+            statements=statements
+        )
+        self.history.append(stats)
+        return response, stats
+
+
+def format_statements(stats: RequestStats) -> str:
+    """Formatar os comandos capturados para mensagens de falha de orçamento"""
+    linhas = [f"{stats.endpoint}: {stats.queries} consultas em {stats.elapsed_ms:.1f} ms"]
+    for i, statement in enumerate(stats.statements, 1):
+        linhas.append(f"  {i:>3}. {' '.join(statement.split())[:200]}")
+    return "\n".join(linhas)
@@ -0,0 +1,93 @@
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.database import Base, get_db
+from app.auth import criar_access_token
+from app.models import Empresa, Usuario, TipoUsuario, StatusEvento
+from app.acesso_eventos import CacheEventos, InfoEvento, cache_eventos
+from .conftest import engine, TestingSessionLocal, override_get_db
+from benchmarks.synthetic import seed_dataset, gerar_cpf
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    app.dependency_overrides[get_db] = override_get_db
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    try:
+        dados = seed_dataset(db, eventos=2, listas_por_evento=1, transacoes_por_lista=2, promoters=1)
+        outra_empresa = Empresa(nome="Outra", cnpj="60746948000112", email="outra@empresa.com")
+        db.add(outra_empresa)
+        db.flush()
+        db.add(Usuario(
+            nome="Promoter Externo", email="externo@outra.com", cpf=gerar_cpf(900),
+            tipo=TipoUsuario.PROMOTER, empresa_id=outra_empresa.id,
+            senha_hash="$2b$12$sintetico", ativo=True
+        ))
+        db.commit()
+        yield dados
+    finally:
+        db.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="module")
+def client(dataset):
+    return TestClient(app)
+
+
+def headers_para(cpf):
+    return {"Authorization": f"Bearer {criar_access_token(data={'sub': cpf})}"}
+
+
+class TestCacheEventos:
+
+    def test_limite_de_tamanho(self):
+        cache = CacheEventos(ttl_segundos=60, tamanho_maximo=2)
+        for evento_id in (1, 2, 3):
+            cache.armazenar(InfoEvento(evento_id, 1, StatusEvento.ATIVO, datetime.now()))
+        assert cache.obter(1) is None
+        assert cache.obter(3) is not None
+        assert len(cache) == 2
+
+
+class TestRequireEventoAccess:
+
+    def test_checagem_em_cache_nao_consulta_eventos(self, client, dataset, query_counter):
+        headers = headers_para(dataset.admin_cpf)
+        url = f"/api/pdv/produtos?evento_id={dataset.evento_ids[0]}"
+        _, primeira = query_counter.measure(client, "GET", url, headers=headers)
+        _, segunda = query_counter.measure(client, "GET", url, headers=headers)
+
+        assert primeira.status_code == segunda.status_code == 200
+        assert any("FROM eventos" in sql for sql in primeira.statements)
+        assert not any("FROM eventos" in sql for sql in segunda.statements)
+
+    def test_outra_empresa_recebe_403(self, client, dataset):
+        response = client.get(
+            f"/api/pdv/vendas?evento_id={dataset.evento_ids[0]}", headers=headers_para(gerar_cpf(900))
+        )
+        assert response.status_code == 403
+        assert response.json()["detail"] == "Acesso negado"
+
+    def test_evento_inexistente_recebe_404(self, client, dataset):
+        response = client.get("/api/pdv/vendas?evento_id=99999", headers=headers_para(dataset.admin_cpf))
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Evento não encontrado"
+
+    def test_cancelamento_invalida_cache(self, client, dataset):
+        evento_id = dataset.evento_ids[1]
+        headers = headers_para(dataset.admin_cpf)
+        client.get(f"/api/pdv/vendas?evento_id={evento_id}", headers=headers)
+        assert cache_eventos.obter(evento_id).status == StatusEvento.ATIVO
+
+        assert client.delete(f"/api/eventos/{evento_id}", headers=headers).status_code == 200
+        assert cache_eventos.obter(evento_id) is None
+
+        response = client.get(f"/api/dashboard/tempo-real/{evento_id}", headers=headers)
+        assert response.status_code == 200
+        assert cache_eventos.obter(evento_id).status == StatusEvento.CANCELADO
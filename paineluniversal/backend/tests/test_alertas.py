@@ -0,0 +1,184 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import (
+    Evento, Lista, TipoLista, Usuario, Transacao, Conquista, PromoterConquista, TipoConquista, NivelBadge,
+    EstadoAlerta, MarcaAlerta, EventoOutbox
+)
+from app.services import alert_service as modulo_alertas
+from app.services.alert_service import AlertService, regras_duracao
+from .conftest import engine
+from .query_counter import QueryCounter
+from benchmarks.synthetic import seed_dataset
+
+
+@pytest.fixture
+def modulos_sessao_local():
+    return (modulo_alertas,)
+
+
+@pytest.fixture
+def db(db):
+    """Três eventos, uma lista quase cheia e um promoter com a primeira conquista"""
+    sessao = db
+    dataset = seed_dataset(sessao, eventos=3, listas_por_evento=2, transacoes_por_lista=2, promoters=3)
+
+    lista_cheia = sessao.query(Lista).filter(Lista.id == dataset.lista_ids[0]).one()
+    lista_cheia.vendas_realizadas, lista_cheia.limite_vendas = 9, 10
+
+    promoters = sessao.query(Usuario).filter(Usuario.cpf.in_(dataset.promoter_cpfs)).order_by(Usuario.id).all()
+    basica = Conquista(nome="Primeira venda", descricao="1 venda", tipo=TipoConquista.VENDAS,
+                       criterio_valor=1, badge_nivel=NivelBadge.BRONZE, icone="🥉", ativa=True)
+    distante = Conquista(nome="Mil vendas", descricao="1000 vendas", tipo=TipoConquista.VENDAS,
+                         criterio_valor=1000, badge_nivel=NivelBadge.OURO, icone="🥇", ativa=True)
+    sessao.add_all([basica, distante])
+    sessao.flush()
+    sessao.add(PromoterConquista(promoter_id=promoters[0].id, conquista_id=basica.id, valor_alcancado=4))
+    sessao.commit()
+
+    sessao.dataset = dataset
+    sessao.promoters = promoters
+    return sessao
+
+
+def mensagens_outbox(db):
+    db.expire_all()
+    eventos = db.query(EventoOutbox).filter(EventoOutbox.tipo == "whatsapp").order_by(EventoOutbox.id).all()
+    return [
+        (payload["telefone"], payload["mensagem"].splitlines()[0])
+        for payload in (json.loads(evento.payload) for evento in eventos)
+    ]
+
+
+def avaliar_todas(servico, db):
+    return [alerta for regra in servico.alert_rules for alerta in servico.avaliar_regra(db, regra) or []]
+
+
+def alertas_por_regra(alertas):
+    agrupados = {}
+    for alerta in alertas:
+        agrupados.setdefault(alerta.regra, []).append(alerta)
+    return agrupados
+
+
+class TestRegrasDeAlerta:
+
+    def test_conjunto_de_alertas(self, db):
+        alertas = alertas_por_regra(avaliar_todas(AlertService(), db))
+        dataset = db.dataset
+
+        assert [a.entidade_id for a in alertas["limite_lista"]] == [dataset.lista_ids[0]]
+        assert "9/10 (90.0%)" in alertas["limite_lista"][0].mensagem
+
+        assert sorted(a.entidade_id for a in alertas["vendas_baixas"]) == sorted(dataset.evento_ids)
+        assert "Vendas atuais: 4" in alertas["vendas_baixas"][0].mensagem
+
+        assert [a.entidade_id for a in alertas["evento_proximo"]] == [dataset.evento_ids[0]]
+        assert alertas["evento_proximo"][0].destinatarios == ("11999990001",)
+
+        promoters_alertados = {a.entidade_id for a in alertas["conquistas_pendentes"]}
+        assert promoters_alertados == {promoter.id for promoter in db.promoters[1:]}
+
+    def test_cada_regra_usa_poucas_consultas(self, db):
+        servico = AlertService()
+        with QueryCounter(engine) as contador:
+            for nome, regra in servico.alert_rules.items():
+                contador.reset()
+                regra(db)
+                assert contador.count <= 2, (nome, contador.statements)
+
+    def test_duracao_por_regra_registrada(self, db):
+        antes = regras_duracao.contagem(regra="limite_lista", resultado="sucesso")
+        AlertService().executar_verificacoes()
+        assert regras_duracao.contagem(regra="limite_lista", resultado="sucesso") == antes + 1
+
+    def test_alertas_vao_para_o_outbox_na_mesma_transacao(self, db):
+        esperados = avaliar_todas(AlertService(), db)
+        AlertService().executar_verificacoes()
+
+        mensagens = mensagens_outbox(db)
+        assert len(mensagens) == sum(len(alerta.destinatarios) for alerta in esperados) > 0
+        assert db.query(EstadoAlerta).count() == len(esperados)
+
+
+class TestDeduplicacaoEMarcas:
+
+    def test_segunda_execucao_nao_reenvia(self, db):
+        servico = AlertService()
+        servico.executar_verificacoes()
+        primeira = len(mensagens_outbox(db))
+        assert primeira > 0
+
+        servico.executar_verificacoes()
+        assert len(mensagens_outbox(db)) == primeira
+
+        db.expire_all()
+        assert db.query(EstadoAlerta).count() > 0
+        assert {marca.regra for marca in db.query(MarcaAlerta).all()} == set(servico.alert_rules)
+
+    def test_novo_limiar_gera_novo_alerta(self, db):
+        servico = AlertService()
+        servico.executar_verificacoes()
+        ja_enviados = len(mensagens_outbox(db))
+
+        lista = db.query(Lista).filter(Lista.id == db.dataset.lista_ids[0]).one()
+        lista.vendas_realizadas = 10
+        db.add(Transacao(
+            cpf_comprador="11144477735", nome_comprador="Nova venda", valor=0, status="aprovada",
+            evento_id=lista.evento_id, lista_id=lista.id
+        ))
+        db.commit()
+
+        servico.executar_verificacoes()
+        assert [titulo for _, titulo in mensagens_outbox(db)[ja_enviados:]] == ["🚨 *ALERTA - LIMITE DE LISTA*"]
+
+    def test_marca_restringe_entidades_avaliadas(self, db):
+        servico = AlertService()
+        futuro = datetime.utcnow() + timedelta(days=1)
+        assert servico.check_limite_lista(db, None)
+        assert servico.check_limite_lista(db, futuro) == []
+        assert servico.check_conquistas_pendentes(db, futuro) == []
+
+    def test_reenvio_respeita_intervalo_da_regra(self, db):
+        servico = AlertService()
+        alertas = [a for a in avaliar_todas(servico, db) if a.regra in ("vendas_baixas", "evento_proximo")]
+        agora = datetime.utcnow()
+        servico.registrar_envios(db, alertas, agora)
+        db.commit()
+
+        assert servico.filtrar_ja_enviados(db, alertas, agora + timedelta(hours=1)) == []
+        depois = servico.filtrar_ja_enviados(db, alertas, agora + timedelta(hours=25))
+        assert {a.regra for a in depois} == {"vendas_baixas"}
+
+    def test_novo_aniversariante_vip_gera_novo_alerta(self, db, monkeypatch):
+        servico = AlertService()
+        monkeypatch.setattr(servico, "_is_birthday_week", lambda cpf: True)
+        lista_vip = db.query(Lista).filter(Lista.id.in_(db.dataset.lista_ids), Lista.tipo == TipoLista.VIP).first()
+        servico.executar_verificacoes()
+        ja_enviados = len(mensagens_outbox(db))
+
+        db.add(Transacao(
+            cpf_comprador="11144477735", nome_comprador="Aniversariante novo", valor=0, status="aprovada",
+            evento_id=lista_vip.evento_id, lista_id=lista_vip.id
+        ))
+        db.commit()
+
+        servico.executar_verificacoes()
+        novos = [titulo for _, titulo in mensagens_outbox(db)[ja_enviados:]]
+        assert novos and set(novos) == {"🎂 *ANIVERSARIANTES VIP*"}
+
+    def test_evento_remarcado_recebe_novo_lembrete(self, db):
+        servico = AlertService()
+        alertas = servico.check_evento_proximo(db)
+        servico.registrar_envios(db, alertas, datetime.utcnow())
+        db.commit()
+        assert servico.filtrar_ja_enviados(db, servico.check_evento_proximo(db), datetime.utcnow()) == []
+
+        evento = db.get(Evento, alertas[0].entidade_id)
+        evento.data_evento = evento.data_evento.replace(minute=(evento.data_evento.minute + 1) % 60)
+        db.commit()
+
+        pendentes = servico.filtrar_ja_enviados(db, servico.check_evento_proximo(db), datetime.utcnow())
+        assert [alerta.entidade_id for alerta in pendentes] == [evento.id]
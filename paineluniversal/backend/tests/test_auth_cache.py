@@ -0,0 +1,138 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.database import Base, get_db
+from app.models import Usuario, TipoUsuario
+from app.auth import (
+    criar_access_token, cache_principais, CachePrincipais, UsuarioPrincipal
+)
+from .conftest import engine, TestingSessionLocal, override_get_db
+from benchmarks.synthetic import seed_dataset, gerar_cpf
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    app.dependency_overrides[get_db] = override_get_db
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    try:
+        yield seed_dataset(db, eventos=1, listas_por_evento=1, transacoes_por_lista=2, promoters=2)
+    finally:
+        db.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="module")
+def client(dataset):
+    return TestClient(app)
+
+
+def headers_para(cpf):
+    return {"Authorization": f"Bearer {criar_access_token(data={'sub': cpf})}"}
+
+
+def principal(cpf="123.456.789-09", id=1):
+    return UsuarioPrincipal(id=id, cpf=cpf, nome="Teste", tipo=TipoUsuario.ADMIN, empresa_id=1, ativo=True)
+
+
+class TestCachePrincipais:
+
+    def test_expira_pelo_ttl(self, monkeypatch):
+        cache = CachePrincipais(ttl_segundos=30, tamanho_maximo=10)
+        cache.armazenar("cpf", 1, principal())
+        assert cache.obter("cpf", 1) is not None
+
+        agora = time.monotonic()
+        monkeypatch.setattr("app.auth.time.monotonic", lambda: agora + 31)
+        assert cache.obter("cpf", 1) is None
+        assert len(cache) == 0
+
+    def test_limite_de_tamanho_descarta_menos_recente(self):
+        cache = CachePrincipais(ttl_segundos=30, tamanho_maximo=2)
+        cache.armazenar("a", 1, principal("a"))
+        cache.armazenar("b", 1, principal("b"))
+        cache.obter("a", 1)
+        cache.armazenar("c", 1, principal("c"))
+
+        assert cache.obter("b", 1) is None
+        assert cache.obter("a", 1) is not None
+        assert cache.obter("c", 1) is not None
+
+    def test_invalidar_remove_todos_os_tokens_do_cpf(self):
+        cache = CachePrincipais(ttl_segundos=30, tamanho_maximo=10)
+        cache.armazenar("a", 1, principal("a"))
+        cache.armazenar("a", 2, principal("a"))
+        cache.armazenar("b", 1, principal("b"))
+        cache.invalidar("a")
+
+        assert cache.obter("a", 1) is None
+        assert cache.obter("a", 2) is None
+        assert cache.obter("b", 1) is not None
+
+
+class TestUsuarioAtualEmCache:
+
+    def test_segunda_requisicao_nao_consulta_usuario(self, client, dataset, query_counter):
+        headers = headers_para(dataset.admin_cpf)
+        _, primeira = query_counter.measure(client, "GET", "/api/dashboard/avancado", headers=headers)
+        _, segunda = query_counter.measure(client, "GET", "/api/dashboard/avancado", headers=headers)
+
+        assert primeira.status_code == segunda.status_code == 200
+        assert segunda.queries == primeira.queries - 1
+        assert not any("FROM usuarios" in sql for sql in segunda.statements)
+
+    def test_principal_nao_e_objeto_orm(self, client, dataset):
+        client.get("/api/dashboard/avancado", headers=headers_para(dataset.admin_cpf))
+        entradas = [p for _, p in cache_principais._entradas.values()]
+        assert entradas
+        assert all(isinstance(p, UsuarioPrincipal) and not isinstance(p, Usuario) for p in entradas)
+
+    def test_me_retorna_dados_completos(self, client, dataset):
+        response = client.get("/api/auth/me", headers=headers_para(dataset.admin_cpf))
+        assert response.status_code == 200
+        assert response.json()["email"] == "admin@sintetica.com"
+
+    def test_desativacao_invalida_cache(self, client, dataset):
+        headers_admin = headers_para(dataset.admin_cpf)
+        cpf_promoter = dataset.promoter_cpfs[0]
+        headers_promoter = headers_para(cpf_promoter)
+
+        assert client.get("/api/dashboard/avancado", headers=headers_promoter).status_code == 200
+
+        db = TestingSessionLocal()
+        promoter_id = db.query(Usuario.id).filter(Usuario.cpf == cpf_promoter).scalar()
+        db.close()
+        assert client.delete(f"/api/usuarios/{promoter_id}", headers=headers_admin).status_code == 200
+
+        response = client.get("/api/dashboard/avancado", headers=headers_promoter)
+        assert response.status_code == 401
+        assert response.json()["detail"] == "Usuário inativo"
+
+    def test_atualizacao_invalida_cache(self, client, dataset):
+        headers_admin = headers_para(dataset.admin_cpf)
+        cpf_promoter = dataset.promoter_cpfs[1]
+        headers_promoter = headers_para(cpf_promoter)
+
+        assert client.get("/api/usuarios/", headers=headers_promoter).status_code == 200
+
+        db = TestingSessionLocal()
+        promoter = db.query(Usuario).filter(Usuario.cpf == cpf_promoter).first()
+        dados = {
+            "cpf": gerar_cpf(777),
+            "nome": promoter.nome,
+            "email": promoter.email,
+            "telefone": promoter.telefone,
+            "tipo": TipoUsuario.PROMOTER.value,
+            "senha": "novaSenha123",
+            "empresa_id": promoter.empresa_id
+        }
+        promoter_id = promoter.id
+        db.close()
+
+        response = client.put(f"/api/usuarios/{promoter_id}", json=dados, headers=headers_admin)
+        assert response.status_code == 200
+        assert client.get("/api/usuarios/", headers=headers_promoter).status_code == 401
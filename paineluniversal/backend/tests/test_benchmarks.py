@@ -0,0 +1,92 @@
+import json
+
+import pytest
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import create_engine, inspect
+
+from app.main import app
+from app.database import Base, get_db
+from app.auth import criar_access_token
+from app.prontidao import revisao_esperada
+from benchmarks.alvos import AlvoInProcess
+from benchmarks.estatisticas import percentil
+from benchmarks.runner import executar_cenarios, montar_relatorio, comparar
+from .conftest import engine, TestingSessionLocal, override_get_db
+from benchmarks.synthetic import recriar_esquema, seed_dataset
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    app.dependency_overrides[get_db] = override_get_db
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    try:
+        yield seed_dataset(
+            db, eventos=2, listas_por_evento=2, transacoes_por_lista=10,
+            produtos_por_evento=3, vendas_por_evento=1, comandas_por_evento=3
+        )
+    finally:
+        db.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+class TestBenchmarks:
+
+    def test_percentil(self):
+        valores = [float(v) for v in range(1, 101)]
+        assert percentil(valores, 50) == pytest.approx(50.5)
+        assert percentil(valores, 99) == pytest.approx(99.01)
+        assert percentil([], 95) is None
+
+    def test_esquema_recriado_pelas_migracoes(self, tmp_path):
+        url = f"sqlite:///{tmp_path / 'benchmark.db'}"
+        engine_benchmark = create_engine(url)
+        try:
+            for _ in range(2):
+                recriar_esquema(engine_benchmark, url)
+
+            with engine_benchmark.connect() as conexao:
+                assert MigrationContext.configure(conexao).get_current_revision() == revisao_esperada()
+            assert set(Base.metadata.tables) <= set(inspect(engine_benchmark).get_table_names())
+        finally:
+            engine_benchmark.dispose()
+
+    def test_door_rush_e_bar_rush_in_process(self, dataset):
+        headers = {"Authorization": f"Bearer {criar_access_token(data={'sub': dataset.admin_cpf})}"}
+        opcoes = {
+            "door_rush": {"concorrencia": 4},
+            "bar_rush": {"concorrencia": 4, "vendas": 12, "ouvintes_por_evento": 1}
+        }
+
+        with AlvoInProcess(app) as alvo:
+            resultados = executar_cenarios(
+                alvo, dataset, headers, ["door_rush", "bar_rush"], engine=engine, opcoes=opcoes
+            )
+
+        door_rush = resultados["door_rush"]
+        assert door_rush["taxa_erro"] == 0.0, door_rush["status"]
+        assert door_rush["status"]["200"] == len(dataset.qr_codes)
+        assert door_rush["consultas_sql"]["total"] > 0
+
+        bar_rush = resultados["bar_rush"]
+        assert bar_rush["taxa_erro"] == 0.0, bar_rush["status"]
+        assert bar_rush["latencia_ms"]["p99"] >= bar_rush["latencia_ms"]["p50"]
+        assert bar_rush["websocket"]["mensagens_recebidas"] > 0
+        assert not bar_rush["websocket"]["erros"]
+
+        relatorio = json.loads(json.dumps(montar_relatorio(resultados, AlvoInProcess.modo, engine, dataset)))
+        assert set(relatorio["cenarios"]) == {"door_rush", "bar_rush"}
+        assert len(comparar(relatorio, relatorio)) > 1
+
+    def test_bar_rush_acima_do_pool_de_conexoes(self, dataset):
+        """Mais requisições simultâneas que conexões no pool (5 + 10 de overflow): a espera
+        por conexão não pode acontecer no event loop"""
+        headers = {"Authorization": f"Bearer {criar_access_token(data={'sub': dataset.admin_cpf})}"}
+        opcoes = {"bar_rush": {"concorrencia": 32, "vendas": 64, "ouvintes_por_evento": 2}}
+
+        with AlvoInProcess(app) as alvo:
+            bar_rush = executar_cenarios(alvo, dataset, headers, ["bar_rush"], engine=engine, opcoes=opcoes)["bar_rush"]
+
+        assert bar_rush["taxa_erro"] == 0.0, bar_rush["status"]
+        assert bar_rush["latencia_ms"]["p50"] < 5000, bar_rush["latencia_ms"]
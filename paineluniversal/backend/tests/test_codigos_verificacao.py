@@ -0,0 +1,153 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.auth import gerar_hash_senha
+from app.models import Usuario, Empresa, TipoUsuario, CodigoVerificacao
+from app.services import codigo_verificacao_service
+from app.services.codigo_verificacao_service import (
+    ArmazenamentoCodigosMemoria, ArmazenamentoCodigosBanco, ResultadoCodigo
+)
+from .conftest import TestingSessionLocal
+
+CPF = "52998224725"
+
+
+@pytest.fixture
+def modulos_sessao_local():
+    return (codigo_verificacao_service,)
+
+
+class TestArmazenamentoMemoria:
+
+    def test_codigo_valido_uma_unica_vez(self):
+        codigos = ArmazenamentoCodigosMemoria(ttl_segundos=60, max_tentativas=3, tamanho_maximo=10)
+        codigos.salvar(None, CPF, "123456")
+        assert codigos.verificar(None, CPF, "123456") == ResultadoCodigo.VALIDO
+        assert codigos.verificar(None, CPF, "123456") == ResultadoCodigo.INVALIDO
+
+    def test_expira_pelo_ttl(self, monkeypatch):
+        codigos = ArmazenamentoCodigosMemoria(ttl_segundos=60, max_tentativas=3, tamanho_maximo=10)
+        codigos.salvar(None, CPF, "123456")
+        agora = time.monotonic()
+        monkeypatch.setattr(codigo_verificacao_service.time, "monotonic", lambda: agora + 61)
+        assert codigos.verificar(None, CPF, "123456") == ResultadoCodigo.INVALIDO
+        assert len(codigos) == 0
+
+    def test_esgota_tentativas(self):
+        codigos = ArmazenamentoCodigosMemoria(ttl_segundos=60, max_tentativas=3, tamanho_maximo=10)
+        codigos.salvar(None, CPF, "123456")
+        assert codigos.verificar(None, CPF, "000000") == ResultadoCodigo.INVALIDO
+        assert codigos.verificar(None, CPF, "000000") == ResultadoCodigo.INVALIDO
+        assert codigos.verificar(None, CPF, "000000") == ResultadoCodigo.TENTATIVAS_ESGOTADAS
+        assert codigos.verificar(None, CPF, "123456") == ResultadoCodigo.INVALIDO
+
+    def test_limite_de_tamanho_e_expirados_removidos_ao_salvar(self, monkeypatch):
+        codigos = ArmazenamentoCodigosMemoria(ttl_segundos=60, max_tentativas=3, tamanho_maximo=2)
+        for indice in range(3):
+            codigos.salvar(None, f"cpf{indice}", "111111")
+        assert len(codigos) == 2
+        assert codigos.verificar(None, "cpf0", "111111") == ResultadoCodigo.INVALIDO
+
+        agora = time.monotonic()
+        monkeypatch.setattr(codigo_verificacao_service.time, "monotonic", lambda: agora + 61)
+        codigos.salvar(None, "novo", "222222")
+        assert len(codigos) == 1
+
+
+class TestArmazenamentoBanco:
+
+    def test_compartilhado_entre_workers(self, db):
+        worker_a = ArmazenamentoCodigosBanco(ttl_segundos=60, max_tentativas=3)
+        worker_b = ArmazenamentoCodigosBanco(ttl_segundos=60, max_tentativas=3)
+        worker_a.salvar(db, CPF, "123456")
+
+        outra_sessao = TestingSessionLocal()
+        try:
+            assert worker_b.verificar(outra_sessao, CPF, "123456") == ResultadoCodigo.VALIDO
+        finally:
+            outra_sessao.close()
+        assert db.query(CodigoVerificacao).count() == 0
+
+    def test_codigo_nao_fica_em_texto_plano(self, db):
+        ArmazenamentoCodigosBanco(ttl_segundos=60, max_tentativas=3).salvar(db, CPF, "123456")
+        assert db.query(CodigoVerificacao).one().codigo_hash != "123456"
+
+    def test_esgota_tentativas(self, db):
+        codigos = ArmazenamentoCodigosBanco(ttl_segundos=60, max_tentativas=2)
+        codigos.salvar(db, CPF, "123456")
+        assert codigos.verificar(db, CPF, "000000") == ResultadoCodigo.INVALIDO
+        assert codigos.verificar(db, CPF, "000000") == ResultadoCodigo.TENTATIVAS_ESGOTADAS
+        assert codigos.verificar(db, CPF, "123456") == ResultadoCodigo.INVALIDO
+
+    def test_expirado_e_invalido_e_removido(self, db):
+        codigos = ArmazenamentoCodigosBanco(ttl_segundos=-1, max_tentativas=3)
+        codigos.salvar(db, CPF, "123456")
+        assert codigos.verificar(db, CPF, "123456") == ResultadoCodigo.INVALIDO
+        assert db.query(CodigoVerificacao).count() == 0
+
+    def test_novo_codigo_substitui_o_anterior_de_outro_worker(self, db):
+        worker_a = ArmazenamentoCodigosBanco(ttl_segundos=60, max_tentativas=3)
+        worker_b = ArmazenamentoCodigosBanco(ttl_segundos=60, max_tentativas=3)
+        worker_a.salvar(db, CPF, "111111")
+        assert worker_a.verificar(db, CPF, "000000") == ResultadoCodigo.INVALIDO
+
+        outra_sessao = TestingSessionLocal()
+        try:
+            worker_b.salvar(outra_sessao, CPF, "222222")
+        finally:
+            outra_sessao.close()
+
+        registro = db.query(CodigoVerificacao).one()
+        db.refresh(registro)
+        assert registro.tentativas == 0
+        assert worker_a.verificar(db, CPF, "111111") == ResultadoCodigo.INVALIDO
+        assert worker_a.verificar(db, CPF, "222222") == ResultadoCodigo.VALIDO
+
+    def test_expirados_removidos_pelo_job_e_nao_ao_salvar(self, db):
+        ArmazenamentoCodigosBanco(ttl_segundos=-1, max_tentativas=3).salvar(db, "expirado", "111111")
+        codigos = ArmazenamentoCodigosBanco(ttl_segundos=60, max_tentativas=3)
+        codigos.salvar(db, CPF, "123456")
+        assert db.query(CodigoVerificacao).count() == 2
+
+        assert asyncio.run(codigos.limpar_expirados()) == 1
+
+        assert [cpf for cpf, in db.query(CodigoVerificacao.cpf)] == [CPF]
+
+
+class TestLoginDuasEtapas:
+
+    @pytest.fixture
+    def client(self, db, monkeypatch):
+        empresa = Empresa(nome="Empresa Login", cnpj="11222333000181", email="login@teste.com")
+        db.add(empresa)
+        db.commit()
+        db.add(Usuario(
+            cpf=CPF, nome="Operador", email="operador@teste.com",
+            senha_hash=gerar_hash_senha("senha123"), tipo=TipoUsuario.PROMOTER,
+            empresa_id=empresa.id, ativo=True
+        ))
+        db.commit()
+        monkeypatch.setattr(
+            "app.routers.auth.codigos_verificacao",
+            ArmazenamentoCodigosBanco(ttl_segundos=60, max_tentativas=2)
+        )
+        return TestClient(app)
+
+    def test_login_completo(self, client):
+        primeira = client.post("/api/auth/login", json={"cpf": CPF, "senha": "senha123"})
+        assert primeira.status_code == 202
+        codigo = primeira.json()["detail"].rsplit(" ", 1)[-1]
+
+        segunda = client.post("/api/auth/login", json={"cpf": CPF, "senha": "senha123", "codigo_verificacao": codigo})
+        assert segunda.status_code == 200
+        assert segunda.json()["access_token"]
+
+    def test_tentativas_esgotadas(self, client):
+        client.post("/api/auth/login", json={"cpf": CPF, "senha": "senha123"})
+        dados = {"cpf": CPF, "senha": "senha123", "codigo_verificacao": "xxxxxx"}
+        assert client.post("/api/auth/login", json=dados).status_code == 401
+        assert client.post("/api/auth/login", json=dados).status_code == 429
@@ -0,0 +1,89 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.database import Base, get_db
+from app.auth import ExecutorSenhas, senhas_duracao, senhas_rejeitadas, gerar_hash_senha
+from app.models import Usuario, Empresa, TipoUsuario
+from .conftest import engine, TestingSessionLocal, override_get_db
+
+
+class TestExecutorSenhas:
+
+    def test_executa_fora_do_event_loop(self):
+        executor = ExecutorSenhas(max_workers=1, max_fila=0)
+
+        async def cenario():
+            return threading.get_ident(), await executor.executar("hash", threading.get_ident)
+
+        thread_loop, thread_hash = asyncio.run(cenario())
+        assert thread_loop != thread_hash
+
+    def test_registra_latencia(self):
+        executor = ExecutorSenhas(max_workers=1, max_fila=0)
+        antes = senhas_duracao.contagem(operacao="hash")
+        resultado = asyncio.run(executor.executar("hash", gerar_hash_senha, "senha123"))
+        assert resultado.startswith("$2")
+        assert senhas_duracao.contagem(operacao="hash") == antes + 1
+
+    def test_saturado_falha_rapido(self):
+        executor = ExecutorSenhas(max_workers=1, max_fila=1)
+        liberar = threading.Event()
+        rejeitadas_antes = senhas_rejeitadas.valor(operacao="verificar")
+
+        async def cenario():
+            ocupadas = [
+                asyncio.ensure_future(executor.executar("verificar", liberar.wait, 5))
+                for _ in range(2)
+            ]
+            await asyncio.sleep(0.05)
+            assert executor.aguardando() == 1
+            with pytest.raises(HTTPException) as erro:
+                await executor.executar("verificar", liberar.wait, 5)
+            liberar.set()
+            await asyncio.gather(*ocupadas)
+            return erro.value
+
+        erro = asyncio.run(cenario())
+        assert erro.status_code == 503
+        assert erro.headers["Retry-After"] == "1"
+        assert senhas_rejeitadas.valor(operacao="verificar") == rejeitadas_antes + 1
+        assert executor.aguardando() == 0
+
+
+class TestLoginComExecutor:
+
+    @pytest.fixture
+    def usuario(self):
+        app.dependency_overrides[get_db] = override_get_db
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        db = TestingSessionLocal()
+        empresa = Empresa(nome="Empresa Senhas", cnpj="11222333000181", email="senhas@teste.com")
+        db.add(empresa)
+        db.commit()
+        usuario = Usuario(
+            cpf="52998224725", nome="Operador", email="operador@teste.com",
+            senha_hash=gerar_hash_senha("senha123"), tipo=TipoUsuario.PROMOTER,
+            empresa_id=empresa.id, ativo=True
+        )
+        db.add(usuario)
+        db.commit()
+        db.close()
+        yield usuario
+        Base.metadata.drop_all(bind=engine)
+
+    def test_login_verifica_senha_no_executor(self, usuario):
+        client = TestClient(app)
+        antes = senhas_duracao.contagem(operacao="verificar")
+
+        errada = client.post("/api/auth/login", json={"cpf": "52998224725", "senha": "errada"})
+        certa = client.post("/api/auth/login", json={"cpf": "52998224725", "senha": "senha123"})
+
+        assert errada.status_code == 401
+        assert certa.status_code == 202
+        assert senhas_duracao.contagem(operacao="verificar") == antes + 2
@@ -0,0 +1,126 @@
+import asyncio
+import time
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect
+
+from app import database, prontidao
+from app.main import app
+from app.models import Base
+from app.prontidao import ProntidaoBanco, revisao_esperada
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+
+def config_alembic(url: str) -> Config:
+    config = Config(str(BACKEND / "alembic.ini"))
+    config.set_main_option("sqlalchemy.url", url)
+    config.attributes["configurar_logs"] = False
+    return config
+
+
+@pytest.fixture
+def banco(tmp_path, monkeypatch):
+    """Aponta o engine da aplicação para um SQLite novo, sem tabelas"""
+    url = f"sqlite:///{tmp_path / 'prontidao.db'}"
+    engine = create_engine(url)
+    monkeypatch.setattr(database, "engine", engine)
+    monkeypatch.setattr(prontidao, "prontidao_banco", ProntidaoBanco(timeout_segundos=2))
+    monkeypatch.setattr("app.main.prontidao_banco", prontidao.prontidao_banco)
+    yield url, engine
+    engine.dispose()
+
+
+class TestMigracoes:
+
+    def test_upgrade_cria_o_esquema_dos_modelos(self, banco):
+        url, engine = banco
+
+        command.upgrade(config_alembic(url), "head")
+
+        tabelas = set(inspect(engine).get_table_names())
+        assert set(Base.metadata.tables) <= tabelas
+        command.check(config_alembic(url))
+
+    def test_chaves_estrangeiras_com_o_tipo_da_coluna_referenciada(self):
+        """O PostgreSQL recusa FK entre tipos diferentes (ex.: String -> Integer)"""
+        divergentes = [
+            f"{fk.parent.table.name}.{fk.parent.name}"
+            for tabela in Base.metadata.tables.values()
+            for fk in tabela.foreign_keys
+            if fk.parent.type._type_affinity is not fk.column.type._type_affinity
+        ]
+        assert divergentes == []
+
+    def test_downgrade_remove_o_esquema(self, banco):
+        url, engine = banco
+        command.upgrade(config_alembic(url), "head")
+
+        command.downgrade(config_alembic(url), "base")
+
+        assert set(inspect(engine).get_table_names()) == {"alembic_version"}
+
+
+class TestHealthz:
+
+    def test_liveness_nao_toca_o_banco(self, banco, monkeypatch):
+        def falhar(*args, **kwargs):
+            raise AssertionError("liveness abriu conexão com o banco")
+        monkeypatch.setattr(database.engine, "connect", falhar)
+        client = TestClient(app)
+
+        for rota in ("/healthz", "/healthz/live"):
+            response = client.get(rota)
+            assert response.status_code == 200
+            assert response.json()["status"] == "ok"
+
+    def test_readiness_com_esquema_migrado(self, banco):
+        url, _ = banco
+        command.upgrade(config_alembic(url), "head")
+
+        response = TestClient(app).get("/healthz/ready")
+
+        assert response.status_code == 200
+        corpo = response.json()
+        assert corpo["status"] == "pronto"
+        assert corpo["revisao"] == corpo["revisao_esperada"] == revisao_esperada()
+        assert "pool" in corpo
+
+    def test_readiness_com_migracoes_pendentes(self, banco):
+        response = TestClient(app).get("/healthz/ready")
+
+        assert response.status_code == 503
+        corpo = response.json()
+        assert (corpo["banco"], corpo["revisao"]) == ("ok", None)
+        assert "alembic upgrade head" in corpo["erro"]
+
+    def test_readiness_com_banco_inacessivel(self, banco, tmp_path, monkeypatch):
+        monkeypatch.setattr(database, "engine", create_engine(f"sqlite:///{tmp_path / 'nao' / 'existe.db'}"))
+
+        response = TestClient(app).get("/healthz/ready")
+
+        assert response.status_code == 503
+        assert response.json()["banco"] == "indisponivel"
+
+    def test_banco_travado_responde_no_timeout_sem_acumular_checagens(self, banco, monkeypatch):
+        chamadas = []
+
+        def travar():
+            chamadas.append(1)
+            time.sleep(0.5)
+            return {}
+        checagem = ProntidaoBanco(timeout_segundos=0.05)
+        monkeypatch.setattr(checagem, "_checar", travar)
+
+        async def cenario():
+            return await asyncio.gather(*(checagem.verificar() for _ in range(5)))
+
+        resultados = asyncio.run(cenario())
+
+        assert [pronto for pronto, _ in resultados] == [False] * 5
+        assert resultados[0][1]["erro"] == "sem resposta em 0.05s"
+        assert len(chamadas) == 1
@@ -0,0 +1,124 @@
+import asyncio
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.http_client import ClienteHTTP, cliente_http, requisicoes_http
+
+
+def criar_cliente(**opcoes):
+    parametros = dict(limite_conexoes=10, limite_por_host=4, keepalive_segundos=30,
+                      timeout_segundos=2, timeout_conexao_segundos=1,
+                      tentativas=3, backoff_segundos=0.001)
+    parametros.update(opcoes)
+    return ClienteHTTP(**parametros)
+
+
+class Servidor:
+    """Servidor HTTP local que registra as conexões usadas e responde conforme o roteiro"""
+
+    def __init__(self):
+        self.conexoes = set()
+        self.chamadas = 0
+        self.em_andamento = 0
+        self.max_em_andamento = 0
+        self.roteiro = []
+        self.atraso = 0
+
+    async def tratar(self, request):
+        self.conexoes.add(request.transport.get_extra_info("peername"))
+        self.chamadas += 1
+        self.em_andamento += 1
+        self.max_em_andamento = max(self.max_em_andamento, self.em_andamento)
+        try:
+            if self.atraso:
+                await asyncio.sleep(self.atraso)
+            status = self.roteiro.pop(0) if self.roteiro else 200
+            return web.json_response({"ok": status == 200}, status=status)
+        finally:
+            self.em_andamento -= 1
+
+
+def com_servidor(cenario):
+    async def rodar():
+        servidor = Servidor()
+        aplicacao = web.Application()
+        aplicacao.router.add_route("*", "/{caminho:.*}", servidor.tratar)
+        async with TestServer(aplicacao) as teste:
+            await cenario(servidor, str(teste.make_url("/health")))
+
+    asyncio.run(rodar())
+
+
+class TestClienteHTTP:
+
+    def test_reutiliza_conexao_keep_alive(self):
+        async def cenario(servidor, url):
+            cliente = criar_cliente()
+            for _ in range(5):
+                resposta = await cliente.get(url, integracao="teste")
+                assert resposta.status == 200
+                assert resposta.json() == {"ok": True}
+            await cliente.parar()
+            assert servidor.chamadas == 5
+            assert len(servidor.conexoes) == 1
+
+        com_servidor(cenario)
+
+    def test_repete_get_em_503(self):
+        async def cenario(servidor, url):
+            cliente = criar_cliente()
+            servidor.roteiro = [503, 503]
+            antes = requisicoes_http.valor(integracao="teste_retry", resultado="retentativa")
+            resposta = await cliente.get(url, integracao="teste_retry")
+            await cliente.parar()
+            assert resposta.status == 200
+            assert servidor.chamadas == 3
+            assert requisicoes_http.valor(integracao="teste_retry", resultado="retentativa") == antes + 2
+
+        com_servidor(cenario)
+
+    def test_post_nao_e_repetido_por_padrao(self):
+        async def cenario(servidor, url):
+            cliente = criar_cliente()
+            servidor.roteiro = [503]
+            resposta = await cliente.post(url, integracao="teste", json={"a": 1})
+            await cliente.parar()
+            assert resposta.status == 503
+            assert servidor.chamadas == 1
+
+        com_servidor(cenario)
+
+    def test_timeout_vira_client_error(self):
+        async def cenario(servidor, url):
+            cliente = criar_cliente(tentativas=1)
+            servidor.atraso = 0.5
+            antes = requisicoes_http.valor(integracao="teste_timeout", resultado="timeout")
+            with pytest.raises(aiohttp.ClientError):
+                await cliente.get(url, integracao="teste_timeout", timeout=0.05)
+            await cliente.parar()
+            assert requisicoes_http.valor(integracao="teste_timeout", resultado="timeout") == antes + 1
+
+        com_servidor(cenario)
+
+    def test_limite_de_conexoes_por_host(self):
+        async def cenario(servidor, url):
+            cliente = criar_cliente(limite_por_host=2)
+            servidor.atraso = 0.05
+            respostas = await asyncio.gather(*(cliente.get(url, integracao="teste") for _ in range(6)))
+            await cliente.parar()
+            assert all(resposta.status == 200 for resposta in respostas)
+            assert servidor.max_em_andamento == 2
+
+        com_servidor(cenario)
+
+    def test_lifespan_abre_e_fecha_sessao(self):
+        with TestClient(app):
+            sessao = cliente_http._sessao
+            assert sessao is not None and not sessao.closed
+        assert sessao.closed
+        assert cliente_http._sessao is None
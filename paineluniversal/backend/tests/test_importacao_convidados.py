@@ -0,0 +1,149 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from openpyxl import Workbook
+
+from app.main import app
+from app.database import settings
+from app.models import Lista, Transacao, StatusTransacao
+from app.services import importacao
+from .conftest import engine
+from .query_counter import QueryCounter
+from benchmarks.synthetic import gerar_cpf
+
+
+@pytest.fixture
+def modulos_sessao_local():
+    return (importacao,)
+
+
+def enviar(client, headers, lista_id, conteudo, nome="convidados.csv"):
+    return client.post(f"/api/listas/{lista_id}/convidados/import", headers=headers,
+                       files={"file": (nome, conteudo.encode(), "text/csv")})
+
+
+class TestImportacaoConvidados:
+
+    def test_valida_deduplica_e_atualiza_vendas(self, cenario, db):
+        dataset, headers = cenario
+        lista_id = dataset.lista_ids[0]
+        vendas_antes = db.get(Lista, lista_id).vendas_realizadas
+        ja_no_evento = db.query(Transacao.cpf_comprador).filter(Transacao.lista_id == lista_id).first()[0]
+        conteudo = "\n".join([
+            "Nome;CPF;Email;Telefone",
+            f"Ana;{gerar_cpf(500001)};ana@x.com;11999990000",
+            f"Bruno;{gerar_cpf(500002).replace('.', '').replace('-', '')};;",
+            "Carla;123;;",
+            f"Ana de novo;{gerar_cpf(500001)};;",
+            f"Já cadastrado;{ja_no_evento};;",
+            f";{gerar_cpf(500003)};;",
+        ]) + "\n"
+
+        response = enviar(TestClient(app), headers, lista_id, conteudo)
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "convidados_criados": 2,
+            "total_linhas": 6,
+            "erros": [
+                "Linha 4: CPF inválido",
+                f"Linha 5: CPF {gerar_cpf(500001)} repetido no arquivo",
+                f"Linha 6: CPF {ja_no_evento} já cadastrado no evento",
+                "Linha 7: Nome obrigatório",
+            ]
+        }
+        db.expire_all()
+        assert db.get(Lista, lista_id).vendas_realizadas == vendas_antes + 2
+        bruno = db.query(Transacao).filter(Transacao.cpf_comprador == gerar_cpf(500002)).one()
+        assert bruno.status == StatusTransacao.APROVADA
+        assert bruno.email_comprador is None
+        assert bruno.qr_code_ticket.startswith("TICKET-")
+
+    def test_lista_grande_com_consultas_constantes(self, cenario, db):
+        dataset, headers = cenario
+        lista_id = dataset.lista_ids[0]
+        conteudo = "nome,cpf\n" + "".join(f"Convidado {n},{gerar_cpf(600000 + n)}\n" for n in range(20000))
+
+        with QueryCounter(engine) as contador:
+            inicio = time.perf_counter()
+            response = enviar(TestClient(app), headers, lista_id, conteudo)
+            duracao = time.perf_counter() - inicio
+
+        assert response.status_code == 200
+        assert response.json()["convidados_criados"] == 20000
+        assert db.query(Transacao).filter(Transacao.lista_id == lista_id).count() == 20002
+        consultas_transacoes = [sql for sql in contador.statements if "transacoes" in sql.lower()]
+        assert sum(1 for sql in consultas_transacoes if sql.lstrip().upper().startswith("SELECT")) == 1
+        assert duracao < 10
+
+    def test_formato_e_colunas(self, cenario):
+        dataset, headers = cenario
+        client = TestClient(app)
+
+        response = enviar(client, headers, dataset.lista_ids[0], "nome,cpf\n", nome="convidados.txt")
+        assert response.status_code == 400
+
+        response = enviar(client, headers, dataset.lista_ids[0], "nome,telefone\nAna,1\n")
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Colunas obrigatórias ausentes: cpf"
+
+
+class TestImportacaoEmLotes:
+
+    @pytest.fixture(autouse=True)
+    def configurar(self, monkeypatch):
+        monkeypatch.setattr(settings, "importacao_tamanho_lote", 100)
+
+    def acompanhar(self, client, headers, lista_id, importacao_id):
+        for _ in range(500):
+            status = client.get(f"/api/listas/{lista_id}/convidados/importacoes/{importacao_id}",
+                                headers=headers).json()
+            if status["status"] != "processando":
+                return status
+            time.sleep(0.02)
+        raise AssertionError("importação não terminou")
+
+    def test_csv_em_lotes_com_progresso(self, cenario, db):
+        dataset, headers = cenario
+        lista_id = dataset.lista_ids[0]
+        vendas_antes = db.get(Lista, lista_id).vendas_realizadas
+        linhas = [f"Convidado {n},{gerar_cpf(700000 + n)}" for n in range(1000)]
+        linhas[150] = "Repetido entre lotes," + gerar_cpf(700010)
+        linhas[160] = "Repetido no lote," + gerar_cpf(700170)
+
+        with TestClient(app) as client:
+            response = client.post(f"/api/listas/{lista_id}/convidados/importacoes", headers=headers,
+                                   files={"file": ("convidados.csv", ("nome,cpf\n" + "\n".join(linhas)).encode())})
+            assert response.status_code == 202
+            status = self.acompanhar(client, headers, lista_id, response.json()["id"])
+
+        assert status["status"] == "concluida"
+        assert (status["linhas_processadas"], status["criados"], status["total_erros"]) == (1000, 998, 2)
+        assert status["erros"] == [
+            {"linha": 152, "erro": f"CPF {gerar_cpf(700010)} já cadastrado no evento"},
+            {"linha": 172, "erro": f"CPF {gerar_cpf(700170)} repetido no arquivo"},
+        ]
+        db.expire_all()
+        assert db.get(Lista, lista_id).vendas_realizadas == vendas_antes + 998
+
+    def test_xlsx_e_status_de_outra_lista(self, cenario, db, tmp_path):
+        dataset, headers = cenario
+        lista_id = dataset.lista_ids[0]
+        planilha = Workbook()
+        planilha.active.append(["CPF", "Nome"])
+        for n in range(250):
+            planilha.active.append([gerar_cpf(800000 + n), f"Convidado {n}"])
+        caminho = tmp_path / "convidados.xlsx"
+        planilha.save(caminho)
+
+        with TestClient(app) as client:
+            response = client.post(f"/api/listas/{lista_id}/convidados/importacoes", headers=headers,
+                                   files={"file": ("convidados.xlsx", caminho.read_bytes())})
+            assert response.status_code == 202
+            importacao_id = response.json()["id"]
+            status = self.acompanhar(client, headers, lista_id, importacao_id)
+            outra = client.get(f"/api/listas/{lista_id + 1}/convidados/importacoes/{importacao_id}", headers=headers)
+
+        assert (status["status"], status["criados"]) == ("concluida", 250)
+        assert outra.status_code == 404
@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.database import settings
+from app.loop_monitor import MonitorEventLoop, lag_event_loop, bloqueios_event_loop
+
+
+def bloquear_event_loop(segundos):
+    time.sleep(segundos)
+
+
+class TestMonitorEventLoop:
+
+    def test_mede_lag_e_captura_pilha_do_bloqueio(self):
+        monitor = MonitorEventLoop(intervalo_ms=10, limite_ms=50, debug=True)
+        amostras_antes = lag_event_loop.contagem()
+        bloqueios_antes = bloqueios_event_loop.valor()
+
+        async def cenario():
+            monitor.iniciar()
+            await asyncio.sleep(0.05)
+            bloquear_event_loop(0.3)
+            await asyncio.sleep(0.05)
+            await monitor.parar()
+
+        asyncio.run(cenario())
+
+        assert lag_event_loop.contagem() > amostras_antes
+        assert bloqueios_event_loop.valor() == bloqueios_antes + 1
+        captura = monitor.listar_capturas()[0]
+        assert captura["bloqueado_ms"] >= 50
+        assert any("bloquear_event_loop" in linha for linha in captura["pilha"])
+
+    def test_sem_debug_nao_inicia_watchdog(self):
+        monitor = MonitorEventLoop(intervalo_ms=10, limite_ms=50, debug=False)
+
+        async def cenario():
+            monitor.iniciar()
+            bloquear_event_loop(0.1)
+            await asyncio.sleep(0.03)
+            await monitor.parar()
+
+        asyncio.run(cenario())
+        assert monitor.listar_capturas() == []
+
+    def test_lifespan_expoe_metrica(self, monkeypatch):
+        monkeypatch.setattr(settings, "metrics_token", "segredo")
+        with TestClient(app) as client:
+            time.sleep(0.3)
+            corpo = client.get("/metrics", headers={"Authorization": "Bearer segredo"}).text
+        assert "# TYPE event_loop_lag_seconds histogram" in corpo
+        assert "event_loop_lag_seconds_count" in corpo
@@ -0,0 +1,232 @@
+import os
+import random
+import time
+import uuid
+from datetime import date
+from functools import partial
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from openpyxl import Workbook
+from sqlalchemy.dialects import postgresql
+
+from app.main import app
+from app.database import settings
+from app.auth import validar_cpf_basico
+from app.models import Importacao, MeepClient, SexoMeepClient, StatusImportacao, StatusMeepClient
+from app.services import importacao
+from app.services.importacao import criar_importacao, normalizar_cpfs, processar_arquivo
+from app.services.meep_client_service import aplicar_campos_busca, processar_lote_clientes, upsert_clientes
+
+
+@pytest.fixture
+def modulos_sessao_local():
+    return (importacao,)
+
+
+def gerar_cpf(base: int) -> str:
+    digitos = [int(d) for d in f"{base:09d}"]
+    for pesos in (range(10, 1, -1), range(11, 1, -1)):
+        resto = sum(d * p for d, p in zip(digitos, pesos)) % 11
+        digitos.append(0 if resto < 2 else 11 - resto)
+    return "".join(map(str, digitos))
+
+
+def escrever_csv(caminho, linhas, separador=","):
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        arquivo.write("\n".join(separador.join(linha) for linha in linhas) + "\n")
+    return str(caminho)
+
+
+def importar(db, dataset, caminho):
+    registro = criar_importacao(db, "meep_clients", dataset.empresa_id, None, os.path.basename(caminho))
+    processar_arquivo(registro.id, caminho, partial(processar_lote_clientes, dataset.empresa_id, set()))
+    db.expire_all()
+    return db.get(Importacao, registro.id)
+
+
+class TestNormalizacaoCpfs:
+
+    def test_mesmo_resultado_da_validacao_basica(self):
+        rng = random.Random(7)
+        cpfs = [gerar_cpf(rng.randrange(10 ** 9)) for _ in range(200)]
+        cpfs += [cpf[:-1] + str((int(cpf[-1]) + 1) % 10) for cpf in cpfs[:50]]
+        cpfs += ["111.111.111-11", "123", "", "529.982.247-25", "abc"]
+
+        digitos, validos = normalizar_cpfs(pd.Series(cpfs))
+
+        assert validos.tolist() == [validar_cpf_basico(cpf) for cpf in cpfs]
+        assert digitos.iloc[-2] == "52998224725"
+
+    def test_completa_zeros_a_esquerda_perdidos(self):
+        cpf = gerar_cpf(1234567)
+        assert cpf.startswith("00")
+
+        digitos, validos = normalizar_cpfs(pd.Series([cpf.lstrip("0")]))
+
+        assert digitos.tolist() == [cpf]
+        assert validos.tolist() == [True]
+
+
+class TestProcessamentoArquivo:
+
+    def test_csv_cria_atualiza_e_registra_erros_por_linha(self, cenario, db, tmp_path, monkeypatch):
+        dataset, _ = cenario
+        monkeypatch.setattr(settings, "importacao_tamanho_lote", 3)
+        existente = MeepClient(id=str(uuid.uuid4()), nome="Antigo", cpf=gerar_cpf(1), empresa_id=dataset.empresa_id,
+                               telefone="1199999", status=StatusMeepClient.BLOQUEADO)
+        aplicar_campos_busca(existente)
+        db.add(existente)
+        db.commit()
+
+        caminho = escrever_csv(tmp_path / "clientes.csv", [
+            ["Nome", "CPF", "Email", "Data_Nascimento", "Sexo"],
+            ["José Conceição", gerar_cpf(1), "jose@x.com", "20/05/1990", "m"],
+            ["Maria", gerar_cpf(2), "", "", "F"],
+            ["", gerar_cpf(3), "", "", ""],
+            ["Sem CPF", "123", "", "", ""],
+            ["Repetida", gerar_cpf(2), "", "", ""],
+            ["Data ruim", gerar_cpf(4), "", "31/02/1990", ""],
+            ["Carla", gerar_cpf(5), "", "1985-01-02", ""],
+            ["Daniel", gerar_cpf(6), "", "06/05/1990", ""],
+        ], separador=";")
+
+        resultado = importar(db, dataset, caminho)
+
+        assert resultado.status == StatusImportacao.CONCLUIDA
+        assert (resultado.linhas_processadas, resultado.criados, resultado.atualizados) == (8, 3, 1)
+        assert resultado.total_erros == 4
+        assert importacao.importacao_para_dict(resultado)["erros"] == [
+            {"linha": 4, "erro": "Nome obrigatório"},
+            {"linha": 5, "erro": "CPF inválido"},
+            {"linha": 6, "erro": "CPF repetido no arquivo"},
+            {"linha": 7, "erro": "Data de nascimento inválida"},
+        ]
+        assert not os.path.exists(caminho)
+
+        db.refresh(existente)
+        assert (existente.nome, existente.nome_busca, existente.email) == ("José Conceição", "jose conceicao", "jose@x.com")
+        assert existente.telefone == "1199999"
+        assert existente.status == StatusMeepClient.BLOQUEADO
+        assert existente.data_nascimento == date(1990, 5, 20)
+        assert existente.sexo == SexoMeepClient.MASCULINO
+
+        maria = db.query(MeepClient).filter(MeepClient.cpf_normalizado == gerar_cpf(2)).one()
+        assert maria.sexo == SexoMeepClient.FEMININO
+        assert maria.email is None
+        nascimentos = dict(db.query(MeepClient.nome, MeepClient.data_nascimento).filter(
+            MeepClient.nome.in_(["Carla", "Daniel"])
+        ).all())
+        assert nascimentos == {"Carla": date(1985, 1, 2), "Daniel": date(1990, 5, 6)}
+
+    def test_xlsx_em_lotes(self, cenario, db, tmp_path, monkeypatch):
+        dataset, _ = cenario
+        monkeypatch.setattr(settings, "importacao_tamanho_lote", 50)
+        planilha = Workbook()
+        aba = planilha.active
+        aba.append(["nome", "cpf", "data_nascimento"])
+        for n in range(120):
+            aba.append([f"Cliente {n}", int(gerar_cpf(n + 12000000)), date(1990, 1, 1 + n % 28)])
+        aba.append([None, None, None])
+        caminho = str(tmp_path / "clientes.xlsx")
+        planilha.save(caminho)
+
+        resultado = importar(db, dataset, caminho)
+
+        assert resultado.status == StatusImportacao.CONCLUIDA
+        assert (resultado.linhas_processadas, resultado.criados, resultado.total_erros) == (120, 120, 0)
+        assert db.query(MeepClient).filter(MeepClient.empresa_id == dataset.empresa_id).count() == 120
+        cliente = db.query(MeepClient).filter(MeepClient.nome == "Cliente 4").one()
+        assert cliente.data_nascimento == date(1990, 1, 5)
+
+    def test_falha_marca_importacao(self, cenario, db, tmp_path):
+        dataset, _ = cenario
+        caminho = escrever_csv(tmp_path / "clientes.csv", [["nome", "cpf"], ["Ana", gerar_cpf(1)]])
+        registro = criar_importacao(db, "meep_clients", dataset.empresa_id, None, "clientes.csv")
+
+        def quebrar(db, lote, progresso):
+            raise RuntimeError("banco indisponível")
+
+        processar_arquivo(registro.id, caminho, quebrar)
+
+        db.expire_all()
+        resultado = db.get(Importacao, registro.id)
+        assert resultado.status == StatusImportacao.FALHOU
+        assert resultado.mensagem == "banco indisponível"
+        assert resultado.concluido_em is not None
+        assert not os.path.exists(caminho)
+
+
+class SessaoPostgres:
+    """Sessão falsa com dialeto PostgreSQL que guarda o SQL compilado"""
+
+    def __init__(self, retorno):
+        self.retorno = retorno
+        self.sql = []
+
+    def get_bind(self):
+        return SimpleNamespace(dialect=postgresql.dialect())
+
+    def execute(self, stmt, *args):
+        self.sql.append(str(stmt.compile(dialect=postgresql.dialect())))
+        return iter(self.retorno)
+
+
+class TestUpsertPostgres:
+
+    def test_upsert_em_um_insert_on_conflict(self):
+        registros = [
+            {"id": str(n), "empresa_id": 1, "nome": "Ana", "nome_busca": "ana", "cpf": None,
+             "cpf_normalizado": gerar_cpf(n), "identificador": None, "telefone": None, "email": None,
+             "data_nascimento": None, "sexo": None}
+            for n in range(3)
+        ]
+        sessao = SessaoPostgres([(True,), (False,), (True,)])
+
+        assert upsert_clientes(sessao, registros) == (2, 1)
+        assert len(sessao.sql) == 1
+        assert "ON CONFLICT (empresa_id, cpf_normalizado) DO UPDATE" in sessao.sql[0]
+        assert "coalesce(excluded.email, meep_clients.email)" in sessao.sql[0]
+        assert "status" not in sessao.sql[0].split("DO UPDATE")[1]
+        indice = next(i for i in MeepClient.__table__.indexes if i.name == "ux_meep_clients_empresa_cpf_normalizado")
+        assert indice.unique
+
+
+class TestRotaImportacao:
+
+    def test_upload_retorna_202_e_status_acompanha(self, cenario):
+        _, headers = cenario
+        conteudo = "nome,cpf\n" + "".join(f"Cliente {n},{gerar_cpf(n + 1)}\n" for n in range(30)) + "Ruim,1\n"
+
+        with TestClient(app) as client:
+            response = client.post("/api/meep-clients/import", headers=headers,
+                                   files={"file": ("clientes.csv", conteudo.encode(), "text/csv")})
+            assert response.status_code == 202
+            importacao_id = response.json()["id"]
+
+            for _ in range(200):
+                status = client.get(f"/api/meep-clients/import/{importacao_id}", headers=headers).json()
+                if status["status"] != "processando":
+                    break
+                time.sleep(0.02)
+
+        assert status["status"] == "concluida"
+        assert (status["criados"], status["total_erros"]) == (30, 1)
+        assert status["erros"] == [{"linha": 32, "erro": "CPF inválido"}]
+
+    def test_rejeita_formato_e_colunas_ausentes(self, cenario):
+        _, headers = cenario
+        client = TestClient(app)
+
+        response = client.post("/api/meep-clients/import", headers=headers,
+                               files={"file": ("clientes.txt", b"nome,cpf\n", "text/plain")})
+        assert response.status_code == 400
+
+        response = client.post("/api/meep-clients/import", headers=headers,
+                               files={"file": ("clientes.csv", b"nome,telefone\nAna,1\n", "text/csv")})
+        assert response.status_code == 400
+        assert "cpf" in response.json()["detail"]
+
+        assert client.get("/api/meep-clients/import/naoexiste", headers=headers).status_code == 404
@@ -0,0 +1,155 @@
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import ClientBlockHistory, Comanda, MeepClient, StatusMeepClient
+from app.services.meep_client_service import (
+    RestricoesClientes, SituacaoCliente, aplicar_campos_busca, restricoes_clientes
+)
+from .conftest import engine
+from .query_counter import QueryCounter
+from benchmarks.synthetic import gerar_cpf
+
+
+def criar_cliente(db, empresa_id, cpf, **campos):
+    cliente = MeepClient(id=str(uuid.uuid4()), nome="Cliente", cpf=cpf, empresa_id=empresa_id, **campos)
+    aplicar_campos_busca(cliente)
+    db.add(cliente)
+    db.commit()
+    return cliente
+
+
+def pode_atender(client, headers, **params):
+    response = client.get("/api/meep-clients/pode-atender", headers=headers, params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+class TestRestricoesClientes:
+
+    def test_checagem_sem_consulta_depois_da_carga(self, cenario, db):
+        dataset, _ = cenario
+        criar_cliente(db, dataset.empresa_id, gerar_cpf(1), status=StatusMeepClient.BLOQUEADO, identificador="PULSEIRA-1")
+        criar_cliente(db, dataset.empresa_id, gerar_cpf(2), has_alert=True)
+        criar_cliente(db, dataset.empresa_id, gerar_cpf(3))
+        restricoes = RestricoesClientes(ttl_segundos=60)
+
+        assert restricoes.situacao(db, dataset.empresa_id, cpf=gerar_cpf(3)) == SituacaoCliente.LIVRE
+        with QueryCounter(engine) as contador:
+            assert restricoes.situacao(db, dataset.empresa_id, cpf=gerar_cpf(1)) == SituacaoCliente.BLOQUEADO
+            assert restricoes.situacao(db, dataset.empresa_id, cpf=gerar_cpf(1).replace(".", "")) == SituacaoCliente.BLOQUEADO
+            assert restricoes.situacao(db, dataset.empresa_id, identificador="PULSEIRA-1") == SituacaoCliente.BLOQUEADO
+            assert restricoes.situacao(db, dataset.empresa_id, cpf=gerar_cpf(2)) == SituacaoCliente.ALERTA
+            assert restricoes.pode_atender(db, dataset.empresa_id, cpf=gerar_cpf(2))
+            assert not restricoes.pode_atender(db, dataset.empresa_id, cpf=gerar_cpf(2), identificador="PULSEIRA-1")
+            assert restricoes.situacao(db, dataset.empresa_id + 1, cpf=gerar_cpf(1)) == SituacaoCliente.LIVRE
+
+        assert len(contador.statements) == 1
+
+    def test_recarrega_apos_ttl(self, cenario, db):
+        dataset, _ = cenario
+        restricoes = RestricoesClientes(ttl_segundos=0)
+        assert restricoes.pode_atender(db, dataset.empresa_id, cpf=gerar_cpf(1))
+
+        criar_cliente(db, dataset.empresa_id, gerar_cpf(1), status=StatusMeepClient.BLOQUEADO)
+
+        assert not restricoes.pode_atender(db, dataset.empresa_id, cpf=gerar_cpf(1))
+
+    def test_atualizar_troca_chaves_do_cliente(self, cenario, db):
+        dataset, _ = cenario
+        cliente = criar_cliente(db, dataset.empresa_id, gerar_cpf(1), status=StatusMeepClient.BLOQUEADO,
+                                identificador="A")
+        restricoes = RestricoesClientes(ttl_segundos=60)
+        assert restricoes.situacao(db, dataset.empresa_id, identificador="A") == SituacaoCliente.BLOQUEADO
+
+        cliente.identificador = "B"
+        restricoes.atualizar(cliente)
+        assert restricoes.situacao(db, dataset.empresa_id, identificador="A") == SituacaoCliente.LIVRE
+        assert restricoes.situacao(db, dataset.empresa_id, identificador="B") == SituacaoCliente.BLOQUEADO
+
+        restricoes.remover(dataset.empresa_id, cliente.id)
+        assert restricoes.situacao(db, dataset.empresa_id, identificador="B") == SituacaoCliente.LIVRE
+
+
+class TestRotasBloqueio:
+
+    def test_alternar_bloqueio_grava_enum_e_atualiza_checagem(self, cenario, db):
+        dataset, headers = cenario
+        cliente = criar_cliente(db, dataset.empresa_id, gerar_cpf(1))
+        client = TestClient(app)
+        assert pode_atender(client, headers, cpf=gerar_cpf(1)) == {"pode_atender": True, "situacao": "livre"}
+
+        response = client.patch(f"/api/meep-clients/{cliente.id}/toggle-block", headers=headers)
+        assert response.json()["message"] == "Cliente bloqueado com sucesso"
+        db.expire_all()
+        assert db.get(MeepClient, cliente.id).status == StatusMeepClient.BLOQUEADO
+        assert pode_atender(client, headers, cpf=gerar_cpf(1)) == {"pode_atender": False, "situacao": "bloqueado"}
+
+        response = client.patch(f"/api/meep-clients/{cliente.id}/toggle-block", headers=headers)
+        assert response.json()["message"] == "Cliente desbloqueado com sucesso"
+        assert pode_atender(client, headers, cpf=gerar_cpf(1))["pode_atender"]
+        assert db.query(ClientBlockHistory).filter(ClientBlockHistory.cliente_id == cliente.id).count() == 2
+
+    def test_atualizar_status_e_alerta_pelo_put(self, cenario, db):
+        dataset, headers = cenario
+        cliente = criar_cliente(db, dataset.empresa_id, gerar_cpf(1))
+        client = TestClient(app)
+        assert pode_atender(client, headers, cpf=gerar_cpf(1))["situacao"] == "livre"
+
+        response = client.put(f"/api/meep-clients/{cliente.id}", headers=headers,
+                              json={"has_alert": True, "sexo": "F"})
+        assert response.status_code == 200
+        assert pode_atender(client, headers, cpf=gerar_cpf(1))["situacao"] == "alerta"
+
+        response = client.put(f"/api/meep-clients/{cliente.id}", headers=headers, json={"status": "bloqueado"})
+        assert response.status_code == 200
+        assert response.json()["status"] == "bloqueado"
+        assert pode_atender(client, headers, cpf=gerar_cpf(1))["situacao"] == "bloqueado"
+
+        assert client.delete(f"/api/meep-clients/{cliente.id}", headers=headers).status_code == 200
+        assert pode_atender(client, headers, cpf=gerar_cpf(1))["situacao"] == "livre"
+
+    def test_pdv_recusa_cpf_e_comanda_de_cliente_bloqueado(self, cenario, db):
+        dataset, headers = cenario
+        comanda = db.get(Comanda, dataset.comanda_ids[0])
+        venda = {
+            "evento_id": dataset.evento_ids[0],
+            "itens": [{"produto_id": dataset.produto_ids[0], "quantidade": 1, "preco_unitario": "10.00"}],
+            "pagamentos": [{"tipo_pagamento": "PIX", "valor": "10.00"}]
+        }
+        criar_cliente(db, dataset.empresa_id, gerar_cpf(1), status=StatusMeepClient.BLOQUEADO)
+        criar_cliente(db, dataset.empresa_id, comanda.cpf_cliente, status=StatusMeepClient.BLOQUEADO)
+        client = TestClient(app)
+
+        response = client.post("/api/pdv/vendas", headers=headers, json={**venda, "cpf_cliente": gerar_cpf(1)})
+        assert response.status_code == 403
+        assert response.json()["detail"] == "Cliente bloqueado"
+
+        with QueryCounter(engine) as contador:
+            response = client.post("/api/pdv/vendas", headers=headers, json={**venda, "comanda_id": comanda.id})
+        assert response.status_code == 403
+        assert not [sql for sql in contador.statements if sql.lstrip().upper().startswith(("INSERT", "UPDATE"))]
+
+        response = client.post("/api/pdv/vendas", headers=headers, json=venda)
+        assert response.status_code == 200
+        assert "X-Cliente-Alerta" not in response.headers
+
+    def test_checkin_por_qr_recusa_bloqueado_e_sinaliza_alerta(self, cenario, db):
+        dataset, headers = cenario
+        comanda = db.get(Comanda, dataset.comanda_ids[0])
+        cliente = criar_cliente(db, dataset.empresa_id, comanda.cpf_cliente, status=StatusMeepClient.BLOQUEADO)
+        params = {"qr_code": comanda.qr_code, "validacao_cpf": comanda.cpf_cliente[:3]}
+        client = TestClient(app)
+
+        response = client.post("/api/checkins/qr", headers=headers, params=params)
+        assert response.status_code == 403
+
+        cliente.status = StatusMeepClient.ATIVO
+        cliente.has_alert = True
+        db.commit()
+        restricoes_clientes.atualizar(cliente)
+
+        response = client.post("/api/checkins/qr", headers=headers, params=params)
+        assert response.status_code == 200
+        assert response.headers["X-Cliente-Alerta"] == "true"
@@ -0,0 +1,147 @@
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.main import app
+from app.models import MeepClient, StatusMeepClient
+from app.services.meep_client_service import normalizar_cpf, normalizar_nome, aplicar_campos_busca
+
+
+def criar_clientes(db, empresa_id, nomes_cpfs, **campos):
+    for nome, cpf in nomes_cpfs:
+        cliente = MeepClient(id=str(uuid.uuid4()), nome=nome, cpf=cpf, empresa_id=empresa_id, **campos)
+        aplicar_campos_busca(cliente)
+        db.add(cliente)
+    db.commit()
+
+
+def buscar(client, headers, **params):
+    response = client.get("/api/meep-clients", headers=headers, params=params)
+    assert response.status_code == 200
+    return response
+
+
+class TestNormalizacao:
+
+    def test_nome_sem_acentos_em_minusculas(self):
+        assert normalizar_nome("  JOSÉ  da   Conceição ") == "jose da conceicao"
+        assert normalizar_nome("") is None
+
+    def test_cpf_so_digitos(self):
+        assert normalizar_cpf("123.456.789-09") == "12345678909"
+        assert normalizar_cpf("abc") is None
+
+
+class TestBuscaClientes:
+
+    def test_busca_nome_sem_acento_e_cpf_formatado(self, cenario, db):
+        dataset, headers = cenario
+        criar_clientes(db, dataset.empresa_id, [("José Conceição", "123.456.789-09"), ("Maria Silva", "98765432100")])
+        client = TestClient(app)
+
+        assert [c["nome"] for c in buscar(client, headers, nome="jose conc").json()] == ["José Conceição"]
+        assert [c["nome"] for c in buscar(client, headers, nome="SILVA").json()] == ["Maria Silva"]
+        assert [c["nome"] for c in buscar(client, headers, cpf="123456").json()] == ["José Conceição"]
+        assert [c["nome"] for c in buscar(client, headers, cpf="987.654").json()] == ["Maria Silva"]
+        assert buscar(client, headers, nome="%").json() == []
+
+    def test_identificador_em_qualquer_posicao_e_cpf_por_prefixo(self, cenario, db):
+        dataset, headers = cenario
+        criar_clientes(db, dataset.empresa_id, [("Ana", "123.456.789-09")], identificador="PULSEIRA-0042")
+        client = TestClient(app)
+
+        assert [c["nome"] for c in buscar(client, headers, identificador="pulseira").json()] == ["Ana"]
+        assert [c["nome"] for c in buscar(client, headers, identificador="0042").json()] == ["Ana"]
+        assert buscar(client, headers, identificador="%").json() == []
+        assert buscar(client, headers, cpf="789-09").json() == []
+
+    def test_paginacao_por_chave_com_limite(self, cenario, db, monkeypatch):
+        dataset, headers = cenario
+        criar_clientes(db, dataset.empresa_id, [(f"Cliente {n:03d}", None) for n in range(25)] + [("Cliente 000", None)])
+        client = TestClient(app)
+
+        vistos, cursor = [], None
+        while True:
+            response = buscar(client, headers, limit=10, **({"cursor": cursor} if cursor else {}))
+            assert len(response.json()) <= 10
+            vistos.extend(response.json())
+            cursor = response.headers.get("X-Proximo-Cursor")
+            if not cursor:
+                break
+
+        assert len({c["id"] for c in vistos}) == 26
+        assert [c["nome"] for c in vistos] == sorted(c["nome"] for c in vistos)
+
+        monkeypatch.setattr("app.routers.meep_clients.settings.meep_clientes_pagina_max", 5)
+        assert len(buscar(client, headers, limit=1000).json()) == 5
+
+    def test_filtro_de_bloqueados(self, cenario, db):
+        dataset, headers = cenario
+        criar_clientes(db, dataset.empresa_id, [("Ativo", None)])
+        criar_clientes(db, dataset.empresa_id, [("Bloqueado", None)], status=StatusMeepClient.BLOQUEADO)
+
+        response = buscar(TestClient(app), headers, somente_bloqueados=True)
+
+        assert [c["nome"] for c in response.json()] == ["Bloqueado"]
+
+    def test_busca_usa_indice_normalizado(self, cenario, db):
+        dataset, _ = cenario
+        criar_clientes(db, dataset.empresa_id, [(f"Cliente {n}", f"{n:011d}") for n in range(50)])
+
+        plano = db.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id FROM meep_clients WHERE empresa_id = :e AND cpf_normalizado = :c"
+        ), {"e": dataset.empresa_id, "c": "00000000010"}).fetchall()
+        assert "ux_meep_clients_empresa_cpf_normalizado" in " ".join(str(linha) for linha in plano)
+
+        plano = db.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id FROM meep_clients WHERE empresa_id = :e ORDER BY nome_busca, id LIMIT 10"
+        ), {"e": dataset.empresa_id}).fetchall()
+        assert "ix_meep_clients_empresa_nome_busca" in " ".join(str(linha) for linha in plano)
+
+
+class TestCadastroClientes:
+
+    def test_criar_preenche_campos_de_busca_e_detecta_cpf_formatado(self, cenario, db):
+        _, headers = cenario
+        client = TestClient(app)
+
+        response = client.post("/api/meep-clients", headers=headers, json={"nome": "Ana Lúcia", "cpf": "111.222.333-44"})
+        assert response.status_code == 200
+        cliente = db.get(MeepClient, response.json()["id"])
+        assert (cliente.nome_busca, cliente.cpf_normalizado) == ("ana lucia", "11122233344")
+
+        response = client.post("/api/meep-clients", headers=headers, json={"nome": "Outra", "cpf": "11122233344"})
+        assert response.status_code == 400
+
+        response = client.put(f"/api/meep-clients/{cliente.id}", headers=headers, json={"nome": "Ána Maria"})
+        db.expire_all()
+        assert db.get(MeepClient, cliente.id).nome_busca == "ana maria"
+
+    def test_editar_para_cpf_de_outro_cliente_retorna_400(self, cenario, db):
+        dataset, headers = cenario
+        criar_clientes(db, dataset.empresa_id, [("Ana", "111.222.333-44"), ("Bia", "55566677788")])
+        bia = db.query(MeepClient).filter(MeepClient.nome == "Bia").one()
+        client = TestClient(app)
+
+        response = client.put(f"/api/meep-clients/{bia.id}", headers=headers, json={"cpf": "11122233344"})
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Cliente com este CPF já existe"
+
+        response = client.put(f"/api/meep-clients/{bia.id}", headers=headers, json={"cpf": "555.666.777-88"})
+        assert response.status_code == 200
+
+    def test_cpf_gravado_entre_a_checagem_e_o_commit_retorna_400(self, cenario, db, monkeypatch):
+        """Corrida entre duas requisições: a checagem passa e o índice único recusa"""
+        dataset, headers = cenario
+        criar_clientes(db, dataset.empresa_id, [("Ana", "11122233344"), ("Bia", "55566677788")])
+        bia = db.query(MeepClient).filter(MeepClient.nome == "Bia").one()
+        monkeypatch.setattr("app.routers.meep_clients._verificar_cpf_disponivel", lambda *args: None)
+        client = TestClient(app)
+
+        criado = client.post("/api/meep-clients", headers=headers, json={"nome": "Outra", "cpf": "111.222.333-44"})
+        editado = client.put(f"/api/meep-clients/{bia.id}", headers=headers, json={"cpf": "11122233344"})
+
+        assert (criado.status_code, editado.status_code) == (400, 400)
+        assert criado.json()["detail"] == editado.json()["detail"] == "Cliente com este CPF já existe"
+        assert db.query(MeepClient).count() == 2
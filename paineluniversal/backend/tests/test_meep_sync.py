@@ -0,0 +1,314 @@
+import asyncio
+import json
+import threading
+import time
+import uuid
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import Tablet, TabletLog, ConfiguracaoMeep, VersaoConfiguracaoMeep
+from app.services import meep_sync
+from app.services.meep_sync import (
+    SincronizadorConfiguracao, gerar_patch, aplicar_patch, hash_configuracao, registrar_versao, serializar
+)
+from app.services.tablet_logs import adicionar_log
+from app.services.tablet_monitor import AlvoTablet
+from app.http_client import cliente_http
+from .conftest import TestingSessionLocal
+
+
+def configuracao_cardapio(preco_chopp=12):
+    return {
+        "loja": {"nome": "Bar Central", "impressora": "cozinha"},
+        "cardapio": {f"item_{n}": {"nome": f"Produto {n}", "preco": 10 + n} for n in range(200)}
+        | {"chopp": {"nome": "Chopp", "preco": preco_chopp}}
+    }
+
+
+class TabletSimulado:
+    """Tablet MEEP com o protocolo de versão/diff (ou legado, só com sync completo)"""
+
+    def __init__(self, suporta_diff=True, atraso=0):
+        self.suporta_diff = suporta_diff
+        self.atraso = atraso
+        self.recusar_patch = False
+        self.configuracao = None
+        self.hash = None
+        self.recebidos = []
+        self.ao_receber = None
+
+    async def versao(self, request):
+        if not self.suporta_diff:
+            return web.Response(status=404)
+        return web.json_response({"hash": self.hash})
+
+    async def completo(self, request):
+        await asyncio.sleep(self.atraso)
+        corpo = await request.read()
+        if self.ao_receber:
+            self.ao_receber()
+        self.recebidos.append(("completo", len(corpo)))
+        self.configuracao = json.loads(corpo)
+        self.hash = request.headers.get("X-Config-Hash")
+        return web.json_response({"ok": True})
+
+    async def patch(self, request):
+        if not self.suporta_diff:
+            return web.Response(status=404)
+        if self.recusar_patch or request.headers["X-Config-Base"] != self.hash:
+            return web.Response(status=409)
+        corpo = await request.read()
+        self.recebidos.append(("diff", len(corpo)))
+        self.configuracao = aplicar_patch(self.configuracao, json.loads(corpo))
+        self.hash = request.headers["X-Config-Hash"]
+        return web.json_response({"ok": True})
+
+    async def iniciar(self):
+        aplicacao = web.Application()
+        aplicacao.router.add_get("/api/config-version", self.versao)
+        aplicacao.router.add_post("/api/sync-config", self.completo)
+        aplicacao.router.add_post("/api/sync-config/patch", self.patch)
+        self.servidor = TestServer(aplicacao, host="127.0.0.1")
+        await self.servidor.start_server()
+        return self
+
+
+class TestPatch:
+
+    def test_hash_independe_da_ordem_das_chaves(self):
+        assert hash_configuracao({"a": 1, "b": {"c": 2, "d": 3}}) == hash_configuracao({"b": {"d": 3, "c": 2}, "a": 1})
+        assert hash_configuracao({"a": 1}) != hash_configuracao({"a": 2})
+
+    def test_patch_leva_versao_antiga_a_nova(self):
+        antigo = {"loja": {"nome": "A", "taxa": 10}, "itens": [1, 2], "removido": True}
+        novo = {"loja": {"nome": "B", "taxa": 10}, "itens": [1, 2, 3], "novo": {"x": 1}}
+
+        patch = gerar_patch(antigo, novo)
+
+        assert patch == {"loja": {"nome": "B"}, "itens": [1, 2, 3], "novo": {"x": 1}, "removido": None}
+        assert aplicar_patch(antigo, patch) == novo
+        assert gerar_patch(novo, novo) == {}
+
+    def test_valor_nulo_nao_e_representavel(self):
+        antigo, novo = {"a": 1}, {"a": None}
+        assert aplicar_patch(antigo, gerar_patch(antigo, novo)) != novo
+
+
+def com_frota(simulados, cenario):
+    async def rodar():
+        try:
+            for simulado in simulados:
+                await simulado.iniciar()
+            alvos = [AlvoTablet(str(n), "127.0.0.1", simulado.servidor.port) for n, simulado in enumerate(simulados)]
+            return await cenario(alvos)
+        finally:
+            for simulado in simulados:
+                await simulado.servidor.close()
+            await cliente_http.parar()
+
+    return asyncio.run(rodar())
+
+
+def criar_sincronizador(**opcoes):
+    parametros = dict(timeout_segundos=2, max_concorrentes=10)
+    parametros.update(opcoes)
+    return SincronizadorConfiguracao(**parametros)
+
+
+class TestSincronizador:
+
+    def test_envia_completo_depois_diff_e_pula_versao_igual(self):
+        simulados = [TabletSimulado(), TabletSimulado(), TabletSimulado(suporta_diff=False)]
+        sincronizador = criar_sincronizador()
+        v1, v2 = configuracao_cardapio(12), configuracao_cardapio(14)
+        h1, h2 = hash_configuracao(v1), hash_configuracao(v2)
+
+        async def cenario(alvos):
+            primeira = await sincronizador.sincronizar_frota(alvos, h1, v1, {})
+            repetida = await sincronizador.sincronizar_frota(alvos, h1, v1, {})
+            segunda = await sincronizador.sincronizar_frota(alvos, h2, v2, {h1: v1})
+            return primeira, repetida, segunda
+
+        primeira, repetida, segunda = com_frota(simulados, cenario)
+
+        assert [r.resultado for r in primeira] == ["completo"] * 3
+        assert [r.resultado for r in repetida] == ["inalterado", "inalterado", "completo"]
+        assert repetida[0].bytes == 0
+        assert [r.resultado for r in segunda] == ["diff", "diff", "completo"]
+        assert segunda[0].bytes * 50 < len(serializar(v2).encode())
+        assert all(simulado.configuracao == v2 for simulado in simulados)
+        assert simulados[0].hash == h2
+
+    def test_patch_recusado_cai_para_completo(self):
+        simulado = TabletSimulado()
+        sincronizador = criar_sincronizador()
+        v1, v2 = configuracao_cardapio(12), configuracao_cardapio(14)
+
+        async def cenario(alvos):
+            await sincronizador.sincronizar(alvos[0], hash_configuracao(v1), v1, {})
+            simulado.configuracao["loja"]["nome"] = "Editado no tablet"
+            simulado.recusar_patch = True
+            return await sincronizador.sincronizar(alvos[0], hash_configuracao(v2), v2,
+                                                   {hash_configuracao(v1): v1})
+
+        resultado = com_frota([simulado], cenario)
+
+        assert resultado.resultado == "completo"
+        assert [modo for modo, _ in simulado.recebidos] == ["completo", "completo"]
+        assert simulado.configuracao == v2
+
+    def test_fan_out_concorrente_com_limite_e_resultado_por_tablet(self):
+        simulados = [TabletSimulado(atraso=0.2) for _ in range(4)]
+        sincronizador = criar_sincronizador(max_concorrentes=2, timeout_segundos=1)
+        configuracao = configuracao_cardapio()
+
+        async def cenario(alvos):
+            alvos.append(AlvoTablet("fora", "127.0.0.1", 1))
+            inicio = time.monotonic()
+            resultados = await sincronizador.sincronizar_frota(alvos, hash_configuracao(configuracao),
+                                                               configuracao, {})
+            return resultados, time.monotonic() - inicio
+
+        resultados, duracao = com_frota(simulados, cenario)
+
+        assert [r.resultado for r in resultados] == ["completo"] * 4 + ["erro"]
+        assert resultados[-1].tablet_id == "fora" and resultados[-1].erro
+        assert 2 * 0.2 <= duracao < 4 * 0.2
+
+
+class FrotaEmThread:
+    """Tablets simulados num event loop próprio, para chamadas feitas pelo TestClient"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.simulados = []
+
+    def criar(self, **opcoes):
+        simulado = asyncio.run_coroutine_threadsafe(TabletSimulado(**opcoes).iniciar(), self.loop).result()
+        self.simulados.append(simulado)
+        return simulado
+
+    def parar(self):
+        for simulado in self.simulados:
+            asyncio.run_coroutine_threadsafe(simulado.servidor.close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+
+class TestRegistroVersao:
+
+    def test_transacao_encerrada_e_versao_desanexada(self, cenario, db):
+        dataset, _ = cenario
+
+        versao = registrar_versao(db, dataset.empresa_id, configuracao_cardapio(12))
+
+        assert not db.in_transaction()
+        assert versao not in db
+        assert db.query(VersaoConfiguracaoMeep.empresa_id).scalar() == dataset.empresa_id
+        assert registrar_versao(db, dataset.empresa_id, configuracao_cardapio(12)).id == versao.id
+
+    def test_hash_gravado_por_outra_requisicao_e_reaproveitado(self, cenario, db, monkeypatch):
+        dataset, _ = cenario
+        existente = registrar_versao(db, dataset.empresa_id, configuracao_cardapio(12))
+        buscar = meep_sync._buscar_versao
+        chamadas = []
+
+        def buscar_depois_da_outra_requisicao(*args):
+            chamadas.append(args)
+            return None if len(chamadas) == 1 else buscar(*args)
+        monkeypatch.setattr(meep_sync, "_buscar_versao", buscar_depois_da_outra_requisicao)
+
+        versao = registrar_versao(db, dataset.empresa_id, configuracao_cardapio(12))
+
+        assert versao.id == existente.id
+        assert len(chamadas) == 2
+        assert db.query(VersaoConfiguracaoMeep).count() == 1
+
+
+@pytest.fixture
+def frota():
+    frota = FrotaEmThread()
+    yield frota
+    frota.parar()
+
+
+class TestRotasSincronizacao:
+
+    @pytest.fixture
+    def cenario(self, cenario, db, frota):
+        dataset, headers = cenario
+        tablets = []
+        for n in range(3):
+            simulado = frota.criar()
+            tablet = Tablet(id=str(uuid.uuid4()), nome=f"Caixa {n}", ip="127.0.0.1",
+                            porta=simulado.servidor.port, empresa_id=dataset.empresa_id)
+            db.add(tablet)
+            tablets.append(tablet.id)
+        db.commit()
+        return tablets, headers
+
+    def test_frota_recebe_diff_na_segunda_versao(self, cenario, db, frota):
+        tablets, headers = cenario
+        client = TestClient(app)
+
+        primeira = client.post("/api/api/tablets/sync-config", headers=headers,
+                               json={"configuracao": configuracao_cardapio(12)})
+        segunda = client.post("/api/api/tablets/sync-config", headers=headers,
+                              json={"configuracao": configuracao_cardapio(14)})
+
+        assert primeira.status_code == 200
+        assert {r["resultado"] for r in primeira.json()["resultados"]} == {"completo"}
+        assert segunda.json()["sincronizados"] == 3
+        assert {r["resultado"] for r in segunda.json()["resultados"]} == {"diff"}
+        assert segunda.json()["bytes_enviados"] * 10 < primeira.json()["bytes_enviados"]
+        assert all(simulado.configuracao == configuracao_cardapio(14) for simulado in frota.simulados)
+
+        db.expire_all()
+        assert db.query(VersaoConfiguracaoMeep).count() == 2
+        assert {config.hash for config in db.query(ConfiguracaoMeep).all()} == {segunda.json()["hash"]}
+
+    def test_envio_acontece_sem_transacao_aberta(self, cenario, db, frota):
+        """Enquanto os tablets recebem a configuração, outras conexões conseguem gravar"""
+        tablets, headers = cenario
+
+        def gravar_log():
+            sessao = TestingSessionLocal()
+            try:
+                adicionar_log(sessao, tablets[0], "teste", "gravado durante o envio")
+                sessao.commit()
+            finally:
+                sessao.close()
+        frota.simulados[0].ao_receber = gravar_log
+
+        response = TestClient(app).post("/api/api/tablets/sync-config", headers=headers,
+                                        json={"configuracao": configuracao_cardapio(12)})
+
+        assert response.status_code == 200
+        assert response.json()["sincronizados"] == 3
+        assert db.query(TabletLog).filter(TabletLog.evento == "teste").count() == 1
+
+    def test_tablet_unico_pula_versao_igual(self, cenario):
+        tablets, headers = cenario
+        client = TestClient(app)
+        url = f"/api/api/tablets/{tablets[0]}/sync-config"
+
+        assert client.post(url, headers=headers, json={"modo": "balcao"}).json()["resultado"] == "completo"
+        response = client.post(url, headers=headers, json={"modo": "balcao"})
+
+        assert response.status_code == 200
+        assert response.json()["resultado"] == "inalterado"
+        assert response.json()["bytes"] == 0
+
+    def test_tablet_desconhecido_retorna_404(self, cenario):
+        _, headers = cenario
+
+        response = TestClient(app).post("/api/api/tablets/sync-config", headers=headers,
+                                        json={"configuracao": {}, "tablet_ids": ["inexistente"]})
+
+        assert response.status_code == 404
@@ -0,0 +1,64 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.main import app
+from app.database import engine, settings
+from app.metrics import Histograma, Contador, registrar_fila, consultas_total
+
+
+class TestMetricas:
+
+    def test_histograma_acumula_buckets(self):
+        histograma = Histograma("teste_duracao_seconds", "teste", labels=("rota",), buckets=(0.1, 1.0))
+        histograma.observe(0.05, rota="/a")
+        histograma.observe(0.5, rota="/a")
+        histograma.observe(5.0, rota="/a")
+
+        linhas = histograma.amostras()
+        assert 'teste_duracao_seconds_bucket{rota="/a",le="0.1"} 1' in linhas
+        assert 'teste_duracao_seconds_bucket{rota="/a",le="1"} 2' in linhas
+        assert 'teste_duracao_seconds_bucket{rota="/a",le="+Inf"} 3' in linhas
+        assert 'teste_duracao_seconds_count{rota="/a"} 3' in linhas
+
+    def test_contador_escapa_labels(self):
+        contador = Contador("teste_total", "teste", labels=("texto",))
+        contador.inc(texto='a"b')
+        assert contador.amostras() == ['teste_total{texto="a\\"b"} 1']
+
+    def test_endpoint_metrics(self, monkeypatch):
+        monkeypatch.setattr(settings, "metrics_token", "segredo")
+        registrar_fila("teste", lambda: 7)
+        client = TestClient(app)
+        client.get("/healthz")
+
+        with client.websocket_connect("/api/pdv/ws/4242"):
+            response = client.get("/metrics", headers={"Authorization": "Bearer segredo"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        corpo = response.text
+        assert 'http_request_duration_seconds_count{method="GET",route="/healthz",status="200"}' in corpo
+        assert 'websocket_connections{evento_id="4242"} 1' in corpo
+        assert 'background_queue_depth{fila="teste"} 7' in corpo
+        assert "# TYPE db_query_duration_seconds histogram" in corpo
+        assert 'db_pool_connections{estado="em_uso"}' in corpo
+
+    @pytest.mark.parametrize("token, headers, esperado", [
+        ("", {"Authorization": "Bearer "}, 404),
+        ("segredo", {}, 401),
+        ("segredo", {"Authorization": "Bearer outro"}, 401),
+    ])
+    def test_endpoint_metrics_exige_token(self, monkeypatch, token, headers, esperado):
+        monkeypatch.setattr(settings, "metrics_token", token)
+
+        response = TestClient(app).get("/metrics", headers=headers)
+
+        assert response.status_code == esperado
+        assert "http_request_duration_seconds" not in response.text
+
+    def test_consultas_contadas(self):
+        antes = consultas_total.valor()
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        assert consultas_total.valor() == antes + 1
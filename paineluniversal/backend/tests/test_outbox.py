@@ -0,0 +1,209 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import EventoOutbox, StatusOutbox
+from app.services import outbox_service
+from app.services.outbox_service import RelayOutbox, adicionar_outbox, entregas_outbox
+from app.services.whatsapp_service import whatsapp_service, despachante_whatsapp
+
+
+@pytest.fixture
+def modulos_sessao_local():
+    return (outbox_service,)
+
+
+def criar_relay(**opcoes):
+    parametros = dict(tamanho_lote=10, max_tentativas=3, backoff_segundos=60,
+                      timeout_entrega_segundos=1, retencao_dias=7)
+    parametros.update(opcoes)
+    return RelayOutbox(**parametros)
+
+
+def vencer_retentativas(db):
+    db.query(EventoOutbox).update({EventoOutbox.proxima_tentativa: datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+
+
+class TestRelayOutbox:
+
+    def test_entrega_em_lotes_e_marca_entregue(self, db):
+        entregues = []
+
+        async def handler(payload):
+            entregues.append(payload["n"])
+
+        relay = criar_relay(tamanho_lote=4)
+        relay.registrar("teste", handler)
+        for n in range(10):
+            adicionar_outbox(db, "teste", {"n": n})
+        db.commit()
+
+        asyncio.run(relay.processar())
+
+        assert sorted(entregues) == list(range(10))
+        db.expire_all()
+        assert {evento.status for evento in db.query(EventoOutbox).all()} == {StatusOutbox.ENTREGUE}
+        assert relay.pendentes == 0
+
+    def test_falha_reagenda_e_vira_dead_letter(self, db):
+        async def handler(payload):
+            raise RuntimeError("webhook fora do ar")
+
+        relay = criar_relay(max_tentativas=3)
+        relay.registrar("teste", handler)
+        adicionar_outbox(db, "teste", {"n": 1})
+        db.commit()
+        mortos_antes = entregas_outbox.valor(tipo="teste", resultado="morto")
+
+        asyncio.run(relay.processar())
+        db.expire_all()
+        evento = db.query(EventoOutbox).one()
+        assert evento.status == StatusOutbox.PENDENTE
+        assert evento.tentativas == 1
+        assert evento.ultimo_erro == "webhook fora do ar"
+        assert evento.proxima_tentativa > datetime.utcnow() + timedelta(seconds=30)
+        assert relay.pendentes == 1
+
+        asyncio.run(relay.processar())
+        db.expire_all()
+        assert db.query(EventoOutbox).one().tentativas == 1
+
+        for _ in range(2):
+            vencer_retentativas(db)
+            asyncio.run(relay.processar())
+        db.expire_all()
+        evento = db.query(EventoOutbox).one()
+        assert evento.status == StatusOutbox.MORTO
+        assert evento.tentativas == 3
+        assert entregas_outbox.valor(tipo="teste", resultado="morto") == mortos_antes + 1
+
+    def test_timeout_e_tipo_sem_handler_contam_como_falha(self, db):
+        async def lento(payload):
+            await asyncio.sleep(5)
+
+        relay = criar_relay(timeout_entrega_segundos=0.05)
+        relay.registrar("lento", lento)
+        adicionar_outbox(db, "lento", {})
+        adicionar_outbox(db, "desconhecido", {})
+        db.commit()
+
+        asyncio.run(relay.processar())
+        db.expire_all()
+        erros = {evento.tipo: evento.ultimo_erro for evento in db.query(EventoOutbox).all()}
+        assert erros == {"lento": "Timeout na entrega", "desconhecido": "Sem handler para o tipo desconhecido"}
+
+    def test_remove_entregues_apos_retencao(self, db):
+        antigo = EventoOutbox(tipo="teste", payload="{}", status=StatusOutbox.ENTREGUE,
+                              processado_em=datetime.utcnow() - timedelta(days=8))
+        recente = EventoOutbox(tipo="teste", payload="{}", status=StatusOutbox.ENTREGUE,
+                               processado_em=datetime.utcnow())
+        db.add_all([antigo, recente])
+        db.commit()
+
+        asyncio.run(criar_relay().processar())
+        db.expire_all()
+        assert [evento.id for evento in db.query(EventoOutbox).all()] == [recente.id]
+
+
+    def test_mensagem_whatsapp_so_conclui_apos_envio(self, db, monkeypatch):
+        enviados = []
+
+        async def enviar(telefone, texto):
+            if not enviados:
+                enviados.append(None)
+                raise RuntimeError("provedor indisponível")
+            enviados.append(telefone)
+
+        monkeypatch.setattr(despachante_whatsapp, "enviar", enviar)
+        monkeypatch.setattr(despachante_whatsapp, "max_tentativas", 1)
+        relay = criar_relay()
+        relay.registrar("whatsapp", whatsapp_service.entregar_mensagem)
+        whatsapp_service.enviar_mensagem_outbox(db, "11999990000", "olá")
+        db.commit()
+
+        async def cenario():
+            await despachante_whatsapp.iniciar()
+            try:
+                await relay.processar()
+                vencer_retentativas(db)
+                await relay.processar()
+            finally:
+                await despachante_whatsapp.parar()
+
+        asyncio.run(cenario())
+        db.expire_all()
+        evento = db.query(EventoOutbox).one()
+        assert evento.status == StatusOutbox.ENTREGUE
+        assert evento.tentativas == 2
+        assert enviados == [None, "11999990000"]
+
+    def test_retentativa_apos_timeout_nao_duplica_envio(self, db, monkeypatch):
+        enviados = []
+        liberar = asyncio.Event()
+
+        async def enviar(telefone, texto):
+            await liberar.wait()
+            enviados.append(telefone)
+
+        monkeypatch.setattr(despachante_whatsapp, "enviar", enviar)
+        relay = criar_relay(timeout_entrega_segundos=0.05)
+        relay.registrar("whatsapp", whatsapp_service.entregar_mensagem)
+        whatsapp_service.enviar_mensagem_outbox(db, "11999990000", "alerta")
+        db.commit()
+
+        async def cenario():
+            await despachante_whatsapp.iniciar()
+            try:
+                for _ in range(2):
+                    await relay.processar()
+                    vencer_retentativas(db)
+                assert despachante_whatsapp.pendentes() == 1
+                liberar.set()
+                await relay.processar()
+            finally:
+                await despachante_whatsapp.parar()
+
+        asyncio.run(cenario())
+        db.expire_all()
+        evento = db.query(EventoOutbox).one()
+        assert (evento.status, evento.tentativas) == (StatusOutbox.ENTREGUE, 3)
+        assert enviados == ["11999990000"]
+
+
+class TestOutboxNoCheckin:
+
+    def test_checkin_grava_notificacao_sem_chamar_webhook(self, cenario, db, monkeypatch):
+        dataset, headers = cenario
+        monkeypatch.setattr(whatsapp_service, "n8n_webhook_url", "http://n8n.invalido/webhook")
+        qr_code = dataset.qr_codes[0]
+
+        response = TestClient(app).post("/api/checkins/qr", headers=headers, params={
+            "qr_code": qr_code, "validacao_cpf": dataset.validacoes[qr_code]
+        })
+
+        assert response.status_code == 200
+        db.expire_all()
+        evento = db.query(EventoOutbox).one()
+        assert evento.tipo == "n8n"
+        assert evento.status == StatusOutbox.PENDENTE
+        payload = json.loads(evento.payload)
+        assert payload["event_type"] == "checkin_realizado"
+        assert payload["data"]["cpf"] == response.json()["cpf"]
+
+    def test_checkin_recusado_nao_grava_notificacao(self, cenario, db, monkeypatch):
+        dataset, headers = cenario
+        monkeypatch.setattr(whatsapp_service, "n8n_webhook_url", "http://n8n.invalido/webhook")
+        qr_code = dataset.qr_codes[0]
+        validacao_errada = "999" if dataset.validacoes[qr_code] != "999" else "998"
+
+        response = TestClient(app).post("/api/checkins/qr", headers=headers, params={
+            "qr_code": qr_code, "validacao_cpf": validacao_errada
+        })
+
+        assert response.status_code == 400
+        assert db.query(EventoOutbox).count() == 0
@@ -0,0 +1,109 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.main import app
+from app.database import Base, get_db, settings
+from app.auth import criar_access_token
+from app import profiling
+from app.profiling import assinar_header_profiling, header_profiling_valido, instrumentar_profiling
+from .conftest import engine, TestingSessionLocal, override_get_db
+from benchmarks.synthetic import seed_dataset
+
+instrumentar_profiling(engine)
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    app.dependency_overrides[get_db] = override_get_db
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    try:
+        yield seed_dataset(db, eventos=1, listas_por_evento=1, transacoes_por_lista=4)
+    finally:
+        db.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def headers_admin(dataset):
+    return {"Authorization": f"Bearer {criar_access_token(data={'sub': dataset.admin_cpf})}"}
+
+
+class TestHeaderProfiling:
+
+    def test_header_assinado_valido(self):
+        assert header_profiling_valido(assinar_header_profiling())
+
+    def test_header_expirado(self):
+        expirado = int(time.time()) - settings.sql_profiling_header_ttl_segundos - 10
+        assert not header_profiling_valido(assinar_header_profiling(expirado))
+
+    def test_header_adulterado(self):
+        valor = assinar_header_profiling()
+        assert not header_profiling_valido(valor[:-1] + ("0" if valor[-1] != "0" else "1"))
+        assert not header_profiling_valido("qualquer-coisa")
+        assert not header_profiling_valido(None)
+
+
+class TestProfilingRequisicao:
+
+    def test_sem_header_nao_perfila(self, headers_admin):
+        client = TestClient(app)
+        response = client.get("/api/dashboard/avancado", headers=headers_admin)
+        assert response.status_code == 200
+        assert "X-SQL-Profile-Summary" not in response.headers
+
+    def test_perfil_com_origem_das_consultas(self, headers_admin):
+        client = TestClient(app)
+        headers = dict(headers_admin, **{"X-SQL-Profile": assinar_header_profiling()})
+        response = client.get("/api/dashboard/avancado", headers=headers)
+
+        assert response.status_code == 200
+        assert response.headers["X-SQL-Profile-Summary"].startswith("queries=")
+        perfil_id = response.headers["X-SQL-Profile-Id"]
+
+        detalhe = client.get(f"/api/debug/sql/{perfil_id}", headers=headers_admin)
+        assert detalhe.status_code == 200
+        dados = detalhe.json()
+        assert dados["total_consultas"] == len(dados["consultas"]) >= 2
+        origens = [consulta["origem"] for consulta in dados["consultas"]]
+        assert any(origem and "routers/dashboard.py" in origem and "obter_dashboard_avancado" in origem
+                   for origem in origens)
+
+        lista = client.get("/api/debug/sql", headers=headers_admin).json()
+        assert lista[0]["id"] == perfil_id
+
+    def test_debug_exige_admin(self):
+        client = TestClient(app)
+        assert client.get("/api/debug/sql").status_code == 403
+
+    def test_perfil_inexistente(self, headers_admin):
+        client = TestClient(app)
+        assert client.get("/api/debug/sql/naoexiste", headers=headers_admin).status_code == 404
+
+
+class TestSlowQueryLog:
+
+    def test_consulta_lenta_registrada(self, tmp_path, monkeypatch):
+        arquivo = tmp_path / "slow.log"
+        monkeypatch.setattr(settings, "slow_query_threshold_ms", 0.000001)
+        monkeypatch.setattr(settings, "slow_query_log_file", str(arquivo))
+        monkeypatch.setattr(profiling, "_handler_configurado", False)
+        handlers_antes = list(profiling.slow_query_logger.handlers)
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            for handler in profiling.slow_query_logger.handlers:
+                handler.flush()
+            conteudo = arquivo.read_text(encoding="utf-8")
+            assert "SELECT 1" in conteudo
+            assert "origem=" in conteudo
+        finally:
+            for handler in profiling.slow_query_logger.handlers:
+                if handler not in handlers_antes:
+                    profiling.slow_query_logger.removeHandler(handler)
+                    handler.close()
@@ -0,0 +1,146 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.database import Base
+from app.auth import criar_access_token
+from app.acesso_eventos import obter_info_evento
+from .conftest import engine, TestingSessionLocal
+from .query_counter import format_statements
+from benchmarks.synthetic import seed_dataset
+
+pytestmark = pytest.mark.query_budget
+
+# Orçamento de consultas por requisição, com o usuário autenticado e os eventos já em cache
+BUDGETS = {
+    "GET /api/dashboard/avancado": 2,
+    "GET /api/dashboard/resumo": 6,
+    "GET /api/pdv/vendas": 4,
+    "POST /api/pdv/vendas": 9,
+    "GET /api/listas/dashboard": 4,
+    "GET /api/checkins/dashboard": 6,
+}
+
+# Tempo de parede máximo por requisição; generoso para não falhar em máquinas lentas de CI
+LATENCY_BUDGET_MS = float(os.getenv("QUERY_BUDGET_LATENCY_MS", "2000"))
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    try:
+        yield seed_dataset(db)
+    finally:
+        db.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="module")
+def client(dataset):
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture
+def headers_admin(client, dataset):
+    token = criar_access_token(data={"sub": dataset.admin_cpf})
+    headers = {"Authorization": f"Bearer {token}"}
+    client.get("/api/auth/me", headers=headers)
+    db = TestingSessionLocal()
+    try:
+        for evento_id in dataset.evento_ids:
+            obter_info_evento(db, evento_id)
+    finally:
+        db.close()
+    return headers
+
+
+def assert_budget(stats, budget_key):
+    assert stats.status_code == 200, format_statements(stats)
+    assert stats.queries <= BUDGETS[budget_key], format_statements(stats)
+    assert stats.elapsed_ms <= LATENCY_BUDGET_MS, format_statements(stats)
+
+
+def payload_venda(evento_id, produto_ids):
+    return {
+        "evento_id": evento_id,
+        "itens": [
+            {"produto_id": produto_id, "quantidade": 1, "preco_unitario": "10.00"}
+            for produto_id in produto_ids
+        ],
+        "pagamentos": [
+            {"tipo_pagamento": "PIX", "valor": f"{10 * len(produto_ids)}.00"}
+        ]
+    }
+
+
+class TestOrcamentoDashboard:
+
+    def test_dashboard_avancado(self, client, headers_admin, query_counter):
+        _, stats = query_counter.measure(client, "GET", "/api/dashboard/avancado", headers=headers_admin)
+        assert_budget(stats, "GET /api/dashboard/avancado")
+
+    def test_dashboard_avancado_por_evento(self, client, headers_admin, dataset, query_counter):
+        response, stats = query_counter.measure(
+            client, "GET", f"/api/dashboard/avancado?evento_id={dataset.evento_ids[0]}",
+            headers=headers_admin
+        )
+        assert_budget(stats, "GET /api/dashboard/avancado")
+        data = response.json()
+        assert data["total_eventos"] == 1
+        assert data["total_vendas"] > 0
+        assert data["total_checkins"] > 0
+
+    def test_dashboard_resumo(self, client, headers_admin, query_counter):
+        _, stats = query_counter.measure(client, "GET", "/api/dashboard/resumo", headers=headers_admin)
+        assert_budget(stats, "GET /api/dashboard/resumo")
+
+
+class TestOrcamentoPDV:
+
+    def test_listar_vendas(self, client, headers_admin, dataset, query_counter):
+        response, stats = query_counter.measure(
+            client, "GET", f"/api/pdv/vendas?evento_id={dataset.evento_ids[0]}",
+            headers=headers_admin
+        )
+        assert_budget(stats, "GET /api/pdv/vendas")
+        vendas = response.json()
+        assert vendas
+        assert all(venda["itens"] and venda["pagamentos"] for venda in vendas)
+
+    def test_processar_venda_independente_do_numero_de_itens(self, client, headers_admin, dataset, query_counter):
+        evento_id = dataset.evento_ids[0]
+        produtos_evento = dataset.produto_ids[:5]
+
+        _, stats_um_item = query_counter.measure(
+            client, "POST", "/api/pdv/vendas",
+            json=payload_venda(evento_id, produtos_evento[:1]), headers=headers_admin
+        )
+        _, stats_cinco_itens = query_counter.measure(
+            client, "POST", "/api/pdv/vendas",
+            json=payload_venda(evento_id, produtos_evento), headers=headers_admin
+        )
+
+        assert_budget(stats_um_item, "POST /api/pdv/vendas")
+        assert_budget(stats_cinco_itens, "POST /api/pdv/vendas")
+        assert stats_cinco_itens.queries == stats_um_item.queries, format_statements(stats_cinco_itens)
+
+
+class TestOrcamentoListasCheckins:
+
+    def test_dashboard_listas(self, client, headers_admin, dataset, query_counter):
+        _, stats = query_counter.measure(
+            client, "GET", f"/api/listas/dashboard/{dataset.evento_ids[0]}", headers=headers_admin
+        )
+        assert_budget(stats, "GET /api/listas/dashboard")
+
+    def test_dashboard_checkins(self, client, headers_admin, dataset, query_counter):
+        response, stats = query_counter.measure(
+            client, "GET", f"/api/checkins/dashboard/{dataset.evento_ids[0]}", headers=headers_admin
+        )
+        assert_budget(stats, "GET /api/checkins/dashboard")
+        assert response.json()["checkins_por_metodo"]
@@ -0,0 +1,160 @@
+import asyncio
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.database import settings
+from app.metrics import jobs_duracao
+from app.scheduler import Job, Scheduler, TravaArquivo, TravaLider, jobs_ignorados, scheduler
+
+
+class TravaCompartilhada(TravaLider):
+    """Trava em memória para simular vários processos disputando a liderança"""
+
+    dono = None
+
+    def __init__(self, nome):
+        self.nome = nome
+
+    def adquirir(self):
+        if TravaCompartilhada.dono in (None, self.nome):
+            TravaCompartilhada.dono = self.nome
+            return True
+        return False
+
+    def liberar(self):
+        if TravaCompartilhada.dono == self.nome:
+            TravaCompartilhada.dono = None
+
+
+def rodar(scheduler_teste, segundos):
+    async def cenario():
+        await scheduler_teste.iniciar()
+        await asyncio.sleep(segundos)
+        await scheduler_teste.parar()
+
+    asyncio.run(cenario())
+
+
+class TestScheduler:
+
+    def test_job_roda_periodicamente(self, tmp_path):
+        execucoes = []
+
+        async def job():
+            execucoes.append(1)
+
+        sched = Scheduler(TravaArquivo(str(tmp_path / "s.lock")), intervalo_lider_segundos=0.01)
+        sched.adicionar(Job(nome="teste_periodico", funcao=job, intervalo_segundos=0.02))
+        sucessos_antes = jobs_duracao.contagem(job="teste_periodico", resultado="sucesso")
+        rodar(sched, 0.2)
+
+        assert len(execucoes) >= 3
+        assert jobs_duracao.contagem(job="teste_periodico", resultado="sucesso") - sucessos_antes == len(execucoes)
+        assert not sched.ativo and not sched.lider
+
+    def test_timeout_cancela_execucao(self, tmp_path):
+        async def job():
+            await asyncio.sleep(10)
+
+        sched = Scheduler(TravaArquivo(str(tmp_path / "s.lock")))
+        sched.adicionar(Job(nome="teste_timeout", funcao=job, intervalo_segundos=0.01, timeout_segundos=0.03))
+        antes = jobs_duracao.contagem(job="teste_timeout", resultado="timeout")
+        rodar(sched, 0.15)
+
+        assert jobs_duracao.contagem(job="teste_timeout", resultado="timeout") > antes
+
+    def test_thread_apos_timeout_mantem_a_vaga(self, tmp_path):
+        em_andamento = []
+        maximo = []
+        trava = threading.Lock()
+
+        def job():
+            with trava:
+                em_andamento.append(1)
+                maximo.append(len(em_andamento))
+            time.sleep(0.1)
+            with trava:
+                em_andamento.pop()
+
+        sched = Scheduler(TravaArquivo(str(tmp_path / "s.lock")))
+        sched.adicionar(Job(nome="teste_thread", funcao=job, intervalo_segundos=0.01,
+                            timeout_segundos=0.02, em_thread=True))
+        timeouts_antes = jobs_duracao.contagem(job="teste_thread", resultado="timeout")
+        ignorados_antes = jobs_ignorados.valor(job="teste_thread")
+        rodar(sched, 0.35)
+
+        assert max(maximo) == 1
+        assert jobs_duracao.contagem(job="teste_thread", resultado="timeout") > timeouts_antes
+        assert jobs_ignorados.valor(job="teste_thread") > ignorados_antes
+
+    def test_execucao_sobreposta_e_ignorada(self, tmp_path):
+        em_andamento = []
+        maximo = []
+
+        async def job():
+            em_andamento.append(1)
+            maximo.append(len(em_andamento))
+            await asyncio.sleep(0.1)
+            em_andamento.pop()
+
+        sched = Scheduler(TravaArquivo(str(tmp_path / "s.lock")))
+        sched.adicionar(Job(nome="teste_sobreposto", funcao=job, intervalo_segundos=0.02))
+        ignorados_antes = jobs_ignorados.valor(job="teste_sobreposto")
+        rodar(sched, 0.25)
+
+        assert max(maximo) == 1
+        assert jobs_ignorados.valor(job="teste_sobreposto") > ignorados_antes
+
+    def test_apenas_lider_executa_jobs(self):
+        execucoes = {"a": 0, "b": 0}
+
+        def criar(nome):
+            async def job():
+                execucoes[nome] += 1
+            sched = Scheduler(TravaCompartilhada(nome), intervalo_lider_segundos=0.02)
+            sched.adicionar(Job(nome=f"teste_lider_{nome}", funcao=job, intervalo_segundos=0.02))
+            return sched
+
+        a, b = criar("a"), criar("b")
+
+        async def cenario():
+            await a.iniciar()
+            await asyncio.sleep(0.01)
+            await b.iniciar()
+            await asyncio.sleep(0.15)
+            assert a.lider and not b.lider
+            assert execucoes["a"] > 0 and execucoes["b"] == 0
+
+            await a.parar()
+            await asyncio.sleep(0.15)
+            assert b.lider
+            assert execucoes["b"] > 0
+            await b.parar()
+
+        TravaCompartilhada.dono = None
+        asyncio.run(cenario())
+
+
+class TestTravaArquivo:
+
+    def test_somente_um_processo_obtem_a_trava(self, tmp_path):
+        caminho = str(tmp_path / "scheduler.lock")
+        primeira, segunda = TravaArquivo(caminho), TravaArquivo(caminho)
+
+        assert primeira.adquirir()
+        assert not segunda.adquirir()
+        primeira.liberar()
+        assert segunda.adquirir()
+        segunda.liberar()
+
+
+class TestLifespan:
+
+    def test_lifespan_inicia_e_para_scheduler(self, monkeypatch):
+        monkeypatch.setattr(settings, "scheduler_habilitado", True)
+        with TestClient(app):
+            assert scheduler.ativo
+        assert not scheduler.ativo
@@ -0,0 +1,62 @@
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+# Bibliotecas carregadas só quando uma exportação, importação ou QR Code é gerado
+DEPENDENCIAS_PESADAS = ("pandas", "numpy", "openpyxl", "reportlab", "qrcode", "PIL", "websockets")
+
+# Tempo cumulativo de `import app.main` medido com -X importtime; generoso para CI lento
+IMPORT_BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "3000"))
+
+
+def importar_app(tmp_path, *argumentos):
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path / 'startup.db'}"}
+    return subprocess.run(
+        [sys.executable, *argumentos], cwd=BACKEND, env=env,
+        capture_output=True, text=True, timeout=120, check=True
+    )
+
+
+def tempos_de_importacao(saida: str):
+    """(módulo, cumulativo em ms) de cada linha da saída de -X importtime"""
+    for linha in saida.splitlines():
+        encontrado = re.match(r"import time:\s+\d+ \|\s+(\d+) \|\s*(\S+)", linha)
+        if encontrado:
+            yield encontrado.group(2), int(encontrado.group(1)) / 1000
+
+
+class TestStartup:
+
+    def test_import_nao_carrega_dependencias_pesadas(self, tmp_path):
+        codigo = (
+            "import json, sys, app.main; "
+            f"print(json.dumps([m for m in {DEPENDENCIAS_PESADAS!r} if m in sys.modules]))"
+        )
+
+        resultado = importar_app(tmp_path, "-c", codigo)
+
+        assert json.loads(resultado.stdout.strip().splitlines()[-1]) == []
+
+    def test_import_nao_acessa_o_banco(self, tmp_path):
+        importar_app(tmp_path, "-c", "import app.main")
+
+        # O SQLite cria o arquivo na primeira conexão; esquema só via `alembic upgrade head`
+        assert not (tmp_path / "startup.db").exists()
+
+    def test_orcamento_de_tempo_de_importacao(self, tmp_path):
+        resultado = importar_app(tmp_path, "-X", "importtime", "-c", "import app.main")
+
+        tempos = dict(tempos_de_importacao(resultado.stderr))
+        maiores = sorted(
+            ((modulo, ms) for modulo, ms in tempos.items() if modulo != "app.main"),
+            key=lambda item: item[1], reverse=True
+        )[:10]
+        assert tempos["app.main"] < IMPORT_BUDGET_MS, (
+            f"import app.main levou {tempos['app.main']:.0f} ms (orçamento {IMPORT_BUDGET_MS:.0f} ms); "
+            f"maiores: {maiores}"
+        )
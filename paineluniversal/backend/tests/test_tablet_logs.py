@@ -0,0 +1,126 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import Tablet, TabletLog
+from app.services import tablet_logs
+from app.services.tablet_logs import RetencaoLogs, inserir_logs
+from .conftest import engine
+from .query_counter import QueryCounter
+
+
+@pytest.fixture
+def modulos_sessao_local():
+    return (tablet_logs,)
+
+
+@pytest.fixture
+def cenario(cenario, db):
+    """Um tablet da empresa do cenário: (tablet_id, headers)"""
+    dataset, headers = cenario
+    tablet = Tablet(id=str(uuid.uuid4()), nome="Caixa 1", ip="127.0.0.1", porta=8080,
+                    empresa_id=dataset.empresa_id)
+    db.add(tablet)
+    db.commit()
+    return tablet.id, headers
+
+
+def linhas(quantidade, inicio=datetime(2026, 10, 1, 12, 0, 0)):
+    return [
+        {"evento": "venda", "detalhes": f"linha {n}", "timestamp": inicio + timedelta(seconds=n // 2)}
+        for n in range(quantidade)
+    ]
+
+
+class TestIngestaoLogs:
+
+    def test_lote_gravado_em_um_insert(self, cenario, db):
+        tablet_id, headers = cenario
+        lote = [{**linha, "timestamp": linha["timestamp"].isoformat()} for linha in linhas(500)]
+
+        with QueryCounter(engine) as contador:
+            response = TestClient(app).post(f"/api/api/tablets/{tablet_id}/logs",
+                                            headers=headers, json={"logs": lote})
+
+        assert response.status_code == 201
+        assert response.json() == {"recebidos": 500}
+        assert sum(1 for sql in contador.statements if sql.lstrip().upper().startswith("INSERT")) == 1
+        assert db.query(TabletLog).filter(TabletLog.tablet_id == tablet_id).count() == 500
+
+    def test_lote_acima_do_limite_e_tablet_de_outra_empresa(self, cenario, monkeypatch):
+        tablet_id, headers = cenario
+        client = TestClient(app)
+        monkeypatch.setattr(tablet_logs.settings, "tablet_logs_lote_max", 10)
+
+        response = client.post(f"/api/api/tablets/{tablet_id}/logs", headers=headers,
+                               json={"logs": [{"evento": "x"}] * 11})
+        assert response.status_code == 413
+
+        response = client.post("/api/api/tablets/outro/logs", headers=headers, json={"logs": [{"evento": "x"}]})
+        assert response.status_code == 404
+
+    def test_timestamp_com_fuso_e_normalizado_para_utc(self, cenario, db):
+        tablet_id, _ = cenario
+
+        inserir_logs(db, tablet_id, [{"evento": "x", "timestamp": datetime.fromisoformat("2026-10-01T09:00:00-03:00")}])
+        db.commit()
+
+        assert db.query(TabletLog.timestamp).scalar().replace(tzinfo=None) == datetime(2026, 10, 1, 12, 0, 0)
+
+
+class TestLeituraPaginada:
+
+    def test_percorre_todas_as_paginas_sem_repetir(self, cenario, db):
+        tablet_id, headers = cenario
+        inserir_logs(db, tablet_id, linhas(45))
+        db.commit()
+        client = TestClient(app)
+
+        vistos, cursor, paginas = [], None, 0
+        while True:
+            params = {"limit": 10, **({"cursor": cursor} if cursor else {})}
+            response = client.get(f"/api/api/tablets/{tablet_id}/logs", headers=headers, params=params)
+            assert response.status_code == 200
+            vistos.extend(response.json())
+            paginas += 1
+            cursor = response.headers.get("X-Proximo-Cursor")
+            if not cursor:
+                break
+
+        assert paginas == 5
+        assert len({log["id"] for log in vistos}) == 45
+        timestamps = [log["timestamp"] for log in vistos]
+        assert timestamps == sorted(timestamps, reverse=True)
+
+    def test_cursor_invalido(self, cenario):
+        tablet_id, headers = cenario
+
+        response = TestClient(app).get(f"/api/api/tablets/{tablet_id}/logs", headers=headers,
+                                       params={"cursor": "nao-e-um-cursor"})
+
+        assert response.status_code == 400
+
+    def test_indice_por_tablet_e_timestamp(self):
+        indices = {indice.name: [coluna.name for coluna in indice.columns] for indice in TabletLog.__table__.indexes}
+        assert indices["ix_tablet_logs_tablet_timestamp"] == ["tablet_id", "timestamp"]
+
+
+class TestRetencao:
+
+    def test_remove_logs_antigos_em_lotes(self, cenario, db):
+        tablet_id, _ = cenario
+        antigos = datetime.utcnow() - timedelta(days=40)
+        inserir_logs(db, tablet_id, linhas(25, inicio=antigos))
+        inserir_logs(db, tablet_id, linhas(5, inicio=datetime.utcnow() - timedelta(days=1)))
+        db.commit()
+
+        with QueryCounter(engine) as contador:
+            removidos = asyncio.run(RetencaoLogs(retencao_dias=30, tamanho_lote=10).limpar())
+
+        assert removidos == 25
+        assert sum(1 for sql in contador.statements if sql.lstrip().upper().startswith("DELETE")) == 3
+        assert db.query(TabletLog).count() == 5
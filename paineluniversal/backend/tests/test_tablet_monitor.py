@@ -0,0 +1,223 @@
+import asyncio
+import socket
+import time
+import uuid
+from datetime import datetime
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import Empresa, Tablet, StatusTablet
+from app.services import tablet_monitor
+from app.services.tablet_monitor import MonitorTablets, EstadoTablet, monitor_tablets
+from app.http_client import cliente_http
+
+
+def porta_fechada():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TabletSimulado:
+    """Servidor /health local com status e atraso configuráveis"""
+
+    def __init__(self, status=200, atraso=0):
+        self.status = status
+        self.atraso = atraso
+        self.chamadas = 0
+        self.em_andamento = 0
+        self.max_em_andamento = 0
+
+    async def health(self, request):
+        self.chamadas += 1
+        self.em_andamento += 1
+        self.max_em_andamento = max(self.max_em_andamento, self.em_andamento)
+        try:
+            await asyncio.sleep(self.atraso)
+            return web.json_response({"status": "ok"}, status=self.status)
+        finally:
+            self.em_andamento -= 1
+
+
+@pytest.fixture
+def modulos_sessao_local():
+    return (tablet_monitor,)
+
+
+@pytest.fixture
+def db(db):
+    empresa = Empresa(nome="Casa", cnpj="99888777000166", email="casa@teste.com")
+    db.add(empresa)
+    db.commit()
+    db.empresa_id = empresa.id
+    return db
+
+
+def criar_tablet(db, porta, ip="127.0.0.1"):
+    tablet = Tablet(id=str(uuid.uuid4()), nome=f"Tablet {porta}", ip=ip, porta=porta,
+                    empresa_id=db.empresa_id)
+    db.add(tablet)
+    db.commit()
+    return tablet.id
+
+
+def criar_monitor(**opcoes):
+    parametros = dict(intervalo_segundos=30, intervalo_falha_segundos=5, intervalo_max_segundos=300,
+                      timeout_segundos=1, max_concorrentes=20)
+    parametros.update(opcoes)
+    return MonitorTablets(**parametros)
+
+
+def com_tablets(simulados, cenario):
+    """Sobe um servidor por tablet simulado e executa o cenário com as portas"""
+    async def rodar():
+        servidores = []
+        try:
+            for simulado in simulados:
+                aplicacao = web.Application()
+                aplicacao.router.add_get("/health", simulado.health)
+                servidor = TestServer(aplicacao, host="127.0.0.1")
+                await servidor.start_server()
+                servidores.append(servidor)
+            return await cenario([servidor.port for servidor in servidores])
+        finally:
+            for servidor in servidores:
+                await servidor.close()
+            await cliente_http.parar()
+
+    return asyncio.run(rodar())
+
+
+class TestMonitorTablets:
+
+    def test_verifica_frota_em_paralelo_com_limite(self, db):
+        simulado = TabletSimulado(atraso=0.2)
+        monitor = criar_monitor(max_concorrentes=5)
+
+        async def cenario(portas):
+            for _ in range(10):
+                criar_tablet(db, portas[0])
+            inicio = time.monotonic()
+            await monitor.ciclo()
+            return time.monotonic() - inicio
+
+        duracao = com_tablets([simulado], cenario)
+        assert simulado.chamadas == 10
+        assert simulado.max_em_andamento == 5
+        assert duracao < 10 * 0.2
+
+    def test_status_e_latencia_em_memoria_e_no_banco(self, db):
+        saudavel, com_erro, lento = TabletSimulado(), TabletSimulado(status=500), TabletSimulado(atraso=2)
+        monitor = criar_monitor(timeout_segundos=0.2)
+
+        async def cenario(portas):
+            ids = [criar_tablet(db, porta) for porta in portas]
+            ids.append(criar_tablet(db, porta_fechada()))
+            await monitor.ciclo()
+            return ids
+
+        ids = com_tablets([saudavel, com_erro, lento], cenario)
+        db.expire_all()
+        tablets = {tablet.id: tablet for tablet in db.query(Tablet).all()}
+
+        assert monitor.obter(ids[0]).online
+        assert tablets[ids[0]].status == StatusTablet.CONECTADO
+        assert tablets[ids[0]].latencia_ms > 0
+        assert tablets[ids[0]].ultima_conexao is not None
+        for tablet_id in ids[1:]:
+            assert not monitor.obter(tablet_id).online
+            assert tablets[tablet_id].status == StatusTablet.DESCONECTADO
+            assert tablets[tablet_id].latencia_ms is None
+            assert tablets[tablet_id].verificado_em is not None
+        assert monitor.obter(ids[1]).erro == "HTTP 500"
+
+    def test_intervalo_adaptativo(self, db):
+        saudavel, quebrado = TabletSimulado(), TabletSimulado(status=503)
+        monitor = criar_monitor(intervalo_segundos=30, intervalo_falha_segundos=0.05)
+
+        async def cenario(portas):
+            for porta in portas:
+                criar_tablet(db, porta)
+            await monitor.ciclo()
+            await monitor.ciclo()
+            assert (saudavel.chamadas, quebrado.chamadas) == (1, 1)
+            await asyncio.sleep(0.06)
+            await monitor.ciclo()
+            assert (saudavel.chamadas, quebrado.chamadas) == (1, 2)
+
+        com_tablets([saudavel, quebrado], cenario)
+        assert [monitor._proximo_intervalo(falhas) for falhas in (0, 1, 2, 3)] == [30, 0.05, 0.1, 0.2]
+        assert criar_monitor()._proximo_intervalo(20) == 300
+
+    def test_tablet_removido_sai_do_cache(self, db):
+        monitor = criar_monitor()
+
+        async def cenario(portas):
+            tablet_id = criar_tablet(db, portas[0])
+            await monitor.ciclo()
+            assert monitor.obter(tablet_id)
+            db.query(Tablet).delete()
+            db.commit()
+            await monitor.ciclo()
+            return tablet_id
+
+        tablet_id = com_tablets([TabletSimulado()], cenario)
+        assert monitor.obter(tablet_id) is None
+
+
+class TestRotaStatus:
+
+    @pytest.fixture
+    def cenario(self, cenario, db, monkeypatch):
+        dataset, headers = cenario
+        db.empresa_id = dataset.empresa_id
+        tablet_id = criar_tablet(db, porta_fechada())
+        monkeypatch.setattr(monitor_tablets, "estados", {})
+        return tablet_id, headers
+
+    def test_status_servido_do_cache_sem_verificar(self, cenario):
+        tablet_id, headers = cenario
+        monitor_tablets.estados[tablet_id] = EstadoTablet(
+            tablet_id=tablet_id, online=True, status=StatusTablet.CONECTADO,
+            latencia_ms=12.5, verificado_em=datetime.utcnow()
+        )
+
+        response = TestClient(app).get(f"/api/api/tablets/{tablet_id}/status", headers=headers)
+
+        assert response.status_code == 200
+        assert response.json()["online"] is True
+        assert response.json()["latencia_ms"] == 12.5
+
+    def test_sem_cache_usa_status_conectado_do_banco(self, cenario, db):
+        tablet_id, headers = cenario
+        tablet = db.get(Tablet, tablet_id)
+        tablet.status = StatusTablet.CONECTADO
+        tablet.latencia_ms = 8.0
+        db.commit()
+
+        response = TestClient(app).get(f"/api/api/tablets/{tablet_id}/status", headers=headers)
+
+        assert response.status_code == 200
+        assert (response.json()["status"], response.json()["online"]) == ("conectado", True)
+        assert response.json()["latencia_ms"] == 8.0
+
+    def test_sem_cache_usa_banco_e_atualizar_forca_verificacao(self, cenario, db):
+        tablet_id, headers = cenario
+        client = TestClient(app)
+
+        response = client.get(f"/api/api/tablets/{tablet_id}/status", headers=headers)
+        assert response.json()["status"] == "desconectado"
+        assert response.json()["verificado_em"] is None
+
+        response = client.get(f"/api/api/tablets/{tablet_id}/status", headers=headers, params={"atualizar": True})
+        assert response.status_code == 200
+        assert response.json()["online"] is False
+        assert response.json()["verificado_em"] is not None
+        assert monitor_tablets.obter(tablet_id).falhas_consecutivas == 1
+
+        listagem = client.get("/api/api/tablets/", headers=headers).json()
+        assert listagem[0]["verificado_em"] is not None
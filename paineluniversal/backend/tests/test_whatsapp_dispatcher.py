@@ -0,0 +1,213 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.database import Base, get_db
+from app.auth import criar_access_token
+from app.services.whatsapp_dispatcher import BaldeTokens, DespachanteWhatsApp, StatusMensagem
+from app.services.whatsapp_service import despachante_whatsapp
+from .conftest import engine, TestingSessionLocal, override_get_db
+from benchmarks.synthetic import seed_dataset
+
+
+def criar_despachante(enviar, **opcoes):
+    parametros = dict(
+        remetente_padrao="padrao", taxa_por_segundo=1000, rajada=1000, max_concorrentes=4,
+        max_tentativas=3, backoff_segundos=0.001, max_fila=10000
+    )
+    parametros.update(opcoes)
+    return DespachanteWhatsApp(enviar, **parametros)
+
+
+def executar(despachante, cenario):
+    async def rodar():
+        await despachante.iniciar()
+        try:
+            return await cenario()
+        finally:
+            await despachante.parar()
+
+    return asyncio.run(rodar())
+
+
+class TestBaldeTokens:
+
+    def test_rajada_e_reposicao(self, monkeypatch):
+        agora = [100.0]
+        monkeypatch.setattr("app.services.whatsapp_dispatcher.time.monotonic", lambda: agora[0])
+        balde = BaldeTokens(taxa=2, capacidade=3)
+
+        assert [balde.consumir() for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert balde.consumir() == pytest.approx(0.5)
+
+        agora[0] += 1
+        assert balde.consumir() == 0.0
+        assert balde.consumir() == 0.0
+        assert balde.consumir() > 0
+
+
+class TestDespachanteWhatsApp:
+
+    def test_envio_respeita_taxa_do_remetente(self):
+        enviados = []
+
+        async def enviar(telefone, texto):
+            enviados.append(time.monotonic())
+
+        despachante = criar_despachante(enviar, taxa_por_segundo=200, rajada=10)
+
+        async def cenario():
+            inicio = time.monotonic()
+            despachante.enfileirar_varios([f"1199{i:07d}" for i in range(60)], "convite")
+            assert await despachante.aguardar_ociosa(timeout=5)
+            return time.monotonic() - inicio
+
+        duracao = executar(despachante, cenario)
+        assert len(enviados) == 60
+        assert duracao >= 50 / 200 * 0.8
+
+    def test_remetentes_tem_limites_independentes(self):
+        enviados = []
+
+        async def enviar(telefone, texto):
+            enviados.append(telefone)
+
+        despachante = criar_despachante(enviar, taxa_por_segundo=0.1, rajada=5)
+
+        async def cenario():
+            despachante.enfileirar_varios([f"a{i}" for i in range(5)], "oi", remetente="numero_a")
+            despachante.enfileirar_varios([f"b{i}" for i in range(5)], "oi", remetente="numero_b")
+            return await despachante.aguardar_ociosa(timeout=1)
+
+        assert executar(despachante, cenario)
+        assert len(enviados) == 10
+
+    def test_concorrencia_limitada(self):
+        em_andamento = []
+        maximo = []
+
+        async def enviar(telefone, texto):
+            em_andamento.append(1)
+            maximo.append(len(em_andamento))
+            await asyncio.sleep(0.02)
+            em_andamento.pop()
+
+        despachante = criar_despachante(enviar, max_concorrentes=4)
+
+        async def cenario():
+            despachante.enfileirar_varios([str(i) for i in range(20)], "oi")
+            return await despachante.aguardar_ociosa(timeout=5)
+
+        assert executar(despachante, cenario)
+        assert max(maximo) == 4
+
+    def test_retentativa_com_backoff(self):
+        falhas = {"instavel": 2, "quebrado": 99}
+
+        async def enviar(telefone, texto):
+            if falhas[telefone] > 0:
+                falhas[telefone] -= 1
+                raise RuntimeError("provedor indisponível")
+
+        despachante = criar_despachante(enviar, max_tentativas=3)
+
+        async def cenario():
+            mensagens = [despachante.enfileirar(telefone, "oi") for telefone in falhas]
+            await despachante.aguardar_ociosa(timeout=5)
+            return mensagens
+
+        instavel, quebrado = executar(despachante, cenario)
+        assert instavel.status == StatusMensagem.ENVIADA
+        assert instavel.tentativas == 3
+        assert instavel.erro is None
+        assert quebrado.status == StatusMensagem.FALHOU
+        assert quebrado.tentativas == 3
+        assert quebrado.erro == "provedor indisponível"
+        assert despachante.status(quebrado.id) is quebrado
+
+    def test_fila_cheia_recusa_lote_inteiro(self):
+        async def enviar(telefone, texto):
+            pass
+
+        despachante = criar_despachante(enviar, max_fila=5)
+        despachante.enfileirar_varios(["1", "2", "3"], "oi")
+
+        with pytest.raises(HTTPException) as erro:
+            despachante.enfileirar_varios(["4", "5", "6"], "oi")
+        assert erro.value.status_code == 503
+        assert despachante.profundidade() == 3
+
+    def test_mensagens_enfileiradas_antes_de_iniciar_sao_enviadas(self):
+        enviados = []
+
+        async def enviar(telefone, texto):
+            enviados.append(telefone)
+
+        despachante = criar_despachante(enviar)
+        despachante.enfileirar("11999990000", "oi")
+
+        async def cenario():
+            return await despachante.aguardar_ociosa(timeout=1)
+
+        assert executar(despachante, cenario)
+        assert enviados == ["11999990000"]
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    app.dependency_overrides[get_db] = override_get_db
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    try:
+        yield seed_dataset(db, eventos=1, listas_por_evento=1, transacoes_por_lista=1)
+    finally:
+        db.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+class TestRotasWhatsApp:
+
+    def test_convites_em_massa_enfileiram_e_retornam(self, dataset, monkeypatch):
+        enviados = []
+
+        async def enviar(telefone, texto):
+            enviados.append(telefone)
+
+        monkeypatch.setattr(despachante_whatsapp, "enviar", enviar)
+        monkeypatch.setattr(despachante_whatsapp, "taxa_por_segundo", 10000)
+        monkeypatch.setattr(despachante_whatsapp, "rajada", 10000)
+        monkeypatch.setattr(despachante_whatsapp, "_baldes", {})
+        headers = {"Authorization": f"Bearer {criar_access_token(data={'sub': dataset.admin_cpf})}"}
+        telefones = [f"+55119{i:08d}" for i in range(1000)]
+
+        with TestClient(app) as client:
+            response = client.post("/api/whatsapp/whatsapp/send-bulk", headers=headers, json={
+                "phones": telefones, "evento_id": dataset.evento_ids[0], "lista_id": dataset.lista_ids[0]
+            })
+            assert response.status_code == 200
+            ids = response.json()["mensagem_ids"]
+            assert len(ids) == 1000
+
+            for _ in range(200):
+                if len(enviados) == 1000:
+                    break
+                time.sleep(0.01)
+
+            status = client.get(f"/api/whatsapp/whatsapp/mensagens/{ids[0]}", headers=headers)
+            assert status.status_code == 200
+            assert status.json()["status"] == "enviada"
+            assert client.get("/api/whatsapp/whatsapp/mensagens/naoexiste", headers=headers).status_code == 404
+
+        assert sorted(enviados) == telefones
+
+    def test_limite_de_numeros_por_lote(self, dataset):
+        headers = {"Authorization": f"Bearer {criar_access_token(data={'sub': dataset.admin_cpf})}"}
+        response = TestClient(app).post("/api/whatsapp/whatsapp/send-bulk", headers=headers, json={
+            "phones": ["1"] * 1001, "evento_id": dataset.evento_ids[0], "lista_id": dataset.lista_ids[0]
+        })
+        assert response.status_code == 400
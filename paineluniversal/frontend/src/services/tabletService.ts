@@ -7,7 +7,7 @@ export interface Tablet {
   porta: number;
   tipo: string;
   status: string;
-  empresa_id: string;
+  empresa_id: number;
   configuracao_meep?: any;
   criado_em: string;
   ultima_conexao?: string;